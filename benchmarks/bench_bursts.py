@@ -0,0 +1,132 @@
+"""
+Burst benchmark: APK reydida to'lqin oynasi bilan va oynasiz API chaqiruvlari
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_bursts
+    python -m benchmarks.bench_bursts --raiders 10 --apks 50 --window 2
+
+Bir nechta foydalanuvchi bir guruhga qisqa vaqt ichida ko'p APK yuboradi
+(album yoki flood). Ikkala rejimda ham update'lar KeyedUpdateProcessor
+orqali bajariladi:
+
+    window=0   - har APK alohida o'chirish, strike va xabar
+    window=N   - BurstCoalescer: lider + delete_messages bilan ommaviy o'chirish
+
+Har rejim uchun API chaqiruvlari, o'chirilgan xabarlar, yuborilgan
+xabarlar va oxirgi strike'lar chiqariladi. Biror APK o'chirilmay qolsa
+chiqish kodi 1.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from telegram import Update
+
+from benchmarks.bench_concurrency import WORKDIR, FakeBot, bot
+from bursts import BurstCoalescer
+from processing import KeyedUpdateProcessor
+
+
+def make_raid(fake_bot: FakeBot, raiders: int, apks: int, spread: float) -> list:
+    """(kelish vaqti, update) juftlari: har reydchi `spread` sekund ichida"""
+    chat_id = -1002000000000
+    raid = []
+    update_id = 0
+    for r in range(raiders):
+        user_id = 5000 + r
+        for _ in range(apks):
+            update_id += 1
+            raid.append((random.uniform(0, spread), Update.de_json({
+                'update_id': update_id,
+                'message': {
+                    'message_id': update_id,
+                    'date': int(time.time()),
+                    'chat': {'id': chat_id, 'type': 'supergroup', 'title': 'raid'},
+                    'from': {'id': user_id, 'is_bot': False, 'first_name': f"r{user_id}"},
+                    'document': {
+                        'file_id': f"f{update_id}",
+                        'file_unique_id': f"u{update_id}",
+                        'file_name': f"mod_{update_id}.apk"
+                    }
+                }
+            }, fake_bot)))
+    raid.sort(key=lambda item: item[0])
+    return raid
+
+
+async def run_mode(window: float, args) -> dict:
+    """Bitta rejim: reydni real vaqtda yuborish va hisoblagichlarni qaytarish"""
+    random.seed(args.seed)
+    bot.db = bot.StrikeDatabase(os.path.join(WORKDIR, f"bursts-{window}.json"))
+    bot.admin_cache = bot.AdminCache(ttl=600)
+    bot.bot_rights = bot.BotRightsCache(ttl=600)
+    bot.bursts = BurstCoalescer(window) if window > 0 else None
+    
+    fake_bot = FakeBot(args.latency)
+    context = SimpleNamespace(bot=fake_bot)
+    processor = KeyedUpdateProcessor(64)
+    raid = make_raid(fake_bot, args.raiders, args.apks, args.spread)
+    
+    started = time.perf_counter()
+    tasks = []
+    for at, update in raid:
+        delay = at - (time.perf_counter() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(
+            processor.process_update(update, bot.handle_document(update, context))
+        ))
+    await asyncio.gather(*tasks)
+    if bot.bursts is not None:
+        await bot.bursts.close()
+    elapsed = time.perf_counter() - started
+    
+    strikes = bot.db.get_statistics()['total_strikes']
+    bot.db.close()
+    return {
+        'elapsed': elapsed,
+        'api': fake_bot.counts['api'],
+        'deleted': fake_bot.counts['deleted'],
+        'notices': fake_bot.counts['notices'],
+        'strikes': strikes,
+        'bans': sum(1 for a in fake_bot.actions.values() if 'ban' in a)
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--raiders', type=int, default=5, help="Reydchilar soni")
+    parser.add_argument('--apks', type=int, default=40, help="Har reydchi APK'lari")
+    parser.add_argument('--spread', type=float, default=1.0, help="Reyd davomiyligi (sekund)")
+    parser.add_argument('--window', type=float, default=3.0, help="To'lqin oynasi (sekund)")
+    parser.add_argument('--latency', type=float, default=0.02, help="API kechikishi (sekund)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    total = args.raiders * args.apks
+    print(
+        f"{total} ta APK ({args.raiders} reydchi x {args.apks}), "
+        f"{args.spread:.1f} s ichida, API kechikishi {args.latency * 1000:.0f} ms"
+    )
+    print(f"{'oyna':<10}{'vaqt, s':>9}{'API':>7}{'deleted':>12}{'notices':>8}{'strike':>8}{'ban':>6}")
+    
+    failed = False
+    for window in (0.0, args.window):
+        result = asyncio.run(run_mode(window, args))
+        print(
+            f"{window:<10}{result['elapsed']:>9.2f}{result['api']:>7}{result['deleted']:>12}"
+            f"{result['notices']:>8}{result['strikes']:>8}{result['bans']:>6}"
+        )
+        if result['deleted'] != total:
+            failed = True
+    
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
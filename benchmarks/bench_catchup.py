@@ -0,0 +1,263 @@
+"""
+Catch-up benchmark: qayta ishga tushgandan keyingi backlog va jonli trafik
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_catchup
+    python -m benchmarks.bench_catchup --backlog 5000 --live 300 --scale 5
+
+Soxta bot barcha Bot API chaqiruvlarini PriorityRateLimiter orqali
+o'tkazadi (Telegram limitlari `--scale` marta tezlashtirilgan) va
+getUpdates'da kutilayotgan update'larni sahifalab beradi. Backlog -
+10 daqiqa oldin yuborilgan aralash guruh trafigi (APK, toza hujjatlar,
+matn). Backlog qayta ishlanayotganda jonli APK'lar berilgan tezlikda
+keladi. Ikki rejim solishtiriladi:
+
+    updater  - drop_pending_updates=False: backlog odatdagi navbat orqali
+               (har APK alohida o'chiriladi, ogohlantirishlar yuboriladi)
+    catchup  - BacklogCatchUp: cheklangan parallellik, BACKLOG ustuvorligi,
+               eski APK'lar ommaviy o'chiriladi, ogohlantirishsiz
+
+Jonli APK'larni olib tashlash kechikishi, backlog tugash vaqti va API
+chaqiruvlari o'lchanadi. Biror APK o'chirilmasa chiqish kodi 1.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+from telegram import Update
+
+from benchmarks.bench_webhook import WebhookFakeBot, bot
+from ratelimit import PriorityRateLimiter
+
+BACKLOG_CHAT = -1006000000000
+LIVE_CHAT = -1007000000000
+
+
+class CatchupFakeBot(WebhookFakeBot):
+    """Rate limiter orqali ishlovchi va getUpdates'ni taqlid qiluvchi soxta bot"""
+    
+    def __init__(self, latency: float, limiter: PriorityRateLimiter, pending: list):
+        super().__init__(latency)
+        with self._unfrozen():
+            self.limiter = limiter
+            self.pending = pending
+            self.calls = defaultdict(int)
+            self.notices = defaultdict(int)
+    
+    async def _limited(self, endpoint: str, chat_id: int) -> bool:
+        async def call():
+            self.calls[endpoint] += 1
+            await self._call()
+            return True
+        return await self.limiter.process_request(
+            call, (), {}, endpoint, {'chat_id': chat_id}, None
+        )
+    
+    async def delete_webhook(self, *args, **kwargs):
+        return True
+    
+    async def get_updates(self, offset=None, limit=100, *args, **kwargs):
+        self.calls['getUpdates'] += 1
+        await self._call()
+        if offset is not None:
+            # offset'dan oldingilari tasdiqlangan
+            confirmed = sum(1 for u in self.pending if u.update_id < offset)
+            del self.pending[:confirmed]
+        return tuple(self.pending[:limit])
+    
+    async def get_chat_administrators(self, chat_id, *args, **kwargs):
+        await self._limited('getChatAdministrators', chat_id)
+        return ()
+    
+    async def get_chat_member(self, chat_id, user_id, *args, **kwargs):
+        await self._limited('getChatMember', chat_id)
+        return SimpleNamespace(
+            status='administrator',
+            can_delete_messages=True,
+            can_restrict_members=True
+        )
+    
+    async def delete_message(self, chat_id, message_id, *args, **kwargs):
+        await self._limited('deleteMessage', chat_id)
+        self.deleted_at[message_id] = time.perf_counter()
+        return True
+    
+    async def delete_messages(self, chat_id, message_ids, *args, **kwargs):
+        await self._limited('deleteMessages', chat_id)
+        now = time.perf_counter()
+        for message_id in message_ids:
+            self.deleted_at[message_id] = now
+        return True
+    
+    async def send_message(self, chat_id, text, *args, **kwargs):
+        self.notices['live' if LIVE_CHAT - 1000 < chat_id <= LIVE_CHAT else 'backlog'] += 1
+        await self._limited('sendMessage', chat_id)
+        return None
+    
+    async def restrict_chat_member(self, chat_id, user_id, *args, **kwargs):
+        await self._limited('restrictChatMember', chat_id)
+        return True
+    
+    async def ban_chat_member(self, chat_id, user_id, *args, **kwargs):
+        await self._limited('banChatMember', chat_id)
+        return True
+
+
+def make_update(fake_bot, update_id: int, chat_id: int, user_id: int, date: int, apk: bool) -> Update:
+    """Guruhdagi APK yoki matnli xabar update'i"""
+    message = {
+        'message_id': update_id,
+        'date': date,
+        'chat': {'id': chat_id, 'type': 'supergroup', 'title': 'catchup'},
+        'from': {'id': user_id, 'is_bot': False, 'first_name': f"c{user_id}"}
+    }
+    if apk:
+        message['document'] = {
+            'file_id': f"f{update_id}",
+            'file_unique_id': f"u{update_id}",
+            'file_name': 'mod.apk'
+        }
+    else:
+        message['text'] = 'salom'
+    return Update.de_json({'update_id': update_id, 'message': message}, fake_bot)
+
+
+def make_backlog(fake_bot, count: int, apk_share: float, chats: int) -> tuple:
+    """10 daqiqa oldingi aralash trafik: (update'lar, APK ID'lari)"""
+    date = int(time.time()) - 600
+    updates, apks = [], set()
+    for update_id in range(1, count + 1):
+        apk = random.random() < apk_share
+        if apk:
+            apks.add(update_id)
+        updates.append(make_update(
+            fake_bot,
+            update_id,
+            BACKLOG_CHAT - update_id % chats,
+            30000 + random.randrange(max(1, count // 20)),
+            date,
+            apk
+        ))
+    return updates, apks
+
+
+async def run_mode(mode: str, args) -> dict:
+    """Bitta rejim: backlog va jonli trafikni qayta ishlash"""
+    random.seed(args.seed)
+    bot.db = bot.StrikeDatabase(f"catchup-{mode}.json")
+    bot.admin_cache = bot.AdminCache(ttl=600)
+    bot.bot_rights = bot.BotRightsCache(ttl=600)
+    bot.stale_deletes = bot.BulkDeleter()
+    bot.Config.STALE_MESSAGE_AGE = 120 if mode == 'catchup' else 10 ** 9
+    
+    limiter = PriorityRateLimiter(
+        global_rate=30 * args.scale,
+        group_rate=20 / 60 * args.scale,
+        max_retries=args.retries
+    )
+    fake_bot = CatchupFakeBot(args.latency, limiter, [])
+    backlog, apks = make_backlog(fake_bot, args.backlog, args.apk_share, args.backlog_chats)
+    application = bot.create_application(bot=fake_bot, updater=False)
+    
+    await application.initialize()
+    await application.start()
+    
+    started = time.perf_counter()
+    if mode == 'catchup':
+        fake_bot.pending.extend(backlog)
+        catchup = await bot.start_catchup(
+            application,
+            concurrency=bot.Config.CATCHUP_CONCURRENCY,
+            prefilter=bot.prefilter
+        )
+    else:
+        for update in backlog:
+            await application.update_queue.put(update)
+    
+    # Jonli APK'lar backlog qayta ishlanayotganda keladi
+    sent_at = {}
+    for i in range(args.live):
+        update_id = args.backlog + 1 + i
+        update = make_update(
+            fake_bot, update_id, LIVE_CHAT - i % args.live_chats, 50000 + i, int(time.time()), True
+        )
+        sent_at[update_id] = time.perf_counter()
+        await application.update_queue.put(update)
+        await asyncio.sleep(1 / args.rate)
+    
+    if mode == 'catchup':
+        while catchup.stats()['running']:
+            await asyncio.sleep(0.01)
+    await application.update_queue.join()
+    while application.update_processor.current_concurrent_updates:
+        await asyncio.sleep(0.01)
+    backlog_done = max(
+        (fake_bot.deleted_at[m] for m in apks if m in fake_bot.deleted_at), default=started
+    ) - started
+    
+    await application.stop()
+    await bot.stale_deletes.close()
+    await application.shutdown()
+    await limiter.shutdown()
+    bot.db.close()
+    
+    latencies = sorted(
+        (fake_bot.deleted_at[u] - sent_at[u]) * 1000
+        for u in sent_at if u in fake_bot.deleted_at
+    )
+    return {
+        'backlog_done': backlog_done,
+        'live_p50': latencies[len(latencies) // 2] if latencies else 0,
+        'live_p99': latencies[int(len(latencies) * 0.99)] if latencies else 0,
+        'missed': len((apks | set(sent_at)) - set(fake_bot.deleted_at)),
+        'deletes': fake_bot.calls['deleteMessage'] + fake_bot.calls['deleteMessages'],
+        'api': sum(fake_bot.calls.values()),
+        'stale_notices': fake_bot.notices['backlog']
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--backlog', type=int, default=3000, help="Kutilayotgan update'lar")
+    parser.add_argument('--apk-share', type=float, default=0.15, help="Backlog'dagi APK ulushi")
+    parser.add_argument('--live', type=int, default=200, help="Jonli APK'lar")
+    parser.add_argument('--rate', type=float, default=20, help="Jonli APK'lar tezligi (1/s)")
+    parser.add_argument('--backlog-chats', type=int, default=5, help="Raid bo'lgan guruhlar")
+    parser.add_argument('--live-chats', type=int, default=100, help="Jonli trafik guruhlari")
+    parser.add_argument('--scale', type=float, default=5, help="Limitlar ko'paytmasi")
+    parser.add_argument('--latency', type=float, default=0.01, help="API kechikishi (sekund)")
+    parser.add_argument('--retries', type=int, default=5, help="Maksimal qayta urinishlar")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    print(
+        f"backlog {args.backlog} ta update ({args.apk_share:.0%} APK), "
+        f"jonli {args.live} ta APK ({args.rate:g}/s), limitlar x{args.scale:g}"
+    )
+    print(
+        f"{'rejim':<10}{'backlog, s':>12}{'jonli p50':>12}{'jonli p99':>12}"
+        f"{'o`chirish':>11}{'API':>8}{'eski xabar':>12}{'qoldi':>8}"
+    )
+    
+    failed = False
+    for mode in ('updater', 'catchup'):
+        result = asyncio.run(run_mode(mode, args))
+        print(
+            f"{mode:<10}{result['backlog_done']:>12.2f}"
+            f"{result['live_p50']:>9.0f} ms{result['live_p99']:>9.0f} ms"
+            f"{result['deletes']:>11}{result['api']:>8}"
+            f"{result['stale_notices']:>12}{result['missed']:>8}"
+        )
+        if result['missed']:
+            failed = True
+    
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
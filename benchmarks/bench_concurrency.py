@@ -0,0 +1,230 @@
+"""
+Concurrency benchmark: update processor'larni handle_document orqali solishtirish
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_concurrency
+    python -m benchmarks.bench_concurrency --chats 50 --users 4 --apks 5 --latency 0.05
+
+Bot API soxta bot bilan almashtiriladi (har chaqiruv `latency` sekund
+kutadi). Har (guruh, foydalanuvchi) bir nechta APK'ni ketma-ket yuboradi,
+barcha oqimlar esa aralashtirilib beriladi. Uch rejim o'lchanadi:
+
+    sequential  - PTB standarti (concurrent_updates o'chirilgan)
+    unordered   - oddiy parallel (SimpleUpdateProcessor)
+    keyed       - KeyedUpdateProcessor
+
+Har rejimdan keyin strike soni va jazolar tartibi (mute -> ban -> ...)
+kutilgan natija bilan solishtiriladi; xato bo'lsa chiqish kodi 1. Shu
+tekshiruv test sifatida: tests/test_processing.py.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+from telegram import Bot, Update
+from telegram.ext import SimpleUpdateProcessor
+
+# bot.py import vaqtida database va log fayllarini joriy papkada ochadi
+WORKDIR = tempfile.mkdtemp(prefix='bench-concurrency-')
+os.chdir(WORKDIR)
+os.environ.setdefault('BOT_TOKEN', '123456:bench')
+os.environ['STRIKES_STORAGE'] = 'json'
+os.environ['VERDICT_CACHE_FILE'] = ''
+os.environ['LOG_LEVEL'] = 'ERROR'
+# Har APK alohida strike olishi kerak (to'lqinlar bench_bursts'da)
+os.environ['BURST_WINDOW'] = '0'
+
+import bot  # noqa: E402
+from processing import KeyedUpdateProcessor  # noqa: E402
+
+BOT_ID = 1
+
+
+class FakeBot(Bot):
+    """Bot API chaqiruvlarini kechikish bilan taqlid qiluvchi bot"""
+    
+    def __init__(self, latency: float):
+        super().__init__('123456:bench')
+        with self._unfrozen():
+            self.latency = latency
+            self.actions = defaultdict(list)
+            self.counts = defaultdict(int)
+    
+    @property
+    def id(self) -> int:
+        return BOT_ID
+    
+    async def _call(self) -> None:
+        self.counts['api'] += 1
+        # Tarmoq tebranishi: chaqiruvlar kelgan tartibda qaytmaydi
+        await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+    
+    async def get_chat_administrators(self, chat_id, *args, **kwargs):
+        await self._call()
+        return ()
+    
+    async def get_chat_member(self, chat_id, user_id, *args, **kwargs):
+        await self._call()
+        return SimpleNamespace(
+            status='administrator',
+            can_delete_messages=True,
+            can_restrict_members=True
+        )
+    
+    async def delete_message(self, chat_id, message_id, *args, **kwargs):
+        self.counts['deleted'] += 1
+        await self._call()
+        return True
+    
+    async def delete_messages(self, chat_id, message_ids, *args, **kwargs):
+        self.counts['deleted'] += len(message_ids)
+        await self._call()
+        return True
+    
+    async def send_message(self, chat_id, text, *args, **kwargs):
+        self.counts['notices'] += 1
+        await self._call()
+        return None
+    
+    async def restrict_chat_member(self, chat_id, user_id, *args, **kwargs):
+        self.actions[(chat_id, user_id)].append('mute')
+        await self._call()
+        return True
+    
+    async def ban_chat_member(self, chat_id, user_id, *args, **kwargs):
+        self.actions[(chat_id, user_id)].append('ban')
+        await self._call()
+        return True
+
+
+def make_updates(fake_bot: FakeBot, chats: int, users: int, apks: int) -> list:
+    """Har oqim tartibini saqlab, oqimlarni aralashtirib update'lar yaratish"""
+    streams = []
+    update_id = 0
+    for c in range(chats):
+        for u in range(users):
+            chat_id = -1001000000000 - c
+            user_id = 1000 + u
+            stream = []
+            for _ in range(apks):
+                update_id += 1
+                stream.append(Update.de_json({
+                    'update_id': update_id,
+                    'message': {
+                        'message_id': update_id,
+                        'date': int(time.time()),
+                        'chat': {'id': chat_id, 'type': 'supergroup', 'title': 'bench'},
+                        'from': {'id': user_id, 'is_bot': False, 'first_name': f"u{user_id}"},
+                        'document': {
+                            'file_id': f"f{update_id}",
+                            'file_unique_id': f"u{update_id}",
+                            'file_name': 'game.apk'
+                        }
+                    }
+                }, fake_bot))
+            streams.append(stream)
+    
+    updates = []
+    while streams:
+        stream = random.choice(streams)
+        updates.append(stream.pop(0))
+        if not stream:
+            streams.remove(stream)
+    return updates
+
+
+def expected_actions(apks: int) -> tuple:
+    """Bitta foydalanuvchi uchun kutilgan jazolar va oxirgi strike"""
+    actions = []
+    strikes = 0
+    for _ in range(apks):
+        strikes += 1
+        if strikes >= bot.Config.MAX_STRIKES:
+            actions.append('ban')
+            strikes = 0
+        elif strikes == 2:
+            actions.append('mute')
+    return actions, strikes
+
+
+async def run_mode(mode: str, args) -> tuple:
+    """Bitta rejimni ishga tushirish: (vaqt, xatolar soni, API chaqiruvlari)"""
+    random.seed(args.seed)
+    bot.db = bot.StrikeDatabase(os.path.join(WORKDIR, f"{mode}.json"))
+    bot.admin_cache = bot.AdminCache(ttl=600)
+    bot.bot_rights = bot.BotRightsCache(ttl=600)
+    
+    fake_bot = FakeBot(args.latency)
+    context = SimpleNamespace(bot=fake_bot)
+    updates = make_updates(fake_bot, args.chats, args.users, args.apks)
+    
+    started = time.perf_counter()
+    if mode == 'sequential':
+        for update in updates:
+            await bot.handle_document(update, context)
+    else:
+        processor = (
+            KeyedUpdateProcessor(args.concurrency) if mode == 'keyed'
+            else SimpleUpdateProcessor(args.concurrency)
+        )
+        # Application kabi: har update uchun kelgan tartibda task
+        await asyncio.gather(*[
+            asyncio.create_task(processor.process_update(u, bot.handle_document(u, context)))
+            for u in updates
+        ])
+    elapsed = time.perf_counter() - started
+    
+    actions, strikes = expected_actions(args.apks)
+    errors = 0
+    for c in range(args.chats):
+        for u in range(args.users):
+            chat_id, user_id = -1001000000000 - c, 1000 + u
+            if fake_bot.actions[(chat_id, user_id)] != actions:
+                errors += 1
+            elif bot.db.get_strikes(chat_id, user_id) != strikes:
+                errors += 1
+    
+    bot.db.close()
+    return elapsed, errors, fake_bot.counts['api']
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--chats', type=int, default=20, help="Guruhlar soni")
+    parser.add_argument('--users', type=int, default=3, help="Har guruhdagi qoidabuzarlar")
+    parser.add_argument('--apks', type=int, default=5, help="Har foydalanuvchi APK'lari")
+    parser.add_argument('--latency', type=float, default=0.02, help="API kechikishi (sekund)")
+    parser.add_argument('--concurrency', type=int, default=64, help="Parallel update'lar")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument(
+        '--modes', default='sequential,unordered,keyed',
+        help="Rejimlar (vergul bilan)"
+    )
+    args = parser.parse_args()
+    
+    total = args.chats * args.users * args.apks
+    print(
+        f"{total} ta update ({args.chats} guruh x {args.users} foydalanuvchi x "
+        f"{args.apks} APK), API kechikishi {args.latency * 1000:.0f} ms"
+    )
+    print(f"{'rejim':<12}{'vaqt, s':>10}{'update/s':>10}{'API':>8}{'xato':>8}")
+    
+    failed = False
+    for mode in args.modes.split(','):
+        elapsed, errors, calls = asyncio.run(run_mode(mode, args))
+        print(f"{mode:<12}{elapsed:>10.2f}{total / elapsed:>10.0f}{calls:>8}{errors:>8}")
+        if mode != 'unordered' and errors:
+            failed = True
+    
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
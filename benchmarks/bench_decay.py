@@ -0,0 +1,98 @@
+"""
+Strike decay benchmark: min-heap rejalashtiruvchi va to'liq skan
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_decay
+    python -m benchmarks.bench_decay --records 1000000 --ticks 60
+
+Database'da `--records` ta yozuv, ularning oxirgi strike vaqtlari bitta
+davr bo'ylab tekis tarqalgan. Vaqt `--ticks` qadam bilan bir davr
+oldinga suriladi va har qadamda muddati o'tgan strike'lar kechiriladi:
+
+    scan  - har qadamda barcha yozuvlar ko'rib chiqiladi
+    heap  - StrikeDecay faqat vaqti kelgan yozuvlarni oladi
+
+Ikkala usul oxirida bir xil holatga kelishi tekshiriladi; aks holda
+chiqish kodi 1.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from decay import StrikeDecay
+from storage import JsonStorage, decay_step
+
+PERIOD = 30 * 86400.0
+
+
+def populate(storage: JsonStorage, records: int, start: float) -> None:
+    """Yozuvlar: 1-3 strike, oxirgi strike so'nggi bitta davr ichida"""
+    rng = random.Random(42)
+    for i in range(records):
+        timestamp = datetime.fromtimestamp(start - rng.random() * PERIOD).isoformat()
+        for _ in range(rng.randint(1, 3)):
+            storage.increment(-1001000000000 - i % 1000, i, timestamp)
+
+
+def run_scan(storage: JsonStorage, now: float) -> int:
+    """Barcha yozuvlarni ko'rib chiqib muddati o'tganlarini kechirish"""
+    forgiven = 0
+    for chat_id, user_id, clock in storage.decay_clocks():
+        record = storage.get(chat_id, user_id)
+        if decay_step(clock, record['strikes'], PERIOD, now)[0]:
+            forgiven += storage.decay(chat_id, user_id, PERIOD, now)[0]
+    return forgiven
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=200000, help="Yozuvlar soni")
+    parser.add_argument('--ticks', type=int, default=30, help="Bir davrdagi qadamlar")
+    args = parser.parse_args()
+    
+    start = time.time()
+    print(f"{args.records} ta yozuv, {args.ticks} qadam")
+    print(f"{'usul':<8}{'jami, s':>10}{'qadam, ms':>12}{'kechirildi':>12}{'qoldi':>10}")
+    
+    results = {}
+    workdir = tempfile.mkdtemp()
+    for mode in ('scan', 'heap'):
+        storage = JsonStorage(
+            os.path.join(workdir, f"decay-{mode}.json"),
+            flush_interval=3600,
+            flush_threshold=10 ** 9
+        )
+        populate(storage, args.records, start)
+        decay = StrikeDecay(storage, PERIOD, batch=10 ** 9)
+        if mode == 'heap':
+            decay._load()
+        
+        forgiven = 0
+        started = time.perf_counter()
+        for tick in range(1, args.ticks + 1):
+            now = start + PERIOD * tick / args.ticks
+            if mode == 'scan':
+                forgiven += run_scan(storage, now)
+            else:
+                decay.run_due(now)
+        elapsed = time.perf_counter() - started
+        if mode == 'heap':
+            forgiven = decay.forgiven
+        
+        results[mode] = storage.index.to_dict()
+        print(
+            f"{mode:<8}{elapsed:>10.2f}{elapsed / args.ticks * 1000:>12.1f}"
+            f"{forgiven:>12}{len(storage.index):>10}"
+        )
+        storage.close()
+    
+    return 0 if results['scan'] == results['heap'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Load test: bot.py + database.py o'tkazuvchanligi soxta Bot API bilan (token kerak emas)
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_load
+    python -m benchmarks.bench_load --updates 20000 --rate 500 --latency 0.03
+    python -m benchmarks.bench_load --errors 0.01 --retry-after deleteMessage=0.02
+    python -m benchmarks.bench_load --save-stream stream.jsonl --save-result base.json
+    python -m benchmarks.bench_load --replay stream.jsonl --baseline base.json
+
+Bot to'liq Application sifatida (prefilter, KeyedUpdateProcessor, rate
+limiter, storage) ishga tushadi, Bot API esa shu jarayondagi alohida
+oqimda ishlovchi FakeBotApi bilan almashtiriladi. Update'lar
+benchmarks.workload generatoridan (matn, xavfsiz hujjat, APK, album,
+raid, admin, buyruq) yoki `--replay` JSONL faylidan olinadi va
+Application navbatiga `--rate` tezlikda (0 - imkon qadar tez) beriladi.
+
+Hisobot:
+    upd/s           - update'lar / birinchi update'dan dispatch tugaguncha
+    time-to-delete  - update navbatga qo'yilgandan soxta API o'chirishni
+                      qabul qilguncha (p50/p99; `--rate 0` da navbat
+                      kutishini ham o'z ichiga oladi)
+    API/violation   - moderatsiya API chaqiruvlari / qoidabuzarlik
+                      (admin bo'lmagan foydalanuvchidan APK)
+
+`--save-result` natijani JSON'ga yozadi, `--baseline` esa shu fayl bilan
+solishtiradi. Xato kiritilmagan bo'lsa har qoidabuzarlik o'chirilgan
+bo'lishi kerak; aks holda chiqish kodi 1.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from telegram import Update
+
+from benchmarks.fake_api import FakeBotApi, parse_method_values
+from benchmarks.workload import ADMIN_IDS, WorkloadGenerator, load_jsonl, parse_mix, save_jsonl
+
+# Baseline bilan solishtiriladigan ko'rsatkichlar: (kalit, nomi, kattasi yaxshimi)
+COMPARED = (
+    ('updates_per_sec', 'upd/s', True),
+    ('ttd_p50_ms', 'time-to-delete p50, ms', False),
+    ('ttd_p99_ms', 'time-to-delete p99, ms', False),
+    ('api_per_violation', 'API/violation', False)
+)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Saralangan ro'yxatdagi q-persentil (0..1; bo'sh ro'yxat - 0)"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def configure_env(args, api_url: str) -> None:
+    """bot.py import qilinishidan oldin Config uchun muhit"""
+    os.environ.update({
+        'BOT_TOKEN': '123456:bench',
+        'BOT_API_URL': api_url,
+        'STRIKES_STORAGE': args.storage,
+        'VERDICT_CACHE_FILE': '',
+        'LOG_FILE': '',
+        'LOG_LEVEL': 'CRITICAL',
+        'CATCHUP_ON_START': 'false',
+        'DEGRADED_REPORT_INTERVAL': '0',
+        'METRICS_PORT': '0',
+        'MAX_CONCURRENT_UPDATES': str(args.concurrency)
+    })
+    if args.burst_window is not None:
+        os.environ['BURST_WINDOW'] = str(args.burst_window)
+    if not args.real_limits:
+        # Limiter navbati emas, bot o'zi o'lchanadi
+        os.environ['RATE_LIMIT_GLOBAL'] = '1000000'
+        os.environ['RATE_LIMIT_GROUP'] = '1000000'
+
+
+def prepare(app, stream: List[dict], keep_dates: bool) -> List[Tuple[Update, Optional[Tuple[int, int]]]]:
+    """Update obyektlari va hujjatli xabarlar kaliti (o'lchovdan oldin)"""
+    now = int(time.time())
+    prepared = []
+    for data in stream:
+        message = data.get('message')
+        key = None
+        if message is not None:
+            if not keep_dates:
+                message['date'] = now
+            if 'document' in message:
+                key = (message['chat']['id'], message['message_id'])
+        prepared.append((Update.de_json(data, app.bot), key))
+    return prepared
+
+
+async def feed(app, prepared: list, rate: float, sent: Dict[Tuple[int, int], float]) -> None:
+    """Update'larni Application navbatiga berish (rate=0 - kutmasdan)"""
+    started = time.perf_counter()
+    for i, (update, key) in enumerate(prepared):
+        if rate:
+            delay = started + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        elif i % 64 == 0:
+            await asyncio.sleep(0)
+        if key is not None:
+            sent[key] = time.perf_counter()
+        await app.update_queue.put(update)
+
+
+async def wait_idle(app) -> float:
+    """Navbat bo'sh va qayta ishlanayotgan update qolmaguncha kutish"""
+    idle_since = None
+    while True:
+        busy = app.update_queue.qsize() or app.update_processor.current_concurrent_updates
+        now = time.perf_counter()
+        if busy:
+            idle_since = None
+        elif idle_since is None:
+            idle_since = now
+        elif now - idle_since >= 0.02:
+            return idle_since
+        await asyncio.sleep(0.005)
+
+
+async def run(args, api: FakeBotApi, stream: List[dict]) -> dict:
+    """Bitta o'lchov: bot ishga tushadi, oqim beriladi, bot to'xtatiladi"""
+    import bot
+    from metrics import EVENTS
+    
+    app = bot.create_application(updater=False)
+    await app.initialize()
+    await app.post_init(app)
+    await app.start()
+    
+    prepared = prepare(app, stream, args.keep_dates)
+    calls_before = api.moderation_calls()
+    events_before = {event: EVENTS.value(event) for event in ('detected', 'exempt')}
+    sent: Dict[Tuple[int, int], float] = {}
+    
+    started = time.perf_counter()
+    await feed(app, prepared, args.rate, sent)
+    finished = await wait_idle(app)
+    
+    # To'lqinlar va ommaviy o'chirish navbati shu yerda yopiladi
+    await app.stop()
+    await app.post_stop(app)
+    await app.shutdown()
+    await app.post_shutdown(app)
+    
+    violations = int(
+        EVENTS.value('detected') - events_before['detected']
+        - (EVENTS.value('exempt') - events_before['exempt'])
+    )
+    latencies = sorted(
+        api.deleted[key] - sent_at for key, sent_at in sent.items() if key in api.deleted
+    )
+    api_calls = api.moderation_calls() - calls_before
+    seconds = finished - started
+    return {
+        'updates': len(prepared),
+        'seconds': round(seconds, 3),
+        'updates_per_sec': round(len(prepared) / seconds, 1) if seconds > 0 else 0.0,
+        'violations': violations,
+        'deleted': len(latencies),
+        'ttd_p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+        'ttd_p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+        'api_calls': api_calls,
+        'api_per_violation': round(api_calls / violations, 2) if violations else 0.0,
+        'injected_errors': api.injected['error'],
+        'injected_retry_after': api.injected['retry_after']
+    }
+
+
+def report(result: dict, baseline: Optional[dict]) -> None:
+    print(
+        f"{result['updates']} update, {result['violations']} qoidabuzarlik, "
+        f"{result['deleted']} o'chirildi, {result['api_calls']} API chaqiruv "
+        f"(kiritilgan xato: {result['injected_errors']}, RetryAfter: {result['injected_retry_after']})"
+    )
+    header = f"{'metrika':<26}{'natija':>12}"
+    if baseline:
+        header += f"{'baseline':>12}{'farq':>10}"
+    print(header)
+    for key, name, higher_is_better in COMPARED:
+        line = f"{name:<26}{result[key]:>12}"
+        if baseline and key in baseline:
+            base = baseline[key]
+            change = (result[key] - base) / base * 100 if base else 0.0
+            better = change >= 0 if higher_is_better else change <= 0
+            line += f"{base:>12}{change:>+9.1f}%{'' if better else ' !'}"
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--updates', type=int, default=5000, help="Sintetik update'lar soni")
+    parser.add_argument('--chats', type=int, default=50, help="Guruhlar soni")
+    parser.add_argument('--users', type=int, default=2000, help="Oddiy foydalanuvchilar soni")
+    parser.add_argument('--mix', default='', help="Tur ulushlari, masalan apk=0.3,raid=0.1")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--replay', help="Update'larni JSONL fayldan o'qish (generator o'rniga)")
+    parser.add_argument('--keep-dates', action='store_true', help="Qayta o'ynatishda xabar sanalarini saqlash")
+    parser.add_argument('--save-stream', help="Oqimni JSONL faylga yozish")
+    parser.add_argument('--rate', type=float, default=0.0, help="Update/sekund (0 - imkon qadar tez)")
+    parser.add_argument(
+        '--latency', action='append', default=[],
+        help="API kechikishi, sekund (0.02 yoki deleteMessage=0.08; takrorlanadi)"
+    )
+    parser.add_argument('--errors', action='append', default=[], help="400 xato ehtimolligi (0.01 yoki metod=..)")
+    parser.add_argument('--retry-after', action='append', default=[], help="429 ehtimolligi (0.01 yoki metod=..)")
+    parser.add_argument('--storage', default='journal', choices=('json', 'journal', 'binary', 'sqlite', 'tiered'))
+    parser.add_argument('--concurrency', type=int, default=64, help="MAX_CONCURRENT_UPDATES")
+    parser.add_argument('--burst-window', type=float, help="BURST_WINDOW (standart - Config)")
+    parser.add_argument('--real-limits', action='store_true', help="Config'dagi rate limitlar bilan")
+    parser.add_argument('--save-result', help="Natijani JSON faylga yozish")
+    parser.add_argument('--baseline', help="Oldingi --save-result fayli bilan solishtirish")
+    args = parser.parse_args()
+    
+    if args.replay:
+        stream = list(load_jsonl(args.replay))
+    else:
+        generator = WorkloadGenerator(args.chats, args.users, parse_mix(args.mix), args.seed)
+        stream = generator.generate(args.updates)
+    if args.save_stream:
+        save_jsonl(args.save_stream, stream)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    result_file = os.path.abspath(args.save_result) if args.save_result else None
+    
+    latency = parse_method_values(args.latency or ['0.02'])
+    errors = parse_method_values(args.errors)
+    api = FakeBotApi(
+        latency=latency.pop('*', 0.0),
+        method_latency=latency,
+        errors=errors,
+        retry_after=parse_method_values(args.retry_after),
+        admins=ADMIN_IDS,
+        seed=args.seed
+    )
+    api.start_in_thread()
+    
+    # bot.py import vaqtida database fayllarini joriy papkada ochadi
+    os.chdir(tempfile.mkdtemp(prefix='bench-load-'))
+    configure_env(args, api.url)
+    try:
+        result = asyncio.run(run(args, api, stream))
+    finally:
+        api.stop_thread()
+    
+    report(result, baseline)
+    if result_file:
+        with open(result_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    
+    faults = result['injected_errors'] or result['injected_retry_after']
+    return 0 if faults or result['deleted'] >= result['violations'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
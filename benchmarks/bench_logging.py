@@ -0,0 +1,90 @@
+"""
+Logging benchmark: chaqiruvchi oqimdagi log narxi
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_logging
+    python -m benchmarks.bench_logging --records 200000
+
+Har moderatsiyadagi yozuvga o'xshash `--records` ta yozuv log'lanadi va
+chaqiruvchi (event loop) oqimida sarflangan vaqt o'lchanadi:
+
+    sync      - basicConfig + FileHandler (eski sozlama, disk shu oqimda)
+    queue     - setup_logging: yozuv navbatga, formatlash va disk fon oqimida
+    filtered  - setup_logging, daraja WARNING: INFO yozuvlari tashlanadi
+                (%-format argumentlari umuman formatlanmaydi)
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from logsetup import TEXT_FORMAT, setup_logging, stop_logging
+
+
+def reset_root() -> None:
+    """Oldingi rejim handler'larini olib tashlash"""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        handler.close()
+        root.removeHandler(handler)
+
+
+def emit(logger: logging.Logger, records: int) -> float:
+    """Yozuvlarni log'lash: chaqiruvchi oqimdagi vaqt (sekund)"""
+    started = time.perf_counter()
+    for i in range(records):
+        logger.info(
+            "APK o'chirildi: %s | Foydalanuvchi: %s | Guruh: %s | strike %s, %s (%s ms)",
+            'mod.apk', 100000 + i, -1001000000000, 1, 'warning', 12.5,
+            extra={'chat_id': -1001000000000, 'user_id': 100000 + i, 'action': 'warning'}
+        )
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=50000, help="Yozuvlar soni")
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp()
+    logger = logging.getLogger('bench')
+    print(f"{args.records} ta yozuv")
+    print(f"{'rejim':<10}{'jami, s':>10}{'yozuv, us':>12}{'fayl, KB':>10}")
+    
+    for mode in ('sync', 'queue', 'filtered'):
+        log_file = os.path.join(workdir, f"{mode}.log")
+        reset_root()
+        if mode == 'sync':
+            logging.basicConfig(
+                format=TEXT_FORMAT,
+                level=logging.INFO,
+                handlers=[logging.FileHandler(log_file, encoding='utf-8')]
+            )
+            listener = None
+        else:
+            listener = setup_logging(
+                level='WARNING' if mode == 'filtered' else 'INFO',
+                log_file=log_file,
+                max_bytes=0
+            )
+            # Benchmark konsolga yozmaydi - faqat fayl handler'i qoladi
+            listener.handlers = listener.handlers[1:]
+        
+        elapsed = emit(logger, args.records)
+        if listener is not None:
+            stop_logging(listener)
+        size = os.path.getsize(log_file) if os.path.exists(log_file) else 0
+        print(
+            f"{mode:<10}{elapsed:>10.3f}{elapsed / args.records * 1e6:>12.2f}"
+            f"{size / 1024:>10.0f}"
+        )
+    
+    reset_root()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Metrics benchmark: hot path'dagi metrika yozish narxi
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_metrics
+    python -m benchmarks.bench_metrics --ops 1000000
+
+Har APK moderatsiyasi ~6 ta bosqich kuzatuvi, ~4 ta API so'rovi
+kuzatuvi va 3-4 ta hisoblagich oshirishini bajaradi. Quyidagilar
+alohida o'lchanadi:
+
+    observe  - Histogram.observe (bisect + qo'shish)
+    inc      - Counter.inc
+    apk      - bitta APK uchun metrikalar to'plami (6 observe + 4 API
+               observe + 3 inc + 10 perf_counter)
+    render   - /metrics javobi (scrape tomonida, hot path'da emas)
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from metrics import MetricsRegistry
+
+STAGES = ('detect', 'checks', 'strike', 'delete', 'warning', 'total')
+METHODS = ('getChatMember', 'deleteMessage', 'sendMessage', 'restrictChatMember')
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--ops', type=int, default=300000, help="Har o'lchovdagi amallar")
+    args = parser.parse_args()
+    
+    registry = MetricsRegistry()
+    stages = registry.histogram('bench_stage_seconds', 'stage', ('stage',))
+    api = registry.histogram('bench_api_seconds', 'api', ('method',))
+    events = registry.counter('bench_events_total', 'events', ('event',))
+    values = [random.expovariate(50) for _ in range(1024)]
+    
+    print(f"{args.ops} ta amal")
+    print(f"{'rejim':<10}{'jami, s':>10}{'amal, us':>12}")
+    
+    def report(name: str, elapsed: float, ops: int) -> None:
+        print(f"{name:<10}{elapsed:>10.3f}{elapsed / ops * 1e6:>12.2f}")
+    
+    started = time.perf_counter()
+    for i in range(args.ops):
+        stages.observe(values[i & 1023], 'delete')
+    report('observe', time.perf_counter() - started, args.ops)
+    
+    started = time.perf_counter()
+    for i in range(args.ops):
+        events.inc('deleted')
+    report('inc', time.perf_counter() - started, args.ops)
+    
+    apks = args.ops // 10
+    clock = time.perf_counter
+    started = time.perf_counter()
+    for i in range(apks):
+        for stage in STAGES:
+            stages.observe(clock() - started, stage)
+        for method in METHODS:
+            api.observe(clock() - started, method)
+        events.inc('detected')
+        events.inc('deleted')
+        events.inc('warning')
+    report('apk', time.perf_counter() - started, apks)
+    
+    renders = 1000
+    started = time.perf_counter()
+    for _ in range(renders):
+        body = registry.render()
+    report('render', time.perf_counter() - started, renders)
+    print(f"/metrics javobi: {len(body)} bayt")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
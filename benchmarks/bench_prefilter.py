@@ -0,0 +1,149 @@
+"""
+Prefilter benchmark: aralash trafikni Application navbati orqali o'tkazish
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_prefilter
+    python -m benchmarks.bench_prefilter --updates 20000 --apk-share 0.01
+
+Bot API soxta bot bilan almashtiriladi. Guruh trafigi asosan toza
+hujjatlar (pdf, jpg), oddiy matnli xabarlar va tahrirlangan xabarlardan
+iborat, ularning kichik qismi APK. Barcha update'lar Application'ning
+update_queue'siga qo'yiladi (polling rejimidagidek) va ikki rejim
+solishtiriladi:
+
+    dispatch  - har update navbatga tushadi, task va handler tekshiruvi oladi
+    prefilter - PrefilterQueue keraksiz update'larni navbatga qo'ymaydi
+
+Har rejimda barcha APK'lar o'chirilgani tekshiriladi; aks holda chiqish
+kodi 1.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from telegram import Update
+
+from benchmarks.bench_webhook import WebhookFakeBot, bot
+
+CLEAN_NAMES = ('report.pdf', 'photo.jpg', 'notes.docx', 'music.mp3')
+CLEAN_MIME_TYPES = {
+    'report.pdf': 'application/pdf',
+    'photo.jpg': 'image/jpeg',
+    'notes.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'music.mp3': 'audio/mpeg'
+}
+
+
+def make_updates(fake_bot: WebhookFakeBot, count: int, apk_share: float, chats: int) -> tuple:
+    """Aralash guruh trafigi: (update'lar, APK xabar ID'lari)"""
+    updates = []
+    apks = set()
+    for update_id in range(1, count + 1):
+        message = {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': -1005000000000 - update_id % chats, 'type': 'supergroup', 'title': 'mix'},
+            'from': {'id': 20000 + update_id % 500, 'is_bot': False, 'first_name': 'm'}
+        }
+        kind = random.random()
+        if kind < apk_share:
+            apks.add(update_id)
+            message['document'] = {
+                'file_id': f"f{update_id}",
+                'file_unique_id': f"a{update_id}",
+                'file_name': 'mod.apk'
+            }
+        elif kind < 0.6:
+            name = random.choice(CLEAN_NAMES)
+            message['document'] = {
+                'file_id': f"f{update_id}",
+                'file_unique_id': f"c{update_id}",
+                'file_name': name,
+                'mime_type': CLEAN_MIME_TYPES[name],
+                'file_size': 200000
+            }
+        else:
+            message['text'] = 'salom'
+        
+        key = 'edited_message' if kind >= 0.9 else 'message'
+        if key == 'edited_message':
+            message['edit_date'] = message['date']
+            apks.discard(update_id)
+        updates.append(Update.de_json({'update_id': update_id, key: message}, fake_bot))
+    return updates, apks
+
+
+async def run_mode(mode: str, args) -> tuple:
+    """Bitta rejim: (vaqt, navbatga tushgan update'lar, o'chirilmagan APK'lar)"""
+    random.seed(args.seed)
+    bot.db = bot.StrikeDatabase(f"prefilter-{mode}.json")
+    bot.admin_cache = bot.AdminCache(ttl=600)
+    bot.bot_rights = bot.BotRightsCache(ttl=600)
+    bot.prefilter = bot.UpdatePrefilter(bot.detector.match, sniffer=bot.sniffer)
+    
+    fake_bot = WebhookFakeBot(args.latency)
+    application = bot.create_application(
+        bot=fake_bot,
+        updater=False,
+        early_reject=mode == 'prefilter'
+    )
+    updates, apks = make_updates(fake_bot, args.updates, args.apk_share, args.chats)
+    
+    await application.initialize()
+    await application.start()
+    
+    queued = 0
+    started = time.perf_counter()
+    for update in updates:
+        size = application.update_queue.qsize()
+        await application.update_queue.put(update)
+        queued += application.update_queue.qsize() > size
+    await application.update_queue.join()
+    # Oxirgi task'lar task_done'dan keyin tugaydi
+    while application.update_processor.current_concurrent_updates:
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - started
+    
+    await application.stop()
+    await application.shutdown()
+    bot.db.close()
+    
+    missed = len(apks - set(fake_bot.deleted_at))
+    return elapsed, queued, missed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--updates', type=int, default=10000, help="Update'lar soni")
+    parser.add_argument('--apk-share', type=float, default=0.02, help="APK ulushi")
+    parser.add_argument('--chats', type=int, default=50, help="Guruhlar soni")
+    parser.add_argument('--latency', type=float, default=0.01, help="API kechikishi (sekund)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    print(f"{args.updates} ta update, APK ulushi {args.apk_share:.0%}")
+    print(f"{'rejim':<12}{'vaqt, s':>10}{'update/s':>10}{'navbat':>10}{'qoldi':>8}")
+    
+    failed = False
+    for mode in ('dispatch', 'prefilter'):
+        elapsed, queued, missed = asyncio.run(run_mode(mode, args))
+        print(
+            f"{mode:<12}{elapsed:>10.2f}{args.updates / elapsed:>10.0f}"
+            f"{queued:>10}{missed:>8}"
+        )
+        if missed:
+            failed = True
+    
+    early = bot.prefilter.stats()
+    print(
+        f"prefilter: toza hujjat {early['rejected']['clean_document']}, "
+        f"handler'siz {early['rejected']['no_handler']}, o'tdi {early['passed']}"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Rate limiter benchmark: flood limitli soxta server bilan raid simulyatsiyasi
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_ratelimit
+    python -m benchmarks.bench_ratelimit --chats 20 --apks 15 --scale 5
+
+Soxta server Telegram cheklovlarini taqlid qiladi: umumiy ~30 so'rov/sekund
+va bitta guruhga ~20 xabar/daqiqa; oshib ketganda RetryAfter qaytaradi.
+Raid paytida har guruhda APK o'chirishlar, ban'lar va ogohlantirishlar bir
+vaqtda yuboriladi. Ikki rejim solishtiriladi:
+
+    direct     - so'rovlar darhol yuboriladi (RetryAfter = yo'qolgan amal)
+    priority   - PriorityRateLimiter
+
+`--scale` barcha limitlarni (server va limiter) bir xil ko'paytiradi, shunda
+benchmark real vaqtdan tezroq ishlaydi (RetryAfter kutishlari esa real). O'chirish yoki ban yo'qolsa
+(priority rejimida) chiqish kodi 1.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+from collections import defaultdict, deque
+
+from telegram.error import RetryAfter
+
+from ratelimit import PriorityRateLimiter
+
+
+class FloodServer:
+    """Sirpanuvchi oyna bilan Telegram flood limitini taqlid qiluvchi server"""
+    
+    def __init__(self, global_rate: float, group_per_minute: float, scale: float, latency: float):
+        self.global_limit = global_rate * scale
+        self.group_limit = group_per_minute
+        self.group_window = 60 / scale
+        self.latency = latency
+        self._global = deque()
+        self._groups = defaultdict(deque)
+        self.accepted = defaultdict(int)
+        self.rejected = 0
+    
+    @staticmethod
+    def _trim(window: deque, now: float, span: float) -> None:
+        while window and window[0] <= now - span:
+            window.popleft()
+    
+    async def call(self, endpoint: str, chat_id: int) -> bool:
+        await asyncio.sleep(self.latency)
+        now = time.monotonic()
+        self._trim(self._global, now, 1.0)
+        if len(self._global) >= self.global_limit:
+            self.rejected += 1
+            raise RetryAfter(1)
+        if endpoint == 'sendMessage':
+            group = self._groups[chat_id]
+            self._trim(group, now, self.group_window)
+            if len(group) >= self.group_limit:
+                self.rejected += 1
+                raise RetryAfter(max(1, int(group[0] + self.group_window - now) + 1))
+            group.append(now)
+        self._global.append(now)
+        self.accepted[endpoint] += 1
+        return True
+
+
+def make_raid(chats: int, apks: int, seed: int) -> list:
+    """(endpoint, chat_id) ro'yxati: har APK uchun o'chirish va ogohlantirish"""
+    rng = random.Random(seed)
+    calls = []
+    for c in range(chats):
+        chat_id = -1003000000000 - c
+        for i in range(apks):
+            calls.append(('deleteMessage', chat_id))
+            calls.append(('sendMessage', chat_id))
+            if i % 3 == 2:
+                calls.append(('banChatMember', chat_id))
+    rng.shuffle(calls)
+    return calls
+
+
+async def run_mode(mode: str, args) -> dict:
+    """Bitta rejim: raidni yuborish va natijalarni yig'ish"""
+    server = FloodServer(30, 20, args.scale, args.latency)
+    limiter = PriorityRateLimiter(
+        global_rate=30 * args.scale,
+        group_rate=20 / 60 * args.scale,
+        max_retries=args.retries
+    )
+    calls = make_raid(args.chats, args.apks, args.seed)
+    lost = defaultdict(int)
+    done_at = defaultdict(list)
+    started = time.monotonic()
+    
+    async def send(endpoint: str, chat_id: int) -> None:
+        try:
+            if mode == 'direct':
+                await server.call(endpoint, chat_id)
+            else:
+                await limiter.process_request(
+                    server.call, (endpoint, chat_id), {}, endpoint, {'chat_id': chat_id}, None
+                )
+            done_at[endpoint].append(time.monotonic() - started)
+        except RetryAfter:
+            lost[endpoint] += 1
+    
+    await asyncio.gather(*[send(e, c) for e, c in calls])
+    
+    return {
+        'elapsed': time.monotonic() - started,
+        'lost': dict(lost),
+        'done_at': done_at,
+        'rejected': server.rejected,
+        'limiter': limiter.stats()
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--chats', type=int, default=20, help="Raid qilingan guruhlar")
+    parser.add_argument('--apks', type=int, default=25, help="Har guruhdagi APK'lar")
+    parser.add_argument('--scale', type=float, default=5, help="Limitlar ko'paytmasi")
+    parser.add_argument('--latency', type=float, default=0.01, help="Server kechikishi (sekund)")
+    parser.add_argument('--retries', type=int, default=5, help="Maksimal qayta urinishlar")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    
+    print(
+        f"{args.chats} guruh x {args.apks} APK, limitlar x{args.scale:g} "
+        f"({30 * args.scale:g} so'rov/s, guruhga {20 * args.scale:g} xabar/daqiqa)"
+    )
+    
+    failed = False
+    for mode in ('direct', 'priority'):
+        result = asyncio.run(run_mode(mode, args))
+        print(f"\n[{mode}] {result['elapsed']:.2f} s, server rad etdi: {result['rejected']}")
+        for endpoint in ('deleteMessage', 'banChatMember', 'sendMessage'):
+            times = sorted(result['done_at'][endpoint])
+            p50 = times[len(times) // 2] if times else 0.0
+            print(
+                f"  {endpoint:<15} bajarildi {len(times):>4}, "
+                f"yo'qoldi {result['lost'].get(endpoint, 0):>4}, "
+                f"p50 tugash {p50:.2f} s"
+            )
+        if mode == 'priority':
+            limits = result['limiter']
+            print(f"  navbat maks: {limits['max_depth']}, qayta urinish: {limits['retries']}")
+            for name, item in limits['priorities'].items():
+                print(
+                    f"  {name:<8} o'rtacha kutish {item['avg_wait'] * 1000:.0f} ms, "
+                    f"maks {item['max_wait'] * 1000:.0f} ms"
+                )
+            if result['lost'].get('deleteMessage') or result['lost'].get('banChatMember'):
+                failed = True
+    
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
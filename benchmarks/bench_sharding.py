@@ -0,0 +1,169 @@
+"""
+Sharding benchmark: worker'lar soniga qarab o'tkazuvchanlik
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_sharding
+    python -m benchmarks.bench_sharding --workers 1 2 4 8 --updates 20000
+
+Har worker haqiqiy `sharding.py --worker` jarayoni: to'liq Application,
+rate limiter va umumiy SQLite strike bazasi. Bot API o'rniga har worker
+o'z soxta serveriga (benchmarks.fake_api, alohida jarayon) ulanadi.
+Sintetik oqim - ko'p guruhlardagi matnli xabarlar va APK'lar - ShardRouter
+orqali worker'larga yuboriladi; oqim tugagach worker'lar navbatini
+tugatib chiqishigacha bo'lgan vaqt o'lchanadi.
+
+Har o'lchovdan keyin tekshiriladi: barcha APK'lar o'chirilgan va umumiy
+bazadagi strike'lar yig'indisi APK'lar soniga teng (har APK yangi
+foydalanuvchidan - strike yo'qolsa yoki ikki marta yozilsa ko'rinadi).
+Aks holda chiqish kodi 1.
+
+O'tkazuvchanlik worker'lar orasida bo'linadigan CPU ishiga bog'liq -
+yadrolar soni worker'lardan kam bo'lsa o'sish ham shunga yarasha bo'ladi.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import httpx
+
+from sharding import ShardRouter, ShardWorker
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def start_fake_api(latency: float) -> tuple:
+    """Soxta Bot API jarayoni: (jarayon, BOT_API_URL)"""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, '-m', 'benchmarks.fake_api', '--port', '0', '--latency', str(latency),
+        stdout=asyncio.subprocess.PIPE,
+        cwd=REPO_ROOT
+    )
+    line = await process.stdout.readline()
+    return process, line.decode().rsplit(' ', 1)[-1].strip()
+
+
+def make_stream(count: int, apk_share: float, chats: int) -> tuple:
+    """Sintetik oqim: (update dict'lari, APK'lar soni)"""
+    updates = []
+    apks = 0
+    for update_id in range(1, count + 1):
+        apk = random.random() < apk_share
+        message = {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': -1008000000000 - random.randrange(chats), 'type': 'supergroup', 'title': 's'},
+            'from': {'id': 100000 + update_id, 'is_bot': False, 'first_name': 's'}
+        }
+        if apk:
+            apks += 1
+            message['document'] = {
+                'file_id': f"f{update_id}",
+                'file_unique_id': f"u{update_id}",
+                'file_name': 'mod.apk'
+            }
+        else:
+            message['text'] = 'salom'
+        updates.append({'update_id': update_id, 'message': message})
+    return updates, apks
+
+
+async def run(workers_count: int, updates: list, args, workdir: str) -> dict:
+    """Bitta o'lchov: `workers_count` ta worker bilan oqimni qayta ishlash"""
+    database = os.path.join(workdir, f"strikes-{workers_count}.db")
+    apis = [await start_fake_api(args.latency) for _ in range(workers_count)]
+    workers = [
+        ShardWorker(index, workers_count, env={
+            'BOT_TOKEN': '123:bench',
+            'BOT_API_URL': url,
+            'STRIKES_STORAGE': 'sqlite',
+            'STRIKES_SQLITE_FILE': database,
+            'RATE_LIMIT_GLOBAL': '1000000',
+            'RATE_LIMIT_GROUP': '1000000',
+            'VERDICT_CACHE_FILE': '',
+            'BURST_WINDOW': '0',
+            'DEGRADED_REPORT_INTERVAL': '0',
+            'LOG_LEVEL': 'ERROR'
+        })
+        for index, (_, url) in enumerate(apis)
+    ]
+    
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        await asyncio.gather(*(worker.start() for worker in workers))
+    finally:
+        os.chdir(cwd)
+    await asyncio.gather(*(worker.wait_ready(120) for worker in workers))
+    
+    router = ShardRouter(workers)
+    started = time.perf_counter()
+    for data in updates:
+        await router.route(data)
+    await asyncio.gather(*(worker.close(600) for worker in workers))
+    elapsed = time.perf_counter() - started
+    
+    deletes = 0
+    async with httpx.AsyncClient() as client:
+        for process, url in apis:
+            stats = (await client.get(url.rsplit('/', 1)[0] + '/stats')).json()
+            deletes += stats.get('deleteMessage', 0) + stats.get('deleteMessages', 0)
+            process.terminate()
+            await process.wait()
+    
+    connection = sqlite3.connect(database)
+    strikes = connection.execute('SELECT COALESCE(SUM(strikes), 0) FROM strikes').fetchone()[0]
+    connection.close()
+    
+    return {
+        'elapsed': elapsed,
+        'routed': router.stats()['routed'],
+        'deletes': deletes,
+        'strikes': strikes
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help="Worker'lar soni")
+    parser.add_argument('--updates', type=int, default=10000, help="Update'lar soni")
+    parser.add_argument('--apk-share', type=float, default=0.1, help="APK ulushi")
+    parser.add_argument('--chats', type=int, default=200, help="Guruhlar soni")
+    parser.add_argument('--latency', type=float, default=0.01, help="API kechikishi (sekund)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    random.seed(args.seed)
+    updates, apks = make_stream(args.updates, args.apk_share, args.chats)
+    print(
+        f"{args.updates} ta update ({apks} APK), {args.chats} guruh, "
+        f"CPU yadrolari: {os.cpu_count()}"
+    )
+    print(f"{'worker':<8}{'vaqt, s':>10}{'update/s':>10}{'o`chirish':>11}{'strike':>8}  taqsimot")
+    
+    failed = False
+    baseline = None
+    with tempfile.TemporaryDirectory() as workdir:
+        for workers_count in args.workers:
+            result = asyncio.run(run(workers_count, updates, args, workdir))
+            rate = args.updates / result['elapsed']
+            baseline = baseline or rate
+            print(
+                f"{workers_count:<8}{result['elapsed']:>10.2f}{rate:>10.0f}"
+                f"{result['deletes']:>11}{result['strikes']:>8}  "
+                f"{json.dumps(result['routed'])} (x{rate / baseline:.2f})"
+            )
+            if result['deletes'] != apks or result['strikes'] != apks:
+                failed = True
+    
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
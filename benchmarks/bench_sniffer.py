@@ -0,0 +1,163 @@
+"""
+Sniffer benchmark: lokal Range-server orqali tarkib tekshiruvini o'lchash
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_sniffer
+    python -m benchmarks.bench_sniffer --size-mb 15 --files 40 --concurrency 4
+
+Vaqtinchalik papkada sintetik fayllar (APK, nomi o'zgartirilgan APK,
+XAPK to'plami, oddiy ZIP, JPEG) yaratiladi va Telegram fayl serveri
+o'rnini bosuvchi lokal HTTP server (Range qo'llab-quvvatlaydi) orqali
+tekshiriladi. Har fayl uchun hukm, yuklangan baytlar va vaqt chiqariladi.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import zipfile
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from sniffer import ApkSniffer
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Range sarlavhasini qo'llab-quvvatlaydigan statik fayl handleri"""
+    
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        
+        size = os.path.getsize(path)
+        match = re.match(r'bytes=(\d*)-(\d*)', self.headers.get('Range', ''))
+        if not match:
+            start, end = 0, size - 1
+            self.send_response(200)
+        else:
+            first, last = match.groups()
+            if first:
+                start, end = int(first), min(int(last or size - 1), size - 1)
+            else:
+                start, end = max(0, size - int(last)), size - 1
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end}/{size}")
+        
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            try:
+                while remaining > 0:
+                    chunk = f.read(min(65536, remaining))
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                # Klient keraklisini olib ulanishni yopdi
+                pass
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def write_zip(path: str, entries: list, payload_size: int, rng: random.Random) -> None:
+    """Berilgan yozuvlar va siqilmaydigan payload bilan ZIP yaratish"""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as archive:
+        per_entry = payload_size // max(1, len(entries))
+        for name in entries:
+            archive.writestr(name, rng.randbytes(per_entry))
+
+
+def build_corpus(workdir: str, size: int, seed: int = 42) -> dict:
+    """Sintetik fayllar: {nom: kutilgan hukm}"""
+    rng = random.Random(seed)
+    resources = [f"res/drawable/icon_{i}.png" for i in range(800)]
+    apk_entries = ['AndroidManifest.xml', 'classes.dex', 'resources.arsc'] + resources
+    
+    corpus = {}
+    write_zip(os.path.join(workdir, 'app.apk'), apk_entries, size, rng)
+    corpus['app.apk'] = True
+    
+    # Manifest oxirida - central directory to'liq o'qilishi kerak
+    write_zip(os.path.join(workdir, 'game.zip'), resources + ['classes.dex'], size, rng)
+    corpus['game.zip'] = True
+    
+    write_zip(os.path.join(workdir, 'bundle'), ['manifest.json', 'icon.png', 'base.apk'], size, rng)
+    corpus['bundle'] = True
+    
+    write_zip(os.path.join(workdir, 'photos.zip'), [f"IMG_{i:04d}.jpg" for i in range(500)], size, rng)
+    corpus['photos.zip'] = False
+    
+    with open(os.path.join(workdir, 'photo.jpg'), 'wb') as f:
+        f.write(b'\xff\xd8\xff\xe0' + rng.randbytes(size))
+    corpus['photo.jpg'] = False
+    
+    return corpus
+
+
+async def run(base_url: str, workdir: str, corpus: dict, files: int, concurrency: int) -> None:
+    """Har faylni alohida, keyin aralash to'plamni parallel tekshirish"""
+    sniffer = ApkSniffer(concurrency=concurrency)
+    
+    print(f"{'fayl':<12}{'hajm':>10}{'hukm':>8}{'kutilgan':>10}{'yuklandi':>12}{'ms':>8}")
+    for name, expected in corpus.items():
+        size = os.path.getsize(os.path.join(workdir, name))
+        before = sniffer.bytes_fetched
+        started = time.perf_counter()
+        verdict = await sniffer.inspect_url(f"{base_url}/{name}", size)
+        elapsed = (time.perf_counter() - started) * 1000
+        fetched = sniffer.bytes_fetched - before
+        print(
+            f"{name:<12}{size // 1024:>8}KB{str(verdict):>8}{str(expected):>10}"
+            f"{fetched:>11}B{elapsed:>8.1f}"
+        )
+    
+    names = [random.choice(list(corpus)) for _ in range(files)]
+    before = sniffer.bytes_fetched
+    total_size = sum(os.path.getsize(os.path.join(workdir, n)) for n in names)
+    started = time.perf_counter()
+    verdicts = await asyncio.gather(*[
+        sniffer.inspect_url(f"{base_url}/{n}", os.path.getsize(os.path.join(workdir, n)))
+        for n in names
+    ])
+    elapsed = time.perf_counter() - started
+    wrong = sum(1 for n, v in zip(names, verdicts) if v is not corpus[n])
+    
+    print(
+        f"\n{files} ta fayl, parallel {concurrency}: {elapsed * 1000:.0f} ms, "
+        f"yuklandi {(sniffer.bytes_fetched - before) / 1024:.0f} KB "
+        f"/ {total_size / 1024 / 1024:.0f} MB, noto'g'ri hukm: {wrong}"
+    )
+    await sniffer.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size-mb', type=float, default=5, help="Har fayl hajmi (MB)")
+    parser.add_argument('--files', type=int, default=40, help="Parallel to'plamdagi fayllar")
+    parser.add_argument('--concurrency', type=int, default=4, help="Semafor chegarasi")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus = build_corpus(workdir, int(args.size_mb * 1024 * 1024))
+        server = ThreadingHTTPServer(
+            ('127.0.0.1', 0), partial(RangeRequestHandler, directory=workdir)
+        )
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            base_url = f"http://127.0.0.1:{server.server_address[1]}"
+            asyncio.run(run(base_url, workdir, corpus, args.files, args.concurrency))
+        finally:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Startup benchmark: strike database'ni yuklash va botning xizmatga tayyor bo'lishi
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --sizes 100000,1000000 --storage journal
+    python -m benchmarks.bench_startup --storage binary --modes lazy
+
+Ikki rejim alohida jarayonlarda solishtiriladi:
+
+    eager  - avvalgi xatti-harakat: database.py import vaqtida
+             `strikes.json`ni singleton uchun, bot.py esa yana bir marta
+             o'z backend'i uchun to'liq yuklaydi; bot faqat shundan keyin
+             update qabul qiladi
+    lazy   - bitta StrikeDatabase, yuklash start_loading() bilan fon
+             oqimida; bot darhol update qabul qiladi
+
+Hisobot:
+    serve s   - jarayon boshidan update qabul qilishgacha
+    loaded s  - strike'lar to'liq yuklanguncha (birinchi add_strike)
+    lag ms    - yuklash paytida asosiy oqimning 5 ms uyqudan eng katta
+                kechikishi (event loop shunchalik to'xtab qoladi)
+    max RSS   - jarayonning eng katta xotirasi
+
+`--storage binary` da strikes.json oldindan binary snapshot'ga
+ko'chiriladi (ko'chirish vaqti o'lchovga kirmaydi).
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from functools import partial
+
+from benchmarks.bench_storage import generate_records
+from storage import migrate_json_to_snapshot
+
+
+def peak_rss_mb() -> float:
+    """
+    Jarayonning eng katta RSS'i (MB).
+    
+    Linux'da ru_maxrss exec'dan keyin ham ota jarayon qiymatini saqlaydi,
+    shuning uchun /proc'dagi VmHWM afzal.
+    """
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_single(mode: str, storage: str, workdir: str) -> dict:
+    """Bitta rejim o'lchovi (alohida jarayonda)"""
+    from database import StrikeDatabase
+    from storage import JsonStorage, create_storage
+    
+    json_file = os.path.join(workdir, 'strikes.json')
+    loader = partial(
+        create_storage,
+        storage,
+        json_file=json_file,
+        sqlite_file=os.path.join(workdir, 'strikes.db'),
+        snapshot_file=os.path.join(workdir, 'strikes.bin'),
+        compact_interval=3600
+    )
+    
+    started = time.perf_counter()
+    lag = 0.0
+    if mode == 'eager':
+        # Import vaqtidagi singleton va bot.py'dagi ikkinchi nusxa
+        singleton = JsonStorage(json_file, compact_interval=3600)
+        db = StrikeDatabase(json_file, backend=loader())
+        serve_s = loaded_s = time.perf_counter() - started
+    else:
+        singleton = None
+        db = StrikeDatabase(json_file, loader=loader)
+        db.start_loading()
+        serve_s = time.perf_counter() - started
+        while not db.loaded:
+            before = time.perf_counter()
+            time.sleep(0.005)
+            lag = max(lag, time.perf_counter() - before - 0.005)
+        loaded_s = time.perf_counter() - started
+    
+    records = db.get_statistics(limit=0)['total_users']
+    rss_mb = peak_rss_mb()
+    db.close()
+    if singleton is not None:
+        singleton.close()
+    return {
+        'mode': mode,
+        'records': records,
+        'serve_s': serve_s,
+        'loaded_s': loaded_s,
+        'lag_ms': lag * 1000,
+        'rss_mb': rss_mb
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='10000,100000,300000')
+    parser.add_argument('--modes', default='eager,lazy')
+    parser.add_argument('--storage', default='journal', choices=('json', 'journal', 'binary', 'sqlite'))
+    parser.add_argument('--single', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.single:
+        mode, workdir = args.single.split(':', 1)
+        print(json.dumps(run_single(mode, args.storage, workdir)))
+        return 0
+    
+    print(
+        f"{'rejim':<7} {'records':>9} {'serve s':>8} {'loaded s':>9} "
+        f"{'lag ms':>7} {'max RSS MB':>11}"
+    )
+    failed = False
+    for size in (int(s) for s in args.sizes.split(',')):
+        with tempfile.TemporaryDirectory() as source:
+            source_file = os.path.join(source, 'strikes.json')
+            with open(source_file, 'w', encoding='utf-8') as f:
+                json.dump(generate_records(size), f, separators=(',', ':'))
+            if args.storage == 'binary':
+                migrate_json_to_snapshot(source_file, os.path.join(source, 'strikes.bin'))
+            
+            for mode in args.modes.split(','):
+                # Har rejim faylning o'z nusxasi bilan (close() uni qayta yozadi)
+                with tempfile.TemporaryDirectory() as workdir:
+                    for name in os.listdir(source):
+                        shutil.copy(os.path.join(source, name), workdir)
+                    proc = subprocess.run(
+                        [sys.executable, '-m', 'benchmarks.bench_startup',
+                         '--single', f"{mode}:{workdir}", '--storage', args.storage],
+                        capture_output=True,
+                        text=True
+                    )
+                if proc.returncode != 0:
+                    print(f"{mode:<7} {size:>9} xato: {proc.stderr.strip().splitlines()[-1:]}")
+                    failed = True
+                    continue
+                r = json.loads(proc.stdout.strip().splitlines()[-1])
+                print(
+                    f"{r['mode']:<7} {r['records']:>9} {r['serve_s']:>8.3f} "
+                    f"{r['loaded_s']:>9.2f} {r['lag_ms']:>7.1f} {r['rss_mb']:>11.1f}"
+                )
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
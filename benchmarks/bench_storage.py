@@ -0,0 +1,147 @@
+"""
+Storage benchmark: JSON (journal), binary snapshot va SQLite backend'larini solishtirish
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_storage
+    python -m benchmarks.bench_storage --sizes 10000,1000000 --ops 2000
+
+Har bir (backend, hajm) juftligi alohida jarayonda o'lchanadi, shuning
+uchun RSS xotira qiymatlari bir-biriga aralashmaydi. `file MB` -
+yuklangan snapshot (yoki database) fayli hajmi.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from snapshot import save_snapshot
+from storage import JsonStorage, SQLiteStorage, make_key
+from strike_index import StrikeIndex
+
+TIMESTAMP = '2024-01-15T10:30:00'
+
+
+def generate_records(size: int, seed: int = 42) -> dict:
+    """Sintetik yozuvlar: har guruhda ~1000 ta qoidabuzar"""
+    rng = random.Random(seed)
+    chats = max(1, size // 1000)
+    data = {}
+    while len(data) < size:
+        chat_id = -1001000000000 - rng.randrange(chats)
+        user_id = rng.randrange(10 ** 9)
+        data[make_key(chat_id, user_id)] = {
+            'strikes': rng.randint(1, 2),
+            'last_strike': TIMESTAMP,
+            'username': f"user{user_id}",
+            'first_name': None
+        }
+    return data
+
+
+def run_single(backend: str, size: int, ops: int, workdir: str) -> dict:
+    """Bitta backend va hajm uchun o'lchov (alohida jarayonda)"""
+    json_file = os.path.join(workdir, 'strikes.json')
+    sqlite_file = os.path.join(workdir, 'strikes.db')
+    snapshot_file = os.path.join(workdir, 'strikes.bin')
+    
+    data = generate_records(size)
+    keys = list(data)
+    sample_chat = int(keys[0].rpartition('_')[0])
+    
+    if backend == 'journal':
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        del data
+        file_size = os.path.getsize(json_file)
+        started = time.perf_counter()
+        store = JsonStorage(json_file, journal=True, compact_interval=3600)
+    elif backend == 'binary':
+        save_snapshot(snapshot_file, StrikeIndex.from_dict(data))
+        del data
+        file_size = os.path.getsize(snapshot_file)
+        started = time.perf_counter()
+        store = JsonStorage(snapshot_file, binary=True, compact_interval=3600)
+    else:
+        store = SQLiteStorage(sqlite_file)
+        store.import_records(data)
+        store.close()
+        del data
+        file_size = os.path.getsize(sqlite_file)
+        started = time.perf_counter()
+        store = SQLiteStorage(sqlite_file)
+    load_s = time.perf_counter() - started
+    
+    rng = random.Random(7)
+    started = time.perf_counter()
+    for _ in range(ops):
+        chat_part, _, user_part = rng.choice(keys).rpartition('_')
+        store.increment(int(chat_part), int(user_part), TIMESTAMP)
+    add_us = (time.perf_counter() - started) / ops * 1e6
+    
+    started = time.perf_counter()
+    store.chat_strikes(sample_chat)
+    chat_ms = (time.perf_counter() - started) * 1e3
+    
+    started = time.perf_counter()
+    store.statistics(limit=10)
+    stats_ms = (time.perf_counter() - started) * 1e3
+    
+    store.close()
+    return {
+        'backend': backend,
+        'size': size,
+        'load_s': load_s,
+        'add_us': add_us,
+        'chat_ms': chat_ms,
+        'stats_ms': stats_ms,
+        'file_mb': file_size / 2 ** 20,
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='10000,1000000,10000000')
+    parser.add_argument('--backends', default='journal,binary,sqlite')
+    parser.add_argument('--ops', type=int, default=5000)
+    parser.add_argument('--single', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.single:
+        backend, size = args.single.split(':')
+        with tempfile.TemporaryDirectory() as workdir:
+            result = run_single(backend, int(size), args.ops, workdir)
+        print(json.dumps(result))
+        return
+    
+    print(
+        f"{'backend':<8} {'records':>10} {'load s':>8} {'add_strike us':>14} "
+        f"{'chat ms':>9} {'stats ms':>9} {'file MB':>8} {'max RSS MB':>11}"
+    )
+    for size in (int(s) for s in args.sizes.split(',')):
+        for backend in args.backends.split(','):
+            proc = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_storage',
+                 '--single', f"{backend}:{size}", '--ops', str(args.ops)],
+                capture_output=True,
+                text=True
+            )
+            if proc.returncode != 0:
+                print(f"{backend:<8} {size:>10} xato: {proc.stderr.strip().splitlines()[-1:]}")
+                continue
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(
+                f"{r['backend']:<8} {r['size']:>10} {r['load_s']:>8.2f} "
+                f"{r['add_us']:>14.1f} {r['chat_ms']:>9.2f} "
+                f"{r['stats_ms']:>9.2f} {r['file_mb']:>8.1f} {r['rss_mb']:>11.1f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Tiered storage benchmark: xotira chegarasi, hit ulushi va strike narxi
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_tiered
+    python -m benchmarks.bench_tiered --records 1000000 --cache-mb 1,4,16
+
+Diskda `--records` ta tarixiy qoidabuzar bo'lgan SQLite bazasi
+yaratiladi, keyin har rejim alohida jarayonda bir xil strike oqimini
+bajaradi. Oqim faollikka o'xshaydi: `--hot-share` qismi `--hot` ta
+yaqinda faol foydalanuvchidan, qolgani butun tarixdan va yangi
+foydalanuvchilardan.
+
+    journal    - hamma yozuv xotirada (StrikeIndex), taqqoslash uchun
+    sqlite     - keshsiz, har so'rov SQLite'ga
+    tiered:N   - SQLite + N MB LRU kesh
+
+Hisobot: bitta amal narxi (oxirgi flush bilan), diskka yozilgan
+yozuvlar, kesh hit ulushi, jarayonning eng katta RSS'i. Tiered rejimda
+`--flush-threshold` (PERSIST_FLUSH_THRESHOLD) turli dirty yozuvlar soni:
+kattaroq qiymatda bir yozuvning ko'proq strike'i bitta yozuvga birlashadi.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_startup import peak_rss_mb
+from benchmarks.bench_storage import TIMESTAMP, generate_records
+from storage import JsonStorage, SQLiteStorage, TieredStorage
+from strike_index import StrikeIndex
+
+
+def make_keys(records: list, hot: int, hot_share: float, ops: int, seed: int = 7) -> list:
+    """Strike oqimi: (chat_id, user_id) ro'yxati"""
+    rng = random.Random(seed)
+    hot_keys = rng.sample(records, min(hot, len(records)))
+    keys = []
+    for _ in range(ops):
+        roll = rng.random()
+        if roll < hot_share:
+            keys.append(rng.choice(hot_keys))
+        elif roll < hot_share + (1 - hot_share) / 2:
+            keys.append(rng.choice(records))
+        else:
+            keys.append((rng.choice(records)[0], 10 ** 10 + rng.randrange(10 ** 9)))
+    return keys
+
+
+def run_single(mode: str, workdir: str, flush_threshold: int) -> dict:
+    """Bitta rejim o'lchovi (alohida jarayonda)"""
+    with open(os.path.join(workdir, 'keys.json'), encoding='utf-8') as f:
+        keys = [tuple(key) for key in json.load(f)]
+    
+    if mode == 'journal':
+        store = JsonStorage(os.path.join(workdir, 'strikes.json'), journal=True, compact_interval=3600)
+    else:
+        store = SQLiteStorage(os.path.join(workdir, 'strikes.db'))
+        if mode.startswith('tiered:'):
+            store = TieredStorage(
+                store,
+                max_bytes=int(float(mode.split(':', 1)[1]) * 2 ** 20),
+                flush_threshold=flush_threshold
+            )
+    
+    started = time.perf_counter()
+    for i, (chat_id, user_id) in enumerate(keys):
+        if i % 4:
+            store.increment(chat_id, user_id, TIMESTAMP)
+        else:
+            store.get(chat_id, user_id)
+    store.flush()
+    op_us = (time.perf_counter() - started) / len(keys) * 1e6
+    
+    cache = store.stats() if isinstance(store, TieredStorage) else None
+    increments = len(keys) - (len(keys) + 3) // 4
+    rss_mb = peak_rss_mb()
+    store.close()
+    return {
+        'mode': mode,
+        'op_us': op_us,
+        'hit_rate': cache['hit_rate'] if cache else None,
+        'cached': cache['size'] if cache else None,
+        # Keshsiz rejimlarda har strike alohida yoziladi
+        'written': cache['written'] if cache else increments,
+        'rss_mb': rss_mb
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=300000, help="Tarixiy qoidabuzarlar")
+    parser.add_argument('--ops', type=int, default=50000)
+    parser.add_argument('--hot', type=int, default=5000, help="Yaqinda faol foydalanuvchilar")
+    parser.add_argument('--hot-share', type=float, default=0.9)
+    parser.add_argument('--cache-mb', default='1,4,16')
+    parser.add_argument('--flush-threshold', type=int, default=500)
+    parser.add_argument('--single', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.single:
+        mode, workdir = args.single.split('@', 1)
+        print(json.dumps(run_single(mode, workdir, args.flush_threshold)))
+        return 0
+    
+    modes = ['journal', 'sqlite'] + [f"tiered:{mb}" for mb in args.cache_mb.split(',')]
+    with tempfile.TemporaryDirectory() as workdir:
+        data = generate_records(args.records)
+        with open(os.path.join(workdir, 'strikes.json'), 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        store = SQLiteStorage(os.path.join(workdir, 'strikes.db'))
+        store.import_records(data)
+        store.close()
+        records = [StrikeIndex.split_key(key) for key in data]
+        del data
+        with open(os.path.join(workdir, 'keys.json'), 'w', encoding='utf-8') as f:
+            json.dump(make_keys(records, args.hot, args.hot_share, args.ops), f)
+        del records
+        
+        print(f"{args.records} ta yozuv, {args.ops} amal ({args.hot_share:.0%} - {args.hot} ta faol foydalanuvchi)")
+        print(f"{'rejim':<12}{'amal, us':>10}{'yozildi':>9}{'hit':>8}{'keshda':>9}{'max RSS MB':>12}")
+        failed = False
+        for mode in modes:
+            # Har rejim bazaning o'z nusxasi bilan
+            with tempfile.TemporaryDirectory() as copy:
+                for name in os.listdir(workdir):
+                    shutil.copy(os.path.join(workdir, name), copy)
+                proc = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.bench_tiered', '--single', f"{mode}@{copy}",
+                     '--flush-threshold', str(args.flush_threshold)],
+                    capture_output=True,
+                    text=True
+                )
+            if proc.returncode != 0:
+                print(f"{mode:<12} xato: {proc.stderr.strip().splitlines()[-1:]}")
+                failed = True
+                continue
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            hit = f"{r['hit_rate']:.1%}" if r['hit_rate'] is not None else '-'
+            cached = r['cached'] if r['cached'] is not None else '-'
+            print(
+                f"{r['mode']:<12}{r['op_us']:>10.1f}{r['written']:>9}"
+                f"{hit:>8}{cached:>9}{r['rss_mb']:>12.1f}"
+            )
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Webhook benchmark: yozib olingan update'larni lokal serverga POST qilish
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.bench_webhook
+    python -m benchmarks.bench_webhook --updates 500 --rate 200 --latency 0.03
+
+Bot API soxta bot bilan almashtiriladi (har chaqiruv `latency` sekund).
+Application webhook rejimidagidek (Updater'siz) ishga tushiriladi,
+WebhookServer esa tasodifiy portda tinglaydi. Har APK update'i
+keep-alive ulanishlar orqali berilgan tezlikda POST qilinadi va
+yuborilgan paytdan soxta botdagi deleteMessage chaqiruvigacha bo'lgan
+vaqt (APK olib tashlash kechikishi) o'lchanadi.
+
+Qo'shimcha tekshiruvlar: noto'g'ri secret - 403, noto'g'ri yo'l - 404,
+to'lib ketgan navbat - 503. Biror tekshiruv o'tmasa chiqish kodi 1.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from benchmarks.bench_concurrency import FakeBot, bot
+from webhook import SECRET_HEADER, WebhookServer
+
+SECRET = 'bench-secret'
+
+
+class WebhookFakeBot(FakeBot):
+    """Tarmoqsiz initialize va o'chirish vaqtlarini yozuvchi soxta bot"""
+    
+    def __init__(self, latency: float):
+        super().__init__(latency)
+        with self._unfrozen():
+            self.deleted_at = {}
+    
+    async def initialize(self) -> None:
+        pass
+    
+    async def shutdown(self) -> None:
+        pass
+    
+    async def delete_message(self, chat_id, message_id, *args, **kwargs):
+        result = await super().delete_message(chat_id, message_id, *args, **kwargs)
+        self.deleted_at[message_id] = time.perf_counter()
+        return result
+
+
+def record(update_id: int, chats: int) -> bytes:
+    """Telegram yuboradigan ko'rinishdagi APK update JSON'i"""
+    chat_id = -1004000000000 - update_id % chats
+    user_id = 10000 + update_id
+    return json.dumps({
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'supergroup', 'title': 'webhook'},
+            'from': {'id': user_id, 'is_bot': False, 'first_name': f"w{user_id}"},
+            'document': {
+                'file_id': f"f{update_id}",
+                'file_unique_id': f"u{update_id}",
+                'file_name': 'update.apk'
+            }
+        }
+    }).encode()
+
+
+async def post(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    path: str,
+    body: bytes,
+    secret: str = SECRET
+) -> int:
+    """Keep-alive ulanish orqali bitta POST (HTTP status)"""
+    writer.write(
+        f"POST {path} HTTP/1.1\r\n"
+        f"Host: localhost\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"{SECRET_HEADER}: {secret}\r\n"
+        f"\r\n".encode() + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    while (await reader.readline()) not in (b'\r\n', b''):
+        pass
+    return int(status_line.split()[1])
+
+
+async def run(args) -> bool:
+    """Server va Application'ni ishga tushirib yuklama berish"""
+    fake_bot = WebhookFakeBot(args.latency)
+    bot.admin_cache = bot.AdminCache(ttl=600)
+    bot.bot_rights = bot.BotRightsCache(ttl=600)
+    application = bot.create_application(bot=fake_bot, updater=False)
+    
+    await application.initialize()
+    await application.start()
+    server = WebhookServer(
+        application,
+        path='/webhook',
+        secret_token=SECRET,
+        port=0,
+        max_pending=args.max_pending,
+        put_timeout=0.05
+    )
+    await server.start()
+    
+    connections = [
+        await asyncio.open_connection('127.0.0.1', server.port)
+        for _ in range(args.connections)
+    ]
+    sent_at = {}
+    statuses = []
+    
+    async def sender(index: int) -> None:
+        reader, writer = connections[index]
+        for update_id in range(index + 1, args.updates + 1, args.connections):
+            target = started + (update_id - 1) / args.rate
+            delay = target - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sent_at[update_id] = time.perf_counter()
+            statuses.append(await post(reader, writer, '/webhook', record(update_id, args.chats)))
+    
+    started = time.perf_counter()
+    await asyncio.gather(*[sender(i) for i in range(args.connections)])
+    while server.stats()['in_flight']:
+        await asyncio.sleep(0.01)
+    
+    latencies = sorted(
+        (fake_bot.deleted_at[u] - sent_at[u]) * 1000
+        for u in sent_at if u in fake_bot.deleted_at
+    )
+    accepted = statuses.count(200)
+    print(
+        f"{args.updates} ta update, {args.rate:.0f}/s, {args.connections} ulanish, "
+        f"API kechikishi {args.latency * 1000:.0f} ms"
+    )
+    print(f"qabul qilindi: {accepted}, o'chirildi: {len(latencies)}")
+    if latencies:
+        print(
+            f"olib tashlash kechikishi: p50 {latencies[len(latencies) // 2]:.1f} ms, "
+            f"p99 {latencies[int(len(latencies) * 0.99)]:.1f} ms, "
+            f"maks {latencies[-1]:.1f} ms"
+        )
+    
+    # Xavfsizlik va backpressure tekshiruvlari
+    reader, writer = connections[0]
+    checks = {
+        "noto'g'ri secret -> 403": await post(reader, writer, '/webhook', record(1, 1), 'wrong') == 403,
+        "noto'g'ri yo'l -> 404": await post(reader, writer, '/other', record(1, 1)) == 404,
+    }
+    
+    with fake_bot._unfrozen():
+        fake_bot.latency = 1.0
+    burst = await asyncio.gather(*[
+        post(*await asyncio.open_connection('127.0.0.1', server.port), '/webhook',
+             record(args.updates + i + 1, args.chats))
+        for i in range(args.max_pending + 5)
+    ])
+    checks["to'la navbat -> 503"] = burst.count(503) == 5
+    await server.stop(drain_timeout=30)
+    
+    for _, writer in connections:
+        writer.close()
+    await application.stop()
+    await application.shutdown()
+    bot.db.close()
+    
+    for name, ok in checks.items():
+        print(f"{name}: {'OK' if ok else 'XATO'}")
+    return accepted == args.updates and len(latencies) == args.updates and all(checks.values())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--updates', type=int, default=300, help="APK update'lar soni")
+    parser.add_argument('--rate', type=float, default=150, help="Yuborish tezligi (update/s)")
+    parser.add_argument('--connections', type=int, default=8, help="Keep-alive ulanishlar")
+    parser.add_argument('--chats', type=int, default=20, help="Guruhlar soni")
+    parser.add_argument('--latency', type=float, default=0.02, help="API kechikishi (sekund)")
+    parser.add_argument('--max-pending', type=int, default=20, help="Navbat chegarasi")
+    args = parser.parse_args()
+    
+    return 0 if asyncio.run(run(args)) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
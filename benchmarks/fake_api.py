@@ -0,0 +1,350 @@
+"""
+Soxta Bot API server: benchmark'lar uchun Telegram o'rnini bosuvchi HTTP server
+
+Foydalanish (repo ildizidan):
+    python -m benchmarks.fake_api --port 8081 --latency 0.02
+    python -m benchmarks.fake_api --latency 0.02 --latency deleteMessage=0.08 \
+        --errors 0.01 --retry-after restrictChatMember=0.05
+
+Bot `BOT_API_URL=http://127.0.0.1:8081/bot` bilan ishga tushirilsa barcha
+so'rovlar shu serverga boradi. Server bot ishlatadigan metodlarga
+haqiqiy ko'rinishdagi javob qaytaradi (bot guruhda to'liq huquqli admin,
+foydalanuvchilar oddiy a'zo, `--admins` ro'yxatidagilar admin) va har
+metod chaqiruvlarini sanaydi. `GET /stats` - {metod: soni} JSON.
+
+Kechikish, xato (400) va flood limit (429 RetryAfter) ehtimolligi
+umumiy (`0.01`) yoki metod bo'yicha (`deleteMessage=0.1`) beriladi;
+xatolar faqat moderatsiya metodlariga (FAULT_METHODS) tushadi.
+
+Boshqa benchmark'lardan jarayon ichida ham ishlatish mumkin (FakeBotApi,
+bot bilan bitta jarayonda - start_in_thread).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'Fake', 'username': 'fake_apk_bot'}
+
+ADMIN_RIGHTS = {
+    'can_be_edited': False,
+    'is_anonymous': False,
+    'can_manage_chat': True,
+    'can_delete_messages': True,
+    'can_manage_video_chats': True,
+    'can_restrict_members': True,
+    'can_promote_members': False,
+    'can_change_info': True,
+    'can_invite_users': True,
+    'can_post_stories': False,
+    'can_edit_stories': False,
+    'can_delete_stories': False
+}
+
+# Xato va RetryAfter kiritiladigan metodlar (getMe, getUpdates va boshqalar doim ishlaydi)
+FAULT_METHODS = frozenset({
+    'getChatMember', 'getChatAdministrators', 'sendMessage', 'deleteMessage',
+    'deleteMessages', 'banChatMember', 'restrictChatMember'
+})
+
+# Metod -> qiymat; '*' - qolgan metodlar uchun
+MethodTable = Dict[str, float]
+
+
+def parse_method_values(specs: Iterable[str]) -> MethodTable:
+    """
+    ["0.02", "deleteMessage=0.08"] -> {"*": 0.02, "deleteMessage": 0.08}
+    
+    Raises:
+        ValueError: Son bo'lmagan qiymat
+    """
+    table: MethodTable = {}
+    for spec in specs:
+        method, _, value = spec.rpartition('=')
+        table[method or '*'] = float(value)
+    return table
+
+
+def method_value(table: MethodTable, method: str) -> float:
+    return table.get(method, table.get('*', 0.0))
+
+
+class FakeBotApi:
+    """Bot API metodlariga soxta javob beruvchi keep-alive HTTP server"""
+    
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.0,
+        method_latency: Optional[MethodTable] = None,
+        errors: Optional[MethodTable] = None,
+        retry_after: Optional[MethodTable] = None,
+        retry_after_seconds: int = 1,
+        admins: Iterable[int] = (),
+        seed: Optional[int] = None
+    ):
+        """
+        Server yaratish (ishga tushirmasdan).
+        
+        Args:
+            host: Tinglanadigan manzil
+            port: Port (0 - tasodifiy bo'sh port)
+            latency: Har javob kechikishi (sekund)
+            method_latency: Metod bo'yicha kechikish (latency o'rniga)
+            errors: 400 Bad Request ehtimolligi (metod yoki '*')
+            retry_after: 429 RetryAfter ehtimolligi (metod yoki '*')
+            retry_after_seconds: 429 javobidagi retry_after
+            admins: Guruh admini deb qaytariladigan foydalanuvchilar
+            seed: Xato kiritish uchun tasodifiy sonlar boshlang'ich qiymati
+        """
+        self.host = host
+        self.port = port
+        self.latency = {'*': latency, **(method_latency or {})}
+        self.errors = errors or {}
+        self.retry_after = retry_after or {}
+        self.retry_after_seconds = retry_after_seconds
+        self.admins = frozenset(admins)
+        self.rng = random.Random(seed)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.injected: Dict[str, int] = defaultdict(int)
+        # (chat_id, message_id) -> muvaffaqiyatli o'chirish vaqti (perf_counter)
+        self.deleted: Dict[Tuple[int, int], float] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._message_id = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """BOT_API_URL qiymati"""
+        return f"http://{self.host}:{self.port}/bot"
+    
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+    
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+    
+    def start_in_thread(self) -> None:
+        """
+        Serverni alohida oqimdagi o'z event loop'ida ishga tushirish.
+        
+        Bot bilan bitta jarayonda ishlatilganda server javoblari botning
+        event loop'ini band qilmaydi, o'chirish vaqtlari esa bitta
+        perf_counter soati bilan o'lchanadi.
+        """
+        started = threading.Event()
+        
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop())
+            self._loop.close()
+        
+        self._thread = threading.Thread(target=run, name='fake-bot-api', daemon=True)
+        self._thread.start()
+        started.wait()
+    
+    def stop_thread(self) -> None:
+        """start_in_thread bilan ishga tushgan serverni to'xtatish"""
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+    
+    def moderation_calls(self) -> int:
+        """Moderatsiya metodlariga chaqiruvlar soni (getMe, getUpdates va boshqalarsiz)"""
+        return sum(count for method, count in list(self.calls.items()) if method in FAULT_METHODS)
+    
+    # ==================== HTTP ====================
+    
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, target, _ = line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', '0'))
+                body = await reader.readexactly(length) if length else b''
+                
+                status, payload = await self._dispatch(method, target, headers, body)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} OK\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"\r\n".encode('ascii') + data
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _dispatch(
+        self,
+        method: str,
+        target: str,
+        headers: Dict[str, str],
+        body: bytes
+    ) -> Tuple[int, Any]:
+        if method == 'GET' and target == '/stats':
+            return 200, dict(self.calls)
+        
+        api_method = target.rsplit('/', 1)[-1]
+        if headers.get('content-type', '').startswith('application/json'):
+            params = json.loads(body or b'{}')
+        else:
+            params = dict(parse_qsl(body.decode()))
+        self.calls[api_method] += 1
+        latency = method_value(self.latency, api_method)
+        if latency:
+            await asyncio.sleep(latency)
+        
+        fault = self.fault(api_method)
+        if fault is not None:
+            return fault
+        
+        result = self.result(api_method, params)
+        if result is None:
+            return 400, {'ok': False, 'error_code': 400, 'description': f"Bad Request: {api_method}"}
+        if api_method in ('deleteMessage', 'deleteMessages'):
+            self.record_deleted(params)
+        return 200, {'ok': True, 'result': result}
+    
+    def fault(self, method: str) -> Optional[Tuple[int, Any]]:
+        """Kiritilgan xato javobi (None - oddiy javob)"""
+        if method not in FAULT_METHODS:
+            return None
+        if self.rng.random() < method_value(self.retry_after, method):
+            self.injected['retry_after'] += 1
+            return 429, {
+                'ok': False,
+                'error_code': 429,
+                'description': f"Too Many Requests: retry after {self.retry_after_seconds}",
+                'parameters': {'retry_after': self.retry_after_seconds}
+            }
+        if self.rng.random() < method_value(self.errors, method):
+            self.injected['error'] += 1
+            return 400, {'ok': False, 'error_code': 400, 'description': "Bad Request: injected error"}
+        return None
+    
+    def record_deleted(self, params: Dict[str, Any]) -> None:
+        """O'chirilgan xabarlar vaqtini yozish"""
+        now = time.perf_counter()
+        chat_id = int(params.get('chat_id', 0))
+        message_ids: List[Any] = params.get('message_ids') or [params.get('message_id', 0)]
+        if isinstance(message_ids, str):
+            message_ids = json.loads(message_ids)
+        for message_id in message_ids:
+            self.deleted.setdefault((chat_id, int(message_id)), now)
+    
+    # ==================== METODLAR ====================
+    
+    def result(self, method: str, params: Dict[str, Any]) -> Any:
+        """Metod natijasi (None - qo'llab-quvvatlanmaydi)"""
+        if method == 'getMe':
+            return BOT_USER
+        if method == 'getChatMember':
+            user_id = int(params.get('user_id', 0))
+            if user_id == BOT_USER['id']:
+                return {'status': 'administrator', 'user': BOT_USER, **ADMIN_RIGHTS}
+            return {
+                'status': 'administrator' if user_id in self.admins else 'member',
+                'user': {'id': user_id, 'is_bot': False, 'first_name': 'user'},
+                **(ADMIN_RIGHTS if user_id in self.admins else {})
+            }
+        if method == 'getChatAdministrators':
+            return [{'status': 'administrator', 'user': BOT_USER, **ADMIN_RIGHTS}] + [
+                {'status': 'administrator', 'user': {'id': user_id, 'is_bot': False, 'first_name': 'admin'},
+                 **ADMIN_RIGHTS}
+                for user_id in sorted(self.admins)
+            ]
+        if method == 'sendMessage':
+            self._message_id += 1
+            return {
+                'message_id': self._message_id,
+                'date': int(time.time()),
+                'chat': {'id': int(params.get('chat_id', 0)), 'type': 'supergroup'},
+                'from': BOT_USER,
+                'text': params.get('text', '')
+            }
+        if method == 'getUpdates':
+            return []
+        if method in (
+            'deleteMessage', 'deleteMessages', 'banChatMember', 'restrictChatMember',
+            'setWebhook', 'deleteWebhook', 'setMyCommands', 'close', 'logOut'
+        ):
+            return True
+        return None
+
+
+async def serve(args) -> None:
+    latency = parse_method_values(args.latency)
+    api = FakeBotApi(
+        args.host,
+        args.port,
+        latency=latency.pop('*', 0.0),
+        method_latency=latency,
+        errors=parse_method_values(args.errors),
+        retry_after=parse_method_values(args.retry_after),
+        retry_after_seconds=args.retry_after_seconds,
+        admins=(int(x) for x in args.admins.split(',') if x.strip())
+    )
+    await api.start()
+    print(f"Soxta Bot API: {api.url}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081, help="Port (0 - tasodifiy)")
+    parser.add_argument(
+        '--latency', action='append', default=[],
+        help="Javob kechikishi, sekund (0.02 yoki deleteMessage=0.08; takrorlanadi)"
+    )
+    parser.add_argument(
+        '--errors', action='append', default=[],
+        help="400 xato ehtimolligi (0.01 yoki deleteMessage=0.1; takrorlanadi)"
+    )
+    parser.add_argument(
+        '--retry-after', action='append', default=[],
+        help="429 RetryAfter ehtimolligi (0.01 yoki sendMessage=0.1; takrorlanadi)"
+    )
+    parser.add_argument('--retry-after-seconds', type=int, default=1, help="429 javobidagi retry_after")
+    parser.add_argument('--admins', default='', help="Admin foydalanuvchi ID'lari (vergul bilan)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
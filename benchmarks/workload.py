@@ -0,0 +1,169 @@
+"""
+Sintetik update oqimi va yozib olingan oqimlarni qayta o'ynatish
+
+Benchmark'lar uchun Telegram update dict'lari (Bot API JSON ko'rinishida):
+
+    text     - oddiy matnli xabar
+    clean    - xavfsiz hujjat (pdf, zip, jpg, ...)
+    apk      - bitta APK
+    album    - bitta foydalanuvchidan media_group_id bilan 2-5 ta APK
+    raid     - bitta guruhga ko'p yangi foydalanuvchidan APK hujumi
+    admin    - admin yuborgan APK (istisno)
+    command  - guruhdagi buyruq (/stats, /help)
+
+Oqimni JSONL faylga yozish va qayta o'qish mumkin - bir xil oqim bilan
+o'zgarishlardan oldingi va keyingi natijalarni solishtirish uchun.
+"""
+
+import json
+import random
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_MIX = {
+    'text': 0.20,
+    'clean': 0.35,
+    'apk': 0.20,
+    'album': 0.06,
+    'raid': 0.03,
+    'admin': 0.06,
+    'command': 0.10
+}
+
+CLEAN_NAMES = ('report.pdf', 'photos.zip', 'photo.jpg', 'notes.txt', 'video.mp4', 'table.xlsx')
+APK_NAMES = ('game.apk', 'mod.apk', 'WhatsApp_Pro.apk', 'update.APK', 'app.xapk')
+COMMANDS = ('/stats', '/help')
+
+# Fake Bot API shu foydalanuvchilarni guruh admini deb qaytaradi
+ADMIN_IDS = tuple(range(500, 510))
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """
+    "apk=0.3,raid=0.1" ko'rinishidagi ulushlarni DEFAULT_MIX ustiga qo'yish.
+    
+    Raises:
+        ValueError: Noma'lum tur yoki noto'g'ri qiymat
+    """
+    mix = dict(DEFAULT_MIX)
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        kind, _, value = part.partition('=')
+        if kind not in mix:
+            raise ValueError(f"Noma'lum update turi: {kind} ({', '.join(mix)})")
+        mix[kind] = float(value)
+    return mix
+
+
+class WorkloadGenerator:
+    """Aralash update oqimini yaratuvchi (seed bilan takrorlanadigan)"""
+    
+    def __init__(
+        self,
+        chats: int = 50,
+        users: int = 2000,
+        mix: Optional[Dict[str, float]] = None,
+        seed: int = 42
+    ):
+        """
+        Generator yaratish.
+        
+        Args:
+            chats: Guruhlar soni
+            users: Oddiy foydalanuvchilar soni
+            mix: Tur -> ulush (DEFAULT_MIX)
+            seed: Tasodifiy sonlar boshlang'ich qiymati
+        """
+        self.chats = chats
+        self.users = users
+        self.mix = mix or DEFAULT_MIX
+        self.rng = random.Random(seed)
+        self._update_id = 0
+        self._message_id = 0
+        self._raider_id = 10 ** 9
+        self._group_id = 0
+    
+    def _message(self, chat_id: int, user_id: int, **content) -> dict:
+        self._update_id += 1
+        self._message_id += 1
+        return {
+            'update_id': self._update_id,
+            'message': {
+                'message_id': self._message_id,
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'supergroup', 'title': 'bench'},
+                'from': {'id': user_id, 'is_bot': False, 'first_name': f"u{user_id}"},
+                **content
+            }
+        }
+    
+    def _document(self, chat_id: int, user_id: int, file_name: str, **extra) -> dict:
+        # Har fayl alohida: hukmlar keshi faqat haqiqiy qayta yuborishlarda ishlaydi
+        return self._message(chat_id, user_id, document={
+            'file_id': f"f{self._message_id + 1}",
+            'file_unique_id': f"u{self._message_id + 1}",
+            'file_name': file_name,
+            'file_size': self.rng.randint(10 ** 4, 10 ** 7)
+        }, **extra)
+    
+    def event(self) -> List[dict]:
+        """Bitta hodisa (album va raid - bir nechta update)"""
+        rng = self.rng
+        kind = rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        chat_id = -1009000000000 - rng.randrange(self.chats)
+        user_id = 100000 + rng.randrange(self.users)
+        
+        if kind == 'text':
+            return [self._message(chat_id, user_id, text='salom')]
+        if kind == 'clean':
+            return [self._document(chat_id, user_id, rng.choice(CLEAN_NAMES))]
+        if kind == 'apk':
+            return [self._document(chat_id, user_id, rng.choice(APK_NAMES))]
+        if kind == 'admin':
+            return [self._document(chat_id, rng.choice(ADMIN_IDS), rng.choice(APK_NAMES))]
+        if kind == 'command':
+            command = rng.choice(COMMANDS)
+            return [self._message(chat_id, user_id, text=command, entities=[
+                {'type': 'bot_command', 'offset': 0, 'length': len(command)}
+            ])]
+        if kind == 'album':
+            self._group_id += 1
+            return [
+                self._document(chat_id, user_id, rng.choice(APK_NAMES), media_group_id=str(self._group_id))
+                for _ in range(rng.randint(2, 5))
+            ]
+        # raid: har safar yangi akkauntlar
+        updates = []
+        for _ in range(rng.randint(5, 20)):
+            self._raider_id += 1
+            updates.append(self._document(chat_id, self._raider_id, rng.choice(APK_NAMES)))
+        return updates
+    
+    def generate(self, count: int) -> List[dict]:
+        """Kamida `count` ta update (oxirgi hodisa to'liq qo'shiladi)"""
+        updates: List[dict] = []
+        while len(updates) < count:
+            updates.extend(self.event())
+        return updates
+
+
+def save_jsonl(path: str, updates: Iterable[dict]) -> int:
+    """
+    Update'larni JSONL faylga yozish.
+    
+    Returns:
+        Yozilgan update'lar soni
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for update in updates:
+            f.write(json.dumps(update, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def load_jsonl(path: str) -> Iterator[dict]:
+    """JSONL fayldagi update'lar (bo'sh qatorlar o'tkazib yuboriladi)"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -14,11 +14,16 @@ Muallif: Anti-APK Security Bot
 Versiya: 1.0.0
 """
 
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from telegram import Update, ChatPermissions, User
+import time
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Any, Awaitable, Callable, List, Optional
+from telegram import Bot, Update, ChatPermissions, Document, Message, User
 from telegram.ext import (
     Application,
+    ChatMemberHandler,
     CommandHandler,
     MessageHandler,
     filters,
@@ -28,17 +33,34 @@ from telegram.error import BadRequest, Forbidden, TelegramError
 from telegram.constants import ParseMode
 
 from config import Config
+from bursts import BurstCoalescer
+from catchup import BacklogCatchUp, BulkDeleter, start_catchup
+from chat_cache import AdminCache, BotRights, BotRightsCache
 from database import StrikeDatabase
+from detection import ApkDetector
+from logsetup import setup_logging
+from metrics import EVENTS, STAGE_SECONDS, MetricsServer, monitor_loop_lag, registry
+from prefilter import PrefilterQueue, UpdatePrefilter, allowed_update_types
+from notices import NoticeSender
+from processing import KeyedUpdateProcessor
+from ratelimit import PriorityRateLimiter
+from sharding import run_sharded
+from sniffer import ApkSniffer
+from verdicts import VerdictCache
+from webhook import WebhookServer, run_webhook
+from storage import TieredStorage, create_storage
 
 # ==================== LOGGING SOZLASH ====================
 
-logging.basicConfig(
-    format='%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
-    level=getattr(logging, Config.LOG_LEVEL, logging.INFO),
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('bot.log', encoding='utf-8')
-    ]
+# Yozuvlar navbat orqali fon oqimida yoziladi - handler'lar event loop'ni
+# disk I/O bilan to'xtatmaydi
+setup_logging(
+    level=Config.LOG_LEVEL,
+    log_file=Config.LOG_FILE,
+    max_bytes=Config.LOG_MAX_BYTES,
+    backup_count=Config.LOG_BACKUP_COUNT,
+    rotate_when=Config.LOG_ROTATE_WHEN,
+    json_lines=Config.LOG_JSON
 )
 
 logger = logging.getLogger('AntiAPKBot')
@@ -49,7 +71,88 @@ logging.getLogger('httpx').setLevel(logging.WARNING)
 
 # ==================== DATABASE ====================
 
-db = StrikeDatabase(Config.STRIKES_DB_FILE)
+# Sharding: strike'lar barcha worker'lar uchun bitta SQLite faylda
+db_shared = Config.SHARDS > 1
+
+# Fayl import vaqtida o'qilmaydi: on_startup yuklashni fon oqimida
+# boshlaydi, strike kerak bo'lgan handler'lar db_ready() bilan kutadi
+db = StrikeDatabase(
+    Config.STRIKES_DB_FILE,
+    loader=partial(
+        create_storage,
+        Config.STRIKES_STORAGE,
+        json_file=Config.STRIKES_DB_FILE,
+        sqlite_file=Config.STRIKES_SQLITE_FILE,
+        snapshot_file=Config.STRIKES_SNAPSHOT_FILE,
+        compact_records=Config.JOURNAL_COMPACT_RECORDS,
+        compact_interval=Config.JOURNAL_COMPACT_INTERVAL,
+        flush_interval=Config.PERSIST_FLUSH_INTERVAL,
+        flush_threshold=Config.PERSIST_FLUSH_THRESHOLD,
+        shared=db_shared,
+        cache_bytes=int(Config.STRIKES_CACHE_MB * 2 ** 20)
+    ),
+    decay_period=Config.STRIKE_DECAY_DAYS * 86400
+)
+
+
+async def db_ready() -> None:
+    """Strike database fonda yuklanayotgan bo'lsa tugashini kutish (loop bloklanmaydi)"""
+    if not db.loaded:
+        await asyncio.to_thread(db.wait_loaded)
+
+
+async def db_write(write: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Strike yozuvini bajarish.
+    
+    Sharding'da har yozuv umumiy SQLite fayliga darhol COMMIT qilinadi va
+    boshqa worker yoki decay oqimi yozayotganda kutadi - shuning uchun u
+    event loop'dan tashqarida bajariladi. Bitta jarayonli backend'lar
+    xotirada yozadi va to'g'ridan-to'g'ri chaqiriladi.
+    """
+    if db_shared:
+        return await asyncio.to_thread(write, *args, **kwargs)
+    return write(*args, **kwargs)
+
+# ==================== KESHLAR ====================
+
+admin_cache = AdminCache(ttl=Config.ADMIN_CACHE_TTL)
+bot_rights = BotRightsCache(ttl=Config.ADMIN_CACHE_TTL)
+
+# ==================== APK TO'LQINLARI ====================
+
+bursts = BurstCoalescer(window=Config.BURST_WINDOW) if Config.BURST_WINDOW > 0 else None
+
+# Eski (catch-up) APK xabarlari guruh bo'yicha ommaviy o'chiriladi
+stale_deletes = BulkDeleter()
+
+# Ogohlantirish va jazo xabarlari fonda: o'chirish ular ortida kutmaydi
+notices = NoticeSender(max_pending=Config.NOTICE_MAX_PENDING)
+
+# ==================== APK ANIQLASH ====================
+
+detector = ApkDetector(
+    Config.APK_EXTENSIONS,
+    Config.APK_PATTERNS,
+    rules_file=Config.DETECTION_RULES_FILE or None,
+    reload_interval=Config.DETECTION_RELOAD_INTERVAL
+)
+
+sniffer = ApkSniffer(
+    max_file_size=Config.SNIFF_MAX_FILE_SIZE,
+    concurrency=Config.SNIFF_CONCURRENCY,
+    timeout=Config.SNIFF_TIMEOUT,
+    extensions=Config.SNIFF_EXTENSIONS
+) if Config.CONTENT_SNIFFING else None
+
+verdict_cache = VerdictCache(
+    Config.VERDICT_CACHE_FILE or None,
+    max_entries=Config.VERDICT_CACHE_SIZE,
+    ttl=Config.VERDICT_CACHE_TTL
+)
+
+# Toza hujjatlar va handler'siz update'lar dispatch'dan oldin tashlanadi
+prefilter = UpdatePrefilter(detector.match, sniffer=sniffer, verdicts=verdict_cache)
 
 # ==================== YORDAMCHI FUNKSIYALAR ====================
 
@@ -62,18 +165,20 @@ async def is_user_admin(
     """
     Foydalanuvchi admin yoki creator ekanligini tekshirish.
     
+    Adminlar ro'yxati guruh bo'yicha keshlanadi (AdminCache), shuning
+    uchun odatda API chaqiruvi bo'lmaydi.
+    
     Args:
         update: Telegram update
         context: Bot context
         user_id: Tekshiriladigan foydalanuvchi ID
-        
+    
     Returns:
         True agar admin/creator, False aks holda
     """
     try:
         chat_id = update.effective_chat.id
-        member = await context.bot.get_chat_member(chat_id, user_id)
-        return member.status in ['creator', 'administrator']
+        return await admin_cache.is_admin(context.bot, chat_id, user_id)
     except TelegramError as e:
         logger.error(f"Admin tekshirishda xato: {e}")
         return False
@@ -89,17 +194,33 @@ async def is_bot_admin(
     Args:
         update: Telegram update
         context: Bot context
-        
+    
     Returns:
         True agar bot admin, False aks holda
     """
+    rights = await get_bot_rights(context, update.effective_chat.id)
+    return rights is not None and rights.status == 'administrator'
+
+
+async def get_bot_rights(
+    context: ContextTypes.DEFAULT_TYPE,
+    chat_id: int
+) -> Optional[BotRights]:
+    """
+    Botning guruhdagi huquqlarini keshdan olish.
+    
+    Args:
+        context: Bot context
+        chat_id: Guruh ID
+    
+    Returns:
+        BotRights, yuklab bo'lmasa None (chaqiruvchi odatdagidek urinadi)
+    """
     try:
-        chat_id = update.effective_chat.id
-        bot_member = await context.bot.get_chat_member(chat_id, context.bot.id)
-        return bot_member.status == 'administrator'
+        return await bot_rights.get(context.bot, chat_id)
     except TelegramError as e:
-        logger.error(f"Bot adminligini tekshirishda xato: {e}")
-        return False
+        logger.error(f"Bot huquqlarini tekshirishda xato: {e}")
+        return None
 
 
 def get_user_mention(user: User) -> str:
@@ -108,7 +229,7 @@ def get_user_mention(user: User) -> str:
     
     Args:
         user: Telegram User object
-        
+    
     Returns:
         HTML formatdagi mention
     """
@@ -116,149 +237,342 @@ def get_user_mention(user: User) -> str:
     return f'<a href="tg://user?id={user.id}">{name}</a>'
 
 
+def is_stale(message: Message) -> bool:
+    """
+    Xabar STALE_MESSAGE_AGE'dan eskimi (masalan, bot o'chiq paytida kelgan).
+    
+    Args:
+        message: Telegram xabari
+    
+    Returns:
+        True agar xabar eski
+    """
+    age = datetime.now(timezone.utc) - message.date
+    return age.total_seconds() > Config.STALE_MESSAGE_AGE
+
+
 def is_apk_file(file_name: str) -> bool:
     """
     Fayl APK ekanligini tekshirish.
     
+    Kengaytmalar nom ichida ham qidiriladi (masalan: game.apk.zip),
+    Unicode hiylalari (RTL-override, homoglyph nuqtalar) tozalanadi.
+    
     Args:
         file_name: Fayl nomi
-        
+    
+    Returns:
+        True agar APK, False aks holda
+    """
+    return detector.match(file_name)
+
+
+async def detect_apk(
+    context: ContextTypes.DEFAULT_TYPE,
+    document: Document
+) -> bool:
+    """
+    Hujjat APK ekanligini aniqlash.
+    
+    Avval fayl nomi (arzon, qoidalar qayta yuklansa ham doim joriy),
+    keyin file_unique_id bo'yicha saqlangan hukm va (CONTENT_SNIFFING
+    yoqilgan bo'lsa) fayl tarkibi tekshiriladi. Kesh faqat tarkibni qayta
+    tekshirmaslik uchun: saqlangan "toza" hukm nom qoidasini chetlab
+    o'tmaydi.
+    
+    Args:
+        context: Bot context
+        document: Telegram Document
+    
     Returns:
         True agar APK, False aks holda
     """
-    if not file_name:
+    if is_apk_file(document.file_name or ""):
+        # Nomi o'zgartirilgan nusxasi ham shu hukm bilan ushlanadi
+        if verdict_cache.peek(document) is not True:
+            verdict_cache.put(document, True)
+        return True
+    
+    cached = verdict_cache.get(document)
+    if cached is not None:
+        return cached
+    
+    if sniffer is None or not sniffer.should_inspect(document):
         return False
     
-    file_name_lower = file_name.lower()
+    verdict = await sniffer.inspect(context.bot, document)
+    if verdict is not None:
+        verdict_cache.put(document, verdict)
+    return verdict is True
+
+
+# ==================== STRIKE AKSIYALARI ====================
+
+
+async def delete_apk_message(message: Message) -> bool:
+    """
+    APK xabarini o'chirish.
+    
+    Xabar allaqachon o'chirilgan bo'lsa (masalan, admin tomonidan) bu
+    muvaffaqiyat hisoblanadi - APK baribir guruhda qolmadi.
     
-    # Kengaytma bilan tugashini tekshirish
-    for ext in Config.APK_EXTENSIONS:
-        if file_name_lower.endswith(ext):
-            return True
-        # Fayl nomi ichida .apk borligini tekshirish (masalan: game.apk.zip)
-        if ext in file_name_lower:
+    Args:
+        message: O'chiriladigan xabar
+    
+    Returns:
+        True agar xabar guruhda qolmadi, False aks holda
+    """
+    chat_id = message.chat_id
+    try:
+        await message.delete()
+    except BadRequest as e:
+        if 'not found' in str(e).lower():
+            logger.info("APK xabar allaqachon o'chirilgan (guruh: %s)", chat_id, extra={'chat_id': chat_id})
             return True
+        bot_rights.invalidate(chat_id)
+        logger.error("Xabarni o'chirishda xato: %s", e, extra={'chat_id': chat_id})
+        return False
+    except Forbidden as e:
+        bot_rights.invalidate(chat_id)
+        logger.error("Xabarni o'chirish taqiqlangan: %s", e, extra={'chat_id': chat_id})
+        return False
+    except TelegramError as e:
+        logger.error("Xabarni o'chirishda xato: %s", e, extra={'chat_id': chat_id})
+        return False
     
-    return False
+    logger.debug("APK xabar o'chirildi: %s", message.document.file_name, extra={'chat_id': chat_id})
+    return True
 
 
-# ==================== STRIKE AKSIYALARI ====================
+async def enforce_with_notice(
+    update: Update,
+    action: Awaitable[Any],
+    action_name: str,
+    notice_text: Optional[str]
+) -> bool:
+    """
+    Jazoni qo'llash va u haqidagi xabarni fonda yuborish.
+    
+    Xabar faqat jazo muvaffaqiyatli bo'lsa NoticeSender orqali
+    yuboriladi - guruhda noto'g'ri e'lon qolmaydi, handler esa guruh
+    xabarlari bucket'ini kutib update processor slotini ushlab turmaydi.
+    Xabar yuborilmasa (yoki guruh navbati to'la bo'lsa) jazo baribir
+    kuchda qoladi.
+    
+    Args:
+        update: Telegram update
+        action: Jazo coroutine'i (restrict/ban)
+        action_name: Log uchun nomi ("Mute", "Ban")
+        notice_text: Guruhga yuboriladigan xabar (HTML, None - yuborilmaydi)
+    
+    Returns:
+        True agar jazo qo'llanildi
+    """
+    chat = update.effective_chat
+    fields = {'chat_id': chat.id, 'action': action_name.lower()}
+    try:
+        await action
+    except BadRequest as e:
+        bot_rights.invalidate(chat.id)
+        logger.error("%s qilishda xato (huquq yo'q?): %s", action_name, e, extra=fields)
+        return False
+    except TelegramError as e:
+        logger.error("%s qilishda xato: %s", action_name, e, extra=fields)
+        return False
+    
+    if notice_text is not None:
+        notices.send(
+            chat.id,
+            partial(chat.send_message, text=notice_text, parse_mode=ParseMode.HTML),
+            action_name,
+            fields
+        )
+    return True
 
 
 async def apply_warning(
     update: Update,
     context: ContextTypes.DEFAULT_TYPE,
     user: User,
-    strike_count: int
+    strike_count: int,
+    notify: bool = True
 ) -> None:
     """
     1-strike: Faqat ogohlantirish yuborish.
+    
+    Eski xabar uchun (notify=False) guruhga hech narsa yuborilmaydi.
     """
-    try:
-        message = Config.WARNING_MESSAGE.format(
-            strike=strike_count,
-            max_strike=Config.MAX_STRIKES
-        )
-        await update.effective_chat.send_message(
-            text=message,
-            parse_mode=ParseMode.HTML,
-            reply_to_message_id=None
-        )
-        logger.info(f"Ogohlantirish yuborildi: {user.username or user.id}")
-    except TelegramError as e:
-        logger.error(f"Ogohlantirish yuborishda xato: {e}")
+    fields = {'chat_id': update.effective_chat.id, 'user_id': user.id, 'action': 'warning'}
+    if not notify:
+        EVENTS.inc('warning')
+        logger.info("Eski APK uchun ogohlantirish yuborilmadi: %s", user.username or user.id, extra=fields)
+        return
+    
+    message = Config.WARNING_MESSAGE.format(
+        strike=strike_count,
+        max_strike=Config.MAX_STRIKES
+    )
+    # Fonda: handler guruh xabarlari bucket'ini kutmaydi
+    queued = notices.send(
+        update.effective_chat.id,
+        partial(update.effective_chat.send_message, text=message, parse_mode=ParseMode.HTML),
+        "Ogohlantirish",
+        fields
+    )
+    EVENTS.inc('warning')
+    if queued:
+        logger.info("Ogohlantirish navbatga qo'yildi: %s", user.username or user.id, extra=fields)
 
 
 async def apply_mute(
     update: Update,
     context: ContextTypes.DEFAULT_TYPE,
     user: User,
-    strike_count: int
+    strike_count: int,
+    notify: bool = True
 ) -> None:
     """
     2-strike: Foydalanuvchini 10 daqiqaga mute qilish.
+    
+    Cheklov va xabar parallel yuboriladi (enforce_with_notice);
+    notify=False bo'lsa faqat cheklov qo'llanadi.
     """
-    try:
-        chat_id = update.effective_chat.id
-        until_date = datetime.now() + timedelta(seconds=Config.MUTE_DURATION)
-        
-        # Mute qilish
-        permissions = ChatPermissions(
-            can_send_messages=False,
-            can_send_media_messages=False,
-            can_send_other_messages=False,
-            can_add_web_page_previews=False
-        )
-        
-        await context.bot.restrict_chat_member(
+    chat_id = update.effective_chat.id
+    
+    # Huquq yo'qligi ma'lum bo'lsa API chaqiruvi baribir muvaffaqiyatsiz
+    rights = await get_bot_rights(context, chat_id)
+    if rights is not None and not rights.can_restrict_members:
+        bot_rights.record_skip()
+        logger.debug("Mute o'tkazib yuborildi, huquq yo'q (guruh: %s)", chat_id, extra={'chat_id': chat_id})
+        return
+    
+    until_date = datetime.now() + timedelta(seconds=Config.MUTE_DURATION)
+    
+    # can_send_media_messages python-telegram-bot 21'da olib tashlangan -
+    # media turlari alohida cheklanadi
+    permissions = ChatPermissions(
+        can_send_messages=False,
+        can_send_audios=False,
+        can_send_documents=False,
+        can_send_photos=False,
+        can_send_videos=False,
+        can_send_video_notes=False,
+        can_send_voice_notes=False,
+        can_send_polls=False,
+        can_send_other_messages=False,
+        can_add_web_page_previews=False
+    )
+    
+    message = Config.MUTE_MESSAGE.format(
+        strike=strike_count,
+        max_strike=Config.MAX_STRIKES
+    )
+    
+    muted = await enforce_with_notice(
+        update,
+        context.bot.restrict_chat_member(
             chat_id=chat_id,
             user_id=user.id,
             permissions=permissions,
             until_date=until_date
-        )
-        
-        # Xabar yuborish
-        message = Config.MUTE_MESSAGE.format(
-            strike=strike_count,
-            max_strike=Config.MAX_STRIKES
-        )
-        await update.effective_chat.send_message(
-            text=message,
-            parse_mode=ParseMode.HTML
-        )
-        
+        ),
+        "Mute",
+        message if notify else None
+    )
+    
+    if muted:
+        EVENTS.inc('mute')
         logger.info(
-            f"Foydalanuvchi mute qilindi: {user.username or user.id} "
-            f"({Config.MUTE_DURATION} sekund)"
+            "Foydalanuvchi mute qilindi: %s (%s sekund)",
+            user.username or user.id,
+            Config.MUTE_DURATION,
+            extra={'chat_id': chat_id, 'user_id': user.id, 'action': 'mute'}
         )
-        
-    except BadRequest as e:
-        logger.error(f"Mute qilishda xato (huquq yo'q?): {e}")
-    except TelegramError as e:
-        logger.error(f"Mute qilishda xato: {e}")
 
 
 async def apply_ban(
     update: Update,
     context: ContextTypes.DEFAULT_TYPE,
     user: User,
-    strike_count: int
+    strike_count: int,
+    notify: bool = True
 ) -> None:
     """
     3-strike: Foydalanuvchini guruhdan chiqarish (ban).
+    
+    Ban va xabar parallel yuboriladi (notify=False - xabarsiz);
+    strike'lar faqat ban muvaffaqiyatli bo'lsa tozalanadi.
     """
-    try:
-        chat_id = update.effective_chat.id
-        
-        # Ban qilish
-        await context.bot.ban_chat_member(
+    chat_id = update.effective_chat.id
+    
+    rights = await get_bot_rights(context, chat_id)
+    if rights is not None and not rights.can_restrict_members:
+        bot_rights.record_skip()
+        logger.debug("Ban o'tkazib yuborildi, huquq yo'q (guruh: %s)", chat_id, extra={'chat_id': chat_id})
+        return
+    
+    message = Config.BAN_MESSAGE.format(
+        user_mention=get_user_mention(user),
+        strike=strike_count,
+        max_strike=Config.MAX_STRIKES
+    )
+    
+    banned = await enforce_with_notice(
+        update,
+        context.bot.ban_chat_member(
             chat_id=chat_id,
             user_id=user.id
-        )
-        
+        ),
+        "Ban",
+        message if notify else None
+    )
+    
+    if banned:
+        EVENTS.inc('ban')
         # Strike'larni tozalash
-        db.reset_strikes(chat_id, user.id)
-        
-        # Xabar yuborish
-        message = Config.BAN_MESSAGE.format(
-            user_mention=get_user_mention(user),
-            strike=strike_count,
-            max_strike=Config.MAX_STRIKES
-        )
-        await update.effective_chat.send_message(
-            text=message,
-            parse_mode=ParseMode.HTML
-        )
-        
+        await db_write(db.reset_strikes, chat_id, user.id)
         logger.warning(
-            f"Foydalanuvchi BAN qilindi: {user.username or user.id} "
-            f"(guruh: {chat_id})"
+            "Foydalanuvchi BAN qilindi: %s (guruh: %s)",
+            user.username or user.id,
+            chat_id,
+            extra={'chat_id': chat_id, 'user_id': user.id, 'action': 'ban'}
         )
-        
-    except BadRequest as e:
-        logger.error(f"Ban qilishda xato (huquq yo'q?): {e}")
+
+
+async def delete_burst(
+    bot: Bot,
+    chat_id: int,
+    message_ids: List[int]
+) -> bool:
+    """
+    To'lqinda yig'ilgan yoki eski APK xabarlarini bitta chaqiruv bilan o'chirish.
+    
+    Args:
+        bot: Telegram bot
+        chat_id: Guruh ID
+        message_ids: Xabar ID'lari (100 tagacha)
+    
+    Returns:
+        True agar xabarlar o'chirildi (topilmaganlari o'tkazib yuboriladi)
+    """
+    try:
+        await bot.delete_messages(chat_id=chat_id, message_ids=message_ids)
+    except (BadRequest, Forbidden) as e:
+        bot_rights.invalidate(chat_id)
+        logger.error("APK xabarlarini ommaviy o'chirishda xato: %s", e, extra={'chat_id': chat_id})
+        return False
     except TelegramError as e:
-        logger.error(f"Ban qilishda xato: {e}")
+        logger.error("APK xabarlarini ommaviy o'chirishda xato: %s", e, extra={'chat_id': chat_id})
+        return False
+    
+    EVENTS.inc('bulk_deleted', amount=len(message_ids))
+    logger.info(
+        "%s ta APK xabar birdaniga o'chirildi (guruh: %s)",
+        len(message_ids),
+        chat_id,
+        extra={'chat_id': chat_id, 'action': 'bulk_delete'}
+    )
+    return True
 
 
 # ==================== ASOSIY HANDLERLAR ====================
@@ -270,7 +584,29 @@ async def handle_document(
 ) -> None:
     """
     Document (fayl) xabarlarini tekshirish va APK bo'lsa o'chirish.
+    
+    Moderatsiya kichik bog'liqlik grafi sifatida bajariladi:
+    
+        huquqlar || admin tekshiruvi   (sovuq keshda ham bitta kechikish)
+        o'chirish || strike yozish      (strike o'chirish natijasini kutmaydi)
+        jazo || xabar                   (enforce_with_notice)
+    
+    O'chirish muvaffaqiyatsiz bo'lsa strike qaytariladi va jazo
+    berilmaydi - guruhda APK qolgan bo'lsa foydalanuvchi jazolanmaydi.
+    
+    BURST_WINDOW yoqilgan bo'lsa, o'chirilgan APK'dan keyin oyna
+    ochiladi: oyna ichidagi keyingi APK'lar (album, flood) strike va
+    xabarsiz yig'iladi va delete_messages bilan birdaniga o'chiriladi.
+    
+    STALE_MESSAGE_AGE'dan eski xabarlar (catch-up) guruh bo'yicha
+    ommaviy o'chiriladi va ular uchun guruhga xabar yuborilmaydi -
+    jazolar baribir qo'llanadi.
+    
+    Har moderatsiya oxirida bitta tuzilgan log yozuvi qoladi (chat_id,
+    user_id, action, latency_ms).
     """
+    started = time.perf_counter()
+    
     # Faqat group va supergroup uchun
     if update.effective_chat.type not in ['group', 'supergroup']:
         return
@@ -283,56 +619,162 @@ async def handle_document(
     document = message.document
     file_name = document.file_name or ""
     
-    # APK tekshirish
-    if not is_apk_file(file_name):
+    # APK tekshirish (hukmlar keshi, nom, kerak bo'lsa tarkib)
+    detected = await detect_apk(context, document)
+    STAGE_SECONDS.observe(time.perf_counter() - started, 'detect')
+    if not detected:
         return
+    EVENTS.inc('detected')
     
     user = message.from_user
     chat_id = message.chat_id
     
-    logger.info(
-        f"APK aniqlandi: {file_name} | "
-        f"Foydalanuvchi: {user.username or user.id} | "
-        f"Guruh: {chat_id}"
+    # Ochiq to'lqin: lider allaqachon huquq/admin tekshiruvidan o'tgan
+    # va strike olgan, bu xabar faqat ommaviy o'chirishga qo'shiladi
+    if bursts is not None and bursts.add((chat_id, user.id), message.message_id):
+        EVENTS.inc('burst')
+        logger.debug("APK to'lqinga qo'shildi: %s (guruh: %s)", file_name, chat_id)
+        return
+    
+    logger.debug(
+        "APK aniqlandi: %s | Foydalanuvchi: %s | Guruh: %s",
+        file_name,
+        user.username or user.id,
+        chat_id
     )
     
-    # Admin tekshirish
+    # Bot huquqlari va admin tekshiruvi bir-biriga bog'liq emas
+    stage_started = time.perf_counter()
+    checks = [get_bot_rights(context, chat_id)]
     if Config.EXCLUDE_ADMINS:
-        if await is_user_admin(update, context, user.id):
-            logger.info(Config.ADMIN_EXEMPT_LOG.format(
-                username=user.username or user.id
-            ))
-            return
+        checks.append(is_user_admin(update, context, user.id))
+    rights, *is_admin = await asyncio.gather(*checks)
+    STAGE_SECONDS.observe(time.perf_counter() - stage_started, 'checks')
     
-    # Xabarni o'chirish
-    try:
-        await message.delete()
-        logger.info(f"APK xabar o'chirildi: {file_name}")
-    except BadRequest as e:
-        logger.error(f"Xabarni o'chirishda xato: {e}")
+    # Bot xabarni o'chira olmasa strike ham berilmaydi - API'ga murojaat
+    # qilmaymiz, guruh esa davriy hisobotda ko'rinadi
+    if rights is not None and not rights.can_delete_messages:
+        bot_rights.record_skip()
+        EVENTS.inc('no_rights')
+        logger.debug("O'chirish o'tkazib yuborildi, huquq yo'q (guruh: %s)", chat_id)
         return
-    except Forbidden as e:
-        logger.error(f"Xabarni o'chirish taqiqlangan: {e}")
+    
+    # Admin tekshirish
+    if any(is_admin):
+        EVENTS.inc('exempt')
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                Config.ADMIN_EXEMPT_LOG.format(username=user.username or user.id),
+                extra={'chat_id': chat_id, 'user_id': user.id, 'action': 'exempt'}
+            )
         return
     
-    # Strike qo'shish
-    strike_count = db.add_strike(
-        chat_id=chat_id,
-        user_id=user.id,
-        username=user.username,
-        first_name=user.first_name
-    )
+    # Xabarni o'chirish - strike shu vaqt ichida yoziladi
+    stage_started = time.perf_counter()
+    stale = is_stale(message)
+    if stale:
+        deletion = stale_deletes.delete(
+            chat_id,
+            message.message_id,
+            partial(delete_burst, context.bot, chat_id)
+        )
+    else:
+        deletion = delete_apk_message(message)
+    delete_task = asyncio.create_task(deletion)
+    
+    try:
+        await db_ready()
+        strike_count = await db_write(
+            db.add_strike,
+            chat_id=chat_id,
+            user_id=user.id,
+            username=user.username,
+            first_name=user.first_name
+        )
+        STAGE_SECONDS.observe(time.perf_counter() - stage_started, 'strike')
+    finally:
+        deleted = await delete_task
+        STAGE_SECONDS.observe(time.perf_counter() - stage_started, 'delete')
+    
+    if not deleted:
+        EVENTS.inc('delete_failed')
+        await db_write(db.revert_strike, chat_id, user.id)
+        return
+    EVENTS.inc('deleted')
+    
+    if bursts is not None:
+        bursts.open((chat_id, user.id), partial(delete_burst, context.bot, chat_id))
     
     # Strike aksiyalari
+    stage_started = time.perf_counter()
     if strike_count >= Config.MAX_STRIKES:
         # 3-strike: BAN
-        await apply_ban(update, context, user, strike_count)
+        action = 'ban'
+        await apply_ban(update, context, user, strike_count, notify=not stale)
     elif strike_count == 2:
         # 2-strike: MUTE
-        await apply_mute(update, context, user, strike_count)
+        action = 'mute'
+        await apply_mute(update, context, user, strike_count, notify=not stale)
     else:
         # 1-strike: WARNING
-        await apply_warning(update, context, user, strike_count)
+        action = 'warning'
+        await apply_warning(update, context, user, strike_count, notify=not stale)
+    
+    finished = time.perf_counter()
+    STAGE_SECONDS.observe(finished - stage_started, action)
+    STAGE_SECONDS.observe(finished - started, 'total')
+    
+    if logger.isEnabledFor(logging.INFO):
+        latency_ms = round((finished - started) * 1000, 1)
+        logger.info(
+            "APK o'chirildi: %s | Foydalanuvchi: %s | Guruh: %s | strike %s, %s (%s ms)",
+            file_name,
+            user.username or user.id,
+            chat_id,
+            strike_count,
+            action,
+            latency_ms,
+            extra={
+                'chat_id': chat_id,
+                'user_id': user.id,
+                'action': action,
+                'strikes': strike_count,
+                'latency_ms': latency_ms,
+                'file_name': file_name
+            }
+        )
+
+
+async def track_chat_member(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """
+    A'zolik o'zgarishlari (admin tayinlash/olib tashlash) bilan admin
+    keshini yangilash.
+    """
+    member_update = update.chat_member
+    admin_cache.update_member(
+        member_update.chat.id,
+        member_update.new_chat_member.user.id,
+        member_update.new_chat_member.status
+    )
+
+
+async def track_my_chat_member(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """
+    Botning o'z a'zoligi/huquqlari o'zgarganda huquqlar keshini yangilash.
+    """
+    member_update = update.my_chat_member
+    chat_id = member_update.chat.id
+    rights = bot_rights.update(chat_id, member_update.new_chat_member)
+    
+    missing = rights.missing()
+    if missing and member_update.new_chat_member.status not in ('left', 'kicked'):
+        logger.info(f"Bot huquqlari o'zgardi (guruh: {chat_id}), yetishmaydi: {', '.join(missing)}")
 
 
 async def handle_private_message(
@@ -400,9 +842,10 @@ async def cmd_stats(
         return
     
     chat_id = update.effective_chat.id
-    strikes = db.get_all_strikes(chat_id)
+    await db_ready()
+    offenders = db.get_chat_offenders(chat_id)
     
-    if not strikes:
+    if not offenders:
         await update.message.reply_text(
             "📊 <b>Statistika</b>\n\n"
             "✅ Hech qanday qoidabuzarlik yo'q!",
@@ -413,10 +856,9 @@ async def cmd_stats(
     # Statistika shakllantirish
     text = "📊 <b>Strike Statistikasi</b>\n\n"
     
-    for user_id, count in sorted(strikes.items(), key=lambda x: x[1], reverse=True):
-        info = db.get_user_info(chat_id, user_id)
-        name = info.get('username') or info.get('first_name') or str(user_id)
-        text += f"• {name}: {count} strike\n"
+    for info in offenders:
+        name = info['username'] or info['first_name'] or str(info['user_id'])
+        text += f"• {name}: {info['strikes']} strike\n"
     
     await update.message.reply_text(text, parse_mode=ParseMode.HTML)
 
@@ -455,7 +897,8 @@ async def cmd_resetstrike(
     
     chat_id = update.effective_chat.id
     
-    if db.reset_strikes(chat_id, target_id):
+    await db_ready()
+    if await db_write(db.reset_strikes, chat_id, target_id):
         await update.message.reply_text(
             f"✅ Strike'lar tozalandi: {target_id}",
             parse_mode=ParseMode.HTML
@@ -467,6 +910,184 @@ async def cmd_resetstrike(
         )
 
 
+async def cmd_globalstats(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """
+    /globalstats - barcha guruhlar bo'yicha statistika (faqat ops jamoasi).
+    """
+    if update.effective_user.id not in Config.OPS_USER_IDS:
+        return
+    
+    await db_ready()
+    stats = db.get_statistics(limit=10)
+    
+    text = (
+        "🌐 <b>Global statistika</b>\n\n"
+        f"👥 Qoidabuzarlar: {stats['total_users']}\n"
+        f"⚡ Jami strike: {stats['total_strikes']}\n"
+    )
+    
+    if db.decay is not None:
+        decay = db.decay.stats()
+        text += (
+            f"⏳ Kechirilgan strike'lar: {decay['forgiven']} "
+            f"({decay['expired']} ta yozuv o'chdi)\n"
+        )
+    
+    if isinstance(db.backend, TieredStorage):
+        strike_cache = db.backend.stats()
+        text += (
+            f"💽 Strike keshi: {strike_cache['size']}/{strike_cache['capacity']} yozuv, "
+            f"hit {strike_cache['hit_rate']:.1%}\n"
+        )
+    
+    if stats['top_offenders']:
+        text += "\n🏆 <b>Top qoidabuzarlar:</b>\n"
+        for item in stats['top_offenders']:
+            chat_id, _, user_id = item['key'].rpartition('_')
+            name = item['username'] or item['first_name'] or user_id
+            text += f"• {name} (guruh {chat_id}): {item['strikes']} strike\n"
+    
+    cache = admin_cache.stats()
+    text += (
+        "\n🗂 <b>Admin keshi:</b>\n"
+        f"• Guruhlar: {cache['chats']}\n"
+        f"• Hit/miss: {cache['hits']}/{cache['misses']} "
+        f"({cache['hit_rate']:.1%})\n"
+    )
+    
+    rights = bot_rights.stats()
+    text += (
+        "\n🔑 <b>Bot huquqlari:</b>\n"
+        f"• Guruhlar: {rights['chats']}\n"
+        f"• Huquqi yetmaydi: {rights['degraded']}\n"
+        f"• O'tkazilgan chaqiruvlar: {rights['skipped_calls']}\n"
+    )
+    
+    early = prefilter.stats()
+    text += (
+        "\n🧹 <b>Prefilter:</b>\n"
+        f"• Qabul qilindi: {early['received']}\n"
+        f"• Tashlandi: toza hujjat {early['rejected']['clean_document']}, "
+        f"handler'siz {early['rejected']['no_handler']}\n"
+        f"• Dispatch qilindi: {early['passed']}\n"
+    )
+    
+    processor = context.application.update_processor
+    if isinstance(processor, KeyedUpdateProcessor):
+        processing = processor.stats()
+        text += (
+            "\n⚙️ <b>Update'lar:</b>\n"
+            f"• Qayta ishlandi: {processing['processed']}\n"
+            f"• Navbat kutgan (bir xil foydalanuvchi): {processing['serialized']}\n"
+            f"• Hozir: {processing['in_flight']}/{processing['max_concurrent']} "
+            f"(kutmoqda: {processing['waiting']})\n"
+        )
+    
+    limiter = getattr(context.bot, 'rate_limiter', None)
+    if isinstance(limiter, PriorityRateLimiter):
+        limits = limiter.stats()
+        text += (
+            "\n🚦 <b>Chiquvchi so'rovlar:</b>\n"
+            f"• Navbat: {limits['depth']} (maks: {limits['max_depth']})\n"
+            f"• Flood limit: {limits['retries']} qayta urinish, "
+            f"{limits['failures']} yo'qotildi\n"
+        )
+        for name, item in limits['priorities'].items():
+            text += (
+                f"• {name}: {item['requests']} so'rov, "
+                f"kutish o'rtacha {item['avg_wait'] * 1000:.0f} ms / "
+                f"maks {item['max_wait'] * 1000:.0f} ms\n"
+            )
+    
+    sent = notices.stats()
+    text += (
+        f"• Guruh xabarlari: {sent['sent']} yuborildi, {sent['dropped']} tashlandi "
+        f"(navbat to'la), {sent['pending']} kutmoqda\n"
+    )
+    
+    webhook = context.application.bot_data.get('webhook')
+    if isinstance(webhook, WebhookServer):
+        intake = webhook.stats()
+        rejected = ', '.join(f"{code}: {n}" for code, n in sorted(intake['rejected'].items()))
+        text += (
+            "\n📡 <b>Webhook:</b>\n"
+            f"• Qabul qilindi: {intake['accepted']}/{intake['received']}\n"
+            f"• Hozir: {intake['in_flight']}/{intake['max_pending']} "
+            f"(maks: {intake['max_in_flight']})\n"
+            f"• Rad etildi: {rejected or '0'}\n"
+        )
+    
+    catchup = context.application.bot_data.get('catchup')
+    if isinstance(catchup, BacklogCatchUp):
+        backlog = catchup.stats()
+        stale = stale_deletes.stats()
+        text += (
+            "\n⏪ <b>Catch-up:</b>\n"
+            f"• Qayta ishlandi: {backlog['processed']}/{backlog['fetched']} "
+            f"({'davom etmoqda' if backlog['running'] else 'tugadi'}, "
+            f"{backlog['elapsed']:.1f} s)\n"
+            f"• Eski APK'lar: {stale['messages']} ta, {stale['batches']} chaqiruvda\n"
+        )
+    
+    verdicts = verdict_cache.stats()
+    text += (
+        "\n🧾 <b>Hukmlar keshi:</b>\n"
+        f"• Yozuvlar: {verdicts['entries']}\n"
+        f"• Hit/miss: {verdicts['hits']}/{verdicts['misses']} "
+        f"({verdicts['hit_rate']:.1%})\n"
+        f"• Chiqarilgan/eskirgan: {verdicts['evictions']}/{verdicts['expirations']}\n"
+    )
+    
+    if bursts is not None:
+        burst = bursts.stats()
+        text += (
+            "\n🌊 <b>APK to'lqinlari:</b>\n"
+            f"• To'lqinlar: {burst['bursts']} (ochiq: {burst['open']})\n"
+            f"• Yig'ilgan xabarlar: {burst['coalesced']}\n"
+            f"• Ommaviy o'chirishlar: {burst['batches']}\n"
+        )
+    
+    if sniffer is not None:
+        sniff = sniffer.stats()
+        text += (
+            "\n🔬 <b>Tarkib tekshiruvi:</b>\n"
+            f"• Tekshirildi: {sniff['inspected']} (APK: {sniff['detected']})\n"
+            f"• Xato/o'tkazildi: {sniff['errors']}/{sniff['skipped']}\n"
+            f"• Yuklangan: {sniff['bytes_fetched'] // 1024} KB\n"
+        )
+    
+    await update.message.reply_text(text, parse_mode=ParseMode.HTML)
+
+
+async def cmd_reloadrules(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """
+    /reloadrules - APK aniqlash qoidalarini qayta yuklash (faqat ops jamoasi).
+    """
+    if update.effective_user.id not in Config.OPS_USER_IDS:
+        return
+    
+    if not detector.rules_file:
+        await update.message.reply_text("ℹ️ DETECTION_RULES_FILE ko'rsatilmagan.")
+        return
+    
+    if detector.reload():
+        # Nom bo'yicha chiqarilgan eski hukmlar yangi qoidalarga mos kelmasligi mumkin
+        verdict_cache.clear()
+        rules = detector.rules
+        await update.message.reply_text(
+            f"✅ Qoidalar yuklandi: {len(rules.extensions)} ta kengaytma, "
+            f"{len(rules.patterns)} ta pattern"
+        )
+    else:
+        await update.message.reply_text("❌ Qoidalarni yuklab bo'lmadi, eskilari saqlandi.")
+
+
 async def cmd_help(
     update: Update,
     context: ContextTypes.DEFAULT_TYPE
@@ -521,34 +1142,211 @@ async def error_handler(
             pass
 
 
-# ==================== MAIN ====================
+# ==================== LIFECYCLE ====================
 
 
-def main() -> None:
+def report_degraded_chats() -> None:
     """
-    Botni ishga tushirish.
+    Huquqi yetmaydigan guruhlarni bitta log yozuvi bilan xabar qilish.
     """
-    # Konfiguratsiyani tekshirish
+    degraded = bot_rights.degraded()
+    if not degraded:
+        return
+    
+    by_missing = {}
+    for chat_id, missing in degraded.items():
+        by_missing.setdefault(', '.join(missing), []).append(str(chat_id))
+    
+    details = '; '.join(
+        f"{missing}: {' '.join(chats)}" for missing, chats in by_missing.items()
+    )
+    logger.warning(
+        f"⚠️ {len(degraded)} ta guruhda bot huquqlari yetmaydi "
+        f"({bot_rights.skipped_calls} ta chaqiruv o'tkazildi) - {details}"
+    )
+
+
+async def degraded_report_loop() -> None:
+    """
+    Huquqi yetmaydigan guruhlar hisobotini davriy chiqarish.
+    """
+    while True:
+        await asyncio.sleep(Config.DEGRADED_REPORT_INTERVAL)
+        report_degraded_chats()
+
+
+async def start_metrics(application: Application) -> None:
+    """
+    Prometheus /metrics serverini va event loop kechikishi o'lchovini boshlash.
+    
+    Navbat chuqurligi kabi qiymatlar faqat scrape paytida o'qiladi -
+    hot path'da ular uchun hech narsa qilinmaydi.
+    """
+    limiter = getattr(application.bot, 'rate_limiter', None)
+    if isinstance(limiter, PriorityRateLimiter):
+        registry.gauge(
+            'apkban_ratelimit_queue_depth',
+            "Rate limiter navbatidagi so'rovlar",
+            collect=lambda: limiter.stats()['depth']
+        )
+    processor = application.update_processor
+    if isinstance(processor, KeyedUpdateProcessor):
+        registry.gauge(
+            'apkban_updates_in_flight',
+            "Hozir qayta ishlanayotgan update'lar",
+            collect=lambda: processor.stats()['in_flight']
+        )
+    registry.gauge(
+        'apkban_strike_users',
+        "Strike'i bor foydalanuvchilar",
+        # Yuklash tugamaguncha scrape kutmaydi - namuna chiqarilmaydi
+        collect=lambda: db.get_statistics(limit=0)['total_users'] if db.loaded else {}
+    )
+    if Config.STRIKES_STORAGE == 'tiered':
+        registry.gauge(
+            'apkban_strike_cache_hit_ratio',
+            "Strike keshi hit ulushi (tiered rejim)",
+            collect=lambda: db.backend.stats()['hit_rate'] if db.loaded else {}
+        )
+        registry.gauge(
+            'apkban_strike_cache_records',
+            "Strike keshidagi yozuvlar (tiered rejim)",
+            collect=lambda: db.backend.stats()['size'] if db.loaded else {}
+        )
+    
+    server = MetricsServer(registry, Config.METRICS_LISTEN, Config.METRICS_PORT)
     try:
-        Config.validate()
-    except ValueError as e:
-        logger.critical(f"Konfiguratsiya xatosi: {e}")
-        print(f"\n❌ XATO: {e}")
-        print("📌 .env faylini yarating va BOT_TOKEN ni kiriting.\n")
+        await server.start()
+    except OSError as e:
+        logger.error(f"Metrikalar serverini ishga tushirib bo'lmadi: {e}")
         return
+    application.bot_data['metrics_server'] = server
+    application.bot_data['loop_lag'] = asyncio.create_task(monitor_loop_lag())
+
+
+async def on_startup(application: Application) -> None:
+    """
+    Bot ishga tushganda fon vazifalarini boshlash.
     
-    logger.info("=" * 50)
-    logger.info("🛡️ Anti-APK Security Bot ishga tushmoqda...")
-    logger.info("=" * 50)
+    CATCHUP_ON_START yoqilgan bo'lsa bot o'chiq paytida kelgan
+    update'lar Updater/webhook ishga tushishidan oldin yig'ib olinadi
+    va fonda qayta ishlanadi.
     
-    # Application yaratish
-    application = Application.builder().token(Config.BOT_TOKEN).build()
+    Strike database shu yerda fon oqimida yuklana boshlaydi - bot
+    uni kutmasdan update qabul qila boshlaydi.
+    """
+    db.start_loading()
+    
+    if Config.DEGRADED_REPORT_INTERVAL > 0:
+        application.bot_data['degraded_report'] = asyncio.create_task(
+            degraded_report_loop()
+        )
+    
+    if Config.METRICS_PORT:
+        await start_metrics(application)
+    
+    if Config.CATCHUP_ON_START:
+        application.bot_data['catchup'] = await start_catchup(
+            application,
+            allowed_updates=allowed_update_types(application),
+            concurrency=Config.CATCHUP_CONCURRENCY,
+            prefilter=prefilter
+        )
+
+
+async def on_stop(application: Application) -> None:
+    """
+    Update'lar to'xtagach catch-up'ni to'xtatish va ochiq to'lqinlar
+    hamda ommaviy o'chirish navbatini yopish (bot hali ulangan).
+    """
+    catchup = application.bot_data.get('catchup')
+    if catchup is not None:
+        await catchup.stop()
+    
+    if bursts is not None:
+        await bursts.close()
+    await stale_deletes.close()
+    await notices.close()
+
+
+async def on_shutdown(application: Application) -> None:
+    """
+    Bot to'xtaganda yig'ilgan o'zgarishlarni yozish va database'ni yopish.
+    """
+    task = application.bot_data.pop('degraded_report', None)
+    if task is not None:
+        task.cancel()
+    report_degraded_chats()
+    
+    task = application.bot_data.pop('loop_lag', None)
+    if task is not None:
+        task.cancel()
+    server = application.bot_data.pop('metrics_server', None)
+    if server is not None:
+        await server.stop()
+    
+    if sniffer is not None:
+        await sniffer.close()
+    verdict_cache.close()
+    
+    db.flush()
+    db.close()
+    logger.info("💾 Database yopildi")
+
+
+# ==================== MAIN ====================
+
+
+def create_application(
+    bot: Optional[Bot] = None,
+    updater: bool = True,
+    early_reject: bool = True
+) -> Application:
+    """
+    Application yaratish va barcha handlerlarni ro'yxatdan o'tkazish.
+    
+    Args:
+        bot: Tayyor bot (benchmark/test uchun; None - BOT_TOKEN va rate limiter)
+        updater: Polling uchun Updater kerakmi (webhook rejimida False)
+        early_reject: Update'larni navbatga qo'yishdan oldin prefilter'dan o'tkazish
+    
+    Returns:
+        Sozlangan Application
+    """
+    builder = Application.builder()
+    if bot is None:
+        # Umumiy limit bot token'iga tegishli - worker'lar uni bo'lishadi,
+        # guruh limitlari esa bo'linmaydi (har guruh bitta worker'da)
+        builder = builder.token(Config.BOT_TOKEN).base_url(Config.BOT_API_URL).rate_limiter(
+            PriorityRateLimiter(
+                global_rate=Config.RATE_LIMIT_GLOBAL / Config.SHARDS,
+                group_rate=Config.RATE_LIMIT_GROUP / 60,
+                max_retries=Config.RATE_LIMIT_MAX_RETRIES
+            )
+        )
+    else:
+        builder = builder.bot(bot)
+    if not updater:
+        builder = builder.updater(None)
+    if early_reject:
+        builder = builder.update_queue(PrefilterQueue(prefilter))
+    
+    application = (
+        builder
+        .concurrent_updates(KeyedUpdateProcessor(Config.MAX_CONCURRENT_UPDATES))
+        .post_init(on_startup)
+        .post_stop(on_stop)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
     
     # Command handlerlar
     application.add_handler(CommandHandler("start", cmd_start))
     application.add_handler(CommandHandler("help", cmd_help))
     application.add_handler(CommandHandler("stats", cmd_stats))
     application.add_handler(CommandHandler("resetstrike", cmd_resetstrike))
+    application.add_handler(CommandHandler("globalstats", cmd_globalstats))
+    application.add_handler(CommandHandler("reloadrules", cmd_reloadrules))
     
     # Document handler (APK tekshirish)
     application.add_handler(
@@ -558,6 +1356,16 @@ def main() -> None:
         )
     )
     
+    # Admin keshini a'zolik o'zgarishlari bilan yangilash
+    application.add_handler(
+        ChatMemberHandler(track_chat_member, ChatMemberHandler.CHAT_MEMBER)
+    )
+    
+    # Bot huquqlari keshini my_chat_member hodisalari bilan yangilash
+    application.add_handler(
+        ChatMemberHandler(track_my_chat_member, ChatMemberHandler.MY_CHAT_MEMBER)
+    )
+    
     # Private chat handler
     application.add_handler(
         MessageHandler(
@@ -569,11 +1377,48 @@ def main() -> None:
     # Error handler
     application.add_error_handler(error_handler)
     
+    if early_reject:
+        prefilter.bind(application)
+    
+    return application
+
+
+def main() -> None:
+    """
+    Botni ishga tushirish.
+    """
+    # Konfiguratsiyani tekshirish
+    try:
+        Config.validate()
+    except ValueError as e:
+        logger.critical(f"Konfiguratsiya xatosi: {e}")
+        print(f"\n❌ XATO: {e}")
+        print("📌 .env faylini yarating va BOT_TOKEN ni kiriting.\n")
+        return
+    
+    logger.info("=" * 50)
+    logger.info("🛡️ Anti-APK Security Bot ishga tushmoqda...")
+    logger.info("=" * 50)
+    
+    webhook_mode = Config.UPDATE_MODE == 'webhook'
+    
+    # Application yaratish
+    application = create_application(updater=not webhook_mode)
+    
+    # Faqat handler'lar qabul qiladigan update turlariga obuna bo'lish
+    allowed_updates = allowed_update_types(application)
+    
     # Botni ishga tushirish
     logger.info("✅ Bot muvaffaqiyatli ishga tushdi!")
     logger.info(f"📊 Adminlarni istisno qilish: {Config.EXCLUDE_ADMINS}")
     logger.info(f"⚡ Max strikes: {Config.MAX_STRIKES}")
     logger.info(f"🔇 Mute davomiyligi: {Config.MUTE_DURATION} sekund")
+    logger.info(f"⏳ Strike kechirilishi: har {Config.STRIKE_DECAY_DAYS:g} kunda bittadan")
+    logger.info(f"💾 Saqlash rejimi: {Config.STRIKES_STORAGE}")
+    logger.info(f"⚙️ Parallel update'lar: {Config.MAX_CONCURRENT_UPDATES}")
+    logger.info(f"📡 Update rejimi: {Config.UPDATE_MODE} ({', '.join(allowed_updates)})")
+    logger.info(f"⏪ Catch-up: {Config.CATCHUP_ON_START}")
+    logger.info(f"🧩 Shard'lar: {Config.SHARDS}")
     
     print("\n" + "=" * 50)
     print("  ANTI-APK SECURITY BOT")
@@ -582,10 +1427,43 @@ def main() -> None:
     print("[*] To'xtatish uchun: Ctrl+C")
     print("=" * 50 + "\n")
     
-    application.run_polling(
-        allowed_updates=Update.ALL_TYPES,
-        drop_pending_updates=True
-    )
+    if Config.SHARDS > 1:
+        # Bu jarayon faqat front: update'lar worker jarayonlarida qayta ishlanadi
+        asyncio.run(run_sharded(
+            Config.SHARDS,
+            Config.BOT_TOKEN,
+            api_url=Config.BOT_API_URL,
+            mode=Config.UPDATE_MODE,
+            allowed_updates=allowed_updates,
+            drop_pending_updates=not Config.CATCHUP_ON_START,
+            prefilter=prefilter,
+            webhook_url=Config.WEBHOOK_URL,
+            listen=Config.WEBHOOK_LISTEN,
+            port=Config.WEBHOOK_PORT,
+            path=Config.WEBHOOK_PATH,
+            secret_token=Config.WEBHOOK_SECRET,
+            max_connections=Config.WEBHOOK_MAX_CONNECTIONS
+        ))
+        db.close()
+    elif webhook_mode:
+        asyncio.run(run_webhook(
+            application,
+            url=Config.WEBHOOK_URL,
+            listen=Config.WEBHOOK_LISTEN,
+            port=Config.WEBHOOK_PORT,
+            path=Config.WEBHOOK_PATH,
+            secret_token=Config.WEBHOOK_SECRET,
+            max_pending=Config.WEBHOOK_MAX_PENDING,
+            max_connections=Config.WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=allowed_updates,
+            drop_pending_updates=not Config.CATCHUP_ON_START,
+            prefilter=prefilter
+        ))
+    else:
+        application.run_polling(
+            allowed_updates=allowed_updates,
+            drop_pending_updates=not Config.CATCHUP_ON_START
+        )
 
 
 if __name__ == '__main__':
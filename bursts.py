@@ -0,0 +1,152 @@
+"""
+Telegram Anti-APK Security Bot - Burst Coalescing
+Bitta foydalanuvchining APK to'lqinini (album, flood) bitta qoidabuzarlik
+sifatida yig'ish va ommaviy o'chirish
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Set
+
+logger = logging.getLogger(__name__)
+
+# Bot API delete_messages chegarasi
+MAX_BATCH = 100
+
+FlushCallback = Callable[[List[int]], Awaitable[Any]]
+
+
+class Burst:
+    """Ochiq oyna: yig'ilgan xabar ID'lari va ularni o'chiruvchi callback"""
+    
+    __slots__ = ('flush', 'pending', 'collected', 'timer')
+    
+    def __init__(self, flush: FlushCallback):
+        self.flush = flush
+        self.pending: List[int] = []
+        self.collected = 0
+        self.timer = None
+
+
+class BurstCoalescer:
+    """
+    (chat_id, user_id) bo'yicha qisqa yig'ish oynasi.
+    
+    To'lqinning birinchi xabari (lider) odatdagidek darhol o'chiriladi va
+    strike oladi, so'ng oyna ochiladi. Oyna ichida kelgan keyingi APK'lar
+    strike va xabarsiz navbatga qo'shiladi va oyna yopilganda
+    delete_messages bilan (100 tadan) o'chiriladi. Shunday qilib album
+    yoki flood bitta strike, bitta xabar va bir nechta API chaqiruviga
+    tushadi, bitta to'lqin esa ogohlantirishdan to'g'ridan-to'g'ri ban'ga
+    sakramaydi.
+    
+    Oyna lider bilan boshlanadi va uzaytirilmaydi: oynadan keyin ham
+    davom etayotgan flood keyingi strike'ni oladi.
+    """
+    
+    def __init__(self, window: float, max_batch: int = MAX_BATCH):
+        """
+        Coalescer yaratish.
+        
+        Args:
+            window: Oyna davomiyligi (sekund)
+            max_batch: Bitta o'chirish chaqiruvidagi maksimal xabarlar
+        """
+        self.window = window
+        self.max_batch = max_batch
+        
+        self._bursts: Dict[Hashable, Burst] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        
+        self.bursts = 0
+        self.coalesced = 0
+        self.batches = 0
+    
+    def open(self, key: Hashable, flush: FlushCallback) -> None:
+        """
+        Lider qayta ishlangandan keyin oyna ochish.
+        
+        Args:
+            key: (chat_id, user_id)
+            flush: Yig'ilgan ID'larni o'chiruvchi coroutine funksiya
+        """
+        if key in self._bursts:
+            return
+        burst = self._bursts[key] = Burst(flush)
+        self.bursts += 1
+        burst.timer = self._spawn(self._expire(key, burst))
+    
+    def add(self, key: Hashable, message_id: int) -> bool:
+        """
+        Xabarni ochiq oynaga qo'shish.
+        
+        Args:
+            key: (chat_id, user_id)
+            message_id: O'chiriladigan xabar ID
+        
+        Returns:
+            True agar oyna ochiq va xabar navbatga qo'shildi,
+            False agar xabar odatdagidek qayta ishlanishi kerak
+        """
+        burst = self._bursts.get(key)
+        if burst is None:
+            return False
+        
+        burst.pending.append(message_id)
+        burst.collected += 1
+        self.coalesced += 1
+        if len(burst.pending) >= self.max_batch:
+            self._spawn(self._flush(burst))
+        return True
+    
+    def _spawn(self, coroutine: Awaitable[Any]) -> asyncio.Task:
+        """Fon vazifasini yaratish (GC yig'ib olmasligi uchun saqlanadi)"""
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+    
+    async def _expire(self, key: Hashable, burst: Burst) -> None:
+        """Oyna tugagach uni yopish va qolgan xabarlarni o'chirish"""
+        try:
+            await asyncio.sleep(self.window)
+        finally:
+            if self._bursts.get(key) is burst:
+                del self._bursts[key]
+            await self._flush(burst)
+            if burst.collected:
+                logger.info(
+                    f"APK to'lqini yopildi: {key} - "
+                    f"{burst.collected} ta qo'shimcha xabar o'chirildi"
+                )
+    
+    async def _flush(self, burst: Burst) -> None:
+        """Navbatdagi ID'larni max_batch bo'laklarda o'chirish"""
+        while burst.pending:
+            batch = burst.pending[:self.max_batch]
+            del burst.pending[:self.max_batch]
+            self.batches += 1
+            try:
+                await burst.flush(batch)
+            except Exception as e:
+                logger.error(f"APK to'lqinini o'chirishda xato: {e}")
+    
+    async def close(self) -> None:
+        """Barcha ochiq oynalarni darhol yopish va navbatni o'chirish"""
+        for burst in list(self._bursts.values()):
+            burst.timer.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+    
+    def stats(self) -> dict:
+        """
+        Coalescer statistikasi.
+        
+        Returns:
+            {"open", "bursts", "coalesced", "batches"}
+        """
+        return {
+            'open': len(self._bursts),
+            'bursts': self.bursts,
+            'coalesced': self.coalesced,
+            'batches': self.batches
+        }
@@ -0,0 +1,315 @@
+"""
+Telegram Anti-APK Security Bot - Backlog Catch-up
+Bot o'chiq turgan paytda kelgan update'larni qayta ishga tushganda
+tashlab yubormasdan tez qayta ishlash
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+from telegram import Update
+from telegram.error import TelegramError
+from telegram.ext import Application
+
+from bursts import MAX_BATCH
+from prefilter import UpdatePrefilter
+from ratelimit import BACKLOG, request_priority
+
+logger = logging.getLogger(__name__)
+
+# getUpdates bir chaqiruvda qaytaradigan maksimal update'lar
+PAGE_SIZE = 100
+
+# (message_ids) -> True agar xabarlar guruhda qolmadi
+DeleteCallback = Callable[[List[int]], Awaitable[bool]]
+
+
+# ==================== OMMAVIY O'CHIRISH ====================
+
+
+class BulkDeleter:
+    """
+    Eski APK xabarlarini guruh bo'yicha yig'ib delete_messages bilan o'chirish.
+    
+    Har chaqiruvchi o'z xabari o'chirilishini kutadi (strike qaytarish
+    uchun natija kerak), lekin xabarlar `linger` sekund yoki `max_batch`
+    ta yig'ilguncha bitta so'rovga jamlanadi. Catch-up ishchilari bir
+    guruhning eski APK'larini deyarli bir vaqtda yuboradi, shuning uchun
+    qisqa `linger` ularni bitta API chaqiruviga yig'ishga yetadi -
+    uzunrog'i esa har ishchini bekorga ushlab turadi.
+    """
+    
+    def __init__(self, linger: float = 0.1, max_batch: int = MAX_BATCH):
+        """
+        Deleter yaratish.
+        
+        Args:
+            linger: Birinchi xabardan keyin yig'ish vaqti (sekund)
+            max_batch: Bitta chaqiruvdagi maksimal xabarlar
+        """
+        self.linger = linger
+        self.max_batch = max_batch
+        
+        self._pending: Dict[int, List[Tuple[int, asyncio.Future]]] = {}
+        self._callbacks: Dict[int, DeleteCallback] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        
+        self.messages = 0
+        self.batches = 0
+    
+    async def delete(self, chat_id: int, message_id: int, delete: DeleteCallback) -> bool:
+        """
+        Xabarni navbatga qo'shish va o'chirilishini kutish.
+        
+        Args:
+            chat_id: Guruh ID
+            message_id: O'chiriladigan xabar ID
+            delete: Guruhning yig'ilgan ID'larini o'chiruvchi coroutine funksiya
+        
+        Returns:
+            True agar xabar guruhda qolmadi
+        """
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.setdefault(chat_id, [])
+        batch.append((message_id, future))
+        self._callbacks[chat_id] = delete
+        self.messages += 1
+        
+        if len(batch) >= self.max_batch:
+            self._spawn(self._flush(chat_id))
+        elif len(batch) == 1:
+            self._spawn(self._flush(chat_id, self.linger))
+        return await future
+    
+    def _spawn(self, coroutine: Awaitable[Any]) -> None:
+        """Fon vazifasini yaratish (GC yig'ib olmasligi uchun saqlanadi)"""
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _flush(self, chat_id: int, delay: float = 0.0) -> None:
+        """Guruhning yig'ilgan xabarlarini o'chirish va kutayotganlarga javob berish"""
+        if delay:
+            await asyncio.sleep(delay)
+        batch = self._pending.pop(chat_id, None)
+        if not batch:
+            return
+        delete = self._callbacks.pop(chat_id)
+        
+        self.batches += 1
+        try:
+            deleted = await delete([message_id for message_id, _ in batch])
+        except Exception as e:
+            logger.error(f"Eski APK xabarlarini o'chirishda xato: {e}")
+            deleted = False
+        for _, future in batch:
+            if not future.done():
+                future.set_result(deleted)
+    
+    async def close(self) -> None:
+        """Navbatdagi barcha xabarlarni darhol o'chirish"""
+        for chat_id in list(self._pending):
+            self._spawn(self._flush(chat_id))
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+    
+    def stats(self) -> dict:
+        """
+        Deleter statistikasi.
+        
+        Returns:
+            {"messages", "batches", "pending"}
+        """
+        return {
+            'messages': self.messages,
+            'batches': self.batches,
+            'pending': sum(len(batch) for batch in self._pending.values())
+        }
+
+
+# ==================== CATCH-UP ====================
+
+
+class BacklogCatchUp:
+    """
+    Qayta ishga tushgandan keyingi update'lar to'plamini qayta ishlash.
+    
+    drop_pending_updates o'rniga: ishga tushishda Telegram'dagi barcha
+    kutilayotgan update'lar getUpdates bilan tez yig'ib olinadi va
+    tasdiqlanadi (Updater/webhook faqat yangilarini oladi), so'ng fon
+    vazifasida `concurrency` ta parallel ishchi bilan Application'ning
+    odatdagi handler'lari orqali o'tkaziladi.
+    
+    Jonli trafik to'xtab qolmaydi: catch-up update processor'ning
+    faqat `concurrency` ta joyini egallaydi va uning barcha Bot API
+    so'rovlari rate limiter'da eng past (BACKLOG) ustuvorlikda o'tadi.
+    Eski xabarlar uchun ogohlantirish yuborilmasligi va ommaviy o'chirish
+    handle_document'da xabar yoshiga qarab hal qilinadi.
+    """
+    
+    def __init__(
+        self,
+        application: Application,
+        allowed_updates: Optional[Sequence[str]] = None,
+        concurrency: int = 16,
+        prefilter: Optional[UpdatePrefilter] = None
+    ):
+        """
+        Catch-up yaratish.
+        
+        Args:
+            application: Initialize qilingan Application
+            allowed_updates: getUpdates uchun update turlari
+            concurrency: Parallel qayta ishlanadigan eski update'lar
+            prefilter: Keraksiz update'larni tashlovchi filtr (ixtiyoriy)
+        """
+        self.application = application
+        self.allowed_updates = allowed_updates
+        self.concurrency = max(1, concurrency)
+        self.prefilter = prefilter
+        
+        self._backlog: Deque[Update] = deque()
+        self._task: Optional[asyncio.Task] = None
+        
+        self.fetched = 0
+        self.processed = 0
+        self.errors = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+    
+    async def fetch(self) -> int:
+        """
+        Kutilayotgan update'larni yig'ib olish va Telegram'da tasdiqlash.
+        
+        Updater/webhook ishga tushishidan oldin chaqirilishi kerak -
+        getUpdates webhook o'rnatilgan bo'lsa yoki boshqa getUpdates
+        bilan parallel ishlamaydi.
+        
+        Xato bo'lsa faqat tasdiqlangan sahifalar qoladi - tasdiqlanmagan
+        oxirgi sahifani Updater/webhook odatdagidek qayta oladi, update
+        ikki marta qayta ishlanmaydi.
+        
+        Returns:
+            Yig'ilgan update'lar soni
+        
+        Raises:
+            TelegramError: Telegram so'rovi muvaffaqiyatsiz bo'lsa
+        """
+        bot = self.application.bot
+        # Oldingi webhook qolgan bo'lsa getUpdates 409 qaytaradi
+        await bot.delete_webhook(drop_pending_updates=False)
+        
+        offset = None
+        unconfirmed: List[Update] = []
+        while True:
+            page = await bot.get_updates(
+                offset=offset,
+                limit=PAGE_SIZE,
+                timeout=0,
+                allowed_updates=self.allowed_updates
+            )
+            # offset'li chaqiruv oldingi sahifani Telegram'da tasdiqladi
+            self._backlog.extend(unconfirmed)
+            self.fetched += len(unconfirmed)
+            if not page:
+                break
+            unconfirmed = page
+            offset = page[-1].update_id + 1
+        
+        return self.fetched
+    
+    def start(self) -> None:
+        """Yig'ilgan update'larni fon vazifasida qayta ishlashni boshlash"""
+        if not self._backlog or self._task is not None:
+            return
+        self.started_at = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+    
+    async def _run(self) -> None:
+        """Ishchilarni ishga tushirish va tugashini kutish"""
+        # Ishchilar va ularning barcha API so'rovlari shu ustuvorlikni meros oladi
+        request_priority.set(BACKLOG)
+        workers = min(self.concurrency, len(self._backlog))
+        await asyncio.gather(*(self._worker() for _ in range(workers)))
+        
+        self.finished_at = time.monotonic()
+        logger.info(
+            f"⏪ Catch-up tugadi: {self.processed} ta update "
+            f"{self.finished_at - self.started_at:.1f} sekundda"
+        )
+    
+    async def _worker(self) -> None:
+        """Navbatdan update olib odatdagi processor orqali bajarish"""
+        application = self.application
+        processor = application.update_processor
+        while self._backlog:
+            update = self._backlog.popleft()
+            if self.prefilter is not None and not self.prefilter.check(update):
+                self.processed += 1
+                continue
+            try:
+                await processor.process_update(update, application.process_update(update))
+            except Exception as e:
+                # Application xatolarni error handler'ga beradi, bu yerga
+                # faqat kutilmagan xatolar yetadi
+                self.errors += 1
+                logger.error(f"Catch-up update'ida xato: {e}")
+            self.processed += 1
+    
+    async def stop(self) -> None:
+        """Tugallanmagan catch-up'ni to'xtatish"""
+        if self._task is None or self._task.done():
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        logger.warning(f"Catch-up to'xtatildi: {len(self._backlog)} ta update qayta ishlanmadi")
+    
+    def stats(self) -> dict:
+        """
+        Catch-up statistikasi.
+        
+        Returns:
+            {"fetched", "processed", "pending", "errors", "running", "elapsed"}
+        """
+        end = self.finished_at or time.monotonic()
+        return {
+            'fetched': self.fetched,
+            'processed': self.processed,
+            'pending': len(self._backlog),
+            'errors': self.errors,
+            'running': self._task is not None and not self._task.done(),
+            'elapsed': end - self.started_at if self.started_at else 0.0
+        }
+
+
+async def start_catchup(
+    application: Application,
+    allowed_updates: Optional[Sequence[str]] = None,
+    concurrency: int = 16,
+    prefilter: Optional[UpdatePrefilter] = None
+) -> BacklogCatchUp:
+    """
+    Backlog'ni yig'ish va fon vazifasida qayta ishlashni boshlash.
+    
+    Yig'ishda xato bo'lsa tasdiqlangan qismi qayta ishlanadi, qolganini
+    Updater/webhook odatdagidek oladi.
+    
+    Returns:
+        Ishga tushgan BacklogCatchUp
+    """
+    catchup = BacklogCatchUp(
+        application,
+        allowed_updates=allowed_updates,
+        concurrency=concurrency,
+        prefilter=prefilter
+    )
+    try:
+        await catchup.fetch()
+    except TelegramError as e:
+        logger.error(f"Catch-up: kutilayotgan update'larni to'liq olib bo'lmadi: {e}")
+    
+    logger.info(f"⏪ Catch-up: {catchup.fetched} ta kutilayotgan update")
+    catchup.start()
+    return catchup
@@ -0,0 +1,323 @@
+"""
+Telegram Anti-APK Security Bot - Chat Cache
+Guruh adminlari va botning o'z huquqlarini xotirada (TTL bilan) saqlash
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from telegram import Bot, ChatMember
+from telegram.constants import ChatMemberStatus
+
+logger = logging.getLogger(__name__)
+
+ADMIN_STATUSES = (ChatMemberStatus.OWNER, ChatMemberStatus.ADMINISTRATOR)
+
+
+class AdminCache:
+    """
+    Har guruh uchun adminlar to'plami.
+    
+    Birinchi so'rovda guruh adminlari bitta get_chat_administrators
+    chaqiruvi bilan yuklanadi va `ttl` sekund davomida xotiradan
+    beriladi. ChatMemberUpdated hodisalari keshni darhol yangilaydi,
+    shuning uchun polling kerak emas. Bir vaqtda kelgan so'rovlar bitta
+    API chaqiruvini baham ko'radi.
+    """
+    
+    def __init__(self, ttl: float = 600.0):
+        """
+        Kesh yaratish.
+        
+        Args:
+            ttl: Yozuvning yashash muddati (sekund)
+        """
+        self.ttl = ttl
+        self._entries: Dict[int, Tuple[float, FrozenSet[int]]] = {}
+        self._loading: Dict[int, asyncio.Future] = {}
+        
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+    
+    def _fresh(self, chat_id: int) -> Optional[FrozenSet[int]]:
+        """Muddati o'tmagan adminlar to'plami (yo'q bo'lsa None)"""
+        entry = self._entries.get(chat_id)
+        if entry is None:
+            return None
+        expires_at, admins = entry
+        if expires_at < time.monotonic():
+            del self._entries[chat_id]
+            return None
+        return admins
+    
+    async def is_admin(self, bot: Bot, chat_id: int, user_id: int) -> bool:
+        """
+        Foydalanuvchi admin/creator ekanligini tekshirish.
+        
+        Args:
+            bot: Telegram bot
+            chat_id: Guruh ID
+            user_id: Foydalanuvchi ID
+        
+        Returns:
+            True agar admin/creator
+        
+        Raises:
+            TelegramError: Adminlarni yuklab bo'lmasa
+        """
+        admins = self._fresh(chat_id)
+        if admins is not None:
+            self.hits += 1
+            return user_id in admins
+        
+        self.misses += 1
+        admins = await self._load(bot, chat_id)
+        return user_id in admins
+    
+    async def _load(self, bot: Bot, chat_id: int) -> FrozenSet[int]:
+        """Adminlarni API'dan yuklash (parallel so'rovlar birlashtiriladi)"""
+        future = self._loading.get(chat_id)
+        if future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Yuklashni boshlagan task bekor qilingan bo'lsa o'zimiz yuklaymiz
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            return await self._load(bot, chat_id)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._loading[chat_id] = future
+        try:
+            members = await bot.get_chat_administrators(chat_id)
+            admins = frozenset(m.user.id for m in members)
+            self.store(chat_id, admins)
+            future.set_result(admins)
+            return admins
+        except Exception as e:
+            future.set_exception(e)
+            # Kutayotgan boshqa so'rov bo'lmasa ham xato "olinmagan" qolmasin
+            future.exception()
+            raise
+        finally:
+            del self._loading[chat_id]
+            if not future.done():
+                # Task bekor qilindi (CancelledError): kutayotganlar osilib qolmasin
+                future.cancel()
+    
+    def store(self, chat_id: int, admins: FrozenSet[int]) -> None:
+        """
+        Guruh adminlarini keshga yozish.
+        
+        Args:
+            chat_id: Guruh ID
+            admins: Admin user_id'lari
+        """
+        self._entries[chat_id] = (time.monotonic() + self.ttl, frozenset(admins))
+    
+    def update_member(self, chat_id: int, user_id: int, status: str) -> None:
+        """
+        ChatMemberUpdated hodisasini keshga qo'llash.
+        
+        Guruh keshda bo'lmasa hech narsa qilinmaydi - keyingi so'rovda
+        to'liq ro'yxat baribir yuklanadi.
+        
+        Args:
+            chat_id: Guruh ID
+            user_id: Foydalanuvchi ID
+            status: Yangi a'zolik holati
+        """
+        entry = self._entries.get(chat_id)
+        if entry is None:
+            return
+        
+        expires_at, admins = entry
+        if status in ADMIN_STATUSES:
+            admins = admins | {user_id}
+        else:
+            admins = admins - {user_id}
+        self._entries[chat_id] = (expires_at, admins)
+        self.updates += 1
+    
+    def invalidate(self, chat_id: int) -> None:
+        """Guruh keshini o'chirish"""
+        self._entries.pop(chat_id, None)
+    
+    def stats(self) -> dict:
+        """
+        Kesh statistikasi.
+        
+        Returns:
+            {"chats", "hits", "misses", "updates", "hit_rate"}
+        """
+        total = self.hits + self.misses
+        return {
+            'chats': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'updates': self.updates,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+
+class BotRights(NamedTuple):
+    """Botning guruhdagi huquqlari"""
+    
+    status: str
+    can_delete_messages: bool
+    can_restrict_members: bool
+    
+    @classmethod
+    def from_member(cls, member: ChatMember) -> 'BotRights':
+        """ChatMember obyektidan huquqlarni olish"""
+        is_admin = member.status == ChatMemberStatus.ADMINISTRATOR
+        return cls(
+            status=member.status,
+            can_delete_messages=is_admin and bool(getattr(member, 'can_delete_messages', False)),
+            can_restrict_members=is_admin and bool(getattr(member, 'can_restrict_members', False))
+        )
+    
+    def missing(self) -> List[str]:
+        """Moderatsiya uchun yetishmayotgan huquqlar nomlari"""
+        missing = []
+        if not self.can_delete_messages:
+            missing.append('can_delete_messages')
+        if not self.can_restrict_members:
+            missing.append('can_restrict_members')
+        return missing
+
+
+class BotRightsCache:
+    """
+    Har guruh uchun botning o'z huquqlari (ChatMemberAdministrator).
+    
+    Huquqlar bitta get_chat_member chaqiruvi bilan yuklanadi va
+    my_chat_member hodisalari bilan yangilanadi. Handlerlar shu kesh
+    orqali muvaffaqiyatsiz bo'lishi aniq bo'lgan API chaqiruvlarini
+    o'tkazib yuboradi; huquqi yetmaydigan guruhlar esa `degraded()`
+    orqali bitta hisobotda ko'rsatiladi.
+    """
+    
+    def __init__(self, ttl: float = 600.0):
+        """
+        Kesh yaratish.
+        
+        Args:
+            ttl: Yozuvning yashash muddati (sekund)
+        """
+        self.ttl = ttl
+        self._entries: Dict[int, Tuple[float, BotRights]] = {}
+        self._loading: Dict[int, asyncio.Future] = {}
+        
+        self.hits = 0
+        self.misses = 0
+        self.skipped_calls = 0
+    
+    async def get(self, bot: Bot, chat_id: int) -> BotRights:
+        """
+        Botning guruhdagi huquqlarini olish.
+        
+        Args:
+            bot: Telegram bot
+            chat_id: Guruh ID
+        
+        Returns:
+            BotRights
+        
+        Raises:
+            TelegramError: Huquqlarni yuklab bo'lmasa
+        """
+        entry = self._entries.get(chat_id)
+        if entry is not None and entry[0] >= time.monotonic():
+            self.hits += 1
+            return entry[1]
+        
+        self.misses += 1
+        return await self._load(bot, chat_id)
+    
+    async def _load(self, bot: Bot, chat_id: int) -> BotRights:
+        """Huquqlarni API'dan yuklash (parallel so'rovlar birlashtiriladi)"""
+        future = self._loading.get(chat_id)
+        if future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Yuklashni boshlagan task bekor qilingan bo'lsa o'zimiz yuklaymiz
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            return await self._load(bot, chat_id)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._loading[chat_id] = future
+        try:
+            member = await bot.get_chat_member(chat_id, bot.id)
+            rights = self.update(chat_id, member)
+            future.set_result(rights)
+            return rights
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            del self._loading[chat_id]
+            if not future.done():
+                # Task bekor qilindi (CancelledError): kutayotganlar osilib qolmasin
+                future.cancel()
+    
+    def update(self, chat_id: int, member: ChatMember) -> BotRights:
+        """
+        Bot a'zoligi o'zgarganda (my_chat_member) keshni yangilash.
+        
+        Args:
+            chat_id: Guruh ID
+            member: Botning yangi ChatMember obyekti
+        
+        Returns:
+            Yangi BotRights
+        """
+        rights = BotRights.from_member(member)
+        if member.status in (ChatMemberStatus.LEFT, ChatMemberStatus.BANNED):
+            self._entries.pop(chat_id, None)
+        else:
+            self._entries[chat_id] = (time.monotonic() + self.ttl, rights)
+        return rights
+    
+    def invalidate(self, chat_id: int) -> None:
+        """Guruh keshini o'chirish (API huquq xatosi qaytarganda)"""
+        self._entries.pop(chat_id, None)
+    
+    def record_skip(self) -> None:
+        """Huquq yo'qligi sababli o'tkazib yuborilgan API chaqiruvini sanash"""
+        self.skipped_calls += 1
+    
+    def degraded(self) -> Dict[int, List[str]]:
+        """
+        Moderatsiya uchun huquqi yetmaydigan guruhlar.
+        
+        Returns:
+            {chat_id: [yetishmayotgan huquqlar]}
+        """
+        result = {}
+        for chat_id, (_, rights) in self._entries.items():
+            missing = rights.missing()
+            if missing:
+                result[chat_id] = missing
+        return result
+    
+    def stats(self) -> dict:
+        """
+        Kesh statistikasi.
+        
+        Returns:
+            {"chats", "degraded", "hits", "misses", "skipped_calls"}
+        """
+        return {
+            'chats': len(self._entries),
+            'degraded': len(self.degraded()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'skipped_calls': self.skipped_calls
+        }
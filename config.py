@@ -3,6 +3,8 @@ Telegram Anti-APK Security Bot - Konfiguratsiya fayli
 """
 
 import os
+import re
+import secrets
 from dotenv import load_dotenv
 
 # .env faylini yuklash
@@ -25,6 +27,111 @@ class Config:
     # Log darajasi
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
     
+    # Log fayli (bo'sh - faqat konsol)
+    LOG_FILE: str = os.getenv('LOG_FILE', 'bot.log')
+    
+    # Hajm bo'yicha rotatsiya: fayl shu hajmga yetganda yangisi ochiladi (bayt)
+    LOG_MAX_BYTES: int = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    
+    # Saqlanadigan eski log fayllari soni
+    LOG_BACKUP_COUNT: int = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+    
+    # Vaqt bo'yicha rotatsiya (midnight, H, ...; bo'sh - hajm bo'yicha)
+    LOG_ROTATE_WHEN: str = os.getenv('LOG_ROTATE_WHEN', '')
+    
+    # Faylga JSON qatorlar (chat_id, user_id, action, latency_ms maydonlari bilan)
+    LOG_JSON: bool = os.getenv('LOG_JSON', 'false').lower() == 'true'
+    
+    # Prometheus metrikalari porti (0 - o'chirilgan)
+    # Sharding rejimida worker N shu port + N'da tinglaydi
+    METRICS_PORT: int = int(os.getenv('METRICS_PORT', '0'))
+    
+    # Metrikalar serveri manzili (tashqariga ochmang)
+    METRICS_LISTEN: str = os.getenv('METRICS_LISTEN', '127.0.0.1')
+    
+    # Admin ro'yxati keshining yashash muddati (sekundlarda)
+    # chat_member hodisalari keshni darhol yangilaydi
+    ADMIN_CACHE_TTL: float = float(os.getenv('ADMIN_CACHE_TTL', '600'))
+    
+    # Huquqi yetmaydigan guruhlar hisobotining oralig'i (sekundlarda)
+    # 0 - hisobot o'chirilgan
+    DEGRADED_REPORT_INTERVAL: float = float(os.getenv('DEGRADED_REPORT_INTERVAL', '3600'))
+    
+    # Bir vaqtda qayta ishlanadigan update'lar soni
+    # Bitta (guruh, foydalanuvchi) update'lari baribir ketma-ket bajariladi
+    MAX_CONCURRENT_UPDATES: int = int(os.getenv('MAX_CONCURRENT_UPDATES', '64'))
+    
+    # APK to'lqini oynasi (sekundlarda): birinchi APK'dan keyin shu vaqt
+    # ichida kelganlari bitta strike bilan ommaviy o'chiriladi
+    # 0 - o'chirilgan (har APK alohida strike)
+    BURST_WINDOW: float = float(os.getenv('BURST_WINDOW', '3'))
+    
+    # Chiquvchi so'rovlar limiti (Telegram cheklovlari)
+    # Umumiy: so'rov/sekund, guruh: bitta guruhga xabar/daqiqa
+    RATE_LIMIT_GLOBAL: float = float(os.getenv('RATE_LIMIT_GLOBAL', '30'))
+    RATE_LIMIT_GROUP: float = float(os.getenv('RATE_LIMIT_GROUP', '20'))
+    
+    # Bitta guruhda yuborilishini kutayotgan ogohlantirish/jazo xabarlari
+    # chegarasi: navbat to'la bo'lsa yangi xabar tashlanadi (raid paytida)
+    NOTICE_MAX_PENDING: int = int(os.getenv('NOTICE_MAX_PENDING', '3'))
+    
+    # RetryAfter (flood limit) javobidan keyingi maksimal qayta urinishlar
+    RATE_LIMIT_MAX_RETRIES: int = int(os.getenv('RATE_LIMIT_MAX_RETRIES', '3'))
+    
+    # Ops jamoasi foydalanuvchi ID'lari (vergul bilan ajratilgan)
+    # Faqat ular /globalstats buyrug'idan foydalana oladi
+    OPS_USER_IDS: frozenset = frozenset(
+        int(x) for x in os.getenv('OPS_USER_IDS', '').split(',') if x.strip()
+    )
+    
+    # ==================== UPDATE QABUL QILISH ====================
+    
+    # Update rejimi: polling yoki webhook
+    UPDATE_MODE: str = os.getenv('UPDATE_MODE', 'polling').lower()
+    
+    # Telegram'ga beriladigan ommaviy HTTPS URL (yo'l bilan)
+    # Masalan: https://bot.example.com/webhook
+    WEBHOOK_URL: str = os.getenv('WEBHOOK_URL', '')
+    
+    # O'rnatilgan HTTP server (reverse proxy ortida)
+    WEBHOOK_LISTEN: str = os.getenv('WEBHOOK_LISTEN', '127.0.0.1')
+    WEBHOOK_PORT: int = int(os.getenv('WEBHOOK_PORT', '8080'))
+    WEBHOOK_PATH: str = os.getenv('WEBHOOK_PATH', '/webhook')
+    
+    # X-Telegram-Bot-Api-Secret-Token, har so'rovda tekshiriladi
+    # Bo'sh bo'lsa har ishga tushishda tasodifiy qiymat yaratiladi
+    # (setWebhook bilan Telegram'ga beriladi)
+    WEBHOOK_SECRET: str = os.getenv('WEBHOOK_SECRET', '') or secrets.token_urlsafe(32)
+    
+    # Tugallanmagan update'lar chegarasi: to'lsa Telegram'ga 503 qaytariladi
+    WEBHOOK_MAX_PENDING: int = int(os.getenv('WEBHOOK_MAX_PENDING', '1000'))
+    
+    # Telegram'ning webhook'ga parallel ulanishlari (1-100)
+    WEBHOOK_MAX_CONNECTIONS: int = int(os.getenv('WEBHOOK_MAX_CONNECTIONS', '40'))
+    
+    # Qayta ishga tushganda bot o'chiq paytida kelgan update'larni
+    # tashlab yubormasdan qayta ishlash (catch-up)
+    CATCHUP_ON_START: bool = os.getenv('CATCHUP_ON_START', 'true').lower() == 'true'
+    
+    # Parallel qayta ishlanadigan eski update'lar (jonli trafik uchun joy qoladi)
+    CATCHUP_CONCURRENCY: int = int(os.getenv('CATCHUP_CONCURRENCY', '16'))
+    
+    # Shundan eski (sekund) APK xabarlari uchun guruhga ogohlantirish
+    # yuborilmaydi, xabarlar esa ommaviy o'chiriladi
+    STALE_MESSAGE_AGE: int = int(os.getenv('STALE_MESSAGE_AGE', '120'))
+    
+    # Bot API manzili (o'z Bot API serveringiz yoki test serveri uchun)
+    BOT_API_URL: str = os.getenv('BOT_API_URL', 'https://api.telegram.org/bot')
+    
+    # ==================== SHARDING ====================
+    
+    # Worker jarayonlari soni: 1 - bitta jarayon, >1 - update'lar chat_id
+    # bo'yicha worker'larga taqsimlanadi (STRIKES_STORAGE=sqlite kerak)
+    SHARDS: int = int(os.getenv('SHARDS', '1'))
+    
+    # Har worker'da tugallanmagan update'lar chegarasi (to'lsa front kutadi)
+    SHARD_MAX_PENDING: int = int(os.getenv('SHARD_MAX_PENDING', '1000'))
+    
     # ==================== STRIKE TIZIMI ====================
     
     # Maksimal strike soni (keyin ban)
@@ -33,9 +140,43 @@ class Config:
     # Mute davomiyligi (sekundlarda) - 10 daqiqa
     MUTE_DURATION: int = 600
     
+    # Strike'larning kechirilishi: har shuncha kunda bitta strike o'chadi
+    # (oxirgi strike'dan hisoblanadi; 0 - strike'lar muddatsiz)
+    STRIKE_DECAY_DAYS: float = float(os.getenv('STRIKE_DECAY_DAYS', '30'))
+    
     # Strike ma'lumotlar fayli
     STRIKES_DB_FILE: str = 'strikes.json'
     
+    # Saqlash rejimi
+    # journal - o'zgarishlar append-only log'ga yoziladi, fonda siqiladi
+    # binary - journal, lekin snapshot ixcham binary faylda (strikes.bin)
+    # sqlite - SQLite (WAL) database, yozuvlar xotirada saqlanmaydi
+    # tiered - SQLite + xotirada faqat faol yozuvlarning LRU keshi
+    # json - har o'zgarishda butun fayl qayta yoziladi (eski rejim)
+    STRIKES_STORAGE: str = os.getenv('STRIKES_STORAGE', 'journal').lower()
+    
+    # SQLite rejimi fayli
+    STRIKES_SQLITE_FILE: str = os.getenv('STRIKES_SQLITE_FILE', 'strikes.db')
+    
+    # Binary rejimi snapshot fayli
+    STRIKES_SNAPSHOT_FILE: str = os.getenv('STRIKES_SNAPSHOT_FILE', 'strikes.bin')
+    
+    # Tiered rejimida strike keshi uchun xotira chegarasi (MB)
+    STRIKES_CACHE_MB: float = float(os.getenv('STRIKES_CACHE_MB', '16'))
+    
+    # Journal compaction: shuncha log yozuvidan keyin snapshot yangilanadi
+    JOURNAL_COMPACT_RECORDS: int = int(os.getenv('JOURNAL_COMPACT_RECORDS', '10000'))
+    
+    # Journal compaction tekshiruvi oralig'i (sekundlarda)
+    JOURNAL_COMPACT_INTERVAL: float = float(os.getenv('JOURNAL_COMPACT_INTERVAL', '300'))
+    
+    # Write-behind: o'zgarishlar diskka fonda, guruhlab yoziladi
+    # Maksimal kechikish (sekundlarda)
+    PERSIST_FLUSH_INTERVAL: float = float(os.getenv('PERSIST_FLUSH_INTERVAL', '1.0'))
+    
+    # Shuncha o'zgarish yig'ilganda darhol yoziladi
+    PERSIST_FLUSH_THRESHOLD: int = int(os.getenv('PERSIST_FLUSH_THRESHOLD', '500'))
+    
     # ==================== XABARLAR ====================
     
     # Ogohlantirish xabari (1-strike)
@@ -80,12 +221,77 @@ class Config:
     
     # ==================== APK ANIQLASH ====================
     
-    # APK fayl kengaytmalari
-    APK_EXTENSIONS: tuple = ('.apk', '.xapk', '.apks', '.apkm')
+    # APK fayl kengaytmalari (vergul bilan ajratilgan)
+    APK_EXTENSIONS: tuple = tuple(
+        x.strip() for x in os.getenv('APK_EXTENSIONS', '.apk,.xapk,.apks,.apkm').split(',')
+        if x.strip()
+    )
+    
+    # Fayl nomida qidiriladigan qo'shimcha substring'lar (vergul bilan ajratilgan)
+    APK_PATTERNS: tuple = tuple(
+        x.strip() for x in os.getenv('APK_PATTERNS', '').split(',') if x.strip()
+    )
+    
+    # Qayta yuklanadigan qoidalar fayli (JSON, ixtiyoriy)
+    # {"extensions": [".apk", ...], "patterns": ["...", ...]}
+    DETECTION_RULES_FILE: str = os.getenv('DETECTION_RULES_FILE', '')
+    
+    # Qoidalar fayli o'zgarishini tekshirish oralig'i (sekundlarda)
+    DETECTION_RELOAD_INTERVAL: float = float(os.getenv('DETECTION_RELOAD_INTERVAL', '30'))
+    
+    # ==================== TARKIBNI TEKSHIRISH ====================
+    
+    # Nomi APK bo'lmagan shubhali fayllar tarkibini tekshirish (true/false)
+    CONTENT_SNIFFING: bool = os.getenv('CONTENT_SNIFFING', 'false').lower() == 'true'
+    
+    # Tarkibi tekshiriladigan kengaytmalar (kengaytmasiz fayllar doim tekshiriladi)
+    SNIFF_EXTENSIONS: tuple = tuple(
+        x.strip() for x in os.getenv(
+            'SNIFF_EXTENSIONS', '.zip,.jar,.bin,.dat,.jpg,.jpeg,.png,.pdf,.mp4'
+        ).split(',') if x.strip()
+    )
+    
+    # Bundan katta fayllar tekshirilmaydi (bayt, Bot API chegarasi 20 MB)
+    SNIFF_MAX_FILE_SIZE: int = int(os.getenv('SNIFF_MAX_FILE_SIZE', str(20 * 1024 * 1024)))
+    
+    # Bir vaqtda tekshiriladigan fayllar soni
+    SNIFF_CONCURRENCY: int = int(os.getenv('SNIFF_CONCURRENCY', '4'))
+    
+    # Bitta yuklash so'rovining timeout'i (sekundlarda)
+    SNIFF_TIMEOUT: float = float(os.getenv('SNIFF_TIMEOUT', '10'))
+    
+    # ==================== HUKMLAR KESHI ====================
+    
+    # file_unique_id -> hukm keshi fayli (bo'sh bo'lsa faqat xotirada)
+    VERDICT_CACHE_FILE: str = os.getenv('VERDICT_CACHE_FILE', 'verdicts.json')
+    
+    # Keshdagi maksimal yozuvlar soni
+    VERDICT_CACHE_SIZE: int = int(os.getenv('VERDICT_CACHE_SIZE', '100000'))
+    
+    # Hukmning amal qilish muddati (sekundlarda)
+    VERDICT_CACHE_TTL: float = float(os.getenv('VERDICT_CACHE_TTL', str(7 * 24 * 3600)))
     
     @classmethod
     def validate(cls) -> bool:
         """Konfiguratsiyani tekshirish"""
         if not cls.BOT_TOKEN:
             raise ValueError("BOT_TOKEN .env faylida ko'rsatilmagan!")
+        if cls.UPDATE_MODE not in ('polling', 'webhook'):
+            raise ValueError(f"UPDATE_MODE noto'g'ri: {cls.UPDATE_MODE} (polling yoki webhook)")
+        if cls.UPDATE_MODE == 'webhook' and not cls.WEBHOOK_URL:
+            raise ValueError("Webhook rejimi uchun WEBHOOK_URL ko'rsatilmagan!")
+        if not re.fullmatch(r'[A-Za-z0-9_-]{1,256}', cls.WEBHOOK_SECRET):
+            raise ValueError("WEBHOOK_SECRET 1-256 belgi bo'lishi kerak (A-Z, a-z, 0-9, _ va -)")
+        if cls.SHARDS < 1:
+            raise ValueError(f"SHARDS kamida 1 bo'lishi kerak: {cls.SHARDS}")
+        if cls.SHARDS > 1 and cls.STRIKES_STORAGE != 'sqlite':
+            raise ValueError("Sharding uchun STRIKES_STORAGE=sqlite kerak (umumiy strike holati)")
+        if cls.NOTICE_MAX_PENDING < 1:
+            raise ValueError(f"NOTICE_MAX_PENDING kamida 1 bo'lishi kerak: {cls.NOTICE_MAX_PENDING}")
+        if cls.STRIKES_CACHE_MB <= 0:
+            raise ValueError(f"STRIKES_CACHE_MB musbat bo'lishi kerak: {cls.STRIKES_CACHE_MB}")
+        if cls.STRIKE_DECAY_DAYS < 0:
+            raise ValueError(f"STRIKE_DECAY_DAYS manfiy bo'lmasligi kerak: {cls.STRIKE_DECAY_DAYS}")
+        if not 0 <= cls.METRICS_PORT <= 65535:
+            raise ValueError(f"METRICS_PORT noto'g'ri: {cls.METRICS_PORT}")
         return True
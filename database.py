@@ -3,21 +3,25 @@ Telegram Anti-APK Security Bot - Strike Database
 Foydalanuvchilar qoidabuzarliklarini saqlash va boshqarish
 """
 
-import json
-import os
 import logging
-from typing import Dict, Optional
+import threading
+import time
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
 
+from decay import StrikeDecay
+from storage import StorageBackend, JsonStorage
+
 logger = logging.getLogger(__name__)
 
 
 class StrikeDatabase:
     """
-    Strike tizimini boshqarish uchun JSON asosidagi database.
+    Strike tizimini boshqarish uchun database.
     
     Har bir foydalanuvchi uchun guruh bo'yicha strike saqlanadi.
-    Ma'lumotlar strukturasi:
+    Saqlash StorageBackend'ga topshiriladi (JSON, journal yoki SQLite).
+    Yozuv strukturasi:
     {
         "chat_id_user_id": {
             "strikes": 3,
@@ -26,58 +30,134 @@ class StrikeDatabase:
             "first_name": "John"
         }
     }
+    
+    decay_period berilsa strike'lar vaqt o'tishi bilan kechiriladi
+    (StrikeDecay): `last_strike` kechirish soatiga aylanadi va har
+    kechirilgan strike bilan bir davrga suriladi, strike'i qolmagan
+    yozuv o'chiriladi.
+    
+    Backend dangasa yaratiladi: konstruktor faylni o'qimaydi. Birinchi
+    murojaatda u shu oqimda yuklanadi, start_loading() esa yuklashni
+    fon oqimida boshlaydi - bot shu vaqtda update'larni qabul qila
+    oladi, strike kerak bo'lgan joylar wait_loaded() bilan kutadi.
+    Database'dan umuman foydalanmaydigan jarayon (sharding front'i)
+    faylni hech qachon o'qimaydi.
     """
     
-    def __init__(self, db_file: str = 'strikes.json'):
+    def __init__(
+        self,
+        db_file: str = 'strikes.json',
+        backend: Optional[StorageBackend] = None,
+        decay_period: float = 0.0,
+        loader: Optional[Callable[[], StorageBackend]] = None
+    ):
         """
-        Database yaratish yoki yuklash.
+        Database yaratish (backend berilmagan bo'lsa hali yuklamasdan).
         
         Args:
-            db_file: JSON fayl nomi
+            db_file: JSON fayl nomi (backend va loader berilmaganda ishlatiladi)
+            backend: Tayyor saqlash qatlami (ixtiyoriy)
+            decay_period: Har shuncha sekundda bitta strike kechiriladi
+                (0 - strike'lar muddatsiz)
+            loader: Backend'ni yaratuvchi (va yuklovchi) funksiya
         """
         self.db_file = db_file
-        self.data: Dict[str, dict] = {}
-        self._load()
+        self.decay_period = decay_period
+        self.decay: Optional[StrikeDecay] = None
+        self.load_seconds: Optional[float] = None
+        
+        self._loader = loader or (lambda: JsonStorage(db_file))
+        self._backend: Optional[StorageBackend] = None
+        self._loaded = threading.Event()
+        self._load_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        
+        if backend is not None:
+            self._attach(backend)
+    
+    @property
+    def backend(self) -> StorageBackend:
+        """
+        Saqlash qatlami (yuklanmagan bo'lsa yuklash tugashi kutiladi).
+        
+        Raises:
+            RuntimeError: Yuklash muvaffaqiyatsiz tugagan bo'lsa
+        """
+        backend = self._backend
+        if backend is None:
+            self.wait_loaded()
+            backend = self._backend
+            if backend is None:
+                raise RuntimeError("Strike database yuklanmadi")
+        return backend
+    
+    @property
+    def loaded(self) -> bool:
+        """Yuklash tugaganmi (bloklanmaydi)"""
+        return self._loaded.is_set()
+    
+    def _attach(self, backend: StorageBackend) -> None:
+        """Tayyor backend'ni ulash va decay'ni boshlash"""
+        self._backend = backend
+        if self.decay_period > 0:
+            self.decay = StrikeDecay(backend, self.decay_period)
+            self.decay.start()
+        self._loaded.set()
     
     def _load(self) -> None:
-        """Ma'lumotlarni fayldan yuklash"""
-        if os.path.exists(self.db_file):
+        """Backend'ni yaratish (takroriy chaqiruv hech narsa qilmaydi)"""
+        with self._load_lock:
+            if self._loaded.is_set():
+                return
+            started = time.perf_counter()
             try:
-                with open(self.db_file, 'r', encoding='utf-8') as f:
-                    self.data = json.load(f)
-                logger.info(f"Database yuklandi: {len(self.data)} ta yozuv")
-            except json.JSONDecodeError as e:
-                logger.error(f"Database yuklashda JSON xatosi: {e}")
-                self.data = {}
+                backend = self._loader()
             except Exception as e:
-                logger.error(f"Database yuklashda xato: {e}")
-                self.data = {}
+                logger.error(f"Strike database yuklashda xato: {e}")
+                # Kutayotganlar osilib qolmasin - backend murojaatda xato beradi
+                self._loaded.set()
+                return
+            self.load_seconds = time.perf_counter() - started
+            self._attach(backend)
+        logger.info(f"💾 Strike database tayyor ({self.load_seconds:.2f} s)")
+    
+    def start_loading(self) -> None:
+        """Yuklashni fon oqimida boshlash (takroriy chaqiruv xavfsiz)"""
+        with self._load_lock:
+            if self._loaded.is_set() or self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._load, name='strike-loader', daemon=True)
+            self._thread.start()
+    
+    def wait_loaded(self) -> None:
+        """Yuklash tugashini kutish (boshlanmagan bo'lsa shu oqimda yuklanadi)"""
+        if self._loaded.is_set():
+            return
+        if self._thread is None:
+            self._load()
         else:
-            logger.info("Yangi database yaratildi")
-            self.data = {}
-    
-    def _save(self) -> bool:
-        """Ma'lumotlarni faylga saqlash"""
-        try:
-            with open(self.db_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
-            return True
-        except Exception as e:
-            logger.error(f"Database saqlashda xato: {e}")
-            return False
+            self._loaded.wait()
     
-    def _get_key(self, chat_id: int, user_id: int) -> str:
+    def flush(self) -> None:
         """
-        Foydalanuvchi uchun unique key yaratish.
+        Xotirada yig'ilgan o'zgarishlarni darhol diskka yozish.
         
-        Args:
-            chat_id: Guruh ID
-            user_id: Foydalanuvchi ID
-            
-        Returns:
-            Unique key string
+        Mutatsiyalar diskka fonda (write-behind) yoziladi. Bot to'xtashidan
+        oldin shu metod chaqiriladi, shunda tasdiqlangan strike yo'qolmaydi.
         """
-        return f"{chat_id}_{user_id}"
+        if self._thread is not None:
+            self._loaded.wait()
+        if self._backend is not None:
+            self._backend.flush()
+    
+    def close(self) -> None:
+        """Database'ni yopish (backend oxirgi o'zgarishlarni saqlaydi; yuklanmagan bo'lsa hech narsa)"""
+        if self._thread is not None:
+            self._loaded.wait()
+        if self.decay is not None:
+            self.decay.close()
+        if self._backend is not None:
+            self._backend.close()
     
     def add_strike(
         self,
@@ -94,36 +174,56 @@ class StrikeDatabase:
             user_id: Foydalanuvchi ID
             username: Foydalanuvchi username (ixtiyoriy)
             first_name: Foydalanuvchi ismi (ixtiyoriy)
-            
+        
         Returns:
             Hozirgi strike soni
         """
-        key = self._get_key(chat_id, user_id)
+        now = datetime.now()
+        strikes = self.backend.increment(
+            chat_id,
+            user_id,
+            now.isoformat(),
+            username=username,
+            first_name=first_name
+        )
+        if self.decay is not None:
+            self.decay.schedule(chat_id, user_id, now.timestamp())
         
-        if key not in self.data:
-            self.data[key] = {
-                'strikes': 0,
-                'last_strike': None,
-                'username': username,
-                'first_name': first_name
-            }
+        # Moderatsiya natijasi handle_document'ning yakuniy yozuvida
+        logger.debug(
+            "Strike qo'shildi: %s (guruh: %s, strike: %s)",
+            username or user_id,
+            chat_id,
+            strikes
+        )
         
-        self.data[key]['strikes'] += 1
-        self.data[key]['last_strike'] = datetime.now().isoformat()
+        return strikes
+    
+    def revert_strike(self, chat_id: int, user_id: int) -> int:
+        """
+        Oxirgi berilgan strike'ni qaytarish.
         
-        if username:
-            self.data[key]['username'] = username
-        if first_name:
-            self.data[key]['first_name'] = first_name
+        Xabarni o'chirib bo'lmaganda ishlatiladi: strike o'chirish bilan
+        parallel yoziladi, o'chirish muvaffaqiyatsiz bo'lsa bekor qilinadi.
         
-        self._save()
+        Args:
+            chat_id: Guruh ID
+            user_id: Foydalanuvchi ID
         
+        Returns:
+            Qolgan strike soni
+        """
+        strikes = self.backend.decrement(chat_id, user_id)
+        if not strikes and self.decay is not None:
+            self.decay.cancel(chat_id, user_id)
         logger.info(
-            f"Strike qo'shildi: {username or user_id} "
-            f"(guruh: {chat_id}, strike: {self.data[key]['strikes']})"
+            "Strike qaytarildi: %s (guruh: %s, strike: %s)",
+            user_id,
+            chat_id,
+            strikes,
+            extra={'chat_id': chat_id, 'user_id': user_id, 'action': 'revert', 'strikes': strikes}
         )
-        
-        return self.data[key]['strikes']
+        return strikes
     
     def get_strikes(self, chat_id: int, user_id: int) -> int:
         """
@@ -132,13 +232,13 @@ class StrikeDatabase:
         Args:
             chat_id: Guruh ID
             user_id: Foydalanuvchi ID
-            
+        
         Returns:
             Strike soni (0 agar yozuv bo'lmasa)
         """
-        key = self._get_key(chat_id, user_id)
-        if key in self.data:
-            return self.data[key].get('strikes', 0)
+        info = self.backend.get(chat_id, user_id)
+        if info:
+            return info.get('strikes', 0)
         return 0
     
     def reset_strikes(self, chat_id: int, user_id: int) -> bool:
@@ -148,17 +248,21 @@ class StrikeDatabase:
         Args:
             chat_id: Guruh ID
             user_id: Foydalanuvchi ID
-            
+        
         Returns:
             True agar muvaffaqiyatli, False aks holda
         """
-        key = self._get_key(chat_id, user_id)
-        if key in self.data:
-            del self.data[key]
-            self._save()
-            logger.info(f"Strike'lar tozalandi: {user_id} (guruh: {chat_id})")
-            return True
-        return False
+        if not self.backend.delete(chat_id, user_id):
+            return False
+        if self.decay is not None:
+            self.decay.cancel(chat_id, user_id)
+        logger.info(
+            "Strike'lar tozalandi: %s (guruh: %s)",
+            user_id,
+            chat_id,
+            extra={'chat_id': chat_id, 'user_id': user_id, 'action': 'reset'}
+        )
+        return True
     
     def get_user_info(self, chat_id: int, user_id: int) -> Optional[dict]:
         """
@@ -167,12 +271,11 @@ class StrikeDatabase:
         Args:
             chat_id: Guruh ID
             user_id: Foydalanuvchi ID
-            
+        
         Returns:
             Foydalanuvchi ma'lumotlari yoki None
         """
-        key = self._get_key(chat_id, user_id)
-        return self.data.get(key)
+        return self.backend.get(chat_id, user_id)
     
     def get_all_strikes(self, chat_id: int) -> Dict[int, int]:
         """
@@ -180,51 +283,36 @@ class StrikeDatabase:
         
         Args:
             chat_id: Guruh ID
-            
+        
         Returns:
             {user_id: strike_count} dict
         """
-        result = {}
-        prefix = f"{chat_id}_"
+        return self.backend.chat_strikes(chat_id)
+    
+    def get_chat_offenders(self, chat_id: int) -> List[dict]:
+        """
+        Guruh qoidabuzarlarini bitta o'tishda olish (strike bo'yicha
+        kamayish tartibida).
         
-        for key, value in self.data.items():
-            if key.startswith(prefix):
-                user_id = int(key.replace(prefix, ''))
-                result[user_id] = value.get('strikes', 0)
+        Args:
+            chat_id: Guruh ID
         
-        return result
+        Returns:
+            [{"user_id", "strikes", "username", "first_name"}, ...]
+        """
+        return self.backend.chat_offenders(chat_id)
     
-    def get_statistics(self) -> dict:
+    def get_statistics(self, limit: int = 10) -> dict:
         """
         Umumiy statistika olish.
         
+        Yig'indilar har o'zgarishda yangilanadi va top ro'yxat
+        leaderboard'dan o'qiladi - butun database saralanmaydi.
+        
+        Args:
+            limit: Top qoidabuzarlar soni
+        
         Returns:
             Statistika dict
         """
-        total_users = len(self.data)
-        total_strikes = sum(v.get('strikes', 0) for v in self.data.values())
-        
-        # Eng ko'p strike olganlar
-        top_offenders = sorted(
-            self.data.items(),
-            key=lambda x: x[1].get('strikes', 0),
-            reverse=True
-        )[:10]
-        
-        return {
-            'total_users': total_users,
-            'total_strikes': total_strikes,
-            'top_offenders': [
-                {
-                    'key': k,
-                    'strikes': v.get('strikes', 0),
-                    'username': v.get('username'),
-                    'first_name': v.get('first_name')
-                }
-                for k, v in top_offenders
-            ]
-        }
-
-
-# Singleton instance
-db = StrikeDatabase()
+        return self.backend.statistics(limit=limit)
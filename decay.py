@@ -0,0 +1,207 @@
+"""
+Telegram Anti-APK Security Bot - Strike Decay
+Eski strike'larni vaqt o'tishi bilan kechirish (min-heap rejalashtiruvchi)
+"""
+
+import heapq
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from storage import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+# (chat_id, user_id)
+DecayKey = Tuple[int, int]
+
+
+class StrikeDecay:
+    """
+    Strike'larni har `period` sekundda bittadan kechiruvchi fon oqimi.
+    
+    Har yozuv uchun keyingi kechirish vaqti min-heap'da saqlanadi: oqim
+    faqat vaqti kelgan yozuvlarni oladi, butun database skan qilinmaydi.
+    Yangi strike yozuv vaqtini keyinga suradi - eski heap elementi
+    o'chirilmaydi, `_due`dagi joriy vaqtga mos kelmasa o'tkazib yuboriladi
+    (eskirgan elementlar ko'payib ketsa heap qayta quriladi).
+    
+    Haqiqiy holat backend'da (`last_strike` - kechirish soati): heap
+    faqat qachon tekshirishni biladi, shuning uchun u qayta ishga
+    tushganda yozuvlardan qayta quriladi va bir nechta jarayon bitta
+    SQLite faylini ishlatsa ham strike ikki marta kechirilmaydi.
+    """
+    
+    def __init__(
+        self,
+        backend: StorageBackend,
+        period: float,
+        batch: int = 500,
+        max_wait: float = 60.0,
+        name: str = 'strike-decay'
+    ):
+        """
+        Rejalashtiruvchi yaratish (ishga tushirmasdan).
+        
+        Args:
+            backend: Strike storage
+            period: Bitta strike'ning umri (sekund)
+            batch: Bitta uyg'onishda ko'riladigan maksimal yozuvlar
+            max_wait: Uyg'onishlar orasidagi maksimal vaqt (sekund)
+            name: Oqim nomi
+        """
+        self.backend = backend
+        self.period = period
+        self.batch = batch
+        self.max_wait = max_wait
+        
+        self._heap: List[Tuple[float, int, int]] = []
+        self._due: Dict[DecayKey, float] = {}
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        
+        self.loaded = 0
+        self.forgiven = 0
+        self.expired = 0
+    
+    def start(self) -> None:
+        """Fon oqimini ishga tushirish (mavjud yozuvlar oqim ichida yuklanadi)"""
+        self._thread.start()
+    
+    def schedule(self, chat_id: int, user_id: int, clock: float) -> None:
+        """
+        Yozuvning kechirish soatini belgilash (strike qo'shilganda).
+        
+        Args:
+            chat_id: Guruh ID
+            user_id: Foydalanuvchi ID
+            clock: Oxirgi strike vaqti, epoch (NaN - hozir tekshirish)
+        """
+        due = time.time() if math.isnan(clock) else clock + self.period
+        with self._cond:
+            self._push((chat_id, user_id), due)
+            if self._heap[0][0] == due:
+                self._cond.notify()
+    
+    def cancel(self, chat_id: int, user_id: int) -> None:
+        """Yozuv o'chirilganda rejadan chiqarish (heap elementi eskiradi)"""
+        with self._cond:
+            self._due.pop((chat_id, user_id), None)
+    
+    def _push(self, key: DecayKey, due: float) -> None:
+        """Heap'ga qo'shish (lock ostida)"""
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, key[0], key[1]))
+        if len(self._heap) > 2 * len(self._due) + 1024:
+            self._heap = [(due, chat_id, user_id) for (chat_id, user_id), due in self._due.items()]
+            heapq.heapify(self._heap)
+    
+    def _load(self) -> None:
+        """Backend'dagi barcha yozuvlarni heap'ga qo'shish"""
+        entries = []
+        for chat_id, user_id, clock in self.backend.decay_clocks():
+            due = 0.0 if math.isnan(clock) else clock + self.period
+            entries.append(((chat_id, user_id), due))
+        
+        with self._cond:
+            for key, due in entries:
+                # Yuklash paytida kelgan yangi strike'lar ustun
+                if key not in self._due:
+                    self._due[key] = due
+                    self._heap.append((due, key[0], key[1]))
+            heapq.heapify(self._heap)
+            self._cond.notify()
+        self.loaded = len(entries)
+        logger.info(f"⏳ Strike decay: {self.loaded} ta yozuv rejalashtirildi")
+    
+    def _take_due(self, now: float) -> List[DecayKey]:
+        """Vaqti kelgan yozuvlarni heap'dan olish (lock ostida)"""
+        keys = []
+        while self._heap and self._heap[0][0] <= now and len(keys) < self.batch:
+            due, chat_id, user_id = heapq.heappop(self._heap)
+            key = (chat_id, user_id)
+            if self._due.get(key) != due:
+                continue
+            del self._due[key]
+            keys.append(key)
+        return keys
+    
+    def run_due(self, now: float) -> int:
+        """
+        Vaqti kelgan yozuvlarni kechirish.
+        
+        Args:
+            now: Hozirgi vaqt (epoch)
+        
+        Returns:
+            Ko'rilgan yozuvlar soni
+        """
+        with self._cond:
+            keys = self._take_due(now)
+        
+        for chat_id, user_id in keys:
+            try:
+                forgiven, next_due = self.backend.decay(chat_id, user_id, self.period, now)
+            except Exception as e:
+                logger.error(f"Strike decay xatosi ({chat_id}, {user_id}): {e}")
+                next_due = now + self.max_wait
+                forgiven = 0
+            
+            self.forgiven += forgiven
+            if next_due is None:
+                # Yozuv muddati tugab o'chirildi (yoki uni admin tozalagan)
+                if forgiven:
+                    self.expired += 1
+                continue
+            with self._cond:
+                # Oraliqda schedule() yangi vaqt qo'ygan bo'lsa o'sha qoladi
+                self._push((chat_id, user_id), max(next_due, self._due.get((chat_id, user_id), 0.0)))
+        return len(keys)
+    
+    def _run(self) -> None:
+        """Fon oqimining asosiy sikli"""
+        try:
+            self._load()
+        except Exception as e:
+            logger.error(f"Strike decay yuklashda xato: {e}")
+        
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                now = time.time()
+                wait = self.max_wait
+                if self._heap:
+                    wait = min(wait, self._heap[0][0] - now)
+                if wait > 0:
+                    self._cond.wait(timeout=wait)
+                    continue
+            self.run_due(time.time())
+    
+    def close(self) -> None:
+        """Oqimni to'xtatish"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread.is_alive():
+            self._thread.join()
+    
+    def stats(self) -> dict:
+        """
+        Rejalashtiruvchi statistikasi.
+        
+        Returns:
+            {"scheduled", "heap", "forgiven", "expired", "next_in"}
+        """
+        with self._cond:
+            next_in = self._heap[0][0] - time.time() if self._heap else None
+            return {
+                'scheduled': len(self._due),
+                'heap': len(self._heap),
+                'forgiven': self.forgiven,
+                'expired': self.expired,
+                'next_in': next_in
+            }
@@ -0,0 +1,344 @@
+"""
+Telegram Anti-APK Security Bot - APK aniqlash
+Fayl nomlarini bitta kompilyatsiya qilingan regex bilan tekshirish
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Matn yo'nalishini teskari qiluvchi belgilar (RLO, RLE, RLI)
+BIDI_REVERSE = frozenset('\u202e\u202b\u2067')
+
+# Yo'nalish bloklarini yopuvchi belgilar (PDF, PDI)
+BIDI_CLOSE = frozenset('\u202c\u2069')
+
+# NFKC ham o'zgartirmaydigan nuqtaga o'xshash belgilar
+DOT_HOMOGLYPHS = {
+    '\u00b7': '.',  # middle dot
+    '\u0701': '.',  # syriac supralinear full stop
+    '\u0702': '.',  # syriac sublinear full stop
+    '\u06d4': '.',  # arabic full stop
+    '\u2027': '.',  # hyphenation point
+    '\u2e31': '.',  # word separator middle dot
+    '\u3002': '.',  # ideographic full stop
+    '\ua60e': '.',  # vai full stop
+    '\ua4f8': '.',  # lisu letter tone mya ti
+}
+
+# Lotin harflariga o'xshash kirill/yunon harflari (casefold'dan keyin)
+LETTER_HOMOGLYPHS = {
+    '\u0430': 'a',  # kirill а
+    '\u03b1': 'a',  # yunon α
+    '\u0440': 'p',  # kirill р
+    '\u03c1': 'p',  # yunon ρ
+    '\u043a': 'k',  # kirill к
+    '\u03ba': 'k',  # yunon κ
+    '\u0445': 'x',  # kirill х
+    '\u03c7': 'x',  # yunon χ
+    '\u0455': 's',  # kirill ѕ
+    '\u043c': 'm',  # kirill м
+}
+
+# Ko'rinmas format belgilari (Unicode "Cf"): soft hyphen, zero-width,
+# bidi boshqaruv belgilari, BOM va h.k.
+INVISIBLE_RANGES = (
+    (0x00AD, 0x00AD), (0x061C, 0x061C), (0x180E, 0x180E),
+    (0x200B, 0x200F), (0x202A, 0x202E), (0x2060, 0x2064),
+    (0x2066, 0x206F), (0xFEFF, 0xFEFF), (0xFFF9, 0xFFFB),
+)
+
+INVISIBLE_RE = re.compile('[' + ''.join(
+    f"\\u{start:04x}-\\u{end:04x}" for start, end in INVISIBLE_RANGES
+) + ']')
+
+# Lotin belgisi -> unga o'xshash belgilar (regex sinfiga kengaytiriladi)
+CONFUSABLES: Dict[str, str] = {}
+for _glyph, _latin in {**DOT_HOMOGLYPHS, **LETTER_HOMOGLYPHS}.items():
+    CONFUSABLES[_latin] = CONFUSABLES.get(_latin, _latin) + _glyph
+
+
+class DetectionRules(NamedTuple):
+    """Kompilyatsiya qilingan aniqlash qoidalari"""
+    
+    extensions: Tuple[str, ...]
+    patterns: Tuple[str, ...]
+    regex: Pattern
+    unicode_regex: Pattern
+
+
+def compile_rules(
+    extensions: Iterable[str],
+    patterns: Iterable[str] = ()
+) -> DetectionRules:
+    """
+    Kengaytmalar va qo'shimcha pattern'larni regex'ga kompilyatsiya qilish.
+    
+    Kengaytmalar nom ichida istalgan joyda qidiriladi (masalan:
+    game.apk.zip), shuning uchun ular oddiy substring sifatida qo'shiladi.
+    Ikki xil regex quriladi: ASCII nomlar uchun oddiy, qolganlari uchun
+    har bir belgi o'xshash belgilar sinfiga kengaytirilgani.
+    
+    Args:
+        extensions: Kengaytmalar ('.apk', ...)
+        patterns: Qo'shimcha substring'lar
+    
+    Returns:
+        DetectionRules
+    
+    Raises:
+        ValueError: Hech qanday qoida berilmasa
+    """
+    extensions = tuple(dict.fromkeys(e.strip().casefold() for e in extensions if e.strip()))
+    patterns = tuple(dict.fromkeys(p.strip().casefold() for p in patterns if p.strip()))
+    
+    needles = set(extensions + patterns)
+    if not needles:
+        raise ValueError("APK aniqlash qoidalari bo'sh")
+    
+    return DetectionRules(
+        extensions,
+        patterns,
+        re.compile(_trie_pattern(needles, re.escape)),
+        re.compile(_trie_pattern(needles, _confusable_class))
+    )
+
+
+def _confusable_class(ch: str) -> str:
+    """Belgi va unga o'xshash belgilar uchun regex bo'lagi"""
+    glyphs = CONFUSABLES.get(ch)
+    if glyphs is None:
+        return re.escape(ch)
+    return '[' + ''.join(re.escape(g) for g in glyphs) + ']'
+
+
+def _trie_pattern(needles: Iterable[str], atom: Callable[[str], str]) -> str:
+    """
+    Substring'lar ro'yxatidan umumiy prefikslari birlashtirilgan regex.
+    
+    ('.apk', '.apks', '.xapk') -> '\\.(?:apks?|xapk)'. Umumiy literal
+    prefiks regex dvigateliga tez qidiruv imkonini beradi, alternativlar
+    esa har pozitsiyada bir martadan ortiq tekshirilmaydi.
+    
+    Args:
+        needles: Substring'lar
+        atom: Bitta belgini regex bo'lagiga aylantiruvchi funksiya
+    
+    Returns:
+        Regex matni
+    """
+    trie: dict = {}
+    for needle in needles:
+        node = trie
+        for ch in needle:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+    
+    def build(node: dict) -> str:
+        optional = '' in node
+        branches = [atom(ch) + build(node[ch]) for ch in sorted(k for k in node if k)]
+        if not branches:
+            return ''
+        if len(branches) == 1:
+            group = branches[0]
+            if not optional:
+                return group
+            if len(group) > 1:
+                group = '(?:' + group + ')'
+        elif all(len(branch) == 1 for branch in branches):
+            group = '[' + ''.join(branches) + ']'
+        else:
+            group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if optional else group
+    
+    return build(trie)
+
+
+def normalize(file_name: str) -> str:
+    """
+    Fayl nomini Unicode hiylalaridan tozalash.
+    
+    NFKC (to'liq kenglikdagi belgilar, kichik nuqta va h.k.), casefold va
+    ko'rinmas format belgilarini (zero-width, bidi) olib tashlash.
+    Nuqta/harf homoglyph'lari regex darajasida tekshiriladi.
+    
+    Args:
+        file_name: Asl fayl nomi
+    
+    Returns:
+        Normallashtirilgan nom
+    """
+    text = unicodedata.normalize('NFKC', file_name).casefold()
+    if INVISIBLE_RE.search(text) is not None:
+        text = INVISIBLE_RE.sub('', text)
+    return text
+
+
+def visual_order(file_name: str) -> str:
+    """
+    RLO/RLE/RLI bilan teskari ko'rsatiladigan qismlarni aylantirish.
+    
+    "photo\\u202ekpa.jpg" foydalanuvchiga "photogpj.apk" bo'lib
+    ko'rinadi - tekshiruv shu ko'rinishda ham o'tkaziladi.
+    
+    Args:
+        file_name: Asl fayl nomi
+    
+    Returns:
+        Ekranda ko'rinadigan tartibdagi nom
+    """
+    parts = []
+    reversed_part = None
+    for ch in file_name:
+        if ch in BIDI_REVERSE:
+            if reversed_part is not None:
+                parts.append(''.join(reversed(reversed_part)))
+            reversed_part = []
+        elif ch in BIDI_CLOSE and reversed_part is not None:
+            parts.append(''.join(reversed(reversed_part)))
+            reversed_part = None
+        elif reversed_part is not None:
+            reversed_part.append(ch)
+        else:
+            parts.append(ch)
+    if reversed_part is not None:
+        parts.append(''.join(reversed(reversed_part)))
+    return ''.join(parts)
+
+
+class ApkDetector:
+    """
+    Fayl nomlari uchun APK aniqlagich.
+    
+    Qoidalar ishga tushishda bitta regex'ga kompilyatsiya qilinadi. ASCII
+    nomlar (deyarli hammasi) faqat lower() + bitta regex qidiruvidan
+    o'tadi; boshqa nomlar avval normallashtiriladi.
+    
+    Qoidalar fayli ko'rsatilgan bo'lsa, u o'zgarganda qoidalar qayta
+    kompilyatsiya qilinadi (restart kerak emas). Yangi qoidalar bitta
+    atribut almashtirish bilan o'rnatiladi, shuning uchun match() lock
+    ishlatmaydi.
+    """
+    
+    def __init__(
+        self,
+        extensions: Iterable[str],
+        patterns: Iterable[str] = (),
+        rules_file: Optional[str] = None,
+        reload_interval: float = 30.0
+    ):
+        """
+        Aniqlagich yaratish.
+        
+        Args:
+            extensions: Standart kengaytmalar
+            patterns: Standart qo'shimcha substring'lar
+            rules_file: JSON qoidalar fayli ({"extensions": [...], "patterns": [...]})
+            reload_interval: Qoidalar fayli o'zgarishini tekshirish oralig'i (sekund)
+        """
+        self.default_rules = compile_rules(extensions, patterns)
+        self.rules = self.default_rules
+        self.rules_file = rules_file
+        self.reload_interval = reload_interval
+        
+        self._reload_lock = threading.Lock()
+        self._rules_mtime: Optional[float] = None
+        self._next_check = 0.0
+        
+        if rules_file:
+            self.reload()
+    
+    def match(self, file_name: str) -> bool:
+        """
+        Fayl APK ekanligini tekshirish.
+        
+        Args:
+            file_name: Fayl nomi
+        
+        Returns:
+            True agar APK, False aks holda
+        """
+        if not file_name:
+            return False
+        
+        if self.rules_file and time.monotonic() >= self._next_check:
+            self.check_reload()
+        
+        regex = self.rules.regex
+        if file_name.isascii():
+            return regex.search(file_name.lower()) is not None
+        
+        regex = self.rules.unicode_regex
+        if regex.search(normalize(file_name)) is not None:
+            return True
+        
+        if not BIDI_REVERSE.isdisjoint(file_name):
+            return regex.search(normalize(visual_order(file_name))) is not None
+        return False
+    
+    def check_reload(self) -> bool:
+        """
+        Qoidalar fayli o'zgargan bo'lsa qayta yuklash.
+        
+        Returns:
+            True agar qoidalar yangilangan bo'lsa
+        """
+        self._next_check = time.monotonic() + self.reload_interval
+        try:
+            mtime = os.stat(self.rules_file).st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self._rules_mtime:
+            return False
+        return self.reload()
+    
+    def reload(self) -> bool:
+        """
+        Qoidalarni fayldan qayta yuklash.
+        
+        Fayl bo'lmasa standart qoidalar ishlatiladi; fayl buzilgan bo'lsa
+        oldingi qoidalar saqlanib qoladi.
+        
+        Returns:
+            True agar muvaffaqiyatli, False aks holda
+        """
+        with self._reload_lock:
+            self._next_check = time.monotonic() + self.reload_interval
+            if not self.rules_file:
+                return False
+            
+            try:
+                mtime = os.stat(self.rules_file).st_mtime
+            except OSError:
+                if self._rules_mtime is not None:
+                    logger.info("Aniqlash qoidalari fayli yo'q - standart qoidalar ishlatiladi")
+                self._rules_mtime = None
+                self.rules = self.default_rules
+                return True
+            
+            try:
+                with open(self.rules_file, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+                rules = compile_rules(
+                    config.get('extensions', self.default_rules.extensions),
+                    config.get('patterns', ())
+                )
+            except (OSError, json.JSONDecodeError, AttributeError, TypeError, ValueError) as e:
+                logger.error(f"Aniqlash qoidalarini yuklashda xato: {e}")
+                self._rules_mtime = mtime
+                return False
+            
+            self._rules_mtime = mtime
+            self.rules = rules
+            logger.info(
+                f"Aniqlash qoidalari yuklandi: {len(rules.extensions)} ta kengaytma, "
+                f"{len(rules.patterns)} ta pattern"
+            )
+            return True
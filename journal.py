@@ -0,0 +1,329 @@
+"""
+Telegram Anti-APK Security Bot - Strike Journal
+Strike o'zgarishlarini append-only log sifatida saqlash
+"""
+
+import json
+import os
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StrikeJournal:
+    """
+    Snapshot + append-only log asosidagi saqlash qatlami.
+    
+    Har bir o'zgarish log faylga bitta ixcham JSON qator sifatida
+    yoziladi. Yozuvlar yozuvning to'liq holatini saqlaydi (increment
+    emas), shuning uchun qayta o'qish (replay) idempotent:
+    
+        {"k":"-100123_42","s":2,"t":"2024-01-15T10:30:00","u":"user","f":"John"}
+        {"k":"-100123_42","d":1}
+    
+    Yozuvlar avval xotiradagi buferga tushadi va flush() chaqirilganda
+    (odatda write-behind oqimidan) faylga yoziladi.
+    
+    Fon oqimi vaqti-vaqti bilan log'ni snapshot'ga (oddiy strikes.json)
+    siqadi. Eski strikes.json fayllari shunchaki birinchi snapshot
+    sifatida o'qiladi. `write_snapshot` berilsa snapshot boshqa formatda
+    (masalan binary, snapshot.py) yoziladi - u holda holatni egasi o'zi
+    o'qiydi va journal'dan faqat read_log() qoldig'ini oladi.
+    """
+    
+    def __init__(
+        self,
+        snapshot_file: str,
+        compact_records: int = 10000,
+        compact_interval: float = 300.0,
+        lock: Optional[threading.RLock] = None,
+        write_snapshot: Optional[Callable[[str, Any], None]] = None
+    ):
+        """
+        Journal yaratish.
+        
+        Args:
+            snapshot_file: Snapshot (JSON) fayl nomi
+            compact_records: Shuncha yozuvdan keyin compaction boshlanadi
+            compact_interval: Compaction tekshiruvi oralig'i (sekund)
+            lock: Ma'lumot egasining lock'i. Compaction nusxa olish va
+                yozish bilan bir xil lock ostida ishlashi kerak, aks holda
+                lock tartibi buziladi
+            write_snapshot: (fayl, holat) ni yozuvchi funksiya (None - JSON)
+        """
+        self.snapshot_file = snapshot_file
+        self.log_file = f"{snapshot_file}.journal"
+        self.rotated_file = f"{self.log_file}.1"
+        self.compact_records = compact_records
+        self.compact_interval = compact_interval
+        
+        self._lock = lock or threading.RLock()
+        self._log = None
+        self._buffer: List[str] = []
+        self._pending = 0
+        self._write_snapshot = write_snapshot
+        self._snapshot_source: Optional[Callable[[], Callable[[], Any]]] = None
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    # ==================== YUKLASH ====================
+    
+    def read_state(self) -> Dict[str, dict]:
+        """
+        Snapshot va log qoldig'idan to'liq holatni o'qish (faqat o'qish).
+        
+        Returns:
+            {"chat_id_user_id": record} dict
+        """
+        data: Dict[str, dict] = {}
+        
+        if os.path.exists(self.snapshot_file):
+            try:
+                with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                logger.error(f"Snapshot yuklashda xato: {e}")
+                data = {}
+        
+        replayed = 0
+        for path in (self.rotated_file, self.log_file):
+            replayed += self._replay(path, data)
+        
+        self._pending = replayed
+        return data
+    
+    def load(self) -> Dict[str, dict]:
+        """
+        Holatni tiklash va log faylini yozish uchun ochish.
+        
+        Returns:
+            {"chat_id_user_id": record} dict
+        """
+        data = self.read_state()
+        self.open_log()
+        
+        logger.info(
+            f"Journal yuklandi: {len(data)} ta yozuv "
+            f"({self._pending} ta log yozuvi qayta o'qildi)"
+        )
+        return data
+    
+    def read_log(self) -> Dict[str, Optional[dict]]:
+        """
+        Faqat log qoldig'idagi o'zgarishlar (snapshot o'qilmaydi).
+        
+        Returns:
+            {"chat_id_user_id": record yoki None (o'chirilgan)} - yozish tartibida
+        """
+        changes: Dict[str, Optional[dict]] = {}
+        replayed = 0
+        for path in (self.rotated_file, self.log_file):
+            replayed += self._replay(path, changes, keep_deletes=True)
+        
+        self._pending = replayed
+        return changes
+    
+    def open_log(self) -> None:
+        """Log faylini yozish uchun ochish (holat o'qilgandan keyin)"""
+        self._log = open(self.log_file, 'a', encoding='utf-8')
+    
+    def _replay(self, path: str, data: Dict[str, Optional[dict]], keep_deletes: bool = False) -> int:
+        """Log faylidagi yozuvlarni data'ga qo'llash (keep_deletes - o'chirish None bo'lib qoladi)"""
+        if not os.path.exists(path):
+            return 0
+        
+        count = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    key = entry['k']
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    # Crash paytida chala yozilgan oxirgi qator
+                    logger.warning(f"Journal qatori o'tkazildi: {path}:{line_no}")
+                    continue
+                
+                if entry.get('d'):
+                    if keep_deletes:
+                        data[key] = None
+                    else:
+                        data.pop(key, None)
+                else:
+                    data[key] = {
+                        'strikes': entry.get('s', 0),
+                        'last_strike': entry.get('t'),
+                        'username': entry.get('u'),
+                        'first_name': entry.get('f')
+                    }
+                count += 1
+        return count
+    
+    # ==================== YOZISH ====================
+    
+    def append_set(self, key: str, record: dict) -> None:
+        """
+        Yozuvning yangi holatini log'ga qo'shish.
+        
+        Args:
+            key: "chat_id_user_id" kaliti
+            record: Yozuvning to'liq holati
+        """
+        self._append({
+            'k': key,
+            's': record.get('strikes', 0),
+            't': record.get('last_strike'),
+            'u': record.get('username'),
+            'f': record.get('first_name')
+        })
+    
+    def append_delete(self, key: str) -> None:
+        """
+        Yozuv o'chirilganini log'ga qo'shish.
+        
+        Args:
+            key: "chat_id_user_id" kaliti
+        """
+        self._append({'k': key, 'd': 1})
+    
+    def _append(self, entry: dict) -> None:
+        """Bitta ixcham qatorni log buferiga qo'shish"""
+        line = json.dumps(entry, separators=(',', ':'), ensure_ascii=False)
+        with self._lock:
+            self._buffer.append(line)
+            self._pending += 1
+            pending = self._pending
+        
+        if pending >= self.compact_records:
+            self._wakeup.set()
+    
+    def flush(self) -> int:
+        """
+        Buferdagi qatorlarni log fayliga yozish.
+        
+        Returns:
+            Yozilgan qatorlar soni
+        """
+        with self._lock:
+            if not self._buffer or self._log is None:
+                return 0
+            lines, self._buffer = self._buffer, []
+            try:
+                self._log.write('\n'.join(lines) + '\n')
+                self._log.flush()
+            except Exception as e:
+                logger.error(f"Journal yozishda xato: {e}")
+                # Keyingi flush'da qayta urinamiz
+                self._buffer = lines + self._buffer
+                return 0
+        return len(lines)
+    
+    # ==================== COMPACTION ====================
+    
+    def start(
+        self,
+        snapshot_source: Callable[[], Callable[[], Any]]
+    ) -> None:
+        """
+        Fon compaction oqimini ishga tushirish.
+        
+        Args:
+            snapshot_source: Journal lock'i ostida chaqiriladi va holatning
+                izchil nusxasini oladi. U qaytargan funksiya esa lock'dan
+                tashqarida JSON dict (yoki write_snapshot uchun holat) quradi
+        """
+        self._snapshot_source = snapshot_source
+        self._thread = threading.Thread(
+            target=self._run,
+            name='strike-journal-compactor',
+            daemon=True
+        )
+        self._thread.start()
+    
+    def _run(self) -> None:
+        """Compaction oqimining asosiy sikli"""
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.compact_interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            if self._pending:
+                self.compact()
+    
+    def compact(self) -> bool:
+        """
+        Log'ni snapshot'ga siqish.
+        
+        Holat nusxasi va log aylantirish bitta lock ostida bajariladi,
+        serializatsiya va JSON yozish esa lock'dan tashqarida.
+        
+        Returns:
+            True agar muvaffaqiyatli, False aks holda
+        """
+        if self._snapshot_source is None:
+            return False
+        
+        with self._lock:
+            materialize = self._snapshot_source()
+            self.flush()
+            try:
+                self._log.close()
+                self._rotate()
+            except OSError as e:
+                logger.error(f"Journal aylantirishda xato: {e}")
+                self._log = open(self.log_file, 'a', encoding='utf-8')
+                return False
+            self._log = open(self.log_file, 'a', encoding='utf-8')
+            self._pending = 0
+        
+        data = materialize()
+        tmp_file = f"{self.snapshot_file}.tmp"
+        try:
+            if self._write_snapshot is not None:
+                self._write_snapshot(tmp_file, data)
+            else:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_file, self.snapshot_file)
+            os.remove(self.rotated_file)
+        except (OSError, ValueError) as e:
+            # Aylantirilgan log saqlanib qoladi va keyingi yuklashda o'qiladi
+            logger.error(f"Snapshot yozishda xato: {e}")
+            return False
+        
+        logger.info(f"Journal siqildi: {len(data)} ta yozuv")
+        return True
+    
+    def _rotate(self) -> None:
+        """Joriy log'ni aylantirilgan faylga o'tkazish"""
+        if not os.path.exists(self.rotated_file):
+            os.replace(self.log_file, self.rotated_file)
+            return
+        
+        # Oldingi compaction tugallanmagan - yozuvlarni yo'qotmaslik uchun qo'shamiz
+        with open(self.log_file, 'r', encoding='utf-8') as src, \
+                open(self.rotated_file, 'a', encoding='utf-8') as dst:
+            dst.write(src.read())
+        os.remove(self.log_file)
+    
+    def close(self) -> None:
+        """Fon oqimini to'xtatish va oxirgi compaction'ni bajarish"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        if self._log is not None and self._pending:
+            self.compact()
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
@@ -0,0 +1,128 @@
+"""
+Telegram Anti-APK Security Bot - Logging
+Log yozuvlarini navbat orqali fon oqimida yozish, rotatsiya va JSON format
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime
+from typing import List
+
+# Yozuvga `extra` orqali qo'shiladigan tuzilgan maydonlar
+STRUCTURED_FIELDS = ('chat_id', 'user_id', 'action', 'latency_ms', 'strikes', 'file_name')
+
+TEXT_FORMAT = '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Har yozuvni bitta JSON qatoriga aylantirish.
+    
+    Asosiy maydonlar (ts, level, logger, message) va yozuvda bo'lsa
+    STRUCTURED_FIELDS - log'larni jq yoki log tizimi bilan filtrlash
+    uchun matnni tahlil qilish shart emas.
+    """
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Yozuvni formatlamasdan navbatga qo'yuvchi handler.
+    
+    Standart QueueHandler xabarni (msg % args) chaqiruvchi oqimda
+    formatlaydi. Navbat shu jarayon ichida bo'lgani uchun yozuv o'zicha
+    uzatiladi - formatlash ham, disk ham fon oqimida.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def stop_logging(listener: logging.handlers.QueueListener) -> None:
+    """Navbatdagi yozuvlarni yozib tugatish va fon oqimini to'xtatish (takroriy chaqiruv xavfsiz)"""
+    if listener._thread is not None:
+        listener.stop()
+
+
+def setup_logging(
+    level: str = 'INFO',
+    log_file: str = 'bot.log',
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    rotate_when: str = '',
+    json_lines: bool = False
+) -> logging.handlers.QueueListener:
+    """
+    Root logger'ni navbat + fon oqimi bilan sozlash.
+    
+    Event loop faqat yozuvni navbatga qo'yadi; konsol va fayl
+    handler'lari QueueListener oqimida ishlaydi. Jarayon tugaganda
+    navbatdagi yozuvlar atexit orqali yozib tugatiladi.
+    
+    Args:
+        level: Log darajasi (DEBUG, INFO, ...)
+        log_file: Log fayli (bo'sh - faqat konsol)
+        max_bytes: Fayl shu hajmga yetganda rotatsiya (0 - cheksiz)
+        backup_count: Saqlanadigan eski fayllar soni
+        rotate_when: Vaqt bo'yicha rotatsiya ("midnight", "H", ...;
+            bo'sh - hajm bo'yicha)
+        json_lines: Faylga JSON qatorlar yozish (konsol matnligicha qoladi)
+    
+    Returns:
+        Ishga tushgan QueueListener
+    """
+    text = logging.Formatter(TEXT_FORMAT)
+    
+    # Konsol stderr'ga: shard worker'larining stdout'i front bilan aloqa uchun
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(text)
+    handlers: List[logging.Handler] = [console]
+    
+    if log_file:
+        if rotate_when:
+            file_handler: logging.Handler = logging.handlers.TimedRotatingFileHandler(
+                log_file,
+                when=rotate_when,
+                backupCount=backup_count,
+                encoding='utf-8'
+            )
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=max_bytes,
+                backupCount=backup_count,
+                encoding='utf-8'
+            )
+        file_handler.setFormatter(JsonFormatter() if json_lines else text)
+        handlers.append(file_handler)
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(getattr(logging, level.upper(), logging.INFO))
+    
+    listener.start()
+    atexit.register(stop_logging, listener)
+    return listener
@@ -0,0 +1,350 @@
+"""
+Telegram Anti-APK Security Bot - Metrics
+Moderatsiya bosqichlari, Bot API so'rovlari va event loop uchun
+Prometheus text formatidagi metrikalar
+"""
+
+import asyncio
+import bisect
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Sekundlarda: 1 ms .. 30 s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[str, ...]
+GaugeValue = Union[float, Dict[Labels, float]]
+
+
+def escape_label(value: str) -> str:
+    """Label qiymatini Prometheus qoidasi bo'yicha ekranlash"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names: Sequence[str], values: Labels, extra: str = '') -> str:
+    """{name="value",...} qismi (`extra` - tayyor qo'shimcha label, masalan le)"""
+    parts = ['%s="%s"' % (name, escape_label(value)) for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class Counter:
+    """Faqat o'suvchi hisoblagich (label'lar bo'yicha)"""
+    
+    kind = 'counter'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+    
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Hisoblagichni oshirish (label qiymatlari labelnames tartibida)"""
+        self._values[labels] = self._values.get(labels, 0) + amount
+    
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+    
+    def samples(self) -> Iterator[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{format_labels(self.labelnames, labels)} {value:g}"
+
+
+class Histogram:
+    """
+    Kechikishlar taqsimoti (label'lar bo'yicha).
+    
+    observe() - bitta bisect va uchta qo'shish: ishlab chiqarishda
+    doimiy yoqiq turishi mumkin. Bucket'lar kumulyativ emas saqlanadi,
+    yig'indi faqat render paytida hisoblanadi.
+    """
+    
+    kind = 'histogram'
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket'lar bo'yicha soni..., +Inf soni]
+        self._counts: Dict[Labels, List[int]] = {}
+        self._sums: Dict[Labels, float] = {}
+    
+    def observe(self, value: float, *labels: str) -> None:
+        """Bitta qiymatni (sekund) qo'shish"""
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            self._sums[labels] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+    
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Blok (await'lar bilan birga) davomiyligini o'lchash"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+    
+    def count(self, *labels: str) -> int:
+        return sum(self._counts.get(labels, ()))
+    
+    def samples(self) -> Iterator[str]:
+        bounds = ['le="%g"' % bound for bound in self.buckets] + ['le="+Inf"']
+        for labels, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                yield f"{self.name}_bucket{format_labels(self.labelnames, labels, bound)} {cumulative}"
+            yield f"{self.name}_sum{format_labels(self.labelnames, labels)} {self._sums[labels]:.6f}"
+            yield f"{self.name}_count{format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Gauge:
+    """
+    Joriy qiymat: o'rnatiladi yoki render paytida funksiyadan olinadi.
+    
+    Funksiya son yoki {labels: qiymat} qaytaradi - navbat chuqurligi
+    kabi qiymatlar hot path'da yangilanmaydi.
+    """
+    
+    kind = 'gauge'
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Optional[Callable[[], GaugeValue]] = None
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self._values: Dict[Labels, float] = {}
+    
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+    
+    def samples(self) -> Iterator[str]:
+        values = self._values
+        if self.collect is not None:
+            try:
+                collected = self.collect()
+            except Exception as e:
+                logger.debug(f"{self.name} gauge'ini olishda xato: {e}")
+                return
+            values = collected if isinstance(collected, dict) else {(): collected}
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{format_labels(self.labelnames, labels)} {value:g}"
+
+
+Metric = Union[Counter, Histogram, Gauge]
+
+
+class MetricsRegistry:
+    """Ro'yxatdan o'tgan metrikalar va ularning Prometheus text ko'rinishi"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+    
+    def register(self, metric: Metric) -> Metric:
+        """
+        Metrikani qo'shish (bir xil nom qayta berilsa eskisi almashtiriladi).
+        
+        Returns:
+            Qo'shilgan metrika
+        """
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+    
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Optional[Callable[[], GaugeValue]] = None
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, collect))
+    
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+# ==================== BOT METRIKALARI ====================
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    'apkban_stage_seconds',
+    "Moderatsiya bosqichlari davomiyligi (detect, checks, strike, delete, warning, mute, ban, total)",
+    ('stage',)
+)
+API_SECONDS = registry.histogram(
+    'apkban_api_request_seconds',
+    "Bot API so'rovlari davomiyligi (rate limiter navbatisiz)",
+    ('method',)
+)
+API_WAIT_SECONDS = registry.histogram(
+    'apkban_api_wait_seconds',
+    "So'rovlarning rate limiter navbatida kutishi",
+    ('priority',)
+)
+API_ERRORS = registry.counter(
+    'apkban_api_errors_total',
+    "Bot API xatolari (metod va xato turi bo'yicha)",
+    ('method', 'error')
+)
+EVENTS = registry.counter(
+    'apkban_moderation_events_total',
+    "Moderatsiya hodisalari (detected, deleted, delete_failed, bulk_deleted, exempt, warning, mute, ban)",
+    ('event',)
+)
+LOOP_LAG_SECONDS = registry.histogram(
+    'apkban_event_loop_lag_seconds',
+    "Event loop kechikishi (rejalashtirilgan uyg'onishdan keyingi ortiqcha vaqt)",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+FLUSH_SECONDS = registry.histogram(
+    'apkban_persist_flush_seconds',
+    "Diskka yozish (write-behind flush) davomiyligi",
+    ('writer',)
+)
+
+
+async def timed_api_call(method: str, callback: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+    """
+    Bot API so'rovini bajarish va davomiyligi/xatosini yozish.
+    
+    Args:
+        method: Bot API metodi (masalan "deleteMessage")
+        callback: So'rovni bajaruvchi coroutine funksiya
+    
+    Returns:
+        callback natijasi
+    """
+    started = time.perf_counter()
+    try:
+        return await callback(*args, **kwargs)
+    except Exception as e:
+        API_ERRORS.inc(method, type(e).__name__)
+        raise
+    finally:
+        API_SECONDS.observe(time.perf_counter() - started, method)
+
+
+async def monitor_loop_lag(interval: float = 0.5) -> None:
+    """
+    Event loop kechikishini davriy o'lchash.
+    
+    `interval` sekundlik uyqu qancha kech tugagani - shu vaqt ichida
+    loop boshqa vazifalar (yoki bloklovchi kod) bilan band bo'lgan.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - started - interval))
+
+
+# ==================== HTTP ====================
+
+
+class MetricsServer:
+    """
+    /metrics so'rovlariga javob beruvchi minimal HTTP server.
+    
+    Har so'rovdan keyin ulanish yopiladi (Prometheus scrape uchun yetarli).
+    Tashqariga ochilmasligi kerak - standart manzil 127.0.0.1.
+    """
+    
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        listen: str = '127.0.0.1',
+        port: int = 9100,
+        path: str = '/metrics'
+    ):
+        """
+        Server yaratish.
+        
+        Args:
+            registry: Chiqariladigan metrikalar
+            listen: Tinglanadigan manzil
+            port: Port (0 - tasodifiy bo'sh port)
+            path: Metrikalar yo'li
+        """
+        self.registry = registry
+        self.listen = listen
+        self.port = port
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.scrapes = 0
+    
+    async def start(self) -> None:
+        """Tinglashni boshlash (port=0 bo'lsa haqiqiy port self.port'ga yoziladi)"""
+        self._server = await asyncio.start_server(self._serve, self.listen, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"📈 Metrikalar: http://{self.listen}:{self.port}{self.path}")
+    
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+    
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readline(), 10)
+            while (await asyncio.wait_for(reader.readline(), 10)) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == self.path:
+                self.scrapes += 1
+                status, body = '200 OK', self.registry.render().encode()
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            else:
+                status, body, content_type = '404 Not Found', b'not found\n', 'text/plain'
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode('ascii') + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError, UnicodeDecodeError):
+            pass
+        finally:
+            writer.close()
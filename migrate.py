@@ -0,0 +1,46 @@
+"""
+Telegram Anti-APK Security Bot - Migratsiya vositasi
+strikes.json (va journal) ma'lumotlarini SQLite database'ga yoki
+binary snapshot'ga (.bin) ko'chirish
+
+Foydalanish:
+    python migrate.py [strikes.json] [strikes.db]
+    python migrate.py strikes.json strikes.bin
+"""
+
+import logging
+import os
+import sys
+
+from storage import migrate_json_to_snapshot, migrate_json_to_sqlite
+
+
+def main() -> int:
+    """
+    Migratsiyani ishga tushirish.
+    
+    Returns:
+        Chiqish kodi
+    """
+    logging.basicConfig(
+        format='%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
+        level=logging.INFO
+    )
+    
+    json_file = sys.argv[1] if len(sys.argv) > 1 else 'strikes.json'
+    target_file = sys.argv[2] if len(sys.argv) > 2 else 'strikes.db'
+    
+    if not os.path.exists(json_file):
+        print(f"❌ Fayl topilmadi: {json_file}")
+        return 1
+    
+    if target_file.endswith('.bin'):
+        count = migrate_json_to_snapshot(json_file, target_file)
+    else:
+        count = migrate_json_to_sqlite(json_file, target_file)
+    print(f"✅ {count} ta yozuv ko'chirildi: {json_file} -> {target_file}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Telegram Anti-APK Security Bot - Notices
+Guruhga ogohlantirish va jazo xabarlarini moderatsiyadan ajratib yuborish
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from telegram.error import TelegramError
+
+logger = logging.getLogger(__name__)
+
+
+class NoticeSender:
+    """
+    Guruh xabarlarini fon vazifalarida yuborish.
+    
+    Guruh bucket'i (~20 xabar/daqiqa) raid paytida tez to'ladi. Xabar
+    handler ichida kutilsa, har handler update processor slotini shu
+    kutishda ushlab turadi va yangi APK'lar o'chirilmay qoladi. Shuning
+    uchun xabar alohida vazifada yuboriladi, handler esa darhol tugaydi.
+    
+    Guruhda `max_pending` ta xabar kutib turgan bo'lsa yangisi tashlanadi:
+    bir necha daqiqa kechikkan ogohlantirish foydasiz, navbat esa
+    cheksiz o'smaydi.
+    """
+    
+    def __init__(self, max_pending: int = 3):
+        """
+        Sender yaratish.
+        
+        Args:
+            max_pending: Bitta guruhda yuborilishini kutayotgan xabarlar chegarasi
+        """
+        self.max_pending = max_pending
+        
+        self._pending: Dict[int, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+    
+    def send(
+        self,
+        chat_id: int,
+        send: Callable[[], Awaitable[Any]],
+        name: str,
+        fields: Optional[dict] = None
+    ) -> bool:
+        """
+        Xabarni fonda yuborish.
+        
+        Args:
+            chat_id: Guruh ID
+            send: Xabarni yuboruvchi coroutine funksiya
+            name: Log uchun nomi ("Ogohlantirish", "Mute", "Ban")
+            fields: Log qatorining qo'shimcha maydonlari
+        
+        Returns:
+            True agar xabar navbatga qo'yildi, False agar tashlandi
+        """
+        pending = self._pending.get(chat_id, 0)
+        if pending >= self.max_pending:
+            self.dropped += 1
+            logger.debug("%s xabari tashlandi, guruh navbati to'la (guruh: %s)", name, chat_id, extra=fields)
+            return False
+        
+        self._pending[chat_id] = pending + 1
+        task = asyncio.create_task(self._send(chat_id, send, name, fields))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+    
+    async def _send(
+        self,
+        chat_id: int,
+        send: Callable[[], Awaitable[Any]],
+        name: str,
+        fields: Optional[dict]
+    ) -> None:
+        """Bitta xabarni yuborish (xato faqat log qilinadi)"""
+        try:
+            await send()
+            self.sent += 1
+        except TelegramError as e:
+            self.failed += 1
+            logger.error("%s xabarini yuborishda xato: %s", name, e, extra=fields)
+        finally:
+            remaining = self._pending[chat_id] - 1
+            if remaining:
+                self._pending[chat_id] = remaining
+            else:
+                del self._pending[chat_id]
+    
+    async def close(self) -> None:
+        """Yuborilmagan xabarlarni bekor qilish"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+    
+    def stats(self) -> dict:
+        """
+        Xabarlar statistikasi.
+        
+        Returns:
+            {"sent", "dropped", "failed", "pending"}
+        """
+        return {
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'pending': len(self._tasks)
+        }
@@ -0,0 +1,210 @@
+"""
+Telegram Anti-APK Security Bot - Update Prefilter
+Keraksiz update'larni handler'larga yetib bormasdan oldin arzon tekshiruv
+bilan tashlab yuborish
+"""
+
+import asyncio
+import logging
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from telegram import Update
+from telegram.ext import (
+    Application,
+    ChatMemberHandler,
+    CommandHandler,
+    MessageHandler
+)
+
+logger = logging.getLogger(__name__)
+
+GROUP_CHAT_TYPES = ('group', 'supergroup')
+
+
+def allowed_update_types(application: Application) -> List[str]:
+    """
+    Ro'yxatdan o'tgan handler'lar qabul qiladigan update turlari.
+    
+    Message/Command handler'lar faqat yangi xabarlar bilan ishlaydi
+    (update.message), tahrirlangan xabarlar so'ralmaydi. Noma'lum handler
+    turi bo'lsa ehtiyot uchun barcha turlar qaytariladi.
+    
+    Args:
+        application: Handler'lari qo'shilgan Application
+    
+    Returns:
+        getUpdates/setWebhook uchun allowed_updates ro'yxati
+    """
+    types = set()
+    for handlers in application.handlers.values():
+        for handler in handlers:
+            if isinstance(handler, (MessageHandler, CommandHandler)):
+                types.add(Update.MESSAGE)
+            elif isinstance(handler, ChatMemberHandler):
+                if handler.chat_member_types != ChatMemberHandler.MY_CHAT_MEMBER:
+                    types.add(Update.CHAT_MEMBER)
+                if handler.chat_member_types != ChatMemberHandler.CHAT_MEMBER:
+                    types.add(Update.MY_CHAT_MEMBER)
+            else:
+                return list(Update.ALL_TYPES)
+    return sorted(types)
+
+
+class UpdatePrefilter:
+    """
+    Dispatch'dan oldingi arzon filtr.
+    
+    Guruhdagi hujjat nomi kompilyatsiya qilingan qoidalarga mos kelmasa,
+    uning hukmi keshda "toza" bo'lsa yoki tarkibini tekshirish kerak
+    bo'lmasa, update hech qaysi coroutine yaratilmasdan tashlab
+    yuboriladi. Boshqa update'lar uchun ro'yxatdan o'tgan handler'larning
+    check_update() tekshiruvi ishlatiladi - hech biri qabul qilmasa
+    update ham tashlanadi.
+    
+    Polling rejimida PrefilterQueue orqali, webhook rejimida esa
+    JSON'ni PTB obyektlariga aylantirishdan oldin (check_raw) ishlaydi.
+    """
+    
+    def __init__(
+        self,
+        is_apk_name: Callable[[str], bool],
+        sniffer: Optional[Any] = None,
+        verdicts: Optional[Any] = None
+    ):
+        """
+        Filtr yaratish.
+        
+        Args:
+            is_apk_name: Fayl nomi tekshiruvi (ApkDetector.match)
+            sniffer: ApkSniffer (None - tarkib tekshirilmaydi)
+            verdicts: VerdictCache (None - keshsiz)
+        """
+        self.is_apk_name = is_apk_name
+        self.sniffer = sniffer
+        self.verdicts = verdicts
+        self.application: Optional[Application] = None
+        
+        self.received = 0
+        self.passed = 0
+        self.rejected: Dict[str, int] = {'clean_document': 0, 'no_handler': 0}
+    
+    def bind(self, application: Application) -> None:
+        """Handler'lari tekshiriladigan Application'ni ulash"""
+        self.application = application
+    
+    # ==================== TEKSHIRUVLAR ====================
+    
+    def check(self, update: object) -> bool:
+        """
+        PTB update'ini tekshirish.
+        
+        Returns:
+            True agar update dispatch qilinishi kerak
+        """
+        self.received += 1
+        if not isinstance(update, Update):
+            self.passed += 1
+            return True
+        
+        message = update.message
+        if (
+            message is not None
+            and message.document is not None
+            and message.chat.type in GROUP_CHAT_TYPES
+            and not self._is_candidate(message.document)
+        ):
+            self.rejected['clean_document'] += 1
+            return False
+        return self.has_handler(update)
+    
+    def check_raw(self, data: dict) -> bool:
+        """
+        Webhook JSON'ini Update'ga aylantirishdan oldin tekshirish.
+        
+        Faqat hujjat qoidasi qo'llanadi; o'tgan update keyin
+        has_handler() bilan tekshiriladi.
+        
+        Returns:
+            False agar update toza hujjat va tashlab yuborilishi kerak
+        """
+        self.received += 1
+        message = data.get('message')
+        if not isinstance(message, dict):
+            return True
+        
+        document = message.get('document')
+        chat = message.get('chat') or {}
+        if not isinstance(document, dict) or chat.get('type') not in GROUP_CHAT_TYPES:
+            return True
+        
+        candidate = self._is_candidate(SimpleNamespace(
+            file_name=document.get('file_name'),
+            file_unique_id=document.get('file_unique_id'),
+            file_size=document.get('file_size'),
+            mime_type=document.get('mime_type')
+        ))
+        if not candidate:
+            self.rejected['clean_document'] += 1
+        return candidate
+    
+    def has_handler(self, update: object) -> bool:
+        """
+        Biror handler update'ni qabul qilishini tekshirish.
+        
+        Returns:
+            True agar update'ni qabul qiladigan handler bor
+        """
+        if self.application is not None and not any(
+            handler.check_update(update)
+            for handlers in self.application.handlers.values()
+            for handler in handlers
+        ):
+            self.rejected['no_handler'] += 1
+            return False
+        self.passed += 1
+        return True
+    
+    def _is_candidate(self, document: Any) -> bool:
+        """Hujjat APK bo'lishi mumkinmi (handler'dagi detect_apk'ning arzon qismi)"""
+        if self.is_apk_name(document.file_name or ''):
+            return True
+        
+        if self.verdicts is not None and document.file_unique_id:
+            verdict = self.verdicts.peek(document)
+            if verdict is not None:
+                return verdict
+        
+        return self.sniffer is not None and self.sniffer.should_inspect(document)
+    
+    # ==================== STATISTIKA ====================
+    
+    def stats(self) -> dict:
+        """
+        Filtr statistikasi.
+        
+        Returns:
+            {"received", "passed", "rejected": {sabab: soni}}
+        """
+        return {
+            'received': self.received,
+            'passed': self.passed,
+            'rejected': dict(self.rejected)
+        }
+
+
+class PrefilterQueue(asyncio.Queue):
+    """
+    Application.update_queue o'rniga: filtrdan o'tmagan update'lar
+    navbatga umuman qo'yilmaydi, demak ular uchun task ham yaratilmaydi.
+    """
+    
+    def __init__(self, prefilter: UpdatePrefilter, maxsize: int = 0):
+        super().__init__(maxsize)
+        self.prefilter = prefilter
+    
+    def put_nowait(self, item: Any) -> None:
+        # Application'ning to'xtatish signali kabi boshqa obyektlar o'tadi
+        if isinstance(item, Update) and not self.prefilter.check(item):
+            return
+        super().put_nowait(item)
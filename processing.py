@@ -0,0 +1,169 @@
+"""
+Telegram Anti-APK Security Bot - Update Processing
+Update'larni parallel, lekin har (chat, user) uchun ketma-ket qayta ishlash
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Dict, Hashable, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+
+def update_key(update: object) -> Optional[Hashable]:
+    """
+    Update'ning ketma-ketlik kaliti.
+    
+    Args:
+        update: Telegram update (yoki boshqa obyekt)
+    
+    Returns:
+        (chat_id, user_id), faqat chat yoki user bo'lsa shu ID,
+        aks holda None (cheklovsiz)
+    """
+    if not isinstance(update, Update):
+        return None
+    
+    chat = update.effective_chat
+    user = update.effective_user
+    if chat is not None and user is not None:
+        return (chat.id, user.id)
+    if chat is not None:
+        return ('chat', chat.id)
+    if user is not None:
+        return ('user', user.id)
+    return None
+
+
+class KeyedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Kalit bo'yicha tartiblangan parallel update processor.
+    
+    Turli (chat_id, user_id) kalitli update'lar parallel bajariladi.
+    Bir xil kalitlilar esa kelgan tartibida birin-ketin bajariladi -
+    bitta foydalanuvchining ikki APK'si ikkalasi ham 1-strike'ni o'qib
+    eskalatsiyani o'tkazib yubora olmaydi, mute esa ban'dan oldin
+    bajariladi.
+    
+    Har kalit uchun asyncio.Lock faqat kalit band bo'lganda mavjud
+    bo'ladi; asyncio.Lock kutayotganlarni FIFO tartibida uyg'otadi.
+    
+    PTB'ning process_update() semaforini kalit lock'idan oldin oladi, shuning
+    uchun unga katta chegara (ADMISSION_LIMIT) beriladi. Haqiqiy parallellik
+    chegarasi - ichki semafor, u kalit lock'i olingandan keyin olinadi:
+    bitta foydalanuvchining navbatdagi update'lari slot egallamaydi va
+    boshqa guruhlar moderatsiyasini to'xtatib qo'ymaydi.
+    """
+    
+    ADMISSION_LIMIT = 2 ** 20
+    
+    def __init__(self, max_concurrent_updates: int):
+        """
+        Processor yaratish.
+        
+        Args:
+            max_concurrent_updates: Bir vaqtda bajariladigan update'lar soni
+        
+        Raises:
+            ValueError: max_concurrent_updates musbat bo'lmasa
+        """
+        if max_concurrent_updates < 1:
+            raise ValueError("max_concurrent_updates musbat bo'lishi kerak")
+        # Bazaviy __init__ semaforni max_concurrent_updates'dan quradi
+        self._limit = self.ADMISSION_LIMIT
+        super().__init__(self.ADMISSION_LIMIT)
+        self._limit = max_concurrent_updates
+        self._slots = asyncio.Semaphore(max_concurrent_updates)
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        self._users: Dict[Hashable, int] = {}
+        self._admitted = 0
+        self._running = 0
+        
+        self.processed = 0
+        self.serialized = 0
+    
+    @property
+    def max_concurrent_updates(self) -> int:
+        """Bir vaqtda bajariladigan update'lar chegarasi"""
+        return self._limit
+    
+    @property
+    def current_concurrent_updates(self) -> int:
+        """Qabul qilingan, hali tugamagan update'lar (kalit yoki slot kutayotganlar ham)"""
+        return self._admitted
+    
+    async def _run(self, coroutine: Awaitable[Any]) -> None:
+        """Coroutine'ni parallellik sloti ostida bajarish"""
+        async with self._slots:
+            self._running += 1
+            try:
+                await coroutine
+            finally:
+                self._running -= 1
+    
+    async def do_process_update(
+        self,
+        update: object,
+        coroutine: Awaitable[Any]
+    ) -> None:
+        """
+        Update'ni kalit lock'i ostida bajarish.
+        
+        Args:
+            update: Telegram update
+            coroutine: Update'ni qayta ishlovchi coroutine
+        """
+        key = update_key(update)
+        self._admitted += 1
+        if key is None:
+            try:
+                await self._run(coroutine)
+            finally:
+                self._admitted -= 1
+                self.processed += 1
+            return
+        
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        elif lock.locked():
+            self.serialized += 1
+        self._users[key] = self._users.get(key, 0) + 1
+        
+        try:
+            async with lock:
+                await self._run(coroutine)
+        finally:
+            self._admitted -= 1
+            self.processed += 1
+            remaining = self._users[key] - 1
+            if remaining:
+                self._users[key] = remaining
+            else:
+                del self._users[key]
+                del self._locks[key]
+    
+    async def initialize(self) -> None:
+        """Resurslar kerak emas"""
+    
+    async def shutdown(self) -> None:
+        """Resurslar kerak emas"""
+    
+    def stats(self) -> dict:
+        """
+        Processor statistikasi.
+        
+        Returns:
+            {"processed", "serialized", "active_keys", "in_flight", "waiting", "max_concurrent"}
+        """
+        return {
+            'processed': self.processed,
+            'serialized': self.serialized,
+            'active_keys': len(self._locks),
+            'in_flight': self._running,
+            'waiting': self._admitted - self._running,
+            'max_concurrent': self.max_concurrent_updates
+        }
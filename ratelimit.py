@@ -0,0 +1,352 @@
+"""
+Telegram Anti-APK Security Bot - Rate Limiting
+Chiquvchi Bot API so'rovlarini ustuvorlik, token bucket va RetryAfter
+qayta urinishlari bilan rejalashtirish
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from datetime import timedelta
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple, Union
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from metrics import API_WAIT_SECONDS, timed_api_call
+
+logger = logging.getLogger(__name__)
+
+# ==================== USTUVORLIKLAR ====================
+
+# Kichik qiymat - yuqori ustuvorlik
+ENFORCE = 0     # APK o'chirish, ban, mute
+LOOKUP = 1      # Huquq/admin tekshiruvi
+NOTICE = 2      # Ogohlantirishlar, buyruq javoblari va boshqalar
+BACKLOG = 3     # Qayta ishga tushgandan keyingi eski update'lar (catch-up)
+
+PRIORITY_NAMES = {ENFORCE: 'enforce', LOOKUP: 'lookup', NOTICE: 'notice', BACKLOG: 'backlog'}
+
+# Joriy vazifadagi barcha so'rovlar uchun ustuvorlik (masalan, catch-up
+# vazifasi BACKLOG o'rnatadi - jonli trafik undan oldin o'tadi)
+request_priority: ContextVar[Optional[int]] = ContextVar('request_priority', default=None)
+
+ENDPOINT_PRIORITY: Dict[str, int] = {
+    'deleteMessage': ENFORCE,
+    'deleteMessages': ENFORCE,
+    'banChatMember': ENFORCE,
+    'restrictChatMember': ENFORCE,
+    'getChatMember': LOOKUP,
+    'getChatAdministrators': LOOKUP,
+    'getChat': LOOKUP
+}
+
+
+def retry_after_seconds(exc: RetryAfter) -> float:
+    """
+    RetryAfter kutish vaqtini sekundda olish.
+    
+    PTB 22.2+ da retry_after int yoki timedelta bo'lishi mumkin
+    (PTB_TIMEDELTA), shuning uchun ikkalasi ham qabul qilinadi.
+    """
+    value = getattr(exc, '_retry_after', None)
+    if value is None:
+        value = exc.retry_after
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+def is_group_chat(chat_id: Any) -> bool:
+    """Guruh/kanal chat_id'si (manfiy son yoki @username)"""
+    if isinstance(chat_id, str):
+        try:
+            chat_id = int(chat_id)
+        except ValueError:
+            return True
+    return isinstance(chat_id, int) and chat_id < 0
+
+
+# ==================== TOKEN BUCKET ====================
+
+
+class TokenBucket:
+    """
+    Oddiy token bucket: `rate` token/sekund, maksimal `capacity` token.
+    
+    RetryAfter javobidan keyin bucket `pause()` bilan to'xtatiladi.
+    """
+    
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated', 'paused_until')
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+    
+    def wait_time(self, now: float) -> float:
+        """
+        Keyingi token uchun kutish vaqti.
+        
+        Returns:
+            0 agar token hozir bor, aks holda sekundlar
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.paused_until > now:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+    
+    def take(self) -> None:
+        """Bitta tokenni olish (wait_time() 0 qaytargandan keyin)"""
+        self.tokens -= 1
+    
+    def pause(self, until: float) -> None:
+        """Bucket'ni `until` (monotonic) vaqtigacha to'xtatish"""
+        self.paused_until = max(self.paused_until, until)
+        self.tokens = 0.0
+    
+    def idle(self, now: float) -> bool:
+        """Bucket to'la va to'xtatilmagan (o'chirib yuborish mumkin)"""
+        return self.wait_time(now) == 0 and self.tokens >= self.capacity
+
+
+# ==================== RATE LIMITER ====================
+
+
+class PriorityRateLimiter(BaseRateLimiter):
+    """
+    Ustuvorlikli chiquvchi so'rovlar rejalashtiruvchisi.
+    
+    chat_id'li barcha so'rovlar umumiy token bucket'dan (Telegram: ~30
+    so'rov/sekund) ustuvorlik tartibida o'tadi: navbat bo'lsa avval
+    ENFORCE (o'chirish, ban), keyin LOOKUP, eng oxiri NOTICE so'rovlari
+    token oladi - raid paytida ban ogohlantirishlar ortida qolmaydi.
+    Guruhlarga xabar yuborish qo'shimcha ravishda guruh bucket'i bilan
+    cheklanadi (Telegram: guruhga ~20 xabar/daqiqa). chat_id'siz
+    so'rovlar (getUpdates, getMe) cheklanmaydi.
+    
+    RetryAfter javobida so'rov kutib qayta yuboriladi: guruhga xabar
+    bo'lsa faqat shu guruh bucket'i, aks holda umumiy bucket to'xtatiladi.
+    
+    Ustuvorlikni `rate_limit_args` (int) yoki butun vazifa uchun
+    `request_priority` context o'zgaruvchisi bilan berish mumkin.
+    """
+    
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        global_burst: float = 5,
+        group_rate: float = 20 / 60,
+        group_burst: float = 1,
+        max_retries: int = 3,
+        max_tracked_chats: int = 10000
+    ):
+        """
+        Rate limiter yaratish.
+        
+        Args:
+            global_rate: Umumiy so'rovlar (so'rov/sekund)
+            global_burst: Umumiy bucket sig'imi - kichik bo'lsa so'rovlar
+                tekis tarqaladi va Telegram oynasidan oshmaydi
+            group_rate: Bitta guruhga xabarlar (xabar/sekund)
+            group_burst: Guruh bucket'i sig'imi (ketma-ket xabarlar)
+            max_retries: RetryAfter'dan keyingi maksimal qayta urinishlar
+            max_tracked_chats: Xotirada saqlanadigan guruh bucket'lari
+        """
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.max_retries = max_retries
+        self.max_tracked_chats = max_tracked_chats
+        
+        self._groups: Dict[Any, TokenBucket] = {}
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._pump: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        
+        self.requests = {priority: 0 for priority in PRIORITY_NAMES}
+        self.queued = {priority: 0 for priority in PRIORITY_NAMES}
+        self.wait_total = {priority: 0.0 for priority in PRIORITY_NAMES}
+        self.wait_max = {priority: 0.0 for priority in PRIORITY_NAMES}
+        self.max_depth = 0
+        self.retries = 0
+        self.failures = 0
+    
+    async def initialize(self) -> None:
+        """Resurslar kerak emas"""
+    
+    async def shutdown(self) -> None:
+        """Navbat pompasini to'xtatish"""
+        if self._pump is not None:
+            self._pump.cancel()
+            self._pump = None
+    
+    # ==================== NAVBAT ====================
+    
+    async def _acquire(self, priority: int) -> None:
+        """Umumiy bucket'dan ustuvorlik tartibida token olish"""
+        if not self._queue and self.global_bucket.wait_time(time.monotonic()) == 0:
+            self.global_bucket.take()
+            return
+        
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._counter), future))
+        self.queued[priority] += 1
+        self.max_depth = max(self.max_depth, len(self._queue))
+        
+        if self._pump is None or self._pump.done():
+            self._wakeup = asyncio.Event()
+            self._pump = asyncio.create_task(self._run_pump())
+        else:
+            self._wakeup.set()
+        await future
+    
+    async def _run_pump(self) -> None:
+        """Navbat bo'shaguncha tokenlarni eng yuqori ustuvorlikka berish"""
+        while self._queue:
+            wait = self.global_bucket.wait_time(time.monotonic())
+            if wait > 0:
+                # Yangi so'rov yoki RetryAfter kutish vaqtini o'zgartirishi mumkin
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                self.global_bucket.take()
+                future.set_result(None)
+    
+    async def _acquire_group(self, chat_id: Any) -> None:
+        """Guruh bucket'idan token olish (faqat xabar yuborish uchun)"""
+        bucket = self._groups.get(chat_id)
+        if bucket is None:
+            if len(self._groups) >= self.max_tracked_chats:
+                now = time.monotonic()
+                for key in [k for k, b in self._groups.items() if b.idle(now)]:
+                    del self._groups[key]
+            bucket = self._groups[chat_id] = TokenBucket(self.group_rate, self.group_burst)
+        
+        while True:
+            wait = bucket.wait_time(time.monotonic())
+            if wait == 0:
+                bucket.take()
+                return
+            await asyncio.sleep(wait)
+    
+    # ==================== SO'ROVLAR ====================
+    
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Union[bool, dict, List[dict]]]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[int]
+    ) -> Union[bool, dict, List[dict]]:
+        """
+        So'rovni navbat orqali yuborish va RetryAfter'da qayta urinish.
+        
+        Args:
+            callback: So'rovni bajaruvchi coroutine funksiya
+            args: callback pozitsion argumentlari
+            kwargs: callback kalit argumentlari
+            endpoint: Bot API metodi (masalan "sendMessage")
+            data: Metod parametrlari
+            rate_limit_args: Ustuvorlik (ixtiyoriy, ENFORCE/LOOKUP/NOTICE/BACKLOG)
+        
+        Returns:
+            callback natijasi
+        
+        Raises:
+            RetryAfter: Qayta urinishlar tugasa
+        """
+        chat_id = data.get('chat_id')
+        if chat_id is None:
+            return await timed_api_call(endpoint, callback, *args, **kwargs)
+        
+        priority = rate_limit_args if rate_limit_args in PRIORITY_NAMES else (
+            request_priority.get()
+        )
+        if priority not in PRIORITY_NAMES:
+            priority = ENDPOINT_PRIORITY.get(endpoint, NOTICE)
+        group = endpoint.startswith('send') and is_group_chat(chat_id)
+        self.requests[priority] += 1
+        
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            if group:
+                await self._acquire_group(chat_id)
+            await self._acquire(priority)
+            
+            waited = time.monotonic() - started
+            self.wait_total[priority] += waited
+            self.wait_max[priority] = max(self.wait_max[priority], waited)
+            API_WAIT_SECONDS.observe(waited, PRIORITY_NAMES[priority])
+            
+            try:
+                return await timed_api_call(endpoint, callback, *args, **kwargs)
+            except RetryAfter as e:
+                if attempt >= self.max_retries:
+                    self.failures += 1
+                    logger.error(
+                        f"{endpoint} {self.max_retries} ta qayta urinishdan keyin ham "
+                        f"flood limit (chat: {chat_id})"
+                    )
+                    raise
+                
+                attempt += 1
+                self.retries += 1
+                delay = retry_after_seconds(e) + 0.1
+                until = time.monotonic() + delay
+                if group:
+                    self._groups[chat_id].pause(until)
+                else:
+                    self.global_bucket.pause(until)
+                    if self._wakeup is not None:
+                        self._wakeup.set()
+                logger.warning(
+                    f"Flood limit: {endpoint} (chat: {chat_id}) "
+                    f"{delay:.1f} sekunddan keyin qayta yuboriladi"
+                )
+    
+    # ==================== STATISTIKA ====================
+    
+    def stats(self) -> dict:
+        """
+        Rate limiter statistikasi.
+        
+        Returns:
+            {"depth", "max_depth", "retries", "failures", "groups",
+             "priorities": {nom: {"requests", "queued", "avg_wait", "max_wait"}}}
+        """
+        return {
+            'depth': len(self._queue),
+            'max_depth': self.max_depth,
+            'retries': self.retries,
+            'failures': self.failures,
+            'groups': len(self._groups),
+            'priorities': {
+                name: {
+                    'requests': self.requests[priority],
+                    'queued': self.queued[priority],
+                    'avg_wait': (
+                        self.wait_total[priority] / self.requests[priority]
+                        if self.requests[priority] else 0.0
+                    ),
+                    'max_wait': self.wait_max[priority]
+                }
+                for priority, name in PRIORITY_NAMES.items()
+            }
+        }
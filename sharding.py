@@ -0,0 +1,545 @@
+"""
+Telegram Anti-APK Security Bot - Sharding
+Update'larni chat_id bo'yicha bir nechta worker jarayonlariga taqsimlash
+
+Front jarayon update'larni qabul qiladi (polling yoki webhook) va har
+birini chat_id'ga qarab doimiy ravishda bitta worker'ga yuboradi. Har
+worker to'liq Application'ni (handler'lar, keshlar, rate limiter)
+Updater'siz ishga tushiradi, strike'lar esa barcha worker'lar uchun
+umumiy SQLite faylida saqlanadi.
+
+Worker'lar bilan aloqa - stdin orqali qatorma-qator JSON (har qator bitta
+update). Worker to'lib qolsa u stdin'ni o'qimay qo'yadi va front'ning
+yozishi kutadi - backpressure alohida protokolsiz ishlaydi.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import httpx
+from telegram.error import TelegramError
+
+from prefilter import UpdatePrefilter
+from webhook import WebhookServer
+
+logger = logging.getLogger(__name__)
+
+# Worker ishga tushgach stdout'ga yoziladigan qator
+READY_LINE = b'ready\n'
+
+# Bitta update qatorining maksimal hajmi (bayt)
+MAX_LINE = 2 * 1024 * 1024
+
+# Update turlari bo'yicha chat obyektiga yo'l
+CHAT_PATHS = (
+    ('message', 'chat'),
+    ('edited_message', 'chat'),
+    ('channel_post', 'chat'),
+    ('edited_channel_post', 'chat'),
+    ('my_chat_member', 'chat'),
+    ('chat_member', 'chat'),
+    ('chat_join_request', 'chat'),
+    ('callback_query', 'message', 'chat')
+)
+
+
+def update_chat_id(data: dict) -> Optional[int]:
+    """
+    Xom update JSON'idan chat_id'ni olish.
+    
+    Args:
+        data: Telegram update (dict)
+    
+    Returns:
+        chat_id yoki None (chat'siz update, masalan inline_query)
+    """
+    for path in CHAT_PATHS:
+        node: Any = data
+        for key in path:
+            node = node.get(key) if isinstance(node, dict) else None
+        if isinstance(node, dict) and isinstance(node.get('id'), int):
+            return node['id']
+    return None
+
+
+def shard_for(chat_id: Optional[int], shards: int) -> int:
+    """
+    chat_id uchun doimiy worker raqami.
+    
+    Bitta guruhning barcha update'lari har doim bitta worker'ga tushadi,
+    shuning uchun guruh keshlari, to'lqinlar va guruh rate limit'i
+    worker'lar orasida bo'linmaydi. Chat'siz update'lar 0-worker'ga.
+    """
+    if chat_id is None:
+        return 0
+    return chat_id % shards
+
+
+def shard_file(path: str, index: int) -> str:
+    """Worker'ning alohida fayli: verdicts.json -> verdicts.2.json"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{index}{ext}"
+
+
+# ==================== WORKER JARAYONI ====================
+
+
+class ShardWorker:
+    """
+    Front tomonidagi bitta worker jarayoni.
+    
+    Worker shu fayl bilan (`--worker`) alohida Python jarayonida
+    ishga tushadi va update'larni stdin'dan o'qiydi.
+    """
+    
+    def __init__(self, index: int, shards: int, env: Optional[Dict[str, str]] = None):
+        """
+        Worker yaratish (ishga tushirmasdan).
+        
+        Args:
+            index: Worker raqami (0 dan)
+            shards: Jami worker'lar
+            env: Qo'shimcha muhit o'zgaruvchilari
+        """
+        self.index = index
+        self.shards = shards
+        self.env = env or {}
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.sent = 0
+    
+    async def start(self) -> None:
+        """Jarayonni ishga tushirish"""
+        env = dict(os.environ)
+        env.update({
+            'SHARDS': str(self.shards),
+            # Kutilayotgan update'larni front yig'adi, worker'lar getUpdates chaqirmaydi
+            'CATCHUP_ON_START': 'false'
+        })
+        # Fayl rotatsiyasi jarayonlar orasida xavfsiz emas - har worker'ga o'z fayli
+        for name, default in (('VERDICT_CACHE_FILE', 'verdicts.json'), ('LOG_FILE', 'bot.log')):
+            path = env.get(name, default)
+            if path:
+                env[name] = shard_file(path, self.index)
+        # Har worker o'z metrikalarini o'z portida beradi
+        metrics_port = int(env.get('METRICS_PORT', '0') or 0)
+        if metrics_port:
+            env['METRICS_PORT'] = str(metrics_port + self.index)
+        env.update(self.env)
+        
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.abspath(__file__),
+            '--worker', str(self.index),
+            '--shards', str(self.shards),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env=env
+        )
+    
+    async def wait_ready(self, timeout: float = 60.0) -> None:
+        """
+        Worker Application'ni ishga tushirganini kutish.
+        
+        Raises:
+            RuntimeError: Worker tayyor bo'lmasdan to'xtasa
+            asyncio.TimeoutError: Vaqt tugasa
+        """
+        line = await asyncio.wait_for(self.process.stdout.readline(), timeout)
+        if line != READY_LINE:
+            raise RuntimeError(f"Shard {self.index} ishga tushmadi (kod: {self.process.returncode})")
+    
+    async def send(self, line: bytes, timeout: Optional[float] = None) -> None:
+        """
+        Update qatorini yuborish.
+        
+        Avval oldingi ma'lumot worker'ga yetishini kutadi, keyin yozadi -
+        kutish vaqti tugasa qator umuman yuborilmaydi.
+        
+        Raises:
+            asyncio.TimeoutError: Worker `timeout` ichida bo'shamasa
+            ConnectionError: Worker to'xtagan bo'lsa
+        """
+        stdin = self.process.stdin
+        await asyncio.wait_for(stdin.drain(), timeout)
+        stdin.write(line)
+        self.sent += 1
+    
+    async def close(self, timeout: float = 30.0) -> None:
+        """stdin'ni yopish (worker navbatni tugatib chiqadi) va kutish"""
+        if self.process is None or self.process.returncode is not None:
+            return
+        try:
+            self.process.stdin.close()
+            await asyncio.wait_for(self.process.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Shard {self.index} {timeout:.0f} sekundda to'xtamadi, o'ldirildi")
+            self.process.kill()
+            await self.process.wait()
+        except ConnectionError:
+            await self.process.wait()
+
+
+class ShardRouter:
+    """Xom update'larni chat_id bo'yicha worker'larga yo'naltirish"""
+    
+    def __init__(self, workers: Sequence[ShardWorker], prefilter: Optional[UpdatePrefilter] = None):
+        """
+        Router yaratish.
+        
+        Args:
+            workers: Ishga tushgan worker'lar (tartibi - worker raqami)
+            prefilter: Toza hujjatlarni yuborishdan oldin tashlovchi filtr
+        """
+        self.workers = list(workers)
+        self.prefilter = prefilter
+        self.routed = [0] * len(self.workers)
+        self.rejected = 0
+    
+    async def route(self, data: dict, timeout: Optional[float] = None) -> bool:
+        """
+        Update'ni o'z worker'iga yuborish.
+        
+        Args:
+            data: Telegram update (dict)
+            timeout: Worker bo'shashini kutish (None - cheksiz)
+        
+        Returns:
+            True agar yuborildi, False agar prefilter tashladi
+        
+        Raises:
+            asyncio.TimeoutError: Worker `timeout` ichida bo'shamasa
+        """
+        if self.prefilter is not None and not self.prefilter.check_raw(data):
+            self.rejected += 1
+            return False
+        
+        index = shard_for(update_chat_id(data), len(self.workers))
+        line = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode() + b'\n'
+        await self.workers[index].send(line, timeout)
+        self.routed[index] += 1
+        return True
+    
+    def stats(self) -> dict:
+        """
+        Router statistikasi.
+        
+        Returns:
+            {"routed": [worker bo'yicha], "rejected"}
+        """
+        return {'routed': list(self.routed), 'rejected': self.rejected}
+
+
+# ==================== FRONT ====================
+
+
+async def api_call(client: httpx.AsyncClient, url: str, method: str, **params: Any) -> Any:
+    """
+    Bot API metodini to'g'ridan-to'g'ri chaqirish (front PTB obyektlarini yaratmaydi).
+    
+    Raises:
+        TelegramError: Bot API xato qaytarsa
+    """
+    response = await client.post(
+        url + method,
+        json={key: value for key, value in params.items() if value is not None}
+    )
+    payload = response.json()
+    if not payload.get('ok'):
+        raise TelegramError(f"{method}: {payload.get('description', response.status_code)}")
+    return payload['result']
+
+
+async def poll_updates(
+    router: ShardRouter,
+    client: httpx.AsyncClient,
+    url: str,
+    allowed_updates: Optional[Sequence[str]] = None,
+    drop_pending_updates: bool = False,
+    poll_timeout: int = 30
+) -> None:
+    """
+    Long polling bilan update'larni olish va worker'larga yo'naltirish.
+    
+    Update'lar PTB obyektlariga aylantirilmaydi - front faqat chat_id'ni
+    o'qiydi. Bekor qilinganda oxirgi olingan update'lar Telegram'da
+    tasdiqlanadi.
+    """
+    await api_call(client, url, 'deleteWebhook', drop_pending_updates=drop_pending_updates)
+    
+    offset = None
+    try:
+        while True:
+            try:
+                updates = await api_call(
+                    client, url, 'getUpdates',
+                    offset=offset,
+                    timeout=poll_timeout,
+                    allowed_updates=list(allowed_updates) if allowed_updates else None
+                )
+            except (httpx.HTTPError, TelegramError, ValueError) as e:
+                logger.error(f"getUpdates xatosi: {e}")
+                await asyncio.sleep(1)
+                continue
+            
+            for data in updates:
+                await router.route(data)
+                offset = data['update_id'] + 1
+    finally:
+        if offset is not None:
+            try:
+                await asyncio.shield(api_call(client, url, 'getUpdates', offset=offset, timeout=0, limit=1))
+            except (httpx.HTTPError, TelegramError, ValueError, asyncio.CancelledError) as e:
+                logger.debug(f"Oxirgi update'larni tasdiqlab bo'lmadi: {e}")
+
+
+class ShardedWebhookServer(WebhookServer):
+    """
+    Webhook front: update'lar dekodlanmasdan worker'larga yo'naltiriladi.
+    
+    Worker `put_timeout` ichida bo'shamasa 503 qaytariladi (Telegram
+    update'ni keyinroq qayta yuboradi).
+    """
+    
+    def __init__(self, router: ShardRouter, **kwargs: Any):
+        super().__init__(None, **kwargs)
+        self.router = router
+    
+    async def _enqueue(self, body: bytes) -> int:
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            logger.warning(f"Webhook: noto'g'ri update: {e}")
+            return 400
+        if not isinstance(data, dict):
+            return 400
+        
+        try:
+            routed = await self.router.route(data, self.put_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Webhook: worker'lar band, 503 qaytarildi")
+            return 503
+        if routed:
+            self.accepted += 1
+        return 200
+
+
+def on_front_done(stop: asyncio.Event, task: asyncio.Task) -> None:
+    """Polling front to'xtasa (masalan, token noto'g'ri) hammasini to'xtatish"""
+    if task.cancelled():
+        return
+    if task.exception() is not None:
+        logger.critical(f"Polling front to'xtadi: {task.exception()}")
+    stop.set()
+
+
+async def run_sharded(
+    shards: int,
+    token: str,
+    api_url: str = 'https://api.telegram.org/bot',
+    mode: str = 'polling',
+    allowed_updates: Optional[Sequence[str]] = None,
+    drop_pending_updates: bool = False,
+    prefilter: Optional[UpdatePrefilter] = None,
+    webhook_url: str = '',
+    listen: str = '127.0.0.1',
+    port: int = 8080,
+    path: str = '/webhook',
+    secret_token: str = '',
+    max_connections: int = 40
+) -> None:
+    """
+    Front va worker'larni ishga tushirish (SIGINT/SIGTERM'gacha).
+    
+    Biror worker kutilmaganda to'xtasa front ham to'xtaydi - jarayon
+    menejeri (Railway) hammasini qayta ishga tushiradi.
+    
+    Args:
+        shards: Worker'lar soni
+        token: Bot token
+        api_url: Bot API manzili
+        mode: "polling" yoki "webhook"
+        allowed_updates: Qabul qilinadigan update turlari
+        drop_pending_updates: Eski update'larni tashlab yuborish
+        prefilter: Front'dagi filtr (toza hujjatlar worker'ga yuborilmaydi)
+        webhook_url: Telegram'ga beriladigan HTTPS URL (webhook rejimi)
+        listen: Tinglanadigan manzil (webhook rejimi)
+        port: Port (webhook rejimi)
+        path: Webhook URL yo'li
+        secret_token: Secret token (webhook rejimida majburiy)
+        max_connections: Telegram'ning parallel ulanishlari
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+    
+    workers = [ShardWorker(index, shards) for index in range(shards)]
+    await asyncio.gather(*(worker.start() for worker in workers))
+    
+    def on_exit(worker: ShardWorker) -> Callable[[asyncio.Task], None]:
+        def callback(_: asyncio.Task) -> None:
+            if not stop.is_set():
+                logger.critical(
+                    f"Shard {worker.index} kutilmaganda to'xtadi "
+                    f"(kod: {worker.process.returncode}), bot to'xtatilmoqda"
+                )
+                stop.set()
+        return callback
+    
+    watchers = []
+    for worker in workers:
+        watcher = asyncio.create_task(worker.process.wait())
+        watcher.add_done_callback(on_exit(worker))
+        watchers.append(watcher)
+    
+    url = f"{api_url}{token}/"
+    front: Optional[asyncio.Task] = None
+    server: Optional[ShardedWebhookServer] = None
+    
+    async with httpx.AsyncClient(timeout=60) as client:
+        try:
+            await asyncio.gather(*(worker.wait_ready() for worker in workers))
+            router = ShardRouter(workers, prefilter)
+            logger.info(f"🧩 {shards} ta shard tayyor")
+            
+            if mode == 'webhook':
+                server = ShardedWebhookServer(
+                    router,
+                    path=path,
+                    secret_token=secret_token,
+                    listen=listen,
+                    port=port
+                )
+                await server.start()
+                await api_call(
+                    client, url, 'setWebhook',
+                    url=webhook_url,
+                    secret_token=secret_token,
+                    max_connections=max_connections,
+                    allowed_updates=list(allowed_updates) if allowed_updates else None,
+                    drop_pending_updates=drop_pending_updates
+                )
+                logger.info(f"Webhook o'rnatildi: {webhook_url}")
+            else:
+                front = asyncio.create_task(poll_updates(
+                    router,
+                    client,
+                    url,
+                    allowed_updates=allowed_updates,
+                    drop_pending_updates=drop_pending_updates
+                ))
+                front.add_done_callback(partial(on_front_done, stop))
+            
+            await stop.wait()
+        finally:
+            stop.set()
+            if front is not None:
+                front.cancel()
+                await asyncio.gather(front, return_exceptions=True)
+            if server is not None:
+                await server.stop()
+            await asyncio.gather(*(worker.close() for worker in workers))
+            for watcher in watchers:
+                watcher.cancel()
+
+
+# ==================== WORKER ====================
+
+
+async def run_worker(index: int, shards: int, max_pending: int) -> None:
+    """
+    Worker: stdin'dagi update'larni Application orqali qayta ishlash.
+    
+    stdin yopilganda (front to'xtadi) qabul qilingan update'lar
+    tugatiladi va Application to'xtatiladi.
+    
+    Args:
+        index: Worker raqami
+        shards: Jami worker'lar
+        max_pending: Tugallanmagan update'lar chegarasi
+    """
+    import bot
+    from telegram import Update
+    
+    application = bot.create_application(updater=False)
+    processor = application.update_processor
+    slots = asyncio.Semaphore(max_pending)
+    tasks = set()
+    
+    def finished(task: asyncio.Task) -> None:
+        tasks.discard(task)
+        slots.release()
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Shard {index} update'ida xato: {task.exception()}")
+    
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    
+    reader = asyncio.StreamReader(limit=MAX_LINE)
+    loop = asyncio.get_running_loop()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    
+    try:
+        await application.start()
+        sys.stdout.buffer.write(READY_LINE)
+        sys.stdout.flush()
+        logger.info(f"🧩 Shard {index + 1}/{shards} tayyor (pid {os.getpid()})")
+        
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                update = Update.de_json(json.loads(line), application.bot)
+            except (ValueError, TypeError, KeyError, AttributeError) as e:
+                logger.warning(f"Shard {index}: noto'g'ri update: {e}")
+                continue
+            if not bot.prefilter.check(update):
+                continue
+            
+            # Joy bo'lmasa stdin o'qilmaydi - front'ning yozishi kutadi
+            await slots.acquire()
+            task = asyncio.create_task(
+                processor.process_update(update, application.process_update(update))
+            )
+            tasks.add(task)
+            task.add_done_callback(finished)
+        
+        if tasks:
+            await asyncio.wait(set(tasks))
+    finally:
+        if application.running:
+            await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Anti-APK bot shard worker'i")
+    parser.add_argument('--worker', type=int, required=True, help="Worker raqami")
+    parser.add_argument('--shards', type=int, required=True, help="Jami worker'lar")
+    args = parser.parse_args()
+    
+    # Terminaldagi Ctrl+C butun guruhga boradi - worker front stdin'ni
+    # yopishini kutadi, navbatdagi update'lar yo'qolmaydi
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    from config import Config
+    asyncio.run(run_worker(args.worker, args.shards, Config.SHARD_MAX_PENDING))
+
+
+if __name__ == '__main__':
+    main()
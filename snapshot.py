@@ -0,0 +1,240 @@
+"""
+Telegram Anti-APK Security Bot - Binary Snapshot
+StrikeIndex'ning ixcham binary snapshot formati
+"""
+
+import math
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from strike_index import ChatBucket, StrikeIndex
+
+MAGIC = b'APKS'
+VERSION = 1
+
+# magic, versiya, guruhlar, yozuvlar, ismlar, siqilgan ismlar jadvali (bayt)
+HEADER = struct.Struct('<4sHIIII')
+
+# Qatorlar ustunlari: (typecode, nomi). Hammasi little-endian, qat'iy kenglikda
+COLUMNS = (
+    ('q', 'user_ids'),
+    ('H', 'strikes'),
+    ('I', 'last_strike'),
+    ('I', 'usernames'),
+    ('I', 'first_names')
+)
+
+
+class SnapshotError(ValueError):
+    """Snapshot fayli buzilgan yoki formati mos emas"""
+
+
+def _to_disk(column: array) -> bytes:
+    """Massiv baytlari little-endian tartibda"""
+    if sys.byteorder == 'big':
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _from_disk(typecode: str, data: memoryview) -> array:
+    """Little-endian baytlardan massiv (nusxa memcpy bilan)"""
+    column = array(typecode)
+    column.frombytes(data)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column
+
+
+def _name_ids(names: List[Optional[str]], table: Dict[str, int]) -> array:
+    """Ismlarni jadval raqamlariga aylantirish (0 - ism yo'q)"""
+    ids = array('I')
+    for name in names:
+        if not name:
+            ids.append(0)
+            continue
+        slot = table.get(name)
+        if slot is None:
+            slot = table[name] = len(table) + 1
+        ids.append(slot)
+    return ids
+
+
+def encode(index: StrikeIndex) -> bytes:
+    """
+    Indeksni binary snapshot'ga aylantirish.
+    
+    Format: sarlavha, guruhlar jadvali (chat_id q, yozuvlar soni I),
+    keyin yozuvlar ustunlari (COLUMNS, guruhlar tartibida) va zlib bilan
+    siqilgan ismlar jadvali ("\\0" bilan ajratilgan UTF-8). Vaqt epoch
+    sekundda saqlanadi (0 - noma'lum), ismlar esa jadvaldagi raqam
+    bilan - takrorlangan ism bir marta yoziladi.
+    
+    Args:
+        index: Strike indeksi (odatda lock ostida olingan nusxa)
+    
+    Returns:
+        Snapshot baytlari
+    
+    Raises:
+        SnapshotError: Strike soni formatga sig'masa (65535 dan katta)
+    """
+    chat_ids = array('q')
+    chat_rows = array('I')
+    columns = {name: array(typecode) for typecode, name in COLUMNS}
+    table: Dict[str, int] = {}
+    
+    for chat_id, bucket in index.chats.items():
+        chat_ids.append(chat_id)
+        chat_rows.append(len(bucket))
+        columns['user_ids'].extend(bucket.user_ids)
+        try:
+            columns['strikes'].extend(array('H', bucket.strikes))
+        except OverflowError:
+            raise SnapshotError(f"Strike soni juda katta (guruh {chat_id})") from None
+        columns['last_strike'].extend(array('I', [
+            0 if math.isnan(value) else max(0, int(value)) for value in bucket.last_strike
+        ]))
+        columns['usernames'].extend(_name_ids(bucket.usernames, table))
+        columns['first_names'].extend(_name_ids(bucket.first_names, table))
+    
+    text = '\0'.join(table)
+    if text.count('\0') != max(len(table) - 1, 0):
+        # Ism ichidagi "\0" ajratuvchini buzadi
+        text = '\0'.join(name.replace('\0', '') for name in table)
+    names = zlib.compress(text.encode('utf-8'))
+    
+    parts = [
+        HEADER.pack(MAGIC, VERSION, len(chat_ids), len(columns['user_ids']), len(table), len(names)),
+        _to_disk(chat_ids),
+        _to_disk(chat_rows)
+    ]
+    parts.extend(_to_disk(columns[name]) for _, name in COLUMNS)
+    parts.append(names)
+    return b''.join(parts)
+
+
+def decode(data: bytes) -> StrikeIndex:
+    """
+    Binary snapshot'dan indeks qurish.
+    
+    Ustunlar fayl baytlaridan to'g'ridan-to'g'ri massivga ko'chiriladi
+    va guruhlar bo'yicha kesiladi - har yozuv uchun dict yaratilmaydi,
+    guruh index/leaderboard'i ham birinchi murojaatgacha qurilmaydi.
+    
+    Args:
+        data: Snapshot baytlari
+    
+    Returns:
+        StrikeIndex
+    
+    Raises:
+        SnapshotError: Fayl buzilgan yoki versiyasi noma'lum
+    """
+    view = memoryview(data)
+    if len(view) < HEADER.size:
+        raise SnapshotError("Snapshot juda qisqa")
+    magic, version, chats, rows, name_count, names_size = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise SnapshotError("Snapshot emas (magic mos emas)")
+    if version != VERSION:
+        raise SnapshotError(f"Noma'lum snapshot versiyasi: {version}")
+    
+    offset = HEADER.size
+    
+    def take(typecode: str, count: int) -> array:
+        nonlocal offset
+        size = array(typecode).itemsize * count
+        if offset + size > len(view):
+            raise SnapshotError("Snapshot kesilgan")
+        column = _from_disk(typecode, view[offset:offset + size])
+        offset += size
+        return column
+    
+    chat_ids = take('q', chats)
+    chat_rows = take('I', chats)
+    if sum(chat_rows) != rows:
+        raise SnapshotError("Guruhlar jadvali yozuvlar soniga mos emas")
+    columns = {name: take(typecode, rows) for typecode, name in COLUMNS}
+    if offset + names_size != len(view):
+        raise SnapshotError("Ismlar jadvali hajmi mos emas")
+    try:
+        text = zlib.decompress(view[offset:]).decode('utf-8')
+    except (zlib.error, UnicodeDecodeError) as e:
+        raise SnapshotError(f"Ismlar jadvali buzilgan: {e}") from None
+    names: List[Optional[str]] = [None]
+    if name_count:
+        names.extend(text.split('\0'))
+    if len(names) != name_count + 1:
+        raise SnapshotError("Ismlar soni mos emas")
+    if max(columns['usernames'], default=0) > name_count or max(columns['first_names'], default=0) > name_count:
+        raise SnapshotError("Ism raqami jadvaldan tashqarida")
+    
+    # Butun ustunlar bir marta xotiradagi turga o'tkaziladi, keyin kesiladi
+    strikes = array('q', columns['strikes'])
+    last_strike = array('d', columns['last_strike'])
+    if 0 in columns['last_strike']:
+        for slot, value in enumerate(columns['last_strike']):
+            if not value:
+                last_strike[slot] = math.nan
+    user_ids = columns['user_ids']
+    usernames = list(map(names.__getitem__, columns['usernames']))
+    first_names = list(map(names.__getitem__, columns['first_names']))
+    
+    buckets: List[Tuple[int, ChatBucket]] = []
+    start = 0
+    for chat_id, count in zip(chat_ids, chat_rows):
+        end = start + count
+        buckets.append((chat_id, ChatBucket.from_columns(
+            user_ids[start:end],
+            strikes[start:end],
+            last_strike[start:end],
+            usernames[start:end],
+            first_names[start:end]
+        )))
+        start = end
+    return StrikeIndex.from_buckets(buckets)
+
+
+def write_snapshot(path: str, index: StrikeIndex) -> None:
+    """
+    Snapshot'ni faylga yozish (fsync bilan, atomik emas).
+    
+    Raises:
+        OSError: Yozishda xato
+        SnapshotError: Indeksni formatga aylantirib bo'lmasa
+    """
+    data = encode(index)
+    with open(path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def save_snapshot(path: str, index: StrikeIndex) -> None:
+    """
+    Snapshot'ni atomik saqlash (vaqtinchalik fayl + os.replace).
+    
+    Raises:
+        OSError: Yozishda xato
+        SnapshotError: Indeksni formatga aylantirib bo'lmasa
+    """
+    tmp_file = f"{path}.tmp"
+    write_snapshot(tmp_file, index)
+    os.replace(tmp_file, path)
+
+
+def read_snapshot(path: str) -> StrikeIndex:
+    """
+    Snapshot faylini o'qish.
+    
+    Raises:
+        OSError: Faylni o'qib bo'lmasa
+        SnapshotError: Fayl buzilgan
+    """
+    with open(path, 'rb') as f:
+        return decode(f.read())
@@ -0,0 +1,423 @@
+"""
+Telegram Anti-APK Security Bot - Content Sniffer
+Nomi o'zgartirilgan APK'larni fayl tarkibidan (ZIP central directory) aniqlash
+"""
+
+import asyncio
+import logging
+import os
+import struct
+from typing import Iterable, Optional, Tuple
+
+import httpx
+from telegram import Bot, Document
+from telegram.error import NetworkError, TelegramError
+
+logger = logging.getLogger(__name__)
+
+# ZIP imzolari
+LOCAL_HEADER_SIG = b'PK\x03\x04'
+EMPTY_ARCHIVE_SIG = b'PK\x05\x06'
+SPANNED_SIG = b'PK\x07\x08'
+CENTRAL_HEADER_SIG = b'PK\x01\x02'
+EOCD_SIG = b'PK\x05\x06'
+
+# End of central directory: 22 bayt + 65535 baytgacha izoh
+EOCD_SIZE = 22
+EOCD_MAX_SEARCH = EOCD_SIZE + 0xFFFF
+
+# Central directory yozuvining qat'iy qismi
+CENTRAL_HEADER_SIZE = 46
+
+# Telegram mijozlari APK uchun qo'yadigan MIME turi
+APK_MIME_TYPE = 'application/vnd.android.package-archive'
+
+# Tarkibi tekshiriladigan MIME turlari
+SNIFF_MIME_TYPES = frozenset({
+    'application/zip',
+    'application/x-zip-compressed',
+    'application/java-archive',
+    'application/octet-stream',
+})
+
+# Arxiv ildizidagi shu yozuvlar APK ekanini bildiradi
+APK_MARKERS = frozenset({'androidmanifest.xml', 'classes.dex'})
+
+
+class SniffError(Exception):
+    """Fayl qismini o'qib bo'lmadi (Range qo'llab-quvvatlanmaydi va h.k.)"""
+
+
+class CentralDirectoryScanner:
+    """
+    ZIP central directory'ni bo'laklab (stream) tahlil qiluvchi.
+    
+    Faqat yozuv nomlari o'qiladi; APK belgisi topilishi bilan tahlil
+    to'xtaydi, shuning uchun katta arxivlarda ham buferda bitta yozuvdan
+    ortiq ma'lumot saqlanmaydi.
+    """
+    
+    def __init__(self, entries: int):
+        """
+        Args:
+            entries: EOCD'dagi yozuvlar soni
+        """
+        self.remaining = entries
+        self.found: Optional[str] = None
+        self._buffer = bytearray()
+    
+    @property
+    def done(self) -> bool:
+        """Tahlil tugadimi (belgi topildi yoki yozuvlar tugadi)"""
+        return self.found is not None or self.remaining <= 0
+    
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Navbatdagi bo'lakni tahlil qilish.
+        
+        Args:
+            chunk: Central directory'ning keyingi baytlari
+        
+        Returns:
+            True agar tahlil tugagan bo'lsa
+        
+        Raises:
+            SniffError: Central directory buzilgan bo'lsa
+        """
+        buffer = self._buffer
+        buffer += chunk
+        offset = 0
+        
+        while not self.done and len(buffer) - offset >= CENTRAL_HEADER_SIZE:
+            if buffer[offset:offset + 4] != CENTRAL_HEADER_SIG:
+                raise SniffError("Central directory imzosi noto'g'ri")
+            name_len, extra_len, comment_len = struct.unpack_from('<HHH', buffer, offset + 28)
+            entry_len = CENTRAL_HEADER_SIZE + name_len + extra_len + comment_len
+            if len(buffer) - offset < entry_len:
+                break
+            
+            start = offset + CENTRAL_HEADER_SIZE
+            name = bytes(buffer[start:start + name_len]).decode('utf-8', 'replace')
+            if is_apk_entry(name):
+                self.found = name
+            self.remaining -= 1
+            offset += entry_len
+        
+        del buffer[:offset]
+        return self.done
+
+
+def describe_error(error: BaseException) -> str:
+    """
+    Xatoning log uchun xavfsiz tavsifi.
+    
+    Fayl manzilida bot token bor (.../file/bot<TOKEN>/...), httpx va
+    OSError xabarlari esa URL/fayl yo'lini o'z ichiga oladi - shuning uchun
+    ularning matni emas, faqat turi va kodi yoziladi.
+    
+    Args:
+        error: Ushlangan xato
+    
+    Returns:
+        Masalan "HTTPStatusError 404" yoki "FileNotFoundError errno=2"
+    """
+    name = type(error).__name__
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"{name} {error.response.status_code}"
+    if isinstance(error, OSError) and error.errno is not None:
+        return f"{name} errno={error.errno}"
+    if isinstance(error, SniffError) or (
+        isinstance(error, TelegramError) and not isinstance(error, NetworkError)
+    ):
+        # O'zimizning va Bot API'ning xabarlarida manzil yo'q
+        return f"{name}: {error}"
+    return name
+
+
+def is_apk_entry(name: str) -> bool:
+    """
+    Arxiv yozuvi APK (yoki APK to'plami) belgisimi.
+    
+    Args:
+        name: Arxiv ichidagi yozuv nomi
+    
+    Returns:
+        True agar ildizdagi AndroidManifest.xml/classes.dex yoki ichki .apk
+    """
+    lower = name.lower()
+    return lower in APK_MARKERS or lower.endswith('.apk')
+
+
+def parse_eocd(tail: bytes) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Fayl oxiridan End of Central Directory yozuvini topish.
+    
+    Args:
+        tail: Faylning oxirgi baytlari
+    
+    Returns:
+        (eocd_pozitsiyasi, yozuvlar_soni, cd_hajmi, cd_offset) yoki None
+    """
+    position = tail.rfind(EOCD_SIG)
+    while position >= 0:
+        if len(tail) - position >= EOCD_SIZE:
+            entries, cd_size, cd_offset, comment_len = struct.unpack_from(
+                '<HIIH', tail, position + 10
+            )
+            # Izoh uzunligi mos kelsa - bu haqiqiy EOCD (izoh ichidagi imzo emas)
+            if position + EOCD_SIZE + comment_len <= len(tail):
+                return position, entries, cd_size, cd_offset
+        position = tail.rfind(EOCD_SIG, 0, position)
+    return None
+
+
+class ApkSniffer:
+    """
+    Fayl tarkibidan APK aniqlagich.
+    
+    Butun fayl yuklab olinmaydi: avval 4 baytlik bosh (ZIP imzosi), keyin
+    fayl oxiri (EOCD) va nihoyat central directory HTTP Range so'rovlari
+    bilan o'qiladi. Central directory bo'laklab tahlil qilinadi va APK
+    belgisi topilishi bilan ulanish yopiladi.
+    
+    Bir vaqtdagi tekshiruvlar soni semafor bilan cheklanadi.
+    """
+    
+    def __init__(
+        self,
+        max_file_size: int = 20 * 1024 * 1024,
+        max_central_dir: int = 4 * 1024 * 1024,
+        concurrency: int = 4,
+        timeout: float = 10.0,
+        extensions: Iterable[str] = (),
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        """
+        Sniffer yaratish.
+        
+        Args:
+            max_file_size: Bundan katta fayllar tekshirilmaydi (bayt)
+            max_central_dir: Central directory hajmi chegarasi (bayt)
+            concurrency: Bir vaqtdagi tekshiruvlar soni
+            timeout: Bitta HTTP so'rov timeout'i (sekund)
+            extensions: Tarkibi tekshiriladigan kengaytmalar
+            client: Tayyor httpx klienti (bo'lmasa o'zi yaratadi)
+        """
+        self.max_file_size = max_file_size
+        self.max_central_dir = max_central_dir
+        self.timeout = timeout
+        self.extensions = tuple(e.lower() for e in extensions)
+        
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._client = client
+        self._own_client = client is None
+        
+        self.inspected = 0
+        self.detected = 0
+        self.skipped = 0
+        self.errors = 0
+        self.bytes_fetched = 0
+    
+    # ==================== TANLASH ====================
+    
+    def should_inspect(self, document: Document) -> bool:
+        """
+        Hujjat tarkibini tekshirish kerakmi.
+        
+        Args:
+            document: Telegram Document
+        
+        Returns:
+            True agar hujjat shubhali va hajm chegarasidan oshmasa
+        """
+        if document.file_size and document.file_size > self.max_file_size:
+            self.skipped += 1
+            return False
+        
+        mime_type = (document.mime_type or '').lower()
+        if mime_type == APK_MIME_TYPE or mime_type in SNIFF_MIME_TYPES:
+            return True
+        
+        name = (document.file_name or '').lower()
+        _, ext = os.path.splitext(name)
+        return not ext or ext in self.extensions
+    
+    # ==================== TEKSHIRISH ====================
+    
+    async def inspect(self, bot: Bot, document: Document) -> Optional[bool]:
+        """
+        Telegram hujjati APK ekanligini tarkibidan aniqlash.
+        
+        Args:
+            bot: Telegram bot
+            document: Telegram Document
+        
+        Returns:
+            True - APK, False - APK emas, None - aniqlab bo'lmadi
+        """
+        if (document.mime_type or '').lower() == APK_MIME_TYPE:
+            self.detected += 1
+            return True
+        
+        async with self._semaphore:
+            try:
+                file = await bot.get_file(document.file_id)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Faylni olishda xato: {describe_error(e)}")
+                return None
+            
+            size = file.file_size or document.file_size
+            if not size or size > self.max_file_size:
+                self.skipped += 1
+                return None
+            
+            return await self._inspect_locked(file.file_path, size)
+    
+    async def inspect_url(self, url: str, size: int) -> Optional[bool]:
+        """
+        URL (yoki lokal fayl yo'li) bo'yicha tekshirish.
+        
+        Args:
+            url: Fayl manzili (Range so'rovlarini qo'llab-quvvatlashi kerak)
+            size: Fayl hajmi (bayt)
+        
+        Returns:
+            True - APK, False - APK emas, None - aniqlab bo'lmadi
+        """
+        if size > self.max_file_size:
+            self.skipped += 1
+            return None
+        async with self._semaphore:
+            return await self._inspect_locked(url, size)
+    
+    async def _inspect_locked(self, url: str, size: int) -> Optional[bool]:
+        """Semafor ostida bitta faylni tekshirish"""
+        self.inspected += 1
+        try:
+            found = await self._scan(url, size)
+        except (SniffError, httpx.HTTPError, OSError, asyncio.TimeoutError) as e:
+            self.errors += 1
+            logger.warning(f"Fayl tarkibini tekshirishda xato: {describe_error(e)}")
+            return None
+        
+        if found:
+            self.detected += 1
+            logger.info(f"Tarkibdan APK aniqlandi ({found})")
+        return found is not None
+    
+    async def _scan(self, url: str, size: int) -> Optional[str]:
+        """
+        Fayldagi APK belgisini topish.
+        
+        Returns:
+            Topilgan yozuv nomi yoki None
+        """
+        if size < EOCD_SIZE:
+            return None
+        
+        head = await self._read(url, 0, 4)
+        if head not in (LOCAL_HEADER_SIG, EMPTY_ARCHIVE_SIG, SPANNED_SIG):
+            return None
+        
+        # Izohsiz arxivlarda EOCD oxirgi 22 baytda - avval kichik bo'lak
+        tail_start = max(0, size - 1024)
+        tail = await self._read(url, tail_start, size - tail_start)
+        eocd = parse_eocd(tail)
+        if eocd is None and tail_start > 0:
+            tail_start = max(0, size - EOCD_MAX_SEARCH)
+            tail = await self._read(url, tail_start, size - tail_start)
+            eocd = parse_eocd(tail)
+        if eocd is None:
+            return None
+        
+        _, entries, cd_size, cd_offset = eocd
+        if cd_offset == 0xFFFFFFFF or entries == 0xFFFF:
+            raise SniffError("ZIP64 arxivlari qo'llab-quvvatlanmaydi")
+        if cd_size > self.max_central_dir or cd_offset + cd_size > size:
+            raise SniffError(f"Central directory hajmi noto'g'ri: {cd_size}")
+        
+        scanner = CentralDirectoryScanner(entries)
+        if cd_offset >= tail_start:
+            # Central directory allaqachon o'qilgan dumda
+            start = cd_offset - tail_start
+            scanner.feed(tail[start:start + cd_size])
+        else:
+            await self._stream(url, cd_offset, cd_size, scanner)
+        return scanner.found
+    
+    # ==================== O'QISH ====================
+    
+    async def _read(self, url: str, start: int, length: int) -> bytes:
+        """Fayl qismini to'liq o'qish"""
+        chunks = []
+        await self._stream(url, start, length, chunks.append)
+        return b''.join(chunks)
+    
+    async def _stream(self, url: str, start: int, length: int, sink) -> None:
+        """
+        Fayl qismini bo'laklab o'qib sink'ga berish.
+        
+        Args:
+            url: HTTP manzil yoki lokal fayl yo'li
+            start: Boshlang'ich bayt
+            length: O'qiladigan baytlar soni
+            sink: Bo'lak qabul qiluvchi (callable yoki CentralDirectoryScanner)
+        """
+        feed = sink.feed if isinstance(sink, CentralDirectoryScanner) else sink
+        
+        if not url.startswith(('http://', 'https://')):
+            data = await asyncio.to_thread(self._read_local, url, start, length)
+            self.bytes_fetched += len(data)
+            feed(data)
+            return
+        
+        client = self._get_client()
+        headers = {'Range': f"bytes={start}-{start + length - 1}"}
+        async with client.stream('GET', url, headers=headers) as response:
+            if response.status_code == 200 and start > 0:
+                raise SniffError("Server Range so'rovlarini qo'llab-quvvatlamaydi")
+            response.raise_for_status()
+            
+            remaining = length
+            async for chunk in response.aiter_bytes():
+                chunk = chunk[:remaining]
+                remaining -= len(chunk)
+                self.bytes_fetched += len(chunk)
+                if feed(chunk) is True or remaining <= 0:
+                    # Keraklisi olindi - qolgan qismini yuklamaymiz
+                    break
+    
+    @staticmethod
+    def _read_local(path: str, start: int, length: int) -> bytes:
+        """Lokal fayldan o'qish (local Bot API server rejimi)"""
+        with open(path, 'rb') as f:
+            f.seek(start)
+            return f.read(length)
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """httpx klientini (kerak bo'lsa) yaratish"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+    
+    async def close(self) -> None:
+        """O'zi yaratgan HTTP klientini yopish"""
+        if self._own_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def stats(self) -> dict:
+        """
+        Sniffer statistikasi.
+        
+        Returns:
+            {"inspected", "detected", "skipped", "errors", "bytes_fetched"}
+        """
+        return {
+            'inspected': self.inspected,
+            'detected': self.detected,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'bytes_fetched': self.bytes_fetched
+        }
@@ -0,0 +1,1409 @@
+"""
+Telegram Anti-APK Security Bot - Storage Backends
+StrikeDatabase uchun almashtiriladigan saqlash qatlamlari
+"""
+
+import abc
+import json
+import math
+import os
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from journal import StrikeJournal
+from metrics import FLUSH_SECONDS
+from snapshot import SnapshotError, read_snapshot, save_snapshot, write_snapshot
+from strike_index import StrikeIndex, format_timestamp, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+def decay_step(last_strike: float, strikes: int, period: float, now: float) -> Tuple[int, float]:
+    """
+    Muddati o'tgan strike'lar sonini hisoblash.
+    
+    `last_strike` - kechirish soati: har to'liq `period` uchun bitta
+    strike kechiriladi va soat shuncha davrga suriladi. Shunday qilib
+    holat yozuvning o'zida qoladi - qayta ishga tushganda strike'lar
+    ikki marta kechirilmaydi.
+    
+    Args:
+        last_strike: Oxirgi strike (yoki kechirish) vaqti, epoch (NaN - noma'lum)
+        strikes: Hozirgi strike soni
+        period: Bitta strike'ning umri (sekund)
+        now: Hozirgi vaqt (epoch)
+    
+    Returns:
+        (kechiriladigan strike'lar, yangi soat)
+    """
+    if math.isnan(last_strike):
+        # Vaqti noma'lum eski yozuvlar uchun soat hozirdan boshlanadi
+        return 0, now
+    periods = int((now - last_strike) // period)
+    if periods <= 0:
+        return 0, last_strike
+    forgiven = min(periods, strikes)
+    return forgiven, last_strike + forgiven * period
+
+
+def make_key(chat_id: int, user_id: int) -> str:
+    """
+    Foydalanuvchi uchun unique key yaratish.
+    
+    Args:
+        chat_id: Guruh ID
+        user_id: Foydalanuvchi ID
+    
+    Returns:
+        "chat_id_user_id" ko'rinishidagi key
+    """
+    return f"{chat_id}_{user_id}"
+
+
+class StorageBackend(abc.ABC):
+    """
+    Strike saqlash qatlamining umumiy interfeysi.
+    
+    StrikeDatabase barcha o'qish/yozishni shu interfeys orqali bajaradi.
+    Yozuvlar quyidagi ko'rinishdagi dict sifatida qaytariladi:
+    {
+        "strikes": 3,
+        "last_strike": "2024-01-15T10:30:00",
+        "username": "user123",
+        "first_name": "John"
+    }
+    """
+    
+    @abc.abstractmethod
+    def increment(
+        self,
+        chat_id: int,
+        user_id: int,
+        timestamp: str,
+        username: Optional[str] = None,
+        first_name: Optional[str] = None
+    ) -> int:
+        """
+        Strike sonini atomik ravishda bittaga oshirish.
+        
+        Returns:
+            Yangi strike soni
+        """
+        raise NotImplementedError
+    
+    @abc.abstractmethod
+    def decrement(self, chat_id: int, user_id: int) -> int:
+        """
+        Strike sonini atomik ravishda bittaga kamaytirish.
+        
+        Nolga tushgan yozuv o'chiriladi (muvaffaqiyatsiz o'chirishdan
+        keyin berilgan strike'ni qaytarish uchun).
+        
+        Returns:
+            Yangi strike soni (yozuv bo'lmasa 0)
+        """
+        raise NotImplementedError
+    
+    @abc.abstractmethod
+    def get(self, chat_id: int, user_id: int) -> Optional[dict]:
+        """Bitta yozuvni olish (yo'q bo'lsa None)"""
+        raise NotImplementedError
+    
+    @abc.abstractmethod
+    def delete(self, chat_id: int, user_id: int) -> bool:
+        """Yozuvni o'chirish (True agar yozuv bor edi)"""
+        raise NotImplementedError
+    
+    @abc.abstractmethod
+    def chat_strikes(self, chat_id: int) -> Dict[int, int]:
+        """Guruhdagi {user_id: strike_count}"""
+        raise NotImplementedError
+    
+    @abc.abstractmethod
+    def chat_offenders(self, chat_id: int, limit: Optional[int] = None) -> List[dict]:
+        """
+        Guruh qoidabuzarlari (strike bo'yicha kamayish tartibida).
+        
+        Har element: {"user_id", "strikes", "username", "first_name"}
+        """
+        raise NotImplementedError
+    
+    @abc.abstractmethod
+    def statistics(self, limit: int = 10) -> dict:
+        """Umumiy statistika (total_users, total_strikes, top_offenders)"""
+        raise NotImplementedError
+    
+    @abc.abstractmethod
+    def decay(self, chat_id: int, user_id: int, period: float, now: float) -> Tuple[int, Optional[float]]:
+        """
+        Yozuvning muddati o'tgan strike'larini atomik ravishda kechirish.
+        
+        Har to'liq `period` uchun bitta strike olinadi va `last_strike`
+        shuncha davrga suriladi (decay_step). Nolga tushgan yozuv
+        o'chiriladi.
+        
+        Returns:
+            (kechirilgan strike'lar, keyingi kechirish vaqti yoki None
+            agar yozuv qolmadi)
+        """
+        raise NotImplementedError
+    
+    @abc.abstractmethod
+    def decay_clocks(self) -> Iterator[Tuple[int, int, float]]:
+        """Barcha yozuvlar: (chat_id, user_id, last_strike epoch yoki NaN)"""
+        raise NotImplementedError
+    
+    def flush(self) -> None:
+        """Xotiradagi o'zgarishlarni diskka yozish (sinxron)"""
+    
+    def close(self) -> None:
+        """Resurslarni bo'shatish va oxirgi o'zgarishlarni saqlash"""
+
+
+# ==================== WRITE-BEHIND ====================
+
+
+class WriteBehind:
+    """
+    O'zgarishlarni fon oqimida guruhlab diskka yozish.
+    
+    Mutatsiyalar faqat mark_dirty() chaqiradi. Fon oqimi har
+    `interval` sekundda yoki `threshold` ta o'zgarish yig'ilganda
+    flush_fn'ni bir marta chaqiradi - ko'p strike bitta yozuvga
+    birlashadi va event loop disk I/O kutmaydi.
+    """
+    
+    def __init__(
+        self,
+        flush_fn: Callable[[], None],
+        interval: float = 1.0,
+        threshold: int = 500,
+        name: str = 'strike-writer'
+    ):
+        """
+        Write-behind oqimini yaratish va ishga tushirish.
+        
+        Args:
+            flush_fn: Diskka yozuvchi funksiya (fon oqimida chaqiriladi)
+            interval: Maksimal kechikish (sekund)
+            threshold: Shuncha o'zgarishda darhol flush
+            name: Oqim nomi
+        """
+        self._flush_fn = flush_fn
+        self.interval = interval
+        self.threshold = threshold
+        
+        self._dirty = 0
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        
+        self.flush_count = 0
+        self.last_flush_seconds = 0.0
+        
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+    
+    def mark_dirty(self, count: int = 1) -> None:
+        """O'zgarish yuz berganini belgilash (bloklanmaydi)"""
+        with self._cond:
+            self._dirty += count
+            if self._dirty >= self.threshold:
+                self._cond.notify()
+    
+    def _run(self) -> None:
+        """Fon oqimining asosiy sikli"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stopped or self._dirty >= self.threshold,
+                    timeout=self.interval
+                )
+                if self._stopped:
+                    return
+                if not self._dirty:
+                    continue
+            self.flush()
+    
+    def flush(self) -> None:
+        """Yig'ilgan o'zgarishlarni hozir yozish (istalgan oqimdan)"""
+        with self._flush_lock:
+            with self._cond:
+                self._dirty = 0
+            started = time.perf_counter()
+            try:
+                self._flush_fn()
+            except Exception as e:
+                logger.error(f"Flush xatosi: {e}")
+                # Keyingi siklda qayta urinamiz
+                self.mark_dirty()
+                return
+            self.last_flush_seconds = time.perf_counter() - started
+            self.flush_count += 1
+            FLUSH_SECONDS.observe(self.last_flush_seconds, self._thread.name)
+    
+    def close(self) -> None:
+        """Oqimni to'xtatish va oxirgi flush'ni bajarish"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+
+
+# ==================== JSON ====================
+
+
+class JsonStorage(StorageBackend):
+    """
+    Xotiradagi indeks + JSON fayl.
+    
+    Yozuvlar StrikeIndex'da (chat_id -> user_id -> yozuv) saqlanadi,
+    shuning uchun guruh bo'yicha so'rovlar boshqa guruhlarni ko'rmaydi.
+    Diskdagi format o'zgarmagan: {"chat_id_user_id": record}.
+    
+    O'zgarishlar darhol xotiraga qo'llanadi, diskka esa WriteBehind
+    orqali fonda yoziladi: oddiy rejimda butun fayl, journal rejimida
+    faqat o'zgargan yozuvlar log'ga.
+    
+    Binary rejimda (journal bilan) db_file - snapshot.py formatidagi
+    ixcham snapshot: yuklashda ustunlar to'g'ridan-to'g'ri massivlarga
+    o'qiladi, JSON dict'lari umuman yaratilmaydi.
+    """
+    
+    def __init__(
+        self,
+        db_file: str = 'strikes.json',
+        journal: bool = False,
+        compact_records: int = 10000,
+        compact_interval: float = 300.0,
+        flush_interval: float = 1.0,
+        flush_threshold: int = 500,
+        binary: bool = False
+    ):
+        """
+        JSON storage yaratish yoki yuklash.
+        
+        Args:
+            db_file: JSON fayl nomi
+            journal: True bo'lsa o'zgarishlar append-only log'ga yoziladi
+                va fonda snapshot'ga siqiladi (har strike'da butun fayl
+                qayta yozilmaydi)
+            compact_records: Journal rejimida compaction chegarasi (yozuvlar)
+            compact_interval: Journal rejimida compaction oralig'i (sekund)
+            flush_interval: Diskka yozishning maksimal kechikishi (sekund)
+            flush_threshold: Shuncha o'zgarishda darhol diskka yozish
+            binary: Snapshot binary formatda (journal rejimini yoqadi)
+        """
+        self.db_file = db_file
+        self.index = StrikeIndex()
+        self._lock = threading.RLock()
+        self._journal: Optional[StrikeJournal] = None
+        self._binary = binary
+        
+        if journal or binary:
+            self._journal = StrikeJournal(
+                db_file,
+                compact_records=compact_records,
+                compact_interval=compact_interval,
+                lock=self._lock,
+                write_snapshot=write_snapshot if binary else None
+            )
+        
+        self._load()
+        
+        if self._journal:
+            self._journal.start(self._snapshot)
+        
+        self._writer = WriteBehind(
+            self._flush,
+            interval=flush_interval,
+            threshold=flush_threshold,
+            name='strike-json-writer'
+        )
+    
+    def _load(self) -> None:
+        """Ma'lumotlarni fayldan yuklash"""
+        data: Dict[str, dict] = {}
+        
+        if self._binary:
+            self.index = self._load_binary()
+            return
+        
+        if self._journal:
+            try:
+                data = self._journal.load()
+            except Exception as e:
+                logger.error(f"Journal yuklashda xato: {e}")
+        elif os.path.exists(self.db_file):
+            try:
+                with open(self.db_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                logger.info(f"Database yuklandi: {len(data)} ta yozuv")
+            except json.JSONDecodeError as e:
+                logger.error(f"Database yuklashda JSON xatosi: {e}")
+            except Exception as e:
+                logger.error(f"Database yuklashda xato: {e}")
+        else:
+            logger.info("Yangi database yaratildi")
+        
+        self.index = StrikeIndex.from_dict(data)
+    
+    def _load_binary(self) -> StrikeIndex:
+        """Binary snapshot va journal qoldig'ini o'qish"""
+        index = StrikeIndex()
+        if os.path.exists(self.db_file):
+            try:
+                index = read_snapshot(self.db_file)
+            except (OSError, SnapshotError) as e:
+                logger.error(f"Binary snapshot yuklashda xato: {e}")
+        else:
+            logger.info("Yangi database yaratildi")
+        
+        try:
+            changes = self._journal.read_log()
+        except Exception as e:
+            logger.error(f"Journal yuklashda xato: {e}")
+            changes = {}
+        for key, record in changes.items():
+            try:
+                chat_id, user_id = StrikeIndex.split_key(key)
+            except ValueError:
+                continue
+            if record is None:
+                index.remove(chat_id, user_id)
+            else:
+                index.set(chat_id, user_id, record)
+        self._journal.open_log()
+        
+        logger.info(
+            f"Binary snapshot yuklandi: {len(index)} ta yozuv "
+            f"({len(changes)} ta log yozuvi qayta o'qildi)"
+        )
+        return index
+    
+    def _save(self) -> bool:
+        """Ma'lumotlarni faylga saqlash (nusxa lock ostida, yozish tashqarida)"""
+        data = self._snapshot()()
+        tmp_file = f"{self.db_file}.tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_file, self.db_file)
+            return True
+        except Exception as e:
+            logger.error(f"Database saqlashda xato: {e}")
+            return False
+    
+    def _flush(self) -> None:
+        """WriteBehind oqimi chaqiradigan yozish funksiyasi"""
+        if self._journal:
+            self._journal.flush()
+        else:
+            self._save()
+    
+    def _persist(self, chat_id: int, user_id: int) -> None:
+        """
+        Bitta yozuv o'zgarishini saqlash uchun belgilash.
+        
+        Journal rejimida yozuv log buferiga qo'shiladi. Diskka yozish
+        WriteBehind oqimida bajariladi.
+        """
+        if self._journal:
+            key = make_key(chat_id, user_id)
+            record = self.index.get(chat_id, user_id)
+            if record is None:
+                self._journal.append_delete(key)
+            else:
+                self._journal.append_set(key, record)
+        self._writer.mark_dirty()
+    
+    def _snapshot(self) -> Callable[[], Dict[str, dict]]:
+        """
+        Indeks nusxasini lock ostida olish.
+        
+        Returns:
+            Lock'siz chaqiriladigan, JSON dict quruvchi funksiya
+        """
+        with self._lock:
+            clone = self.index.copy()
+        if self._binary:
+            # Binary snapshot ustunlardan to'g'ridan-to'g'ri yoziladi
+            return lambda: clone
+        return clone.to_dict
+    
+    def increment(
+        self,
+        chat_id: int,
+        user_id: int,
+        timestamp: str,
+        username: Optional[str] = None,
+        first_name: Optional[str] = None
+    ) -> int:
+        with self._lock:
+            strikes = self.index.increment(
+                chat_id,
+                user_id,
+                timestamp,
+                username,
+                first_name
+            )
+            self._persist(chat_id, user_id)
+        return strikes
+    
+    def decrement(self, chat_id: int, user_id: int) -> int:
+        with self._lock:
+            record = self.index.get(chat_id, user_id)
+            if record is None:
+                return 0
+            strikes = record['strikes'] - 1
+            if strikes > 0:
+                record['strikes'] = strikes
+                self.index.set(chat_id, user_id, record)
+            else:
+                strikes = 0
+                self.index.remove(chat_id, user_id)
+            self._persist(chat_id, user_id)
+        return strikes
+    
+    def get(self, chat_id: int, user_id: int) -> Optional[dict]:
+        return self.index.get(chat_id, user_id)
+    
+    def delete(self, chat_id: int, user_id: int) -> bool:
+        with self._lock:
+            if not self.index.remove(chat_id, user_id):
+                return False
+            self._persist(chat_id, user_id)
+        return True
+    
+    def chat_strikes(self, chat_id: int) -> Dict[int, int]:
+        # Decay oqimi bucket ustunlarini o'zgartiradi (remove - swap-pop)
+        with self._lock:
+            bucket = self.index.chat(chat_id)
+            if bucket is None:
+                return {}
+            return dict(zip(bucket.user_ids, bucket.strikes))
+    
+    def chat_offenders(self, chat_id: int, limit: Optional[int] = None) -> List[dict]:
+        with self._lock:
+            bucket = self.index.chat(chat_id)
+            if bucket is None:
+                return []
+            return bucket.ranked(limit)
+    
+    def statistics(self, limit: int = 10) -> dict:
+        with self._lock:
+            top_offenders = self.index.top(limit)
+            return {
+                'total_users': len(self.index),
+                'total_strikes': self.index.total_strikes,
+                'top_offenders': [
+                    {
+                        'key': make_key(chat_id, offender['user_id']),
+                        'strikes': offender['strikes'],
+                        'username': offender['username'],
+                        'first_name': offender['first_name']
+                    }
+                    for chat_id, offender in top_offenders
+                ]
+            }
+    
+    def decay(self, chat_id: int, user_id: int, period: float, now: float) -> Tuple[int, Optional[float]]:
+        with self._lock:
+            record = self.index.get(chat_id, user_id)
+            if record is None:
+                return 0, None
+            last_strike = parse_timestamp(record['last_strike'])
+            forgiven, clock = decay_step(last_strike, record['strikes'], period, now)
+            if clock == last_strike:
+                return 0, clock + period
+            
+            strikes = record['strikes'] - forgiven
+            if strikes > 0:
+                record['strikes'] = strikes
+                record['last_strike'] = format_timestamp(clock)
+                self.index.set(chat_id, user_id, record)
+            else:
+                self.index.remove(chat_id, user_id)
+            self._persist(chat_id, user_id)
+        return forgiven, clock + period if strikes > 0 else None
+    
+    def decay_clocks(self) -> Iterator[Tuple[int, int, float]]:
+        with self._lock:
+            clocks = [
+                (chat_id, user_id, last_strike)
+                for chat_id, bucket in self.index.chats.items()
+                for user_id, last_strike in zip(bucket.user_ids, bucket.last_strike)
+            ]
+        return iter(clocks)
+    
+    def flush(self) -> None:
+        self._writer.flush()
+    
+    def close(self) -> None:
+        self._writer.close()
+        if self._journal:
+            self._journal.close()
+
+
+# ==================== SQLITE ====================
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    SQLite (WAL rejimi) asosidagi storage.
+    
+    Yozuvlar xotirada saqlanmaydi: har bir so'rov indeksli SQL so'rovi.
+    (chat_id, user_id) composite primary key, strike oshirish esa bitta
+    atomik UPSERT ... RETURNING so'rovi bilan bajariladi.
+    
+    Yozuvlar ochiq tranzaksiyada to'planadi, COMMIT esa WriteBehind
+    oqimida guruhlab bajariladi.
+    
+    shared=True (sharding: bir faylni bir nechta jarayon ishlatadi) -
+    har yozuv alohida avtomatik tranzaksiya: ochiq tranzaksiya yozish
+    lock'ini boshqa jarayonlardan uzoq ushlab turmaydi, UPSERT ... RETURNING
+    esa jarayonlar orasida ham atomik. Fayl band bo'lsa SQLite qisqa
+    (BUSY_TIMEOUT) kutadi, keyin yozuv qayta uriniladi - urinishlar
+    orasida ulanish lock'i bo'shatiladi, shunda boshqa oqimning o'qishi
+    yozuv kutayotgan oqim ortida qolib ketmaydi.
+    """
+    
+    # Umumiy rejimda bitta urinishda SQLite'ning kutishi (sekund)
+    BUSY_TIMEOUT = 0.05
+    # Qayta urinishlar orasidagi kutish chegarasi (sekund)
+    BUSY_RETRY_MAX_DELAY = 0.2
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS strikes (
+            chat_id     INTEGER NOT NULL,
+            user_id     INTEGER NOT NULL,
+            strikes     INTEGER NOT NULL DEFAULT 0,
+            last_strike TEXT,
+            username    TEXT,
+            first_name  TEXT,
+            PRIMARY KEY (chat_id, user_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_strikes_chat ON strikes (chat_id);
+        CREATE INDEX IF NOT EXISTS idx_strikes_count ON strikes (strikes);
+        CREATE INDEX IF NOT EXISTS idx_strikes_chat_count ON strikes (chat_id, strikes);
+        
+        -- Umumiy yig'indilar triggerlar orqali har o'zgarishda yangilanadi
+        CREATE TABLE IF NOT EXISTS strike_totals (
+            id      INTEGER PRIMARY KEY CHECK (id = 0),
+            users   INTEGER NOT NULL,
+            strikes INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO strike_totals (id, users, strikes)
+            SELECT 0, COUNT(*), COALESCE(SUM(strikes), 0) FROM strikes;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_strikes_insert AFTER INSERT ON strikes
+        BEGIN
+            UPDATE strike_totals
+            SET users = users + 1, strikes = strikes + NEW.strikes
+            WHERE id = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_strikes_update AFTER UPDATE OF strikes ON strikes
+        BEGIN
+            UPDATE strike_totals
+            SET strikes = strikes + NEW.strikes - OLD.strikes
+            WHERE id = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_strikes_delete AFTER DELETE ON strikes
+        BEGIN
+            UPDATE strike_totals
+            SET users = users - 1, strikes = strikes - OLD.strikes
+            WHERE id = 0;
+        END;
+    """
+    
+    def __init__(
+        self,
+        db_file: str = 'strikes.db',
+        flush_interval: float = 1.0,
+        flush_threshold: int = 500,
+        shared: bool = False,
+        busy_timeout: float = 30.0
+    ):
+        """
+        SQLite storage ochish (kerak bo'lsa yaratish).
+        
+        Args:
+            db_file: SQLite fayl nomi
+            flush_interval: COMMIT'ning maksimal kechikishi (sekund)
+            flush_threshold: Shuncha o'zgarishda darhol COMMIT
+            shared: Fayl bir nechta jarayon bilan umumiy (har yozuv darhol COMMIT)
+            busy_timeout: Boshqa jarayon yozayotgan bo'lsa yozuvni kutishning
+                umumiy chegarasi (sekund)
+        """
+        self.db_file = db_file
+        self.shared = shared
+        self.busy_timeout = busy_timeout
+        self.busy_retries = 0
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            db_file,
+            isolation_level=None,
+            check_same_thread=False,
+            # Umumiy rejimda qisqa kutish, qolgani _write'dagi qayta urinishlar
+            timeout=self.BUSY_TIMEOUT if shared else busy_timeout
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._writer = WriteBehind(
+            self._commit,
+            interval=flush_interval,
+            threshold=flush_threshold,
+            name='strike-sqlite-writer'
+        )
+        logger.info(f"SQLite database ochildi: {db_file}")
+    
+    def _write(self, sql: str, params: tuple) -> Optional[sqlite3.Row]:
+        """
+        Yozish so'rovini bajarish (umumiy rejimda darhol COMMIT, aks holda
+        ochiq tranzaksiya ichida).
+        
+        Returns:
+            RETURNING qatori (bo'lmasa None)
+        
+        Raises:
+            sqlite3.OperationalError: Fayl busy_timeout davomida band qolsa
+        """
+        if not self.shared:
+            with self._lock:
+                if not self._conn.in_transaction:
+                    self._conn.execute("BEGIN")
+                row = self._conn.execute(sql, params).fetchone()
+            self._writer.mark_dirty()
+            return row
+        
+        deadline = time.monotonic() + self.busy_timeout
+        delay = self.BUSY_TIMEOUT
+        while True:
+            with self._lock:
+                try:
+                    # Avtomatik tranzaksiya RETURNING qatori o'qilganda yakunlanadi
+                    return self._conn.execute(sql, params).fetchone()
+                except sqlite3.OperationalError as e:
+                    if e.sqlite_errorcode & 0xff != sqlite3.SQLITE_BUSY or time.monotonic() >= deadline:
+                        raise
+                    self.busy_retries += 1
+            time.sleep(delay)
+            delay = min(delay * 2, self.BUSY_RETRY_MAX_DELAY)
+    
+    def _commit(self) -> None:
+        """Ochiq tranzaksiyani yakunlash (WriteBehind oqimidan)"""
+        with self._lock:
+            if self._conn.in_transaction:
+                self._conn.execute("COMMIT")
+    
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> dict:
+        return {
+            'strikes': row['strikes'],
+            'last_strike': row['last_strike'],
+            'username': row['username'],
+            'first_name': row['first_name']
+        }
+    
+    def increment(
+        self,
+        chat_id: int,
+        user_id: int,
+        timestamp: str,
+        username: Optional[str] = None,
+        first_name: Optional[str] = None
+    ) -> int:
+        row = self._write(
+            """
+            INSERT INTO strikes (chat_id, user_id, strikes, last_strike, username, first_name)
+            VALUES (?, ?, 1, ?, ?, ?)
+            ON CONFLICT (chat_id, user_id) DO UPDATE SET
+                strikes = strikes + 1,
+                last_strike = excluded.last_strike,
+                username = COALESCE(excluded.username, username),
+                first_name = COALESCE(excluded.first_name, first_name)
+            RETURNING strikes
+            """,
+            (chat_id, user_id, timestamp, username, first_name)
+        )
+        return row['strikes']
+    
+    def decrement(self, chat_id: int, user_id: int) -> int:
+        row = self._write(
+            """
+            UPDATE strikes SET strikes = strikes - 1
+            WHERE chat_id = ? AND user_id = ?
+            RETURNING strikes
+            """,
+            (chat_id, user_id)
+        )
+        if row is None:
+            return 0
+        if row['strikes'] > 0:
+            return row['strikes']
+        # Oraliqda boshqa oqim yoki jarayon strike qo'shgan bo'lsa yozuv qoladi
+        self._write(
+            "DELETE FROM strikes WHERE chat_id = ? AND user_id = ? AND strikes <= 0",
+            (chat_id, user_id)
+        )
+        return 0
+    
+    def get(self, chat_id: int, user_id: int) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM strikes WHERE chat_id = ? AND user_id = ?",
+                (chat_id, user_id)
+            ).fetchone()
+        return self._row_to_dict(row) if row else None
+    
+    def delete(self, chat_id: int, user_id: int) -> bool:
+        row = self._write(
+            "DELETE FROM strikes WHERE chat_id = ? AND user_id = ? RETURNING strikes",
+            (chat_id, user_id)
+        )
+        return row is not None
+    
+    def chat_strikes(self, chat_id: int) -> Dict[int, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id, strikes FROM strikes WHERE chat_id = ?",
+                (chat_id,)
+            ).fetchall()
+        return {row['user_id']: row['strikes'] for row in rows}
+    
+    def chat_offenders(self, chat_id: int, limit: Optional[int] = None) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id, strikes, username, first_name FROM strikes "
+                "WHERE chat_id = ? ORDER BY strikes DESC LIMIT ?",
+                (chat_id, -1 if limit is None else limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def statistics(self, limit: int = 10) -> dict:
+        with self._lock:
+            totals = self._conn.execute(
+                "SELECT users, strikes FROM strike_totals WHERE id = 0"
+            ).fetchone()
+            rows = self._conn.execute(
+                "SELECT * FROM strikes ORDER BY strikes DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        
+        return {
+            'total_users': totals['users'],
+            'total_strikes': totals['strikes'],
+            'top_offenders': [
+                {
+                    'key': make_key(row['chat_id'], row['user_id']),
+                    'strikes': row['strikes'],
+                    'username': row['username'],
+                    'first_name': row['first_name']
+                }
+                for row in rows
+            ]
+        }
+    
+    def decay(self, chat_id: int, user_id: int, period: float, now: float) -> Tuple[int, Optional[float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT strikes, last_strike FROM strikes WHERE chat_id = ? AND user_id = ?",
+                (chat_id, user_id)
+            ).fetchone()
+        if row is None:
+            return 0, None
+        last_strike = parse_timestamp(row['last_strike'])
+        forgiven, clock = decay_step(last_strike, row['strikes'], period, now)
+        if clock == last_strike:
+            return 0, clock + period
+        
+        # Oraliqda boshqa oqim yoki jarayon strike qo'shgan bo'lsa (soat
+        # o'zgargan) hech narsa yozilmaydi - keyingi urinishda qayta
+        # hisoblanadi. Lock yozuv kutilayotganda ushlab turilmaydi
+        updated = self._write(
+            """
+            UPDATE strikes SET strikes = strikes - ?, last_strike = ?
+            WHERE chat_id = ? AND user_id = ? AND last_strike IS ?
+            RETURNING strikes
+            """,
+            (forgiven, format_timestamp(clock), chat_id, user_id, row['last_strike'])
+        )
+        if updated is None:
+            return 0, now
+        if updated['strikes'] > 0:
+            return forgiven, clock + period
+        self._write(
+            "DELETE FROM strikes WHERE chat_id = ? AND user_id = ? AND strikes <= 0",
+            (chat_id, user_id)
+        )
+        return forgiven, None
+    
+    def put_many(self, records: Iterable[Tuple[int, int, Optional[dict]]]) -> None:
+        """
+        Yozuvlarni to'liq holat bilan yozish (TieredStorage write-back'i uchun).
+        
+        Args:
+            records: (chat_id, user_id, yozuv yoki None - o'chirish);
+                har kalit bir martadan
+        """
+        upserts: List[tuple] = []
+        deletes: List[tuple] = []
+        for chat_id, user_id, record in records:
+            if record is None:
+                deletes.append((chat_id, user_id))
+            else:
+                upserts.append((
+                    chat_id,
+                    user_id,
+                    record['strikes'],
+                    record['last_strike'],
+                    record['username'],
+                    record['first_name']
+                ))
+        if not upserts and not deletes:
+            return
+        
+        with self._lock:
+            if not self.shared and not self._conn.in_transaction:
+                self._conn.execute("BEGIN")
+            if deletes:
+                self._conn.executemany(
+                    "DELETE FROM strikes WHERE chat_id = ? AND user_id = ?",
+                    deletes
+                )
+            if upserts:
+                self._conn.executemany(
+                    """
+                    INSERT INTO strikes (chat_id, user_id, strikes, last_strike, username, first_name)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (chat_id, user_id) DO UPDATE SET
+                        strikes = excluded.strikes,
+                        last_strike = excluded.last_strike,
+                        username = excluded.username,
+                        first_name = excluded.first_name
+                    """,
+                    upserts
+                )
+        self._writer.mark_dirty(len(upserts) + len(deletes))
+    
+    def decay_clocks(self) -> Iterator[Tuple[int, int, float]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chat_id, user_id, last_strike FROM strikes"
+            ).fetchall()
+        for row in rows:
+            yield row['chat_id'], row['user_id'], parse_timestamp(row['last_strike'])
+    
+    def import_records(self, data: Dict[str, dict]) -> int:
+        """
+        "chat_id_user_id" -> record ko'rinishidagi yozuvlarni bitta
+        tranzaksiyada yozish (migratsiya uchun).
+        
+        Args:
+            data: JSON storage formatidagi yozuvlar
+        
+        Returns:
+            Yozilgan yozuvlar soni
+        """
+        rows: List[tuple] = []
+        for key, record in data.items():
+            try:
+                chat_id, user_id = StrikeIndex.split_key(key)
+            except ValueError:
+                logger.warning(f"Noto'g'ri key o'tkazib yuborildi: {key}")
+                continue
+            rows.append((
+                chat_id,
+                user_id,
+                record.get('strikes', 0),
+                record.get('last_strike'),
+                record.get('username'),
+                record.get('first_name')
+            ))
+        
+        with self._lock:
+            self._commit()
+            self._conn.execute("BEGIN")
+            try:
+                # INSERT OR REPLACE DELETE triggerini ishga tushirmaydi -
+                # yig'indilar to'g'ri qolishi uchun UPSERT
+                self._conn.executemany(
+                    "INSERT INTO strikes "
+                    "(chat_id, user_id, strikes, last_strike, username, first_name) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (chat_id, user_id) DO UPDATE SET "
+                    "strikes = excluded.strikes, "
+                    "last_strike = excluded.last_strike, "
+                    "username = excluded.username, "
+                    "first_name = excluded.first_name",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+    
+    def flush(self) -> None:
+        self._writer.flush()
+    
+    def close(self) -> None:
+        self._writer.close()
+        with self._lock:
+            self._conn.close()
+
+
+# ==================== TIERED ====================
+
+
+class CachedRecord:
+    """TieredStorage keshidagi bitta yozuv (dict'dan ixcham)"""
+    
+    __slots__ = ('strikes', 'last_strike', 'username', 'first_name')
+    
+    def __init__(
+        self,
+        strikes: int,
+        last_strike: Optional[str],
+        username: Optional[str],
+        first_name: Optional[str]
+    ):
+        self.strikes = strikes
+        self.last_strike = last_strike
+        self.username = username
+        self.first_name = first_name
+    
+    @classmethod
+    def from_dict(cls, record: dict) -> 'CachedRecord':
+        return cls(
+            record['strikes'],
+            record['last_strike'],
+            record['username'],
+            record['first_name']
+        )
+    
+    def to_dict(self) -> dict:
+        return {
+            'strikes': self.strikes,
+            'last_strike': self.last_strike,
+            'username': self.username,
+            'first_name': self.first_name
+        }
+
+
+class TieredStorage(StorageBackend):
+    """
+    Diskdagi SQLite oldida hajmi cheklangan LRU kesh.
+    
+    Xotirada faqat yaqinda faol bo'lgan (chat_id, user_id) yozuvlari
+    turadi - RAM umumiy qoidabuzarlar soniga emas, joriy faollikka
+    bog'liq. Keshda yo'q yozuv diskdan o'qiladi (read-through), yo'qligi
+    ham keshlanadi: yangi qoidabuzarning keyingi strike'i diskka bormaydi.
+    
+    O'zgarishlar keshda qo'llanadi va "dirty" deb belgilanadi. Dirty yozuv
+    keshdan chiqarilayotganda darhol (write-back), qolganlari esa
+    WriteBehind orqali fonda diskka yoziladi. Guruh va umumiy statistika
+    so'rovlari diskka yozishni kutmaydi: so'rov SQLite indekslari bilan
+    bajariladi va natija dirty yozuvlar bilan to'g'rilanadi. Har dirty
+    yozuvning diskdagi strike soni eslab qolinadi, shuning uchun umumiy
+    yig'indilar ham faqat dirty yozuvlar bo'yicha tuzatiladi.
+    """
+    
+    # Bitta kesh elementining taxminiy hajmi: kalit tuple, CachedRecord,
+    # OrderedDict tuguni va odatdagi vaqt/ism satrlari (tracemalloc bilan
+    # o'lchangan, benchmarks/bench_tiered.py)
+    ENTRY_BYTES = 480
+    
+    def __init__(
+        self,
+        backing: SQLiteStorage,
+        max_bytes: int = 16 * 2 ** 20,
+        flush_interval: float = 1.0,
+        flush_threshold: int = 500
+    ):
+        """
+        Keshli storage yaratish.
+        
+        Args:
+            backing: Diskdagi storage
+            max_bytes: Kesh uchun xotira chegarasi (bayt)
+            flush_interval: Dirty yozuvlarni diskka yozishning maksimal kechikishi (sekund)
+            flush_threshold: Shuncha turli yozuv o'zgarganda darhol diskka
+                yozish (kattaroq - bir yozuvning ko'proq o'zgarishi birlashadi)
+        """
+        self.backing = backing
+        self.capacity = max(1, max_bytes // self.ENTRY_BYTES)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.written = 0
+        
+        self._cache: 'OrderedDict[Tuple[int, int], Optional[CachedRecord]]' = OrderedDict()
+        # Dirty kalit -> diskdagi strike soni (yozuv yo'q bo'lsa 0)
+        self._dirty: Dict[Tuple[int, int], int] = {}
+        self._lock = threading.RLock()
+        self._writer = WriteBehind(
+            self._write_back,
+            interval=flush_interval,
+            threshold=flush_threshold,
+            name='strike-cache-writer'
+        )
+        logger.info(f"Strike keshi: {self.capacity} ta yozuv ({max_bytes / 2 ** 20:.0f} MB)")
+    
+    def _lookup(self, key: Tuple[int, int]) -> Optional[CachedRecord]:
+        """Yozuvni keshdan olish, yo'q bo'lsa diskdan o'qib keshlash (lock ostida)"""
+        cache = self._cache
+        if key in cache:
+            self.hits += 1
+            cache.move_to_end(key)
+            return cache[key]
+        
+        self.misses += 1
+        data = self.backing.get(*key)
+        record = None if data is None else CachedRecord.from_dict(data)
+        cache[key] = record
+        while len(cache) > self.capacity:
+            self._evict()
+        return record
+    
+    def _evict(self) -> None:
+        """Eng uzoq ishlatilmagan yozuvni chiqarish (dirty bo'lsa diskka yoziladi)"""
+        key, record = self._cache.popitem(last=False)
+        self.evictions += 1
+        if key in self._dirty:
+            del self._dirty[key]
+            self.backing.put_many([(key[0], key[1], None if record is None else record.to_dict())])
+            self.written += 1
+    
+    def _mark(self, key: Tuple[int, int], before: int) -> None:
+        """
+        Yozuv o'zgarganini belgilash (WriteBehind chegarasi - turli yozuvlar soni).
+        
+        Args:
+            key: (chat_id, user_id)
+            before: O'zgarishdan oldingi strike soni (yozuv dirty bo'lmasa
+                u diskdagi bilan bir xil)
+        """
+        if key not in self._dirty:
+            self._dirty[key] = before
+            self._writer.mark_dirty()
+    
+    def _dirty_records(self, chat_id: Optional[int] = None) -> Dict[Tuple[int, int], Optional[CachedRecord]]:
+        """Dirty yozuvlarning keshdagi holati (lock ostida; chat_id berilsa faqat shu guruh)"""
+        cache = self._cache
+        return {
+            key: cache[key]
+            for key in self._dirty
+            if chat_id is None or key[0] == chat_id
+        }
+    
+    def _write_back(self) -> None:
+        """Barcha dirty yozuvlarni diskka yozish (keshda qoladi)"""
+        with self._lock:
+            cache = self._cache
+            self.backing.put_many(
+                (chat_id, user_id, None if record is None else record.to_dict())
+                for chat_id, user_id, record in (
+                    (key[0], key[1], cache[key]) for key in self._dirty
+                )
+            )
+            self.written += len(self._dirty)
+            self._dirty.clear()
+    
+    def increment(
+        self,
+        chat_id: int,
+        user_id: int,
+        timestamp: str,
+        username: Optional[str] = None,
+        first_name: Optional[str] = None
+    ) -> int:
+        key = (chat_id, user_id)
+        with self._lock:
+            record = self._lookup(key)
+            if record is None:
+                self._mark(key, 0)
+                record = self._cache[key] = CachedRecord(1, timestamp, username, first_name)
+            else:
+                self._mark(key, record.strikes)
+                record.strikes += 1
+                record.last_strike = timestamp
+                if username is not None:
+                    record.username = username
+                if first_name is not None:
+                    record.first_name = first_name
+            return record.strikes
+    
+    def decrement(self, chat_id: int, user_id: int) -> int:
+        key = (chat_id, user_id)
+        with self._lock:
+            record = self._lookup(key)
+            if record is None:
+                return 0
+            self._mark(key, record.strikes)
+            record.strikes -= 1
+            strikes = record.strikes
+            if strikes <= 0:
+                strikes = 0
+                self._cache[key] = None
+        return strikes
+    
+    def get(self, chat_id: int, user_id: int) -> Optional[dict]:
+        with self._lock:
+            record = self._lookup((chat_id, user_id))
+            return None if record is None else record.to_dict()
+    
+    def delete(self, chat_id: int, user_id: int) -> bool:
+        key = (chat_id, user_id)
+        with self._lock:
+            record = self._lookup(key)
+            if record is None:
+                return False
+            self._mark(key, record.strikes)
+            self._cache[key] = None
+        return True
+    
+    def chat_strikes(self, chat_id: int) -> Dict[int, int]:
+        with self._lock:
+            strikes = self.backing.chat_strikes(chat_id)
+            for (_, user_id), record in self._dirty_records(chat_id).items():
+                if record is None:
+                    strikes.pop(user_id, None)
+                else:
+                    strikes[user_id] = record.strikes
+        return strikes
+    
+    def chat_offenders(self, chat_id: int, limit: Optional[int] = None) -> List[dict]:
+        with self._lock:
+            dirty = self._dirty_records(chat_id)
+            # Diskdagi eski holati bilan dirty yozuvlar top'dan chiqariladi
+            rows = self.backing.chat_offenders(chat_id, None if limit is None else limit + len(dirty))
+            offenders = [row for row in rows if (chat_id, row['user_id']) not in dirty]
+            offenders.extend(
+                {
+                    'user_id': user_id,
+                    'strikes': record.strikes,
+                    'username': record.username,
+                    'first_name': record.first_name
+                }
+                for (_, user_id), record in dirty.items()
+                if record is not None
+            )
+        offenders.sort(key=lambda row: row['strikes'], reverse=True)
+        return offenders if limit is None else offenders[:limit]
+    
+    def statistics(self, limit: int = 10) -> dict:
+        with self._lock:
+            dirty = self._dirty_records()
+            stats = self.backing.statistics(limit + len(dirty) if limit > 0 else 0)
+            for key, record in dirty.items():
+                before = self._dirty[key]
+                after = 0 if record is None else record.strikes
+                stats['total_users'] += (after > 0) - (before > 0)
+                stats['total_strikes'] += after - before
+            if limit <= 0:
+                return stats
+            
+            dirty_keys = {make_key(*key): record for key, record in dirty.items()}
+            top = [row for row in stats['top_offenders'] if row['key'] not in dirty_keys]
+            top.extend(
+                {
+                    'key': key,
+                    'strikes': record.strikes,
+                    'username': record.username,
+                    'first_name': record.first_name
+                }
+                for key, record in dirty_keys.items()
+                if record is not None
+            )
+        top.sort(key=lambda row: row['strikes'], reverse=True)
+        stats['top_offenders'] = top[:limit]
+        return stats
+    
+    def decay(self, chat_id: int, user_id: int, period: float, now: float) -> Tuple[int, Optional[float]]:
+        key = (chat_id, user_id)
+        with self._lock:
+            if key not in self._cache:
+                # Sovuq yozuv keshga olinmaydi - faol yozuvlarni siqib chiqarmasin
+                return self.backing.decay(chat_id, user_id, period, now)
+            
+            record = self._cache[key]
+            if record is None:
+                return 0, None
+            last_strike = parse_timestamp(record.last_strike)
+            forgiven, clock = decay_step(last_strike, record.strikes, period, now)
+            if clock == last_strike:
+                return 0, clock + period
+            
+            self._mark(key, record.strikes)
+            strikes = record.strikes - forgiven
+            if strikes > 0:
+                record.strikes = strikes
+                record.last_strike = format_timestamp(clock)
+            else:
+                self._cache[key] = None
+        return forgiven, clock + period if strikes > 0 else None
+    
+    def decay_clocks(self) -> Iterator[Tuple[int, int, float]]:
+        self._write_back()
+        return self.backing.decay_clocks()
+    
+    def stats(self) -> dict:
+        """
+        Kesh holati.
+        
+        Returns:
+            {"size", "capacity", "dirty", "hits", "misses", "evictions",
+            "written", "hit_rate"}
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._cache),
+                'capacity': self.capacity,
+                'dirty': len(self._dirty),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'written': self.written,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+    
+    def flush(self) -> None:
+        self._writer.flush()
+        self.backing.flush()
+    
+    def close(self) -> None:
+        self._writer.close()
+        self.backing.close()
+
+
+# ==================== FACTORY ====================
+
+
+def migrate_json_to_sqlite(json_file: str, sqlite_file: str) -> int:
+    """
+    strikes.json (va uning journal'i) ma'lumotlarini SQLite'ga ko'chirish.
+    
+    Args:
+        json_file: Manba JSON fayl
+        sqlite_file: Maqsad SQLite fayl
+    
+    Returns:
+        Ko'chirilgan yozuvlar soni
+    """
+    data = StrikeJournal(json_file).read_state()
+    target = SQLiteStorage(sqlite_file)
+    try:
+        count = target.import_records(data)
+    finally:
+        target.close()
+    logger.info(f"Migratsiya tugadi: {count} ta yozuv {json_file} -> {sqlite_file}")
+    return count
+
+
+def migrate_json_to_snapshot(json_file: str, snapshot_file: str) -> int:
+    """
+    strikes.json (va uning journal'i) ma'lumotlarini binary snapshot'ga ko'chirish.
+    
+    Vaqtlar sekund aniqligigacha qisqaradi.
+    
+    Args:
+        json_file: Manba JSON fayl
+        snapshot_file: Maqsad snapshot fayl
+    
+    Returns:
+        Ko'chirilgan yozuvlar soni
+    """
+    index = StrikeIndex.from_dict(StrikeJournal(json_file).read_state())
+    save_snapshot(snapshot_file, index)
+    logger.info(f"Migratsiya tugadi: {len(index)} ta yozuv {json_file} -> {snapshot_file}")
+    return len(index)
+
+
+def create_storage(
+    kind: str,
+    json_file: str = 'strikes.json',
+    sqlite_file: str = 'strikes.db',
+    snapshot_file: str = 'strikes.bin',
+    compact_records: int = 10000,
+    compact_interval: float = 300.0,
+    flush_interval: float = 1.0,
+    flush_threshold: int = 500,
+    shared: bool = False,
+    cache_bytes: int = 16 * 2 ** 20
+) -> StorageBackend:
+    """
+    Konfiguratsiya bo'yicha storage yaratish.
+    
+    Args:
+        kind: "json", "journal", "binary", "sqlite" yoki "tiered"
+        json_file: JSON/journal rejimi fayli
+        sqlite_file: SQLite rejimi fayli
+        snapshot_file: Binary rejimi snapshot fayli
+        compact_records: Journal compaction chegarasi
+        compact_interval: Journal compaction oralig'i (sekund)
+        flush_interval: Diskka yozishning maksimal kechikishi (sekund)
+        flush_threshold: Shuncha o'zgarishda darhol diskka yozish
+        shared: Bir nechta jarayon bitta storage'ni ishlatadi (faqat sqlite)
+        cache_bytes: Tiered rejimida LRU kesh uchun xotira chegarasi (bayt)
+    
+    Returns:
+        StorageBackend
+    
+    Raises:
+        ValueError: Noma'lum tur yoki umumiy rejimda sqlite emas
+    """
+    if shared and kind != 'sqlite':
+        raise ValueError(f"{kind} storage jarayonlar orasida umumiy bo'la olmaydi (sqlite kerak)")
+    
+    if kind in ('sqlite', 'tiered'):
+        # Birinchi ishga tushishda mavjud strikes.json avtomatik ko'chiriladi
+        if not os.path.exists(sqlite_file) and os.path.exists(json_file):
+            migrate_json_to_sqlite(json_file, sqlite_file)
+        store = SQLiteStorage(
+            sqlite_file,
+            flush_interval=flush_interval,
+            flush_threshold=flush_threshold,
+            shared=shared
+        )
+        if kind == 'sqlite':
+            return store
+        return TieredStorage(
+            store,
+            max_bytes=cache_bytes,
+            flush_interval=flush_interval,
+            flush_threshold=flush_threshold
+        )
+    
+    if kind == 'binary':
+        # Birinchi ishga tushishda mavjud strikes.json avtomatik ko'chiriladi
+        if not os.path.exists(snapshot_file) and os.path.exists(json_file):
+            migrate_json_to_snapshot(json_file, snapshot_file)
+        return JsonStorage(
+            snapshot_file,
+            binary=True,
+            compact_records=compact_records,
+            compact_interval=compact_interval,
+            flush_interval=flush_interval,
+            flush_threshold=flush_threshold
+        )
+    
+    if kind in ('json', 'journal'):
+        return JsonStorage(
+            json_file,
+            journal=kind == 'journal',
+            compact_records=compact_records,
+            compact_interval=compact_interval,
+            flush_interval=flush_interval,
+            flush_threshold=flush_threshold
+        )
+    
+    raise ValueError(f"Noma'lum storage turi: {kind}")
@@ -0,0 +1,663 @@
+"""
+Telegram Anti-APK Security Bot - Strike Index
+Xotiradagi ixcham chat_id -> user_id -> yozuv indeksi
+"""
+
+import bisect
+import math
+import sys
+from array import array
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+
+def parse_timestamp(value: Optional[str]) -> float:
+    """
+    ISO vaqtni epoch sekundga aylantirish.
+    
+    Args:
+        value: ISO formatdagi vaqt yoki None
+    
+    Returns:
+        Epoch sekund (noma'lum bo'lsa NaN)
+    """
+    if not value:
+        return math.nan
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def format_timestamp(value: float) -> Optional[str]:
+    """
+    Epoch sekundni ISO vaqtga aylantirish.
+    
+    Args:
+        value: Epoch sekund (NaN - noma'lum)
+    
+    Returns:
+        ISO formatdagi vaqt yoki None
+    """
+    if math.isnan(value):
+        return None
+    return datetime.fromtimestamp(value).isoformat()
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Takrorlanuvchi ismlarni bitta obyektda saqlash"""
+    return sys.intern(value) if value else value
+
+
+class Leaderboard:
+    """
+    Strike soni bo'yicha tartiblangan a'zolar.
+    
+    A'zolar strike darajalari bo'yicha guruhlanadi (level -> {a'zo: son}),
+    mavjud darajalar esa tartiblangan ro'yxatda saqlanadi. Strike
+    o'zgarishi O(log k) (k - turli strike qiymatlari soni, amalda MAX_STRIKES
+    atrofida), top-N esa yuqori darajalardan boshlab o'qiladi - butun
+    ma'lumotni saralash kerak emas.
+    
+    `count` bir a'zoning shu darajadagi soni: guruh leaderboard'ida doim 1,
+    global leaderboard'da esa guruhdagi shu darajadagi foydalanuvchilar soni.
+    """
+    
+    __slots__ = ('levels', 'values')
+    
+    def __init__(self):
+        self.levels: Dict[int, Dict[Hashable, int]] = {}
+        self.values: List[int] = []
+    
+    def move(self, member: Hashable, old: int, new: int) -> None:
+        """
+        A'zoni bir darajadan boshqasiga ko'chirish.
+        
+        Args:
+            member: A'zo (user_id yoki chat_id)
+            old: Oldingi strike soni (0 - yangi a'zo)
+            new: Yangi strike soni (0 - a'zo o'chirildi)
+        """
+        if old == new:
+            return
+        if old > 0:
+            level = self.levels[old]
+            count = level[member] - 1
+            if count:
+                level[member] = count
+            else:
+                del level[member]
+                if not level:
+                    del self.levels[old]
+                    del self.values[bisect.bisect_left(self.values, old)]
+        if new > 0:
+            level = self.levels.get(new)
+            if level is None:
+                level = self.levels[new] = {}
+                bisect.insort(self.values, new)
+            level[member] = level.get(member, 0) + 1
+    
+    def descending(self) -> Iterator[Tuple[int, Dict[Hashable, int]]]:
+        """(strike, {a'zo: son}) juftliklari, eng yuqori darajadan"""
+        for value in reversed(self.values):
+            yield value, self.levels[value]
+    
+    def top(self, limit: int) -> List[Tuple[Hashable, int]]:
+        """
+        Eng ko'p strike'li a'zolar.
+        
+        Args:
+            limit: Maksimal natija soni
+        
+        Returns:
+            [(a'zo, strike), ...]
+        """
+        result = []
+        for value, level in self.descending():
+            for member in level:
+                if len(result) >= limit:
+                    return result
+                result.append((member, value))
+        return result
+
+
+class ChatBucket:
+    """
+    Bitta guruhning qoidabuzarlari.
+    
+    Yozuvlar ustunli massivlarda saqlanadi (har yozuv uchun alohida dict
+    yaratilmaydi), `index` esa user_id -> qator raqamini beradi. O'chirish
+    oxirgi qatorni bo'shagan joyga ko'chirish orqali O(1). `leaderboard`
+    guruh ichidagi strike tartibini doimiy saqlaydi.
+    
+    `index` va `leaderboard` ustunlardan birinchi murojaatda quriladi:
+    yuklangan, lekin hali ishlatilmagan guruh faqat massivlarda turadi.
+    """
+    
+    __slots__ = (
+        '_index',
+        '_leaderboard',
+        'user_ids',
+        'strikes',
+        'last_strike',
+        'usernames',
+        'first_names'
+    )
+    
+    def __init__(self):
+        self._index: Optional[Dict[int, int]] = {}
+        self._leaderboard: Optional[Leaderboard] = Leaderboard()
+        self.user_ids = array('q')
+        self.strikes = array('q')
+        self.last_strike = array('d')
+        self.usernames: List[Optional[str]] = []
+        self.first_names: List[Optional[str]] = []
+    
+    @property
+    def index(self) -> Dict[int, int]:
+        """user_id -> qator raqami"""
+        index = self._index
+        if index is None:
+            index = self._index = dict(zip(self.user_ids, range(len(self.user_ids))))
+        return index
+    
+    @property
+    def leaderboard(self) -> Leaderboard:
+        """Guruh ichidagi strike tartibi"""
+        leaderboard = self._leaderboard
+        if leaderboard is None:
+            leaderboard = self._leaderboard = Leaderboard()
+            levels = leaderboard.levels
+            for user_id, strikes in zip(self.user_ids, self.strikes):
+                if strikes > 0:
+                    level = levels.get(strikes)
+                    if level is None:
+                        level = levels[strikes] = {}
+                    level[user_id] = 1
+            leaderboard.values = sorted(levels)
+        return leaderboard
+    
+    def strike_counts(self) -> Counter:
+        """Strike soni -> shu sonli foydalanuvchilar (global leaderboard uchun)"""
+        counts = Counter(self.strikes)
+        counts.pop(0, None)
+        return counts
+    
+    def __len__(self) -> int:
+        return len(self.user_ids)
+    
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self.index
+    
+    def get(self, user_id: int) -> Optional[dict]:
+        """
+        Yozuvni dict ko'rinishida olish.
+        
+        Args:
+            user_id: Foydalanuvchi ID
+        
+        Returns:
+            Yozuv dict yoki None
+        """
+        slot = self.index.get(user_id)
+        if slot is None:
+            return None
+        return {
+            'strikes': self.strikes[slot],
+            'last_strike': format_timestamp(self.last_strike[slot]),
+            'username': self.usernames[slot],
+            'first_name': self.first_names[slot]
+        }
+    
+    def get_strikes(self, user_id: int) -> int:
+        """Strike soni (yozuv bo'lmasa 0)"""
+        slot = self.index.get(user_id)
+        return 0 if slot is None else self.strikes[slot]
+    
+    def set(
+        self,
+        user_id: int,
+        strikes: int,
+        last_strike: float,
+        username: Optional[str] = None,
+        first_name: Optional[str] = None
+    ) -> None:
+        """
+        Yozuvni to'liq qiymatlar bilan yozish (yangi yoki mavjud).
+        
+        Args:
+            user_id: Foydalanuvchi ID
+            strikes: Strike soni
+            last_strike: Oxirgi strike vaqti (epoch sekund)
+            username: Foydalanuvchi username
+            first_name: Foydalanuvchi ismi
+        """
+        index = self.index
+        slot = index.get(user_id)
+        if slot is None:
+            # Ikkalasi ham yangi qator qo'shilishidan oldin qurilishi kerak:
+            # aks holda yangi a'zo leaderboard'ga ikki marta tushadi
+            leaderboard = self.leaderboard
+            index[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+            self.strikes.append(strikes)
+            self.last_strike.append(last_strike)
+            self.usernames.append(_intern(username))
+            self.first_names.append(_intern(first_name))
+            leaderboard.move(user_id, 0, strikes)
+            return
+        
+        self.leaderboard.move(user_id, self.strikes[slot], strikes)
+        self.strikes[slot] = strikes
+        self.last_strike[slot] = last_strike
+        self.usernames[slot] = _intern(username)
+        self.first_names[slot] = _intern(first_name)
+    
+    def increment(
+        self,
+        user_id: int,
+        last_strike: float,
+        username: Optional[str] = None,
+        first_name: Optional[str] = None
+    ) -> int:
+        """
+        Strike sonini bittaga oshirish.
+        
+        Args:
+            user_id: Foydalanuvchi ID
+            last_strike: Strike vaqti (epoch sekund)
+            username: Yangi username (bo'sh bo'lsa eskisi qoladi)
+            first_name: Yangi ism (bo'sh bo'lsa eskisi qoladi)
+        
+        Returns:
+            Yangi strike soni
+        """
+        slot = self.index.get(user_id)
+        if slot is None:
+            self.set(user_id, 1, last_strike, username, first_name)
+            return 1
+        
+        self.leaderboard.move(user_id, self.strikes[slot], self.strikes[slot] + 1)
+        self.strikes[slot] += 1
+        self.last_strike[slot] = last_strike
+        if username:
+            self.usernames[slot] = _intern(username)
+        if first_name:
+            self.first_names[slot] = _intern(first_name)
+        return self.strikes[slot]
+    
+    def remove(self, user_id: int) -> bool:
+        """
+        Yozuvni o'chirish.
+        
+        Args:
+            user_id: Foydalanuvchi ID
+        
+        Returns:
+            True agar yozuv bor edi
+        """
+        slot = self.index.pop(user_id, None)
+        if slot is None:
+            return False
+        
+        self.leaderboard.move(user_id, self.strikes[slot], 0)
+        last = len(self.user_ids) - 1
+        if slot != last:
+            moved = self.user_ids[last]
+            self.user_ids[slot] = moved
+            self.strikes[slot] = self.strikes[last]
+            self.last_strike[slot] = self.last_strike[last]
+            self.usernames[slot] = self.usernames[last]
+            self.first_names[slot] = self.first_names[last]
+            self.index[moved] = slot
+        
+        self.user_ids.pop()
+        self.strikes.pop()
+        self.last_strike.pop()
+        self.usernames.pop()
+        self.first_names.pop()
+        return True
+    
+    def copy(self) -> 'ChatBucket':
+        """
+        Ma'lumot ustunlarining nusxasi (massivlar memcpy bilan ko'chiriladi).
+        
+        Leaderboard va index nusxalanmaydi: nusxa faqat serializatsiya uchun.
+        """
+        clone = ChatBucket.__new__(ChatBucket)
+        clone._index = None
+        clone._leaderboard = None
+        clone.user_ids = array('q', self.user_ids)
+        clone.strikes = array('q', self.strikes)
+        clone.last_strike = array('d', self.last_strike)
+        clone.usernames = self.usernames[:]
+        clone.first_names = self.first_names[:]
+        return clone
+    
+    @classmethod
+    def from_columns(
+        cls,
+        user_ids: array,
+        strikes: array,
+        last_strike: array,
+        usernames: List[Optional[str]],
+        first_names: List[Optional[str]]
+    ) -> 'ChatBucket':
+        """
+        Tayyor ustunlardan bucket (index va leaderboard kerak bo'lganda quriladi).
+        
+        Args:
+            user_ids: array('q') - takrorlanmaydigan user_id'lar
+            strikes: array('q')
+            last_strike: array('d') - epoch sekund (NaN - noma'lum)
+            usernames: Username'lar
+            first_names: Ismlar
+        
+        Returns:
+            ChatBucket
+        """
+        bucket = cls.__new__(cls)
+        bucket._index = None
+        bucket._leaderboard = None
+        bucket.user_ids = user_ids
+        bucket.strikes = strikes
+        bucket.last_strike = last_strike
+        bucket.usernames = usernames
+        bucket.first_names = first_names
+        return bucket
+    
+    @classmethod
+    def from_records(cls, records: List[Tuple[int, dict]]) -> 'ChatBucket':
+        """
+        Bucket'ni bir yo'la qurish (yuklash uchun).
+        
+        Ustunlar ro'yxatlardan bitta o'tishda yaratiladi, leaderboard esa
+        birinchi murojaatda - har yozuv uchun set() va move() chaqirilmaydi.
+        user_id takrorlansa (masalan "-100_05" va "-100_5" kalitlari)
+        oxirgisi qoladi.
+        
+        Args:
+            records: [(user_id, {"strikes", "last_strike", "username", "first_name"}), ...]
+        
+        Returns:
+            ChatBucket
+        """
+        index = {user_id: slot for slot, (user_id, _) in enumerate(records)}
+        if len(index) != len(records):
+            bucket = cls()
+            for user_id, record in records:
+                bucket.set(
+                    user_id,
+                    record.get('strikes', 0),
+                    parse_timestamp(record.get('last_strike')),
+                    record.get('username'),
+                    record.get('first_name')
+                )
+            return bucket
+        
+        bucket = cls.from_columns(
+            array('q', [user_id for user_id, _ in records]),
+            array('q', [record.get('strikes', 0) for _, record in records]),
+            array('d', [parse_timestamp(record.get('last_strike')) for _, record in records]),
+            [_intern(record.get('username')) for _, record in records],
+            [_intern(record.get('first_name')) for _, record in records]
+        )
+        bucket._index = index
+        return bucket
+    
+    def rows(self) -> Iterator[Tuple[int, int, Optional[str], Optional[str]]]:
+        """(user_id, strikes, username, first_name) qatorlari"""
+        return zip(self.user_ids, self.strikes, self.usernames, self.first_names)
+    
+    def offender(self, user_id: int, strikes: int) -> dict:
+        """Leaderboard elementi uchun ism ma'lumotlari bilan dict"""
+        slot = self.index[user_id]
+        return {
+            'user_id': user_id,
+            'strikes': strikes,
+            'username': self.usernames[slot],
+            'first_name': self.first_names[slot]
+        }
+    
+    def ranked(self, limit: Optional[int] = None) -> List[dict]:
+        """
+        Guruh qoidabuzarlari strike bo'yicha kamayish tartibida.
+        
+        Args:
+            limit: Maksimal natija soni (None - hammasi)
+        
+        Returns:
+            [{"user_id", "strikes", "username", "first_name"}, ...]
+        """
+        top = self.leaderboard.top(len(self.user_ids) if limit is None else limit)
+        return [self.offender(user_id, strikes) for user_id, strikes in top]
+
+
+class StrikeIndex:
+    """
+    chat_id -> ChatBucket indeksi.
+    
+    Guruh bo'yicha so'rovlar faqat o'sha guruh qoidabuzarlari soniga
+    proporsional: boshqa guruhlar yozuvlari ko'rilmaydi. Umumiy
+    foydalanuvchi/strike soni har o'zgarishda yangilanadi, global
+    leaderboard esa guruhlarni daraja bo'yicha sanaydi (yozuvlarni emas).
+    """
+    
+    def __init__(self):
+        self.chats: Dict[int, ChatBucket] = {}
+        self.leaderboard = Leaderboard()
+        self.total_strikes = 0
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def chat(self, chat_id: int) -> Optional[ChatBucket]:
+        """Guruh bucket'i (yozuv bo'lmasa None)"""
+        return self.chats.get(chat_id)
+    
+    def get(self, chat_id: int, user_id: int) -> Optional[dict]:
+        """Bitta yozuvni dict ko'rinishida olish"""
+        bucket = self.chats.get(chat_id)
+        return bucket.get(user_id) if bucket is not None else None
+    
+    def set(self, chat_id: int, user_id: int, record: dict) -> None:
+        """
+        Yozuvni JSON formatidagi dict'dan yozish.
+        
+        Args:
+            chat_id: Guruh ID
+            user_id: Foydalanuvchi ID
+            record: {"strikes", "last_strike", "username", "first_name"}
+        """
+        bucket = self.chats.get(chat_id)
+        if bucket is None:
+            bucket = self.chats[chat_id] = ChatBucket()
+        if user_id not in bucket:
+            self._size += 1
+        old = bucket.get_strikes(user_id)
+        new = record.get('strikes', 0)
+        bucket.set(
+            user_id,
+            new,
+            parse_timestamp(record.get('last_strike')),
+            record.get('username'),
+            record.get('first_name')
+        )
+        self._track(chat_id, old, new)
+    
+    def increment(
+        self,
+        chat_id: int,
+        user_id: int,
+        timestamp: str,
+        username: Optional[str] = None,
+        first_name: Optional[str] = None
+    ) -> int:
+        """
+        Strike sonini bittaga oshirish.
+        
+        Returns:
+            Yangi strike soni
+        """
+        bucket = self.chats.get(chat_id)
+        if bucket is None:
+            bucket = self.chats[chat_id] = ChatBucket()
+        if user_id not in bucket:
+            self._size += 1
+        old = bucket.get_strikes(user_id)
+        new = bucket.increment(
+            user_id,
+            parse_timestamp(timestamp),
+            username,
+            first_name
+        )
+        self._track(chat_id, old, new)
+        return new
+    
+    def remove(self, chat_id: int, user_id: int) -> bool:
+        """
+        Yozuvni o'chirish (bo'sh qolgan bucket ham o'chiriladi).
+        
+        Returns:
+            True agar yozuv bor edi
+        """
+        bucket = self.chats.get(chat_id)
+        if bucket is None:
+            return False
+        old = bucket.get_strikes(user_id)
+        if not bucket.remove(user_id):
+            return False
+        self._track(chat_id, old, 0)
+        self._size -= 1
+        if not len(bucket):
+            del self.chats[chat_id]
+        return True
+    
+    def _track(self, chat_id: int, old: int, new: int) -> None:
+        """Umumiy yig'indilar va global leaderboard'ni yangilash"""
+        self.total_strikes += new - old
+        self.leaderboard.move(chat_id, old, new)
+    
+    def top(self, limit: int) -> List[Tuple[int, dict]]:
+        """
+        Barcha guruhlar bo'yicha eng ko'p strike'li foydalanuvchilar.
+        
+        Global leaderboard'dan yuqori darajadagi guruhlar olinadi, keyin
+        shu guruhlarning o'z leaderboard'idagi o'sha daraja a'zolari.
+        
+        Args:
+            limit: Maksimal natija soni
+        
+        Returns:
+            [(chat_id, offender dict), ...]
+        """
+        result = []
+        for value, chats in self.leaderboard.descending():
+            for chat_id in chats:
+                bucket = self.chats[chat_id]
+                for user_id in bucket.leaderboard.levels[value]:
+                    if len(result) >= limit:
+                        return result
+                    result.append((chat_id, bucket.offender(user_id, value)))
+        return result
+    
+    def copy(self) -> 'StrikeIndex':
+        """
+        Indeks ma'lumotlarining nusxasi (leaderboard'larsiz).
+        
+        Lock ostida tez olinadi, keyin esa lock'siz serializatsiya qilinadi.
+        """
+        clone = StrikeIndex()
+        clone.chats = {chat_id: bucket.copy() for chat_id, bucket in self.chats.items()}
+        clone._size = self._size
+        return clone
+    
+    @staticmethod
+    def split_key(key: str) -> Tuple[int, int]:
+        """
+        "chat_id_user_id" kalitini ajratish.
+        
+        Raises:
+            ValueError: Kalit noto'g'ri bo'lsa
+        """
+        # chat_id manfiy bo'ladi: oxirgi "_" bo'yicha ajratamiz
+        chat_part, _, user_part = key.rpartition('_')
+        return int(chat_part), int(user_part)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, dict]) -> 'StrikeIndex':
+        """
+        JSON formatidagi {"chat_id_user_id": record} dan indeks qurish.
+        
+        Args:
+            data: JSON storage ma'lumotlari
+        
+        Returns:
+            StrikeIndex
+        """
+        grouped: Dict[int, List[Tuple[int, dict]]] = {}
+        for key, record in data.items():
+            try:
+                chat_id, user_id = cls.split_key(key)
+            except ValueError:
+                continue
+            records = grouped.get(chat_id)
+            if records is None:
+                records = grouped[chat_id] = []
+            records.append((user_id, record))
+        
+        # Guruhlar bir yo'la quriladi (index.set'dan bir necha marta tez)
+        return cls.from_buckets(
+            (chat_id, ChatBucket.from_records(records))
+            for chat_id, records in grouped.items()
+        )
+    
+    @classmethod
+    def from_buckets(cls, buckets: Iterable[Tuple[int, ChatBucket]]) -> 'StrikeIndex':
+        """
+        Tayyor guruh bucket'laridan indeks qurish.
+        
+        Yig'indilar va global leaderboard ustunlardan hisoblanadi -
+        bucket'larning o'z index/leaderboard'i qurilmaydi.
+        
+        Args:
+            buckets: (chat_id, ChatBucket) juftliklari (bo'sh bucket'lar o'tkaziladi)
+        
+        Returns:
+            StrikeIndex
+        """
+        index = cls()
+        levels = index.leaderboard.levels
+        for chat_id, bucket in buckets:
+            if not len(bucket):
+                continue
+            index.chats[chat_id] = bucket
+            index._size += len(bucket)
+            index.total_strikes += sum(bucket.strikes)
+            for value, count in bucket.strike_counts().items():
+                level = levels.get(value)
+                if level is None:
+                    level = levels[value] = {}
+                level[chat_id] = count
+        index.leaderboard.values = sorted(levels)
+        return index
+    
+    def to_dict(self) -> Dict[str, dict]:
+        """
+        Indeksni JSON formatiga aylantirish (snapshot uchun).
+        
+        Returns:
+            {"chat_id_user_id": record} dict
+        """
+        data = {}
+        for chat_id, bucket in self.chats.items():
+            for slot, user_id in enumerate(bucket.user_ids):
+                data[f"{chat_id}_{user_id}"] = {
+                    'strikes': bucket.strikes[slot],
+                    'last_strike': format_timestamp(bucket.last_strike[slot]),
+                    'username': bucket.usernames[slot],
+                    'first_name': bucket.first_names[slot]
+                }
+        return data
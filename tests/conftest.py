@@ -0,0 +1,26 @@
+"""
+Umumiy fixture'lar
+"""
+
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def bot_module(tmp_path_factory):
+    """bot.py'ni vaqtinchalik papkada import qilish (u fayllarni joriy papkada ochadi)"""
+    workdir = tmp_path_factory.mktemp('bot')
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(workdir)
+        mp.setenv('BOT_TOKEN', '123456:test')
+        mp.setenv('STRIKES_STORAGE', 'json')
+        mp.setenv('VERDICT_CACHE_FILE', '')
+        mp.setenv('LOG_FILE', '')
+        mp.setenv('LOG_LEVEL', 'CRITICAL')
+        mp.setenv('METRICS_PORT', '0')
+        # Har APK alohida strike olishi kerak (to'lqinlarsiz)
+        mp.setenv('BURST_WINDOW', '0')
+        bot = importlib.import_module('bot')
+        yield SimpleNamespace(bot=bot, workdir=workdir)
@@ -0,0 +1,92 @@
+"""
+AdminCache va BotRightsCache: birlashtirilgan API so'rovlari
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from telegram.constants import ChatMemberStatus
+
+from chat_cache import AdminCache, BotRightsCache
+
+CHAT_ID = -100
+
+
+class SlowBot:
+    """Birinchi chaqiruvi `release` kutadigan soxta bot"""
+    
+    id = 1
+    
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.calls = 0
+    
+    async def get_chat_administrators(self, chat_id):
+        self.calls += 1
+        if self.calls == 1:
+            await self.release.wait()
+        return [SimpleNamespace(user=SimpleNamespace(id=7))]
+    
+    async def get_chat_member(self, chat_id, user_id):
+        self.calls += 1
+        if self.calls == 1:
+            await self.release.wait()
+        return SimpleNamespace(
+            status=ChatMemberStatus.ADMINISTRATOR,
+            can_delete_messages=True,
+            can_restrict_members=True
+        )
+
+
+def test_admin_waiters_survive_cancelled_owner():
+    async def main():
+        cache = AdminCache(ttl=600)
+        bot = SlowBot()
+        owner = asyncio.create_task(cache.is_admin(bot, CHAT_ID, 7))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.is_admin(bot, CHAT_ID, 7))
+        await asyncio.sleep(0)
+        
+        owner.cancel()
+        assert await asyncio.wait_for(waiter, timeout=1) is True
+        assert owner.cancelled()
+        assert bot.calls == 2
+    
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_does_not_cancel_load():
+    async def main():
+        cache = AdminCache(ttl=600)
+        bot = SlowBot()
+        owner = asyncio.create_task(cache.is_admin(bot, CHAT_ID, 7))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.is_admin(bot, CHAT_ID, 8))
+        await asyncio.sleep(0)
+        
+        waiter.cancel()
+        await asyncio.sleep(0)
+        bot.release.set()
+        assert await asyncio.wait_for(owner, timeout=1) is True
+        assert waiter.cancelled()
+        assert bot.calls == 1
+    
+    asyncio.run(main())
+
+
+def test_rights_waiters_survive_cancelled_owner():
+    async def main():
+        cache = BotRightsCache(ttl=600)
+        bot = SlowBot()
+        owner = asyncio.create_task(cache.get(bot, CHAT_ID))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get(bot, CHAT_ID))
+        await asyncio.sleep(0)
+        
+        owner.cancel()
+        rights = await asyncio.wait_for(waiter, timeout=1)
+        assert rights.missing() == []
+        assert owner.cancelled()
+        assert bot.calls == 2
+    
+    asyncio.run(main())
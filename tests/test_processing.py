@@ -0,0 +1,268 @@
+"""
+KeyedUpdateProcessor: bir xil (chat, user) ketma-ket, boshqalar parallel
+
+handle_document aralash oqimlar bilan chaqiriladi, Bot API esa kechikishli
+soxta bot bilan almashtiriladi.
+"""
+
+import asyncio
+import random
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+from telegram import Bot, Update
+
+from processing import KeyedUpdateProcessor
+
+BOT_ID = 1
+
+
+class FakeBot(Bot):
+    """Bot API chaqiruvlarini tasodifiy kechikish bilan taqlid qiluvchi bot"""
+    
+    def __init__(self, latency: float, seed: int = 42):
+        super().__init__('123456:test')
+        with self._unfrozen():
+            self.latency = latency
+            self.rng = random.Random(seed)
+            self.actions = defaultdict(list)
+    
+    @property
+    def id(self) -> int:
+        return BOT_ID
+    
+    async def _call(self) -> None:
+        # Chaqiruvlar kelgan tartibda qaytmaydi
+        await asyncio.sleep(self.latency * self.rng.uniform(0.5, 1.5))
+    
+    async def get_chat_administrators(self, chat_id, *args, **kwargs):
+        await self._call()
+        return ()
+    
+    async def get_chat_member(self, chat_id, user_id, *args, **kwargs):
+        await self._call()
+        return SimpleNamespace(status='administrator', can_delete_messages=True, can_restrict_members=True)
+    
+    async def delete_message(self, chat_id, message_id, *args, **kwargs):
+        await self._call()
+        return True
+    
+    async def delete_messages(self, chat_id, message_ids, *args, **kwargs):
+        await self._call()
+        return True
+    
+    async def send_message(self, chat_id, text, *args, **kwargs):
+        await self._call()
+    
+    async def restrict_chat_member(self, chat_id, user_id, *args, **kwargs):
+        self.actions[(chat_id, user_id)].append('mute')
+        await self._call()
+        return True
+    
+    async def ban_chat_member(self, chat_id, user_id, *args, **kwargs):
+        self.actions[(chat_id, user_id)].append('ban')
+        await self._call()
+        return True
+
+
+def apk_update(update_id: int, chat_id: int, user_id: int, fake_bot=None) -> Update:
+    return Update.de_json({
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'supergroup', 'title': 'test'},
+            'from': {'id': user_id, 'is_bot': False, 'first_name': f"u{user_id}"},
+            'document': {'file_id': f"f{update_id}", 'file_unique_id': f"u{update_id}", 'file_name': 'game.apk'}
+        }
+    }, fake_bot)
+
+
+def interleaved(streams: list, seed: int = 7) -> list:
+    """Har oqim ichidagi tartibni saqlab, oqimlarni aralashtirish"""
+    rng = random.Random(seed)
+    streams = [list(stream) for stream in streams if stream]
+    updates = []
+    while streams:
+        stream = rng.choice(streams)
+        updates.append(stream.pop(0))
+        if not stream:
+            streams.remove(stream)
+    return updates
+
+
+def expected_actions(max_strikes: int, apks: int) -> tuple:
+    """Bitta foydalanuvchi uchun kutilgan jazolar tartibi va oxirgi strike"""
+    actions = []
+    strikes = 0
+    for _ in range(apks):
+        strikes += 1
+        if strikes >= max_strikes:
+            actions.append('ban')
+            strikes = 0
+        elif strikes == 2:
+            actions.append('mute')
+    return actions, strikes
+
+
+def run_bursts(env, name: str, apks: dict, concurrency: int) -> tuple:
+    """
+    Aralash oqimni KeyedUpdateProcessor orqali handle_document'ga berish.
+    
+    Args:
+        apks: (chat_id, user_id) -> APK soni
+    
+    Returns:
+        (soxta bot, strike database)
+    """
+    bot = env.bot
+    bot.db = bot.StrikeDatabase(str(env.workdir / f"{name}.json"))
+    bot.admin_cache = bot.AdminCache(ttl=600)
+    bot.bot_rights = bot.BotRightsCache(ttl=600)
+    fake_bot = FakeBot(latency=0.004)
+    context = SimpleNamespace(bot=fake_bot)
+    
+    update_id = 0
+    streams = []
+    for (chat_id, user_id), count in apks.items():
+        stream = []
+        for _ in range(count):
+            update_id += 1
+            stream.append(apk_update(update_id, chat_id, user_id, fake_bot))
+        streams.append(stream)
+    updates = interleaved(streams)
+    
+    async def main():
+        processor = KeyedUpdateProcessor(concurrency)
+        # Application kabi: har update uchun kelgan tartibda task
+        await asyncio.gather(*[
+            asyncio.create_task(processor.process_update(u, bot.handle_document(u, context)))
+            for u in updates
+        ])
+    
+    asyncio.run(main())
+    return fake_bot, bot.db
+
+
+def assert_escalation(env, fake_bot, db, apks: dict) -> None:
+    for (chat_id, user_id), count in apks.items():
+        actions, strikes = expected_actions(env.bot.Config.MAX_STRIKES, count)
+        assert fake_bot.actions[(chat_id, user_id)] == actions, (chat_id, user_id)
+        assert db.get_strikes(chat_id, user_id) == strikes, (chat_id, user_id)
+
+
+def test_interleaved_bursts_keep_strikes_and_escalation(bot_module):
+    apks = {
+        (-1001000000000 - c, 1000 + u): 1 + (c + u) % 6
+        for c in range(4)
+        for u in range(3)
+    }
+    fake_bot, db = run_bursts(bot_module, 'bursts', apks, concurrency=64)
+    try:
+        assert_escalation(bot_module, fake_bot, db, apks)
+    finally:
+        db.close()
+
+
+def test_same_key_backlog_larger_than_slots(bot_module):
+    # Bitta foydalanuvchi slotlardan ko'p APK yuboradi, boshqalar ham bor
+    apks = {(-1002000000000, 2000): 8, (-1002000000000, 2001): 3, (-1002000000001, 2000): 4}
+    fake_bot, db = run_bursts(bot_module, 'backlog', apks, concurrency=2)
+    try:
+        assert_escalation(bot_module, fake_bot, db, apks)
+    finally:
+        db.close()
+
+
+def test_queued_same_key_updates_do_not_hold_slots():
+    async def main():
+        processor = KeyedUpdateProcessor(2)
+        release = asyncio.Event()
+        
+        async def flood():
+            await release.wait()
+        
+        async def other():
+            pass
+        
+        # Kalit A: biri bajarilmoqda, qolganlari kalit lock'ini kutadi
+        flood_tasks = [
+            asyncio.create_task(processor.process_update(apk_update(i, -100, 1), flood()))
+            for i in range(1, 7)
+        ]
+        await asyncio.sleep(0)
+        try:
+            await asyncio.wait_for(processor.process_update(apk_update(7, -200, 2), other()), timeout=1)
+            stats = processor.stats()
+            assert stats['in_flight'] == 1
+            assert stats['waiting'] == 5
+            assert processor.current_concurrent_updates == 6
+        finally:
+            release.set()
+            await asyncio.gather(*flood_tasks)
+        assert processor.current_concurrent_updates == 0
+        assert processor.stats()['processed'] == 7
+    
+    asyncio.run(main())
+
+
+class LimitedBot(FakeBot):
+    """O'chirish va xabarlar haqiqiy PriorityRateLimiter orqali o'tadi"""
+    
+    def __init__(self, limiter):
+        super().__init__(latency=0.004)
+        with self._unfrozen():
+            self.limiter = limiter
+            self.deleted_at = {}
+    
+    async def _limited(self, endpoint: str, chat_id: int) -> None:
+        await self.limiter.process_request(self._call, (), {}, endpoint, {'chat_id': chat_id}, None)
+    
+    async def delete_message(self, chat_id, message_id, *args, **kwargs):
+        await self._limited('deleteMessage', chat_id)
+        self.deleted_at[message_id] = time.perf_counter()
+        return True
+    
+    async def send_message(self, chat_id, text, *args, **kwargs):
+        await self._limited('sendMessage', chat_id)
+
+
+def test_raid_deletes_do_not_wait_for_group_notices(bot_module, monkeypatch):
+    from notices import NoticeSender
+    from ratelimit import PriorityRateLimiter
+    
+    bot = bot_module.bot
+    monkeypatch.setattr(bot, 'db', bot.StrikeDatabase(str(bot_module.workdir / 'raid.json')))
+    monkeypatch.setattr(bot, 'admin_cache', bot.AdminCache(ttl=600))
+    monkeypatch.setattr(bot, 'bot_rights', bot.BotRightsCache(ttl=600))
+    monkeypatch.setattr(bot, 'notices', NoticeSender(max_pending=3))
+    limiter = PriorityRateLimiter()
+    fake_bot = LimitedBot(limiter)
+    context = SimpleNamespace(bot=fake_bot)
+    
+    # Bitta guruhga 20 ta yangi akkaunt: har biri 1-strike va ogohlantirish oladi
+    updates = [apk_update(i, -1003000000000, 3000 + i, fake_bot) for i in range(1, 21)]
+    sent = {}
+    
+    async def main():
+        processor = KeyedUpdateProcessor(8)
+        tasks = []
+        for update in updates:
+            sent[update.message.message_id] = time.perf_counter()
+            tasks.append(asyncio.create_task(
+                processor.process_update(update, bot.handle_document(update, context))
+            ))
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=10)
+        await bot.notices.close()
+        await limiter.shutdown()
+    
+    try:
+        asyncio.run(main())
+    finally:
+        bot.db.close()
+    
+    latencies = [fake_bot.deleted_at[i] - sent[i] for i in sent if i in fake_bot.deleted_at]
+    assert len(latencies) == len(updates)
+    assert max(latencies) < 2.0
+    assert bot.notices.stats()['dropped'] >= len(updates) - 1 - 3
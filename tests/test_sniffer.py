@@ -0,0 +1,50 @@
+"""
+ApkSniffer: xato loglarida fayl manzili (bot token) chiqmasligi
+"""
+
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import httpx
+
+from sniffer import ApkSniffer, describe_error
+
+TOKEN = '123:SECRET'
+FILE_URL = f"https://api.telegram.org/file/bot{TOKEN}/documents/file_1.zip"
+
+
+def not_found(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(404, request=request)
+
+
+def test_http_error_is_logged_without_url(caplog):
+    async def main():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(not_found))
+        sniffer = ApkSniffer(client=client)
+        try:
+            return await sniffer.inspect_url(FILE_URL, 4096)
+        finally:
+            await client.aclose()
+    
+    with caplog.at_level(logging.WARNING, logger='sniffer'):
+        assert asyncio.run(main()) is None
+    assert 'HTTPStatusError 404' in caplog.text
+    assert TOKEN not in caplog.text
+
+
+def test_get_file_path_is_not_logged(caplog):
+    class FileBot:
+        async def get_file(self, file_id):
+            return SimpleNamespace(file_path=f"/var/lib/bot{TOKEN}/documents/missing.zip", file_size=4096)
+    
+    document = SimpleNamespace(file_id='f1', file_size=4096, mime_type='application/zip', file_name='a.zip')
+    with caplog.at_level(logging.WARNING, logger='sniffer'):
+        assert asyncio.run(ApkSniffer().inspect(FileBot(), document)) is None
+    assert 'FileNotFoundError errno=2' in caplog.text
+    assert TOKEN not in caplog.text
+
+
+def test_describe_error_drops_exception_text():
+    error = httpx.ConnectError(f"connect failed for {FILE_URL}")
+    assert describe_error(error) == 'ConnectError'
@@ -0,0 +1,116 @@
+"""
+SQLiteStorage umumiy rejimi (qisqa kutish va qayta urinish) va TieredStorage
+statistikasi (dirty yozuvlar diskka yozilmasdan hisobga olinadi)
+"""
+
+import random
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from storage import SQLiteStorage, TieredStorage
+
+TIMESTAMP = '2024-01-15T10:30:00'
+
+
+def hold_write_lock(db_file: str, seconds: float) -> threading.Thread:
+    """Boshqa jarayon kabi yozish lock'ini `seconds` davomida ushlab turish"""
+    locked = threading.Event()
+    
+    def hold():
+        conn = sqlite3.connect(db_file, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+        locked.set()
+        time.sleep(seconds)
+        conn.execute("COMMIT")
+        conn.close()
+    
+    thread = threading.Thread(target=hold)
+    thread.start()
+    locked.wait()
+    return thread
+
+
+def test_shared_write_retries_without_blocking_reads(tmp_path):
+    db_file = str(tmp_path / 'strikes.db')
+    store = SQLiteStorage(db_file, shared=True)
+    try:
+        store.increment(-100, 1, TIMESTAMP)
+        holder = hold_write_lock(db_file, 0.5)
+        
+        result = {}
+        writer = threading.Thread(target=lambda: result.update(strikes=store.increment(-100, 2, TIMESTAMP)))
+        writer.start()
+        time.sleep(0.1)
+        
+        # Yozuv kutayotgan bo'lsa ham o'qish ulanish lock'ida qolib ketmaydi
+        started = time.perf_counter()
+        assert store.get(-100, 1)['strikes'] == 1
+        assert time.perf_counter() - started < 0.2
+        
+        writer.join()
+        holder.join()
+        assert result['strikes'] == 1
+        assert store.busy_retries > 0
+    finally:
+        store.close()
+
+
+def test_shared_write_gives_up_after_busy_timeout(tmp_path):
+    db_file = str(tmp_path / 'strikes.db')
+    store = SQLiteStorage(db_file, shared=True, busy_timeout=0.2)
+    try:
+        holder = hold_write_lock(db_file, 0.6)
+        started = time.perf_counter()
+        with pytest.raises(sqlite3.OperationalError):
+            store.increment(-100, 1, TIMESTAMP)
+        assert time.perf_counter() - started < 0.5
+        holder.join()
+        assert store.increment(-100, 1, TIMESTAMP) == 1
+    finally:
+        store.close()
+
+
+def test_tiered_aggregates_match_disk_without_write_back(tmp_path):
+    rng = random.Random(5)
+    store = TieredStorage(
+        SQLiteStorage(str(tmp_path / 'strikes.db')),
+        max_bytes=40 * TieredStorage.ENTRY_BYTES,
+        flush_interval=3600,
+        flush_threshold=10 ** 6
+    )
+    try:
+        # Bir qismi diskka tushgan, bir qismi keshda dirty
+        for step in range(600):
+            chat_id, user_id = -rng.randrange(1, 4), rng.randrange(60)
+            op = rng.random()
+            if op < 0.7:
+                store.increment(chat_id, user_id, TIMESTAMP, username=f"u{user_id}")
+            elif op < 0.85:
+                store.decrement(chat_id, user_id)
+            else:
+                store.delete(chat_id, user_id)
+            if step == 300:
+                store.flush()
+        
+        dirty = store.stats()['dirty']
+        assert dirty > 0
+        stats = store.statistics(limit=5)
+        strikes = {chat_id: store.chat_strikes(chat_id) for chat_id in (-1, -2, -3)}
+        offenders = {chat_id: store.chat_offenders(chat_id, limit=4) for chat_id in (-1, -2, -3)}
+        assert store.stats()['dirty'] == dirty
+        
+        store.flush()
+        expected = store.backing.statistics(limit=5)
+        assert stats['total_users'] == expected['total_users']
+        assert stats['total_strikes'] == expected['total_strikes']
+        assert [row['strikes'] for row in stats['top_offenders']] == [row['strikes'] for row in expected['top_offenders']]
+        for chat_id in (-1, -2, -3):
+            assert strikes[chat_id] == store.backing.chat_strikes(chat_id)
+            assert [row['strikes'] for row in offenders[chat_id]] == [
+                row['strikes'] for row in store.backing.chat_offenders(chat_id, limit=4)
+            ]
+    finally:
+        store.close()
@@ -0,0 +1,44 @@
+"""
+StrikeIndex va ChatBucket: yuklangandan keyingi leaderboard
+"""
+
+from strike_index import StrikeIndex
+
+RECORD = {'strikes': 2, 'last_strike': '2024-01-01T00:00:00', 'username': 'eski', 'first_name': 'Eski'}
+
+
+def loaded_index() -> StrikeIndex:
+    """Fayldan yuklangandek: bucket'larning index/leaderboard'i hali qurilmagan"""
+    return StrikeIndex.from_dict({'-100_1': dict(RECORD)})
+
+
+def test_new_offender_after_load_is_ranked_once():
+    index = loaded_index()
+    index.increment(-100, 2, '2024-02-01T00:00:00', 'yangi', 'Yangi')
+    
+    bucket = index.chat(-100)
+    assert bucket.leaderboard.levels == {2: {1: 1}, 1: {2: 1}}
+    assert [(o['user_id'], o['strikes']) for o in bucket.ranked()] == [(1, 2), (2, 1)]
+
+
+def test_reset_after_load_leaves_no_stale_member():
+    index = loaded_index()
+    index.increment(-100, 2, '2024-02-01T00:00:00', 'yangi', 'Yangi')
+    assert index.remove(-100, 2)
+    
+    bucket = index.chat(-100)
+    assert bucket.leaderboard.levels == {2: {1: 1}}
+    assert [(o['user_id'], o['strikes']) for o in bucket.ranked(10)] == [(1, 2)]
+    assert [(chat_id, o['user_id']) for chat_id, o in index.top(10)] == [(-100, 1)]
+
+
+def test_set_after_load_matches_fresh_index():
+    loaded = loaded_index()
+    fresh = StrikeIndex()
+    fresh.set(-100, 1, dict(RECORD))
+    for index in (loaded, fresh):
+        index.set(-100, 3, {'strikes': 4, 'last_strike': None, 'username': None, 'first_name': None})
+        index.remove(-100, 1)
+    
+    assert loaded.chat(-100).leaderboard.levels == fresh.chat(-100).leaderboard.levels == {4: {3: 1}}
+    assert loaded.top(10) == fresh.top(10)
@@ -0,0 +1,38 @@
+"""
+VerdictCache va detect_apk: kesh nom qoidalarini chetlab o'tmasligi
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from telegram import Document
+
+from verdicts import VerdictCache
+
+
+def document(name: str, size: int = 1000, mime_type: str = 'application/zip') -> Document:
+    return Document('f1', 'u1', file_name=name, mime_type=mime_type, file_size=size)
+
+
+def test_peek_checks_size_and_mime_like_get():
+    cache = VerdictCache()
+    cache.put(document('a.zip'), False)
+    
+    assert cache.peek(document('a.zip')) is False
+    for other in (document('a.zip', size=2000), document('a.zip', mime_type='image/jpeg')):
+        assert cache.peek(other) is None
+        assert cache.get(other) is None
+
+
+def test_cached_clean_verdict_does_not_skip_name_rule(bot_module, monkeypatch):
+    bot = bot_module.bot
+    monkeypatch.setattr(bot, 'verdict_cache', VerdictCache())
+    monkeypatch.setattr(bot, 'sniffer', None)
+    context = SimpleNamespace(bot=None)
+    
+    # Tarkibi toza deb topilgan fayl keyin APK nomi bilan yuborildi
+    bot.verdict_cache.put(document('photos.zip'), False)
+    assert asyncio.run(bot.detect_apk(context, document('photos.apk'))) is True
+    
+    # Hukm endi APK: nomi yana o'zgartirilgan nusxa ham ushlanadi
+    assert asyncio.run(bot.detect_apk(context, document('photos.zip'))) is True
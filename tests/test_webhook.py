@@ -0,0 +1,23 @@
+"""
+WebhookServer: secret token har doim tekshiriladi
+"""
+
+import pytest
+
+from webhook import SECRET_HEADER, WebhookServer
+
+SECRET = 'test-secret'
+
+
+def test_secret_token_is_required():
+    for secret in ('', None):
+        with pytest.raises(ValueError):
+            WebhookServer(None, secret_token=secret)
+
+
+def test_request_without_secret_is_rejected():
+    server = WebhookServer(None, secret_token=SECRET)
+    
+    assert server._check('POST', '/webhook', {}, b'{}') == 403
+    assert server._check('POST', '/webhook', {SECRET_HEADER: 'wrong'}, b'{}') == 403
+    assert server._check('POST', '/webhook', {SECRET_HEADER: SECRET}, b'{}') == 200
@@ -0,0 +1,223 @@
+"""
+Telegram Anti-APK Security Bot - Verdict Cache
+Fayl hukmlarini (APK / toza) file_unique_id bo'yicha keshlash
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from telegram import Document
+
+from storage import WriteBehind
+
+logger = logging.getLogger(__name__)
+
+# (hukm, amal qilish muddati (epoch), hajm, mime turi)
+Entry = Tuple[bool, float, Optional[int], Optional[str]]
+
+
+class VerdictCache:
+    """
+    file_unique_id -> hukm LRU + TTL keshi.
+    
+    Bitta APK ko'p guruhlarga qayta yuborilganda Telegram unga bir xil
+    file_unique_id beradi - ma'lum APK'lar tekshiruvsiz o'chiriladi,
+    toza fayllar esa qayta yuklanmaydi. Hajm va MIME turi ikkinchi kalit
+    sifatida saqlanadi: ular mos kelmasa yozuv ishlatilmaydi.
+    
+    Kesh faylga write-behind oqimi orqali saqlanadi va restart'dan keyin
+    qayta yuklanadi.
+    """
+    
+    def __init__(
+        self,
+        cache_file: Optional[str] = None,
+        max_entries: int = 100000,
+        ttl: float = 7 * 24 * 3600,
+        flush_interval: float = 30.0
+    ):
+        """
+        Kesh yaratish.
+        
+        Args:
+            cache_file: Saqlash fayli (None bo'lsa faqat xotirada)
+            max_entries: Maksimal yozuvlar soni (eng eskisi chiqariladi)
+            ttl: Hukmning amal qilish muddati (sekund)
+            flush_interval: Faylga yozishning maksimal kechikishi (sekund)
+        """
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.ttl = ttl
+        
+        self._entries: 'OrderedDict[str, Entry]' = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        
+        self._writer = None
+        if cache_file:
+            self._load()
+            self._writer = WriteBehind(
+                self._save,
+                interval=flush_interval,
+                threshold=1000,
+                name='verdict-writer'
+            )
+    
+    # ==================== O'QISH/YOZISH ====================
+    
+    def get(self, document: Document) -> Optional[bool]:
+        """
+        Hujjat uchun saqlangan hukm.
+        
+        Args:
+            document: Telegram Document
+        
+        Returns:
+            True - APK, False - toza, None - hukm yo'q
+        """
+        key = document.file_unique_id
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            verdict, expires_at, size, mime_type = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            if not self._same_file(document, size, mime_type):
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return verdict
+    
+    def peek(self, document: Document) -> Optional[bool]:
+        """
+        Hukmni statistika va LRU tartibiga ta'sir qilmasdan ko'rish.
+        
+        get() kabi hajm va MIME turi ham solishtiriladi.
+        
+        Args:
+            document: Telegram Document
+        
+        Returns:
+            True - APK, False - toza, None - hukm yo'q, eskirgan yoki
+            boshqa fayl
+        """
+        entry = self._entries.get(document.file_unique_id)
+        if entry is None or entry[1] < time.time():
+            return None
+        verdict, _, size, mime_type = entry
+        if not self._same_file(document, size, mime_type):
+            return None
+        return verdict
+    
+    def put(self, document: Document, verdict: bool) -> None:
+        """
+        Hujjat hukmini saqlash.
+        
+        Args:
+            document: Telegram Document
+            verdict: True - APK, False - toza
+        """
+        entry = (verdict, time.time() + self.ttl, document.file_size, document.mime_type)
+        with self._lock:
+            self._entries[document.file_unique_id] = entry
+            self._entries.move_to_end(document.file_unique_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        
+        if self._writer is not None:
+            self._writer.mark_dirty()
+    
+    def clear(self) -> None:
+        """Barcha hukmlarni o'chirish (masalan, qoidalar o'zgarganda)"""
+        with self._lock:
+            self._entries.clear()
+        if self._writer is not None:
+            self._writer.mark_dirty()
+    
+    @staticmethod
+    def _same_file(
+        document: Document,
+        size: Optional[int],
+        mime_type: Optional[str]
+    ) -> bool:
+        """Ikkinchi kalit (hajm, MIME) mos kelishini tekshirish"""
+        if size is not None and document.file_size is not None and size != document.file_size:
+            return False
+        if mime_type is not None and document.mime_type is not None and mime_type != document.mime_type:
+            return False
+        return True
+    
+    # ==================== SAQLASH ====================
+    
+    def _load(self) -> None:
+        """Keshni fayldan yuklash (muddati o'tganlar tashlab yuboriladi)"""
+        if not os.path.exists(self.cache_file):
+            return
+        
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error(f"Hukmlar keshini yuklashda xato: {e}")
+            return
+        
+        now = time.time()
+        # Fayl LRU tartibida saqlanadi - oxirgilari eng yangilari
+        for key, (verdict, expires_at, size, mime_type) in list(data.items())[-self.max_entries:]:
+            if expires_at >= now:
+                self._entries[key] = (bool(verdict), expires_at, size, mime_type)
+        
+        logger.info(f"Hukmlar keshi yuklandi: {len(self._entries)} ta yozuv")
+    
+    def _save(self) -> None:
+        """Keshni faylga yozish (WriteBehind oqimida chaqiriladi)"""
+        with self._lock:
+            data = dict(self._entries)
+        
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+    
+    def close(self) -> None:
+        """Oxirgi o'zgarishlarni yozish va fon oqimini to'xtatish"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+    
+    # ==================== STATISTIKA ====================
+    
+    def stats(self) -> dict:
+        """
+        Kesh statistikasi.
+        
+        Returns:
+            {"entries", "hits", "misses", "evictions", "expirations", "hit_rate"}
+        """
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / total if total else 0.0
+        }
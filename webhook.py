@@ -0,0 +1,365 @@
+"""
+Telegram Anti-APK Security Bot - Webhook
+Update'larni polling o'rniga o'rnatilgan async HTTP endpoint orqali qabul qilish
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import signal
+from typing import Dict, Optional, Sequence, Set, Tuple
+
+from telegram import Update
+from telegram.ext import Application
+
+from prefilter import UpdatePrefilter
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = 'x-telegram-bot-api-secret-token'
+
+REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    403: 'Forbidden',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    503: 'Service Unavailable'
+}
+
+
+class WebhookServer:
+    """
+    Telegram webhook so'rovlarini qabul qiluvchi minimal HTTP/1.1 server.
+    
+    Har POST'da secret token tekshiriladi (majburiy: usiz webhook yo'liga
+    yetgan har kim soxta update bilan xabarlarni o'chirtirib, foydalanuvchilarni
+    ban qildira oladi), update dekodlanadi va
+    Application'ning update processori orqali fon vazifasida bajariladi -
+    Telegram'ga javob qayta ishlashni kutmasdan qaytadi.
+    
+    Qabul qilingan, lekin hali tugallanmagan update'lar soni `max_pending`
+    bilan cheklanadi. Chegara to'lsa so'rov `put_timeout` sekund kutadi,
+    keyin 503 qaytariladi - Telegram update'ni keyinroq qayta yuboradi
+    (backpressure), bot xotirasi esa cheksiz o'smaydi.
+    
+    TLS qo'llab-quvvatlanmaydi: server reverse proxy (nginx, caddy) ortida
+    ishlashi kerak.
+    """
+    
+    def __init__(
+        self,
+        application: Application,
+        path: str = '/webhook',
+        secret_token: str = '',
+        listen: str = '127.0.0.1',
+        port: int = 8080,
+        max_pending: int = 1000,
+        put_timeout: float = 1.0,
+        max_body: int = 1024 * 1024,
+        idle_timeout: float = 75.0,
+        prefilter: Optional[UpdatePrefilter] = None
+    ):
+        """
+        Server yaratish.
+        
+        Args:
+            application: Update'larni qayta ishlovchi Application
+            path: Webhook URL yo'li
+            secret_token: X-Telegram-Bot-Api-Secret-Token qiymati
+            listen: Tinglanadigan manzil
+            port: Port (0 - tasodifiy bo'sh port)
+            max_pending: Qabul qilingan, tugallanmagan update'lar chegarasi
+            put_timeout: Chegara to'lganda kutish (sekund), keyin 503
+            max_body: So'rov tanasining maksimal hajmi (bayt)
+            idle_timeout: Keep-alive ulanishning bo'sh turish vaqti (sekund)
+            prefilter: Keraksiz update'larni dekodlashdan oldin tashlovchi filtr
+        
+        Raises:
+            ValueError: secret_token bo'sh bo'lsa
+        """
+        if not secret_token:
+            raise ValueError("Webhook uchun secret token majburiy")
+        self.application = application
+        self.path = path
+        self.secret_token = secret_token
+        self.listen = listen
+        self.port = port
+        self.max_pending = max_pending
+        self.put_timeout = put_timeout
+        self.max_body = max_body
+        self.idle_timeout = idle_timeout
+        self.prefilter = prefilter
+        
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._slots = asyncio.Semaphore(max_pending)
+        self._tasks: Set[asyncio.Task] = set()
+        self._connections: Set[asyncio.StreamWriter] = set()
+        
+        self.received = 0
+        self.accepted = 0
+        self.rejected: Dict[int, int] = {}
+        self.max_in_flight = 0
+    
+    # ==================== ISHGA TUSHIRISH ====================
+    
+    async def start(self) -> None:
+        """Tinglashni boshlash (port=0 bo'lsa haqiqiy port self.port'ga yoziladi)"""
+        self._server = await asyncio.start_server(self._serve, self.listen, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"🌐 Webhook server: http://{self.listen}:{self.port}{self.path}")
+    
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """
+        Yangi so'rovlarni to'xtatish va qabul qilinganlarini tugatish.
+        
+        Args:
+            drain_timeout: Tugallanmagan update'larni kutish (sekund)
+        """
+        if self._server is not None:
+            self._server.close()
+            # Keep-alive ulanishlar o'zi yopilmaydi
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        
+        if self._tasks:
+            _, pending = await asyncio.wait(set(self._tasks), timeout=drain_timeout)
+            if pending:
+                logger.warning(f"Webhook: {len(pending)} ta update tugallanmay qoldi")
+    
+    # ==================== HTTP ====================
+    
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Bitta (keep-alive) ulanishdagi so'rovlarni ketma-ket bajarish"""
+        self._connections.add(writer)
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, version, headers, body = request
+                
+                status = await self._dispatch(method, target, headers, body)
+                # O'qilmagan (juda katta) tana bo'lsa ulanishni davom ettirib bo'lmaydi
+                keep_alive = (
+                    version == 'HTTP/1.1'
+                    and headers.get('connection', '').lower() != 'close'
+                    and len(body) == int(headers.get('content-length', '0'))
+                )
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Length: 0\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    f"\r\n".encode('ascii')
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+    
+    async def _read_request(
+        self,
+        reader: asyncio.StreamReader
+    ) -> Optional[Tuple[str, str, str, Dict[str, str], bytes]]:
+        """
+        HTTP so'rovini o'qish.
+        
+        Returns:
+            (method, target, version, headers, body), ulanish yopilgan bo'lsa None
+        
+        Raises:
+            ValueError: So'rov formati noto'g'ri
+        """
+        line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+        if not line:
+            return None
+        method, target, version = line.decode('latin-1').split()
+        
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        
+        length = int(headers.get('content-length', '0'))
+        if length > self.max_body:
+            return method, target, version, headers, b''
+        body = await reader.readexactly(length) if length else b''
+        return method, target, version, headers, body
+    
+    async def _dispatch(
+        self,
+        method: str,
+        target: str,
+        headers: Dict[str, str],
+        body: bytes
+    ) -> int:
+        """So'rovni tekshirish va update'ni navbatga qo'yish (HTTP status)"""
+        self.received += 1
+        status = self._check(method, target, headers, body)
+        if status == 200:
+            status = await self._enqueue(body)
+        if status != 200:
+            self.rejected[status] = self.rejected.get(status, 0) + 1
+        return status
+    
+    def _check(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> int:
+        """So'rov yo'li, metodi, hajmi va secret token'ini tekshirish"""
+        if target.split('?', 1)[0] != self.path:
+            return 404
+        if method != 'POST':
+            return 405
+        if int(headers.get('content-length', '0')) > self.max_body:
+            return 413
+        if not hmac.compare_digest(
+            headers.get(SECRET_HEADER, '').encode(), self.secret_token.encode()
+        ):
+            return 403
+        return 200
+    
+    async def _enqueue(self, body: bytes) -> int:
+        """Update'ni dekodlash va bo'sh joy bo'lsa fon vazifasida bajarish"""
+        try:
+            data = json.loads(body)
+            # Toza hujjatlar PTB obyektlariga aylantirilmaydi - Telegram'ga
+            # baribir 200 qaytariladi, aks holda u qayta yuboradi
+            if self.prefilter is not None and not self.prefilter.check_raw(data):
+                return 200
+            update = Update.de_json(data, self.application.bot)
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            logger.warning(f"Webhook: noto'g'ri update: {e}")
+            return 400
+        
+        if self.prefilter is not None and not self.prefilter.has_handler(update):
+            return 200
+        
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.put_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Webhook: navbat to'la ({self.max_pending}), 503 qaytarildi")
+            return 503
+        
+        processor = self.application.update_processor
+        task = asyncio.create_task(
+            processor.process_update(update, self.application.process_update(update))
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._finished)
+        self.accepted += 1
+        self.max_in_flight = max(self.max_in_flight, len(self._tasks))
+        return 200
+    
+    def _finished(self, task: asyncio.Task) -> None:
+        """Update tugadi: joyni bo'shatish"""
+        self._tasks.discard(task)
+        self._slots.release()
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Webhook update'ida xato: {task.exception()}")
+    
+    # ==================== STATISTIKA ====================
+    
+    def stats(self) -> dict:
+        """
+        Webhook statistikasi.
+        
+        Returns:
+            {"received", "accepted", "rejected", "in_flight", "max_in_flight", "max_pending"}
+        """
+        return {
+            'received': self.received,
+            'accepted': self.accepted,
+            'rejected': dict(self.rejected),
+            'in_flight': len(self._tasks),
+            'max_in_flight': self.max_in_flight,
+            'max_pending': self.max_pending
+        }
+
+
+async def run_webhook(
+    application: Application,
+    url: str,
+    listen: str,
+    port: int,
+    path: str,
+    secret_token: str,
+    max_pending: int = 1000,
+    max_connections: int = 40,
+    allowed_updates: Optional[Sequence[str]] = None,
+    drop_pending_updates: bool = False,
+    prefilter: Optional[UpdatePrefilter] = None
+) -> None:
+    """
+    Botni webhook rejimida ishga tushirish (SIGINT/SIGTERM'gacha).
+    
+    Application.run_polling() kabi post_init, post_stop va post_shutdown
+    hook'lari chaqiriladi.
+    
+    Args:
+        application: Updater'siz yaratilgan Application
+        url: Telegram'ga beriladigan ommaviy HTTPS URL (yo'l bilan)
+        listen: Tinglanadigan manzil
+        port: Port
+        path: Webhook URL yo'li
+        secret_token: Secret token (setWebhook'ga beriladi va har so'rovda tekshiriladi)
+        max_pending: Tugallanmagan update'lar chegarasi
+        max_connections: Telegram'ning parallel ulanishlari (1-100)
+        allowed_updates: Qabul qilinadigan update turlari
+        drop_pending_updates: Eski update'larni tashlab yuborish
+        prefilter: Dispatch'dan oldingi filtr (ixtiyoriy)
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows: signal handler'lar qo'llab-quvvatlanmaydi
+            pass
+    
+    server = WebhookServer(
+        application,
+        path=path,
+        secret_token=secret_token,
+        listen=listen,
+        port=port,
+        max_pending=max_pending,
+        prefilter=prefilter
+    )
+    
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    application.bot_data['webhook'] = server
+    
+    try:
+        await application.start()
+        await server.start()
+        await application.bot.set_webhook(
+            url=url,
+            secret_token=secret_token,
+            max_connections=max_connections,
+            allowed_updates=allowed_updates,
+            drop_pending_updates=drop_pending_updates
+        )
+        logger.info(f"Webhook o'rnatildi: {url}")
+        
+        await stop.wait()
+    finally:
+        await server.stop()
+        if application.running:
+            await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)